@@ -10,49 +10,77 @@ from app.core.security import ALGORITHM
 from app.db.session import get_db
 from app.models.enums import UserRole
 from app.models.user import User
+from app.services.capacity_governance import RoleIndex
+from app.services.capacity_roles import load_role_index
+from app.services.principal_cache import Principal, load_principal, principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+def _token_user_id(token: str) -> int | None:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        return int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _principal(db: Session, user_id: int) -> Principal | None:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        generation = principal_cache.generation()
+        principal = load_principal(db, user_id)
+        if principal is not None:
+            principal_cache.put(principal, generation)
+    return principal
+
+
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> Principal:
+    """The caller's principal, from the principal cache when it holds one; inactive users are refused."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str | None = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError as exc:
-        raise credentials_exception from exc
-
-    user = db.get(User, int(user_id))
-    if not user:
+    user_id = _token_user_id(token)
+    if user_id is None:
         raise credentials_exception
-    return user
+    principal = _principal(db, user_id)
+    if not principal:
+        raise credentials_exception
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User is inactive. Contact ADMIN.")
+    return principal
 
 
 def get_current_user_optional(
     db: Session = Depends(get_db),
     token: str | None = Depends(oauth2_scheme_optional),
-) -> User | None:
+) -> Principal | None:
     if not token:
         return None
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str | None = payload.get("sub")
-        if user_id is None:
-            return None
-    except JWTError:
+    user_id = _token_user_id(token)
+    if user_id is None:
+        return None
+    principal = _principal(db, user_id)
+    if not principal or not principal.is_active:
         return None
-    user = db.get(User, int(user_id))
+    return principal
+
+
+def get_current_user_record(
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_user),
+) -> User:
+    """The caller's ``User`` row, for the endpoints that read or change the account itself."""
+    user = db.get(User, principal.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
     return user
 
 
 def require_roles(*allowed_roles: UserRole) -> Callable:
-    def checker(current_user: User = Depends(get_current_user)) -> User:
+    def checker(current_user: Principal = Depends(get_current_user)) -> Principal:
         # PM and PO are treated as equivalent execution roles.
         pm_po_alias = {
             UserRole.PM: UserRole.PO,
@@ -75,13 +103,17 @@ def require_roles(*allowed_roles: UserRole) -> Callable:
     return checker
 
 
-def ensure_custom_role_permission(current_user: User, permission_attr: str, action_label: str) -> None:
-    custom_role = current_user.custom_role
-    if not custom_role:
+def ensure_custom_role_permission(current_user: Principal, permission_attr: str, action_label: str) -> None:
+    if current_user.custom_role_id is None:
         return
-    if getattr(custom_role, permission_attr, False):
+    if permission_attr in current_user.custom_role_permissions:
         return
     raise HTTPException(
         status_code=403,
-        detail=f"Custom role '{custom_role.name}' does not allow: {action_label}",
+        detail=f"Custom role '{current_user.custom_role_name}' does not allow: {action_label}",
     )
+
+
+def get_role_index(db: Session = Depends(get_db)) -> RoleIndex:
+    """Capacity role index, loaded once per request (FastAPI caches dependencies)."""
+    return load_role_index(db)
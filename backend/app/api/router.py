@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import audit, auth, chat, dashboard, documents, features, fte_roles, intake, projects, roadmap, settings, users
+from app.api.routes import audit, auth, changes, chat, dashboard, documents, features, fte_roles, intake, projects, roadmap, settings, users
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
@@ -14,4 +14,5 @@ api_router.include_router(settings.router)
 api_router.include_router(dashboard.router)
 api_router.include_router(chat.router)
 api_router.include_router(audit.router)
+api_router.include_router(changes.router)
 api_router.include_router(fte_roles.router, prefix="/fte_roles", tags=["fte_roles"])
@@ -1,172 +1,217 @@
+import csv
+import io
+import json
 from datetime import datetime
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import require_roles
 from app.db.session import get_db
-from app.models.document import Document
 from app.models.enums import UserRole
-from app.models.intake_item import IntakeItem
-from app.models.intake_item_version import IntakeItemVersion
-from app.models.roadmap_item import RoadmapItem
-from app.models.roadmap_item_version import RoadmapItemVersion
-from app.models.roadmap_movement_request import RoadmapMovementRequest
-from app.models.roadmap_plan_item import RoadmapPlanItem
-from app.models.user import User
 from app.schemas.audit import (
     AuditCenterOut,
+    AuditDocumentPageOut,
     AuditDocumentRowOut,
+    AuditEventPageOut,
+    AuditEventRowOut,
+    AuditIntakeChangePageOut,
     AuditIntakeChangeRowOut,
+    AuditMovementPageOut,
     AuditMovementRowOut,
+    AuditRoadmapChangePageOut,
     AuditRoadmapChangeRowOut,
     AuditSummaryOut,
 )
+from app.services.audit_center import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    AuditFilters,
+    audit_section_rows,
+    count_audit_rows,
+    fetch_audit_page,
+    iter_audit_rows,
+    validate_audit_filters,
+)
+from app.services.fast_json import fast_responses_enabled, json_response
+from app.services.roadmap_as_of import as_naive_utc
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 
+AUDIT_ROLES = (UserRole.ADMIN, UserRole.CEO, UserRole.VP)
+SECTION_ROW_SCHEMAS = {
+    "documents": AuditDocumentRowOut,
+    "intake_changes": AuditIntakeChangeRowOut,
+    "roadmap_changes": AuditRoadmapChangeRowOut,
+    "movement_events": AuditMovementRowOut,
+    "events": AuditEventRowOut,
+}
+
+
+def audit_filters(
+    actor_id: int | None = Query(default=None, ge=1),
+    date_from: datetime | None = Query(default=None),
+    date_to: datetime | None = Query(default=None),
+    action: str | None = Query(default=None, max_length=64),
+    context: str | None = Query(default=None, max_length=30),
+) -> AuditFilters:
+    return AuditFilters(
+        actor_id=actor_id,
+        date_from=as_naive_utc(date_from) if date_from else None,
+        date_to=as_naive_utc(date_to) if date_to else None,
+        action=action or None,
+        context=context or None,
+    )
+
+
+def _audit_page(db: Session, section: str, filters: AuditFilters, cursor: str | None, limit: int) -> dict:
+    try:
+        items, next_cursor = fetch_audit_page(db, section, filters, cursor, limit)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    page = {"items": items, "next_cursor": next_cursor}
+    return json_response(page) if fast_responses_enabled() else page
+
+
+def _audit_center(db: Session) -> dict:
+    sections = {
+        name: audit_section_rows(db, name)
+        for name in ("documents", "intake_changes", "roadmap_changes", "movement_events")
+    }
+    return {
+        "generated_at": datetime.utcnow(),
+        "summary": {
+            "documents_total": len(sections["documents"]),
+            "intake_changes_total": len(sections["intake_changes"]),
+            "roadmap_changes_total": len(sections["roadmap_changes"]),
+            "movement_total": len(sections["movement_events"]),
+        },
+        **sections,
+    }
+
 
 @router.get("/center", response_model=AuditCenterOut)
 def get_audit_center(
     db: Session = Depends(get_db),
-    _=Depends(require_roles(UserRole.ADMIN, UserRole.CEO, UserRole.VP)),
+    _=Depends(require_roles(*AUDIT_ROLES)),
 ):
-    user_rows = db.query(User).all()
-    users = {u.id: u.email for u in user_rows}
-    user_roles = {u.id: str(u.role) for u in user_rows}
-
-    intake_items = db.query(IntakeItem).all()
-    intake_by_doc = {item.document_id: item for item in intake_items}
-    intake_by_id = {item.id: item for item in intake_items}
-
-    roadmap_items = db.query(RoadmapItem).all()
-    roadmap_by_id = {item.id: item for item in roadmap_items}
-    plan_items = db.query(RoadmapPlanItem).all()
-    plan_by_bucket = {item.bucket_item_id: item for item in plan_items}
-    plan_by_id = {item.id: item for item in plan_items}
-
-    documents = db.query(Document).order_by(Document.id.desc()).all()
-    document_rows: list[AuditDocumentRowOut] = []
-    for doc in documents:
-        intake = intake_by_doc.get(doc.id)
-        roadmap = roadmap_by_id.get(intake.roadmap_item_id) if intake and intake.roadmap_item_id else None
-        plan = plan_by_bucket.get(roadmap.id) if roadmap else None
-        project_context = (
-            (plan.project_context if plan else "")
-            or (roadmap.project_context if roadmap else "")
-            or (intake.project_context if intake else "")
-        )
-        document_rows.append(
-            AuditDocumentRowOut(
-                document_id=doc.id,
-                file_name=doc.file_name or "",
-                file_type=doc.file_type or "",
-                file_hash=doc.file_hash or "",
-                notes=doc.notes or "",
-                uploaded_by=doc.uploaded_by,
-                uploaded_by_email=users.get(doc.uploaded_by),
-                uploaded_by_role=user_roles.get(doc.uploaded_by),
-                created_at=doc.created_at,
-                intake_item_id=intake.id if intake else None,
-                intake_status=intake.status if intake else "",
-                roadmap_item_id=roadmap.id if roadmap else None,
-                roadmap_plan_item_id=plan.id if plan else None,
-                roadmap_planning_status=plan.planning_status if plan else "",
-                project_context=project_context or "",
-            )
-        )
-
-    intake_versions = db.query(IntakeItemVersion).order_by(IntakeItemVersion.id.desc()).all()
-    intake_rows: list[AuditIntakeChangeRowOut] = []
-    for version in intake_versions:
-        intake = intake_by_id.get(version.intake_item_id)
-        intake_rows.append(
-            AuditIntakeChangeRowOut(
-                event_id=version.id,
-                intake_item_id=version.intake_item_id,
-                document_id=intake.document_id if intake else None,
-                title=(intake.title if intake else f"Intake #{version.intake_item_id}") or "",
-                action=version.action or "",
-                status=(intake.status if intake else "") or "",
-                project_context=(intake.project_context if intake else "") or "",
-                changed_by=version.changed_by,
-                changed_by_email=users.get(version.changed_by),
-                changed_by_role=user_roles.get(version.changed_by),
-                changed_fields=version.changed_fields or [],
-                created_at=version.created_at,
-            )
-        )
-
-    roadmap_versions = db.query(RoadmapItemVersion).order_by(RoadmapItemVersion.id.desc()).all()
-    roadmap_rows: list[AuditRoadmapChangeRowOut] = []
-    for version in roadmap_versions:
-        roadmap = roadmap_by_id.get(version.roadmap_item_id)
-        title = (roadmap.title if roadmap else f"Roadmap #{version.roadmap_item_id}") or ""
-        project_context = (roadmap.project_context if roadmap else "") or ""
-        roadmap_rows.append(
-            AuditRoadmapChangeRowOut(
-                event_id=version.id,
-                roadmap_item_id=version.roadmap_item_id,
-                title=title,
-                action=version.action or "",
-                project_context=project_context,
-                changed_by=version.changed_by,
-                changed_by_email=users.get(version.changed_by),
-                changed_by_role=user_roles.get(version.changed_by),
-                changed_fields=version.changed_fields or [],
-                created_at=version.created_at,
-            )
-        )
-
-    movement_records = db.query(RoadmapMovementRequest).order_by(RoadmapMovementRequest.id.desc()).all()
-    movement_rows: list[AuditMovementRowOut] = []
-    for movement in movement_records:
-        plan = plan_by_id.get(movement.plan_item_id)
-        roadmap = roadmap_by_id.get(movement.bucket_item_id)
-        title = (plan.title if plan else "") or (roadmap.title if roadmap else "") or f"Roadmap #{movement.bucket_item_id}"
-        project_context = (
-            (plan.project_context if plan else "")
-            or (roadmap.project_context if roadmap else "")
-            or ""
-        )
-        movement_rows.append(
-            AuditMovementRowOut(
-                request_id=movement.id,
-                plan_item_id=movement.plan_item_id,
-                bucket_item_id=movement.bucket_item_id,
-                title=title,
-                status=movement.status or "",
-                request_type=movement.request_type or "",
-                project_context=project_context,
-                from_start_date=movement.from_start_date or "",
-                from_end_date=movement.from_end_date or "",
-                to_start_date=movement.to_start_date or "",
-                to_end_date=movement.to_end_date or "",
-                reason=movement.reason or "",
-                blocker=movement.blocker or "",
-                decision_reason=movement.decision_reason or "",
-                requested_by=movement.requested_by,
-                requested_by_email=users.get(movement.requested_by),
-                requested_by_role=user_roles.get(movement.requested_by),
-                decided_by=movement.decided_by,
-                decided_by_email=users.get(movement.decided_by),
-                decided_by_role=user_roles.get(movement.decided_by),
-                requested_at=movement.requested_at,
-                decided_at=movement.decided_at,
-                executed_at=movement.executed_at,
+    center = _audit_center(db)
+    return json_response(center) if fast_responses_enabled() else center
+
+
+@router.get("/summary", response_model=AuditSummaryOut)
+def get_audit_summary(
+    filters: AuditFilters = Depends(audit_filters),
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(*AUDIT_ROLES)),
+):
+    # The action filter is for the version and movement lists; totals ignore it.
+    filters.action = None
+    return AuditSummaryOut(
+        documents_total=count_audit_rows(db, "documents", filters),
+        intake_changes_total=count_audit_rows(db, "intake_changes", filters),
+        roadmap_changes_total=count_audit_rows(db, "roadmap_changes", filters),
+        movement_total=count_audit_rows(db, "movement_events", filters),
+    )
+
+
+@router.get("/documents", response_model=AuditDocumentPageOut)
+def list_audit_documents(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: AuditFilters = Depends(audit_filters),
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(*AUDIT_ROLES)),
+):
+    return _audit_page(db, "documents", filters, cursor, limit)
+
+
+@router.get("/intake-changes", response_model=AuditIntakeChangePageOut)
+def list_audit_intake_changes(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: AuditFilters = Depends(audit_filters),
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(*AUDIT_ROLES)),
+):
+    return _audit_page(db, "intake_changes", filters, cursor, limit)
+
+
+@router.get("/roadmap-changes", response_model=AuditRoadmapChangePageOut)
+def list_audit_roadmap_changes(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: AuditFilters = Depends(audit_filters),
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(*AUDIT_ROLES)),
+):
+    return _audit_page(db, "roadmap_changes", filters, cursor, limit)
+
+
+@router.get("/movement-events", response_model=AuditMovementPageOut)
+def list_audit_movement_events(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: AuditFilters = Depends(audit_filters),
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(*AUDIT_ROLES)),
+):
+    return _audit_page(db, "movement_events", filters, cursor, limit)
+
+
+@router.get("/events", response_model=AuditEventPageOut)
+def list_audit_events(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: AuditFilters = Depends(audit_filters),
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(*AUDIT_ROLES)),
+):
+    """Every audited change, from the partitioned ``audit_events`` table; a date range reads only its months."""
+    return _audit_page(db, "events", filters, cursor, limit)
+
+
+def _csv_line(values: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def _export_lines(section: str, filters: AuditFilters, format: str):
+    schema = SECTION_ROW_SCHEMAS[section]
+    fields = list(schema.model_fields)
+    if format == "csv":
+        yield _csv_line(fields)
+    for row in iter_audit_rows(section, filters):
+        data = schema.model_validate(row).model_dump(mode="json")
+        if format == "csv":
+            yield _csv_line(
+                ["; ".join(data[key]) if isinstance(data[key], list) else data[key] for key in fields]
             )
-        )
-
-    return AuditCenterOut(
-        generated_at=datetime.utcnow(),
-        summary=AuditSummaryOut(
-            documents_total=len(document_rows),
-            intake_changes_total=len(intake_rows),
-            roadmap_changes_total=len(roadmap_rows),
-            movement_total=len(movement_rows),
-        ),
-        documents=document_rows,
-        intake_changes=intake_rows,
-        roadmap_changes=roadmap_rows,
-        movement_events=movement_rows,
+        else:
+            yield json.dumps(data) + "\n"
+
+
+@router.get("/export/{section}")
+def export_audit_section(
+    section: str,
+    format: str = Query(default="ndjson"),
+    filters: AuditFilters = Depends(audit_filters),
+    _=Depends(require_roles(*AUDIT_ROLES)),
+):
+    section = section.replace("-", "_")
+    if section not in SECTION_ROW_SCHEMAS:
+        raise HTTPException(status_code=404, detail="Unknown audit section")
+    if format not in {"ndjson", "csv"}:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    try:
+        validate_audit_filters(section, filters)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    filename = f"audit_{section}_{datetime.utcnow():%Y%m%d_%H%M%S}.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        _export_lines(section, filters, format),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
@@ -3,13 +3,14 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_current_user_optional
+from app.api.deps import get_current_user_optional, get_current_user_record
 from app.core.security import create_access_token, get_password_hash, verify_password
 from app.db.session import get_db
 from app.models.enums import UserRole
 from app.models.user import User
 from app.schemas.auth import ChangePasswordInput, ChangePasswordOut, LoginInput, TokenOut
 from app.schemas.user import UserCreate, UserOut
+from app.services.principal_cache import Principal
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -18,7 +19,7 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 def register(
     payload: UserCreate,
     db: Session = Depends(get_db),
-    current_user: User | None = Depends(get_current_user_optional),
+    current_user: Principal | None = Depends(get_current_user_optional),
 ):
     existing = db.query(User).filter(User.email == payload.email.lower()).first()
     if existing:
@@ -66,7 +67,7 @@ def login(payload: LoginInput, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)):
+def me(current_user: User = Depends(get_current_user_record)):
     return current_user
 
 
@@ -74,7 +75,7 @@ def me(current_user: User = Depends(get_current_user)):
 def change_password(
     payload: ChangePasswordInput,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_record),
 ):
     if not verify_password(payload.current_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
@@ -0,0 +1,146 @@
+import json
+import time
+
+from anyio import CapacityLimiter, to_thread
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_current_user
+from app.db.session import SessionLocal
+from app.schemas.changes import ChangeEventOut, ChangeFeedOut
+from app.services.change_feed import (
+    DEFAULT_FEED_LIMIT,
+    MAX_FEED_LIMIT,
+    FeedPage,
+    change_feed_listener,
+    decode_feed_cursor,
+    event_cursor,
+    head_cursor,
+    read_changes,
+)
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+MAX_LONG_POLL_SECONDS = 30
+# Re-read at least this often while waiting, in case a notification was missed.
+FEED_POLL_SECONDS = 2.0
+STREAM_SECONDS = 300
+STREAM_HEARTBEAT_SECONDS = 15
+# Feed reads run on their own few threads, so open feeds cannot starve other endpoints.
+_FEED_READS = CapacityLimiter(4)
+
+
+def _read_page(cursor: str | None, limit: int) -> FeedPage:
+    # Each read is its own short transaction: waiting readers hold no snapshot.
+    with SessionLocal() as db:
+        if cursor is None:
+            return FeedPage(events=[], cursor=head_cursor(db))
+        return read_changes(db, cursor, limit)
+
+
+async def _read(cursor: str | None, limit: int) -> FeedPage:
+    return await to_thread.run_sync(_read_page, cursor, limit, limiter=_FEED_READS)
+
+
+def _event_out(event) -> ChangeEventOut:
+    return ChangeEventOut(
+        cursor=event_cursor(event),
+        entity_type=event.entity_type,
+        entity_id=event.entity_id,
+        version_no=event.version_no,
+        action=event.action,
+        created_at=event.created_at,
+    )
+
+
+def _checked_cursor(cursor: str | None) -> str | None:
+    if cursor is not None:
+        try:
+            decode_feed_cursor(cursor)
+        except ValueError as err:
+            raise HTTPException(status_code=400, detail=str(err))
+    return cursor
+
+
+@router.get("", response_model=ChangeFeedOut)
+async def get_changes(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_FEED_LIMIT, ge=1, le=MAX_FEED_LIMIT),
+    wait: int = Query(default=0, ge=0, le=MAX_LONG_POLL_SECONDS),
+    _=Depends(get_current_user),
+):
+    """Item changes after ``cursor``, waiting up to ``wait`` seconds for one (long polling).
+
+    Without a cursor, returns the current one and no events: load the lists
+    once, then follow the feed and re-fetch only the items it names.
+
+    An event is delivered only once every transaction that was open when it
+    was written has finished, so the feed never skips a change that commits
+    late. A long write elsewhere (document analysis waiting on the LLM, say)
+    therefore holds back newer events until it ends; meanwhile long polls
+    return empty when ``wait`` runs out.
+    """
+    cursor = _checked_cursor(cursor)
+    deadline = time.monotonic() + wait
+    while True:
+        generation = change_feed_listener.generation() if wait else 0
+        page = await _read(cursor, limit)
+        remaining = deadline - time.monotonic()
+        if page.events or page.reset or cursor is None or remaining <= 0:
+            break
+        cursor = page.cursor
+        await change_feed_listener.wait(generation, min(remaining, FEED_POLL_SECONDS))
+    return ChangeFeedOut(events=[_event_out(event) for event in page.events], cursor=page.cursor, reset=page.reset)
+
+
+def _sse(event: str, data: dict, event_id: str | None = None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def _stream(cursor: str | None):
+    deadline = time.monotonic() + STREAM_SECONDS
+    last_sent = time.monotonic()
+    if cursor is None:
+        cursor = (await _read(None, 1)).cursor
+        yield _sse("cursor", {"cursor": cursor}, cursor)
+    while time.monotonic() < deadline:
+        generation = change_feed_listener.generation()
+        page = await _read(cursor, DEFAULT_FEED_LIMIT)
+        if page.reset:
+            yield _sse("reset", {"cursor": page.cursor}, page.cursor)
+            last_sent = time.monotonic()
+        for event in page.events:
+            out = _event_out(event)
+            yield _sse("change", out.model_dump(mode="json"), out.cursor)
+            last_sent = time.monotonic()
+        cursor = page.cursor
+        if page.events and len(page.events) == DEFAULT_FEED_LIMIT:
+            continue
+        if time.monotonic() - last_sent >= STREAM_HEARTBEAT_SECONDS:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await change_feed_listener.wait(generation, FEED_POLL_SECONDS)
+
+
+@router.get("/stream")
+async def stream_changes(
+    cursor: str | None = Query(default=None),
+    last_event_id: str | None = Header(default=None),
+    _=Depends(get_current_user),
+):
+    """Server-sent events for item changes, resuming from ``Last-Event-ID`` or ``cursor``.
+
+    Each ``change`` event's id is its cursor. A ``reset`` event means the
+    cursor fell out of the retained feed and lists must be reloaded. The
+    stream ends after a few minutes; clients reconnect with the last id.
+    Events wait for earlier open transactions as in ``GET /changes``; the
+    stream keeps sending heartbeats meanwhile.
+    """
+    cursor = _checked_cursor(last_event_id or cursor)
+    return StreamingResponse(
+        _stream(cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,18 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, require_roles
 from app.db.session import get_db
-from app.models.user import User
-from app.schemas.chat import ChatInput, ChatOut, IntakeSupportInput
+from app.models.enums import UserRole
+from app.schemas.chat import AgentGraphOut, ChatInput, ChatOut, IntakeSupportInput
+from app.services.agents.graph_registry import graph_stats
 from app.services.agents.intake_support_agent import run_intake_support_agent
 from app.services.agents.roadmap_chat_graph import run_chat_graph
+from app.services.principal_cache import Principal
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
 @router.post("", response_model=ChatOut)
-def chat(payload: ChatInput, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def chat(payload: ChatInput, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     answer, evidence = run_chat_graph(payload.question, db, role=getattr(current_user, "role", ""))
     return ChatOut(
         answer=answer,
@@ -26,8 +28,14 @@ def chat(payload: ChatInput, db: Session = Depends(get_db), current_user: User =
     )
 
 
+@router.get("/graphs", response_model=list[AgentGraphOut])
+def list_agent_graphs(_=Depends(require_roles(UserRole.CEO, UserRole.ADMIN))):
+    """Compiled agent graphs with their one-off compile time and use count."""
+    return graph_stats()
+
+
 @router.post("/intake-support", response_model=ChatOut)
-def intake_support(payload: IntakeSupportInput, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def intake_support(payload: IntakeSupportInput, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     try:
         answer, evidence, actions, support_applied, item_id, support_state, intent_clear, next_action = run_intake_support_agent(
             intake_item_id=payload.intake_item_id,
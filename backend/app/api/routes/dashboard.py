@@ -3,7 +3,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 import re
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_role_index
 from app.db.session import get_db
 from app.models.governance_config import GovernanceConfig
 from app.models.intake_item import IntakeItem
@@ -11,7 +11,16 @@ from app.models.roadmap_movement_request import RoadmapMovementRequest
 from app.models.roadmap_item import RoadmapItem
 from app.models.roadmap_plan_item import RoadmapPlanItem
 from app.schemas.dashboard import DashboardOut
-from app.services.capacity_governance import build_capacity_governance_alert
+from app.services.capacity_governance import RoleIndex, build_capacity_governance_alert
+from app.services.capacity_roles import load_role_vectors
+from app.services.read_models import (
+    CommitmentFlagsRow,
+    IntakeFlagsRow,
+    PlanCapacityRow,
+    commitment_flags,
+    open_intake_flags,
+    plan_capacity_rows,
+)
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
@@ -35,21 +44,25 @@ def _has_ai_tagged_activity(items: list[str] | None) -> bool:
     return False
 
 
-def _is_ai_intake(item: IntakeItem) -> bool:
+def _is_ai_intake(item: IntakeFlagsRow) -> bool:
     return _has_ai_tagged_activity(item.activities)
 
 
-def _is_ai_roadmap_item(item: RoadmapItem) -> bool:
+def _is_ai_roadmap_item(item: CommitmentFlagsRow) -> bool:
     return (item.ai_fte or 0) > 0 or _has_ai_tagged_activity(item.activities)
 
 
-def _is_ai_plan_item(item: RoadmapPlanItem) -> bool:
+def _is_ai_plan_item(item: PlanCapacityRow) -> bool:
     return (item.ai_fte or 0) > 0 or _has_ai_tagged_activity(item.activities)
 
 
 @router.get("/summary", response_model=DashboardOut)
-def get_dashboard_summary(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    intake_open_items = db.query(IntakeItem).filter(IntakeItem.status != "approved").all()
+def get_dashboard_summary(
+    db: Session = Depends(get_db),
+    _=Depends(get_current_user),
+    roles: RoleIndex = Depends(get_role_index),
+):
+    intake_open_items = open_intake_flags(db)
     intake_total = len(intake_open_items)
     intake_understanding_pending = (
         db.query(func.count(IntakeItem.id))
@@ -67,7 +80,7 @@ def get_dashboard_summary(db: Session = Depends(get_db), _=Depends(get_current_u
     rnd_intake_total = sum(1 for item in intake_open_items if _is_rnd_mode(item.delivery_mode))
     ai_intake_total = sum(1 for item in intake_open_items if _is_ai_intake(item))
 
-    commitment_items = db.query(RoadmapItem).all()
+    commitment_items = commitment_flags(db)
     commitments_total = len(commitment_items)
     commitments_ready = sum(1 for item in commitment_items if bool(item.picked_up))
     rnd_commitments_total = sum(1 for item in commitment_items if _is_rnd_mode(item.delivery_mode))
@@ -76,7 +89,7 @@ def get_dashboard_summary(db: Session = Depends(get_db), _=Depends(get_current_u
     commitments_locked = db.query(func.count(RoadmapPlanItem.id)).scalar() or 0
     roadmap_total = commitments_locked
 
-    all_plan_items = db.query(RoadmapPlanItem).all()
+    all_plan_items = plan_capacity_rows(db)
     rnd_roadmap_total = sum(1 for item in all_plan_items if _is_rnd_mode(item.delivery_mode))
     ai_roadmap_total = sum(1 for item in all_plan_items if _is_ai_plan_item(item))
 
@@ -118,7 +131,11 @@ def get_dashboard_summary(db: Session = Depends(get_db), _=Depends(get_current_u
         RoadmapPlanItem.priority
     ).all()
     governance = db.query(GovernanceConfig).order_by(GovernanceConfig.id.asc()).first()
-    capacity_governance_alert = build_capacity_governance_alert(governance, all_plan_items)
+    capacity_governance_alert = build_capacity_governance_alert(
+        governance,
+        all_plan_items,
+        load_role_vectors(db, governance, all_plan_items, roles) if governance else None,
+    )
 
     def _to_dict(rows):
         return {str(k or "unknown"): int(v or 0) for k, v in rows}
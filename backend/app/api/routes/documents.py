@@ -1,117 +1,172 @@
 from pathlib import Path
-import hashlib
 import mimetypes
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import FileResponse, JSONResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, require_roles
 from app.db.session import get_db
 from app.models.document import Document
+from app.models.document_fingerprint import DocumentFingerprint
+from app.models.document_unit import DocumentUnit
 from app.models.enums import UserRole
 from app.models.intake_analysis import IntakeAnalysis
 from app.models.intake_item import IntakeItem
 from app.models.intake_item_version import IntakeItemVersion
+from app.models.maintenance_job import MaintenanceJob
 from app.models.project import Project
 from app.models.roadmap_plan_item import RoadmapPlanItem
 from app.models.roadmap_item import RoadmapItem
 from app.models.roadmap_item_version import RoadmapItemVersion
-from app.models.user import User
 from app.schemas.common import BulkDeleteOut, BulkIdsIn
-from app.schemas.document import DocumentOut
+from app.schemas.document import (
+    DocumentOut,
+    DocumentSearchOut,
+    DocumentUploadOut,
+    MaintenanceJobOut,
+    SimilarDocumentOut,
+)
+from app.services.capacity_rollups import plan_ids_of_items, refresh_capacity_rollups
+from app.services.content_store import lock_blob, release_files
+from app.services.collection_etags import collection_cache_headers, collection_etag, rows_token, schema_salt
+from app.services.document_preview import (
+    cache_headers,
+    etag_matches,
+    file_etag,
+    get_document_preview_payload,
+    preview_etag,
+    preview_is_cacheable,
+)
 from app.services.document_parser import extract_document_units
-from app.services.file_storage import save_upload
+from app.services.document_search import index_document_units, search_document_units
+from app.services.document_similarity import find_similar_documents
+from app.services.fast_json import fast_responses_enabled, rows_response, schema_select
+from app.services.file_storage import UploadTooLarge, discard_upload, promote_upload, stage_upload
+from app.services.principal_cache import Principal
+from app.services.versioning import delete_plan_history
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
-def _compute_hash(path: str) -> str:
-    h = hashlib.sha256()
-    p = Path(path)
-    with p.open("rb") as f:
-        while True:
-            chunk = f.read(1024 * 1024)
-            if not chunk:
-                break
-            h.update(chunk)
-    return h.hexdigest()
-
-
-def _backfill_missing_hashes(db: Session, max_rows: int = 100) -> None:
-    missing = (
-        db.query(Document)
-        .filter((Document.file_hash == "") | (Document.file_hash.is_(None)))
-        .order_by(Document.id.desc())
-        .limit(max_rows)
-        .all()
-    )
-    changed = False
-    for doc in missing:
-        try:
-            doc.file_hash = _compute_hash(doc.file_path)
-            db.add(doc)
-            changed = True
-        except Exception:
-            continue
-    if changed:
-        db.flush()
-
-
-@router.post("/upload", response_model=DocumentOut)
+@router.post("/upload", response_model=DocumentUploadOut)
 def upload_document(
     file: UploadFile = File(...),
     project_id: int | None = Form(None),
     notes: str = Form(""),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
 ):
     if project_id:
         project = db.get(Project, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
-    file_path, file_type, file_hash = save_upload(file)
-    _backfill_missing_hashes(db)
-    duplicate = db.query(Document).filter(Document.file_hash == file_hash).order_by(Document.id.desc()).first()
-    if duplicate:
-        try:
-            p = Path(file_path)
-            if p.exists():
-                p.unlink()
-        except Exception:
-            pass
-        raise HTTPException(
-            status_code=409,
-            detail=(
-                f"Duplicate upload detected. Existing document id={duplicate.id}, "
-                f"name={duplicate.file_name}. Reuse existing item from Intake Queue."
-            ),
-        )
+    try:
+        staged = stage_upload(file)
+    except UploadTooLarge as err:
+        raise HTTPException(status_code=413, detail=str(err))
+    try:
+        # Held until the document row commits, so a concurrent release cannot remove the blob.
+        lock_blob(db, staged.file_hash)
+        duplicate = db.query(Document).filter(Document.file_hash == staged.file_hash).order_by(Document.id.desc()).first()
+        if duplicate:
+            raise HTTPException(
+                status_code=409,
+                detail=(
+                    f"Duplicate upload detected. Existing document id={duplicate.id}, "
+                    f"name={duplicate.file_name}. Reuse existing item from Intake Queue."
+                ),
+            )
+        file_path = promote_upload(staged)
+    finally:
+        # No-op once promoted; otherwise drops the staged copy.
+        discard_upload(staged)
 
     document = Document(
         project_id=project_id,
         uploaded_by=current_user.id,
         file_name=file.filename,
-        file_type=file_type,
+        file_type=staged.file_type,
         file_path=file_path,
-        file_hash=file_hash,
+        file_hash=staged.file_hash,
         notes=notes,
     )
     db.add(document)
+    db.flush()
+
+    # Index now so the upload can point at earlier versions of the same document.
+    try:
+        units = extract_document_units(file_path=file_path, file_type=document.file_type)
+    except Exception:
+        units = []
+    index_document_units(db, document, units)
     db.commit()
     db.refresh(document)
-    return document
+    similar = find_similar_documents(db, document, units)
+    return DocumentUploadOut.model_validate(document).model_copy(
+        update={"similar_documents": [SimilarDocumentOut(**item) for item in similar]}
+    )
 
 
 @router.get("", response_model=list[DocumentOut])
-def list_documents(db: Session = Depends(get_db), _=Depends(get_current_user)):
+def list_documents(
+    response: Response,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+    _=Depends(get_current_user),
+):
+    etag = collection_etag(schema_salt(DocumentOut), rows_token(db, Document))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=collection_cache_headers(etag))
+    if fast_responses_enabled():
+        statement = schema_select(Document, DocumentOut).order_by(Document.id.desc())
+        return rows_response(db, statement, collection_cache_headers(etag))
+    response.headers.update(collection_cache_headers(etag))
     return db.query(Document).order_by(Document.id.desc()).all()
 
 
+@router.get("/search", response_model=DocumentSearchOut)
+def search_documents(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+    _=Depends(get_current_user),
+):
+    """Ranked full-text hits over parsed document units, each with its unit ref."""
+    query = " ".join(q.split())
+    if not query:
+        raise HTTPException(status_code=400, detail="Search query is required")
+    return search_document_units(db, query, limit=limit, offset=offset)
+
+
+@router.get("/maintenance/jobs", response_model=list[MaintenanceJobOut])
+def list_storage_maintenance_jobs(
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(UserRole.CEO, UserRole.ADMIN)),
+):
+    """Progress of the background storage jobs (hash backfill)."""
+    return db.query(MaintenanceJob).order_by(MaintenanceJob.name.asc()).all()
+
+
+@router.get("/{document_id}/similar", response_model=list[SimilarDocumentOut])
+def get_similar_documents(
+    document_id: int,
+    db: Session = Depends(get_db),
+    _=Depends(get_current_user),
+):
+    """Likely earlier versions of a document, by SimHash distance and unit overlap."""
+    doc = db.get(Document, document_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return find_similar_documents(db, doc)
+
+
 @router.get("/{document_id}/file")
 def get_document_file(
     document_id: int,
+    if_none_match: str | None = Header(None),
     db: Session = Depends(get_db),
     _=Depends(get_current_user),
 ):
@@ -119,6 +174,10 @@ def get_document_file(
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
+    etag = file_etag(doc.file_hash)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+
     file_path = Path(doc.file_path)
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Document file not found on disk")
@@ -129,13 +188,14 @@ def get_document_file(
         path=str(file_path),
         media_type=media_type,
         filename=doc.file_name,
-        headers={"Content-Disposition": f'inline; filename="{doc.file_name}"'},
+        headers={"Content-Disposition": f'inline; filename="{doc.file_name}"', **cache_headers(etag)},
     )
 
 
 @router.get("/{document_id}/preview")
 def get_document_preview(
     document_id: int,
+    if_none_match: str | None = Header(None),
     db: Session = Depends(get_db),
     _=Depends(get_current_user),
 ):
@@ -143,43 +203,24 @@ def get_document_preview(
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     path = Path(doc.file_path)
+    ext = (doc.file_type or path.suffix.replace(".", "")).lower()
+
+    etag = preview_etag(doc.file_hash, ext)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
     if not path.exists():
         raise HTTPException(status_code=404, detail="Document file not found on disk")
 
-    ext = (doc.file_type or path.suffix.replace(".", "")).lower()
-    if ext in {"pdf", "png", "jpg", "jpeg", "gif", "webp", "txt", "md", "csv", "json", "xml", "html"}:
-        return {"mode": "inline_file", "file_type": ext}
-
-    if ext in {"doc", "docx", "ppt", "pptx", "xls", "xlsx"}:
-        try:
-            units = extract_document_units(file_path=doc.file_path, file_type=doc.file_type)
-        except Exception:
-            return {"mode": "download_only", "file_type": ext}
-        lines = [u.get("text", "").strip() for u in units if u.get("text")]
-        preview_lines = [line for line in lines if line][:200]
-        preview_units = []
-        for u in units[:280]:
-            ref = str(u.get("ref", "")).strip()
-            text = str(u.get("text", "")).strip()
-            if not text:
-                continue
-            preview_units.append({"ref": ref, "text": text})
-        return {
-            "mode": "extracted_text",
-            "file_type": ext,
-            "preview_text": "\n".join(preview_lines),
-            "line_count": len(preview_lines),
-            "preview_units": preview_units,
-        }
-
-    return {"mode": "download_only", "file_type": ext}
+    payload = get_document_preview_payload(db, doc, ext)
+    # A failed parse must not be revalidated as the real preview later.
+    return JSONResponse(payload, headers=cache_headers(etag if preview_is_cacheable(payload, ext) else None))
 
 
 @router.post("/bulk-delete", response_model=BulkDeleteOut)
 def bulk_delete_documents(
     payload: BulkIdsIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM, UserRole.PO)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM, UserRole.PO)),
 ):
     ids = sorted(set(payload.ids))
     if not ids:
@@ -187,6 +228,7 @@ def bulk_delete_documents(
 
     documents = db.query(Document).filter(Document.id.in_(ids)).all()
     deleted = 0
+    plan_ids: list[int] = []
 
     for doc in documents:
         direct_roadmap_ids = [
@@ -215,6 +257,8 @@ def bulk_delete_documents(
             db.query(IntakeItem).filter(IntakeItem.id == intake.id).delete(synchronize_session=False)
 
             if roadmap_id:
+                delete_plan_history(db, [roadmap_id])
+                plan_ids += plan_ids_of_items(db, [roadmap_id])
                 db.query(RoadmapPlanItem).filter(RoadmapPlanItem.bucket_item_id == roadmap_id).delete(
                     synchronize_session=False
                 )
@@ -224,6 +268,8 @@ def bulk_delete_documents(
                 db.query(RoadmapItem).filter(RoadmapItem.id == roadmap_id).delete(synchronize_session=False)
 
         if direct_roadmap_ids:
+            delete_plan_history(db, direct_roadmap_ids)
+            plan_ids += plan_ids_of_items(db, direct_roadmap_ids)
             db.query(RoadmapPlanItem).filter(RoadmapPlanItem.bucket_item_id.in_(direct_roadmap_ids)).delete(
                 synchronize_session=False
             )
@@ -232,14 +278,16 @@ def bulk_delete_documents(
             )
             db.query(RoadmapItem).filter(RoadmapItem.id.in_(direct_roadmap_ids)).delete(synchronize_session=False)
 
+        db.query(DocumentUnit).filter(DocumentUnit.document_id == doc.id).delete(synchronize_session=False)
+        db.query(DocumentFingerprint).filter(DocumentFingerprint.document_id == doc.id).delete(
+            synchronize_session=False
+        )
         db.query(Document).filter(Document.id == doc.id).delete(synchronize_session=False)
-        try:
-            file_path = Path(doc.file_path)
-            if file_path.exists():
-                file_path.unlink()
-        except Exception:
-            pass
         deleted += 1
 
+    file_paths = [doc.file_path for doc in documents]
+    refresh_capacity_rollups(db, plan_ids)
     db.commit()
+    # Blobs can be shared by identical documents; only unreferenced ones go.
+    release_files(db, file_paths)
     return BulkDeleteOut(deleted=deleted)
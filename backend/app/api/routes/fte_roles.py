@@ -4,9 +4,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, require_roles
+from app.db.session import get_db
 from app.models.enums import UserRole
 from app.models.fte_role import FteRole
-from app.models.user import User
 from app.schemas.fte_role import (
     FteAllocationOut,
     FteRoleIn,
@@ -15,13 +15,15 @@ from app.schemas.fte_role import (
     GovernanceConfigFteIn,
     GovernanceConfigFteOut,
 )
+from app.services.capacity_rollups import invalidate_capacity_rollups
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
 
 @router.get("/active", response_model=list[FteRoleOut])
 def list_active_fte_roles(
-    db: Session = Depends(lambda db: None),
+    db: Session = Depends(get_db),
 ) -> list[FteRole]:
     """List all active FTE roles ordered by display order."""
     return (
@@ -34,8 +36,8 @@ def list_active_fte_roles(
 
 @router.get("/", response_model=list[FteRoleOut])
 def list_all_fte_roles(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(lambda db: None),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ) -> list[FteRole]:
     """List all FTE roles (including inactive)."""
     return db.query(FteRole).order_by(FteRole.display_order, FteRole.name).all()
@@ -44,8 +46,8 @@ def list_all_fte_roles(
 @router.get("/{role_id}", response_model=FteRoleOut)
 def get_fte_role(
     role_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(lambda db: None),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ) -> FteRole:
     """Get a specific FTE role by ID."""
     role = db.query(FteRole).filter(FteRole.id == role_id).first()
@@ -60,8 +62,8 @@ def get_fte_role(
 @router.post("/", response_model=FteRoleOut, status_code=status.HTTP_201_CREATED)
 def create_fte_role(
     role_in: FteRoleIn,
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
-    db: Session = Depends(lambda db: None),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
+    db: Session = Depends(get_db),
 ) -> FteRole:
     """Create a new FTE role (Admin only)."""
     # Check if abbreviation already exists
@@ -95,8 +97,8 @@ def create_fte_role(
 def update_fte_role(
     role_id: int,
     role_update: FteRoleUpdateIn,
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
-    db: Session = Depends(lambda db: None),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
+    db: Session = Depends(get_db),
 ) -> FteRole:
     """Update an FTE role (Admin only)."""
     role = db.query(FteRole).filter(FteRole.id == role_id).first()
@@ -110,6 +112,9 @@ def update_fte_role(
     update_data = role_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(role, field, value)
+    # Capacity rollups are keyed by the active roles' abbreviations.
+    if {"is_active", "abbreviation"} & update_data.keys():
+        invalidate_capacity_rollups(db)
 
     role.updated_by = current_user.id
     db.commit()
@@ -120,8 +125,8 @@ def update_fte_role(
 @router.delete("/{role_id}", response_model=FteRoleOut)
 def delete_fte_role(
     role_id: int,
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
-    db: Session = Depends(lambda db: None),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
+    db: Session = Depends(get_db),
 ) -> FteRole:
     """Deactivate an FTE role (Admin only)."""
     role = db.query(FteRole).filter(FteRole.id == role_id).first()
@@ -134,6 +139,7 @@ def delete_fte_role(
     # Soft delete by deactivating
     role.is_active = False
     role.updated_by = current_user.id
+    invalidate_capacity_rollups(db)
     db.commit()
     db.refresh(role)
     return role
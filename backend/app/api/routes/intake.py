@@ -1,15 +1,15 @@
+import hashlib
 from datetime import datetime
-from pathlib import Path
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
 from app.api.deps import require_roles
-from app.core.config import settings
 from app.db.session import get_db
 from app.models.document import Document
+from app.models.document_unit import DocumentUnit
 from app.models.enums import UserRole
 from app.models.intake_analysis import IntakeAnalysis
 from app.models.intake_item import IntakeItem
@@ -31,8 +31,19 @@ from app.schemas.intake import (
     UnderstandingApprovalIn,
     UnderstandingDraftIn,
 )
+from app.services.analysis_diff import INCREMENTAL_MIN_OVERLAP_PERCENT, AnalysisBaseline
+from app.services.capacity_rollups import plan_ids_of_items, refresh_capacity_rollups
+from app.services.collection_etags import collection_cache_headers, collection_etag, rows_token, schema_salt
+from app.services.content_store import lock_blob
+from app.services.document_preview import etag_matches
+from app.services.fast_json import fast_responses_enabled, rows_response, schema_select
+from app.services.document_parser import PARSER_VERSION
+from app.services.document_search import index_document
+from app.services.document_similarity import find_similar_documents
+from app.services.file_storage import store_bytes
 from app.services.intake_agent import generate_intake_analysis_v2, generate_roadmap_candidate_from_document
-from app.services.versioning import log_intake_version, log_roadmap_version
+from app.services.principal_cache import Principal
+from app.services.versioning import delete_plan_history, load_item_history, log_intake_version, log_roadmap_version
 
 router = APIRouter(prefix="/intake", tags=["intake"])
 UNCLEAR_INTENT = "Document intent is unclear."
@@ -43,7 +54,7 @@ def _is_rnd_mode(value: str | None) -> bool:
 
 
 def _enforce_rnd_intake_entry(
-    current_user: User,
+    current_user: Principal,
     requested_mode: str | None = None,
     existing_mode: str | None = None,
 ) -> None:
@@ -161,6 +172,41 @@ def _with_vertex_fallback(
     return primary_output, primary_result
 
 
+def _load_analysis_baseline(db: Session, document_id: int) -> AnalysisBaseline | None:
+    """An analysed document with its indexed units, or ``None`` if it has no analysis."""
+    baseline_doc = db.get(Document, document_id)
+    if not baseline_doc:
+        return None
+    analysis = (
+        db.query(IntakeAnalysis)
+        .join(IntakeItem, IntakeItem.id == IntakeAnalysis.intake_item_id)
+        .filter(IntakeItem.document_id == document_id)
+        .first()
+    )
+    if not analysis or not (analysis.output_json or {}).get("document_understanding_check"):
+        return None
+    if baseline_doc.units_parser_version < PARSER_VERSION:
+        index_document(db, baseline_doc)
+    units = [
+        {"ref": ref, "text": text}
+        for ref, text in db.query(DocumentUnit.ref, DocumentUnit.text)
+        .filter(DocumentUnit.document_id == document_id)
+        .order_by(DocumentUnit.position.asc())
+    ]
+    return AnalysisBaseline(document_id=document_id, units=units, output=dict(analysis.output_json))
+
+
+def _pick_analysis_baseline(db: Session, document: Document) -> AnalysisBaseline | None:
+    """Closest earlier version (SimHash match above the overlap floor) that has been analysed."""
+    for similar in find_similar_documents(db, document):
+        if similar["overlap_percent"] < INCREMENTAL_MIN_OVERLAP_PERCENT:
+            continue
+        baseline = _load_analysis_baseline(db, similar["document_id"])
+        if baseline:
+            return baseline
+    return None
+
+
 def _intent_unclear(analysis_output: dict | None) -> bool:
     understanding = ((analysis_output or {}).get("document_understanding_check") or {})
     return understanding.get("Primary intent (1 sentence)") == "Document intent is unclear."
@@ -172,7 +218,7 @@ def analyze_document(
     payload: IntakeAnalyzeIn | None = None,
     force: bool = Query(False, description="Force reprocessing even if analysis exists"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
     document = db.get(Document, document_id)
     if not document:
@@ -185,6 +231,19 @@ def analyze_document(
         existing_mode=existing_item.delivery_mode if existing_item else None,
     )
 
+    if document.units_parser_version < PARSER_VERSION:
+        index_document(db, document)
+    # Revisions of an analysed document only send their changed sections to the model.
+    baseline = None
+    if payload and payload.baseline_document_id:
+        if payload.baseline_document_id == document.id:
+            raise HTTPException(status_code=400, detail="Baseline must be a different document")
+        baseline = _load_analysis_baseline(db, payload.baseline_document_id)
+        if not baseline:
+            raise HTTPException(status_code=400, detail="Baseline document has no analysis to reuse")
+    elif not force:
+        baseline = _pick_analysis_baseline(db, document)
+
     active_llm = db.query(LLMConfig).filter(LLMConfig.is_active.is_(True)).first()
     def _run(config: LLMConfig | None):
         return generate_intake_analysis_v2(
@@ -195,6 +254,7 @@ def analyze_document(
             model=config.model if config else "",
             api_key=config.api_key if config else "",
             base_url=config.base_url if config else "",
+            baseline=baseline,
         )
 
     analysis_output, result = _with_vertex_fallback(db=db, active_llm=active_llm, runner=_run)
@@ -290,14 +350,11 @@ def analyze_document(
 def manual_create_intake_item(
     payload: IntakeManualIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
     _enforce_rnd_intake_entry(current_user=current_user, requested_mode=payload.delivery_mode)
 
-    storage_dir = Path(settings.FILE_STORAGE_PATH)
-    storage_dir.mkdir(parents=True, exist_ok=True)
     file_name = f"manual-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:6]}.txt"
-    file_path = storage_dir / file_name
     manual_text = "\n".join(
         [
             f"Title: {payload.title.strip()}",
@@ -314,14 +371,17 @@ def manual_create_intake_item(
             *[f"- {x.strip()}" for x in payload.activities if x.strip()],
         ]
     )
-    file_path.write_text(manual_text, encoding="utf-8")
+    content = manual_text.encode("utf-8")
+    lock_blob(db, hashlib.sha256(content).hexdigest())
+    file_path, file_hash = store_bytes(content)
 
     doc = Document(
         project_id=None,
         uploaded_by=current_user.id,
         file_name=file_name,
         file_type="manual",
-        file_path=str(file_path),
+        file_path=file_path,
+        file_hash=file_hash,
         notes="manual intake entry",
     )
     db.add(doc)
@@ -370,7 +430,7 @@ def approve_understanding_and_generate_candidate(
     item_id: int,
     payload: UnderstandingApprovalIn | None = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
     item = db.get(IntakeItem, item_id)
     if not item:
@@ -412,6 +472,9 @@ def approve_understanding_and_generate_candidate(
     if activity_mode not in {"commitment", "implementation"}:
         raise HTTPException(status_code=400, detail="activity_mode must be 'commitment' or 'implementation'.")
 
+    baseline_id = ((analysis.output_json or {}).get("incremental") or {}).get("baseline_document_id")
+    baseline = _load_analysis_baseline(db, int(baseline_id)) if baseline_id else None
+
     active_llm = db.query(LLMConfig).filter(LLMConfig.is_active.is_(True)).first()
     def _run_candidate(config: LLMConfig | None):
         return generate_roadmap_candidate_from_document(
@@ -423,6 +486,7 @@ def approve_understanding_and_generate_candidate(
             model=config.model if config else "",
             api_key=config.api_key if config else "",
             base_url=config.base_url if config else "",
+            baseline=baseline,
         )
 
     candidate_json, result = _with_vertex_fallback(db=db, active_llm=active_llm, runner=_run_candidate)
@@ -450,6 +514,9 @@ def approve_understanding_and_generate_candidate(
         "source": "manual_edit" if payload else "llm_generated",
     }
     merged["roadmap_candidate"] = candidate_json["roadmap_candidate"]
+    merged["activity_reviews"] = candidate_json.get("activity_reviews") or {}
+    if candidate_json.get("incremental"):
+        merged["candidate_incremental"] = candidate_json["incremental"]
     merged["activity_mode_selected"] = activity_mode
     analysis.output_json = merged
     analysis.primary_type = result["primary_type"]
@@ -475,7 +542,7 @@ def save_understanding_draft(
     item_id: int,
     payload: UnderstandingDraftIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
     item = db.get(IntakeItem, item_id)
     if not item:
@@ -543,40 +610,62 @@ def save_understanding_draft(
 @router.get("/items/{item_id}/analysis", response_model=IntakeAnalysisOut)
 def intake_analysis(
     item_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
     db: Session = Depends(get_db),
     _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
+    etag = collection_etag(
+        schema_salt(IntakeAnalysisOut),
+        rows_token(db, IntakeAnalysis, IntakeAnalysis.intake_item_id == item_id),
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=collection_cache_headers(etag))
     analysis = db.query(IntakeAnalysis).filter(IntakeAnalysis.intake_item_id == item_id).first()
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found for intake item")
+    response.headers.update(collection_cache_headers(etag))
     return analysis
 
 
 @router.get("/items", response_model=list[IntakeOut])
 def list_intake_items(
+    response: Response,
+    ids: list[int] | None = Query(default=None),
+    if_none_match: str | None = Header(None),
     db: Session = Depends(get_db),
     _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
-    return (
-        db.query(IntakeItem)
-        .filter(IntakeItem.status != "approved")
-        .order_by(IntakeItem.id.desc())
-        .all()
-    )
+    criteria = [IntakeItem.status != "approved"]
+    if ids:
+        criteria.append(IntakeItem.id.in_(ids))
+    etag = collection_etag(schema_salt(IntakeOut), rows_token(db, IntakeItem, *criteria))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=collection_cache_headers(etag))
+    if fast_responses_enabled():
+        statement = schema_select(IntakeItem, IntakeOut).where(*criteria).order_by(IntakeItem.id.desc())
+        return rows_response(db, statement, collection_cache_headers(etag))
+    response.headers.update(collection_cache_headers(etag))
+    return db.query(IntakeItem).filter(*criteria).order_by(IntakeItem.id.desc()).all()
 
 
 @router.get("/items/{item_id}/history", response_model=list[VersionOut])
 def intake_history(
     item_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
     db: Session = Depends(get_db),
     _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
-    versions = (
-        db.query(IntakeItemVersion)
-        .filter(IntakeItemVersion.intake_item_id == item_id)
-        .order_by(IntakeItemVersion.id.desc())
-        .all()
+    etag = collection_etag(
+        schema_salt(VersionOut),
+        rows_token(db, IntakeItemVersion, IntakeItemVersion.intake_item_id == item_id),
+        rows_token(db, User),
     )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=collection_cache_headers(etag))
+    response.headers.update(collection_cache_headers(etag))
+    history = load_item_history(db, IntakeItemVersion, IntakeItemVersion.intake_item_id, item_id)
 
     users = {u.id: u.email for u in db.query(User).all()}
     return [
@@ -586,11 +675,11 @@ def intake_history(
             changed_by=v.changed_by,
             changed_by_email=users.get(v.changed_by),
             changed_fields=v.changed_fields,
-            before_data=v.before_data,
-            after_data=v.after_data,
+            before_data=before,
+            after_data=after,
             created_at=v.created_at,
         )
-        for v in versions
+        for v, before, after in history
     ]
 
 
@@ -599,7 +688,7 @@ def review_intake_item(
     item_id: int,
     payload: IntakeReviewIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
     item = db.get(IntakeItem, item_id)
     if not item:
@@ -698,7 +787,7 @@ def review_intake_item(
 def bulk_delete_intake_items(
     payload: BulkIdsIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP)),
 ):
     ids = sorted(set(payload.ids))
     if not ids:
@@ -740,6 +829,8 @@ def bulk_delete_intake_items(
         deleted += 1
 
     if roadmap_ids:
+        delete_plan_history(db, roadmap_ids)
+        plan_ids = plan_ids_of_items(db, roadmap_ids)
         db.query(RoadmapPlanItem).filter(RoadmapPlanItem.bucket_item_id.in_(roadmap_ids)).delete(
             synchronize_session=False
         )
@@ -747,6 +838,7 @@ def bulk_delete_intake_items(
             synchronize_session=False
         )
         db.query(RoadmapItem).filter(RoadmapItem.id.in_(roadmap_ids)).delete(synchronize_session=False)
+        refresh_capacity_rollups(db, plan_ids)
 
     db.commit()
     return BulkDeleteOut(deleted=deleted)
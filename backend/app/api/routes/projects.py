@@ -7,6 +7,7 @@ from app.models.enums import UserRole
 from app.models.project import Project
 from app.models.user import User
 from app.schemas.project import ProjectCreate, ProjectOut, ProjectUpdate
+from app.services.principal_cache import Principal
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -20,7 +21,7 @@ def list_projects(db: Session = Depends(get_db), _=Depends(get_current_user)):
 def create_project(
     payload: ProjectCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM)),
 ):
     owner_id = payload.owner_id or current_user.id
     owner = db.get(User, owner_id)
@@ -4,12 +4,14 @@ from io import BytesIO
 import re
 from difflib import SequenceMatcher
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
+import numpy as np
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from openpyxl import Workbook
 
-from app.api.deps import get_current_user, require_roles
+from app.api.deps import get_current_user, get_role_index, require_roles
 from app.db.session import get_db
 from app.models.enums import UserRole
 from app.models.governance_config import GovernanceConfig
@@ -21,13 +23,24 @@ from app.models.roadmap_redundancy_decision import RoadmapRedundancyDecision
 from app.models.roadmap_item_version import RoadmapItemVersion
 from app.models.user import User
 from app.schemas.common import BulkDeleteOut, BulkIdsIn
+from app.schemas.dashboard import CapacityGovernanceAlertOut
 from app.schemas.history import VersionOut
 from app.schemas.roadmap import (
+    CapacityForecastOut,
+    CapacityHeatmapOut,
+    CapacityScenarioOut,
+    CapacitySimulationIn,
+    CapacitySimulationOut,
+    CapacitySlotOut,
+    CapacitySlotSearchIn,
+    CapacitySlotSearchOut,
     CapacityValidateIn,
     CapacityValidateOut,
+    RoadmapAsOfOut,
     RoadmapItemOut,
     RoadmapItemUpdateIn,
     RoadmapMoveIn,
+    RoadmapCommitFailureOut,
     RoadmapMoveOut,
     RoadmapMovementCEOIn,
     RoadmapMovementDecisionIn,
@@ -40,20 +53,59 @@ from app.schemas.roadmap import (
     RoadmapRedundancyDecisionIn,
     RoadmapRedundancyDecisionOut,
     RoadmapRedundancyOut,
-    RedundancyMatchOut,
     RoadmapUnlockOut,
 )
 from app.schemas.resource_validation import (
     ResourceValidationRequest,
     ResourceValidationResponse,
 )
+from app.services.audit_events import record_movement_event
+from app.services.collection_etags import collection_cache_headers, collection_etag, rows_token, schema_salt
+from app.services.document_preview import etag_matches
+from app.services.fast_json import fast_responses_enabled, json_response, rows_response, schema_select
+from app.services.capacity_governance import (
+    DEFAULT_ROLES,
+    CapacityScenario,
+    RoleIndex,
+    RoleVectors,
+    build_capacity_governance_alert,
+    schedule_plans,
+    simulate_capacity_scenarios,
+    usage_from_schedule,
+    week_number,
+    week_start,
+)
+from app.services.capacity_roles import (
+    load_bucket_extra_fte,
+    load_plan_extra_fte,
+    load_role_vectors,
+    store_plan_extra_fte,
+)
+from app.services.capacity_forecast import build_capacity_forecast
+from app.services.capacity_rollups import build_capacity_heatmap, plan_ids_of_items, refresh_capacity_rollups
+from app.services.capacity_locks import ANNUAL_POOL_KEY, CapacityLockUnavailable, lock_capacity_buckets
+from app.services.capacity_scheduler import FeasibleSlot, find_feasible_slots
+from app.services.principal_cache import Principal
+from app.services.read_models import plan_capacity_rows, plan_export_rows
 from app.services.resource_validation import analyze_resource_allocation
-from app.services.versioning import log_roadmap_version
+from app.services.roadmap_as_of import as_naive_utc, plan_item_snapshot, roadmap_as_of
+from app.services.versioning import (
+    MERGE_TRACE_ACTION_PREFIX,
+    delete_plan_history,
+    load_item_history,
+    log_plan_version,
+    log_roadmap_version,
+)
 
 router = APIRouter(prefix="/roadmap", tags=["roadmap"])
 
 SIMILARITY_FLAG_THRESHOLD = 0.62
 SIMILARITY_MATCH_THRESHOLD = 0.55
+MAX_SLOT_ALTERNATIVES = 20
+MAX_SLOT_HORIZON_WEEKS = 260
+MAX_SIMULATION_SCENARIOS = 50
+DEFAULT_FORECAST_TRIALS = 2000
+MAX_FORECAST_TRIALS = 10000
 ROLE_KEYS = ("fe", "be", "ai", "pm")
 PORTFOLIOS = ("client", "internal")
 
@@ -285,47 +337,57 @@ def _apply_plan_schedule(
     item.dependency_ids = sorted(set(dependency_ids))
 
 
-def _current_usage_weekly(
-    db: Session,
-    exclude_bucket_item_id: int | None = None,
-) -> dict[str, dict[str, dict[str, float]]]:
-    usage: dict[str, dict[str, dict[str, float]]] = {
-        "client": {},
-        "internal": {},
-    }
-    plans = db.query(RoadmapPlanItem).all()
-    for plan in plans:
-        if exclude_bucket_item_id and plan.bucket_item_id == exclude_bucket_item_id:
-            continue
-        parsed = _parse_plan_dates(plan.planned_start_date, plan.planned_end_date)
-        if not parsed:
-            continue
-        start, end = parsed
-        portfolio = _norm_portfolio(plan.project_context)
-        for wk in _week_keys_between(start, end):
-            slot = usage[portfolio].setdefault(wk, {"fe": 0.0, "be": 0.0, "ai": 0.0, "pm": 0.0, "fs": 0.0})
-            slot["fe"] += _safe_non_negative(plan.fe_fte)
-            slot["be"] += _safe_non_negative(plan.be_fte)
-            slot["ai"] += _safe_non_negative(plan.ai_fte)
-            slot["pm"] += _safe_non_negative(plan.pm_fte)
-            slot["fs"] += _safe_non_negative(plan.fs_fte)
-    return usage
+def _default_role_vectors() -> RoleVectors:
+    return RoleVectors(DEFAULT_ROLES, np.zeros((0, len(DEFAULT_ROLES.keys))), np.zeros(0), np.zeros(0))
 
 
-def _current_usage_pw(db: Session) -> dict[str, dict[str, float]]:
-    usage: dict[str, dict[str, float]] = {
-        "client": {"fe": 0.0, "be": 0.0, "ai": 0.0, "pm": 0.0, "fs": 0.0},
-        "internal": {"fe": 0.0, "be": 0.0, "ai": 0.0, "pm": 0.0, "fs": 0.0},
-    }
-    plans = db.query(RoadmapPlanItem).all()
-    for plan in plans:
-        portfolio = _norm_portfolio(plan.project_context)
-        duration = _usage_duration(plan.tentative_duration_weeks)
-        usage[portfolio]["fe"] += _safe_non_negative(plan.fe_fte) * duration
-        usage[portfolio]["be"] += _safe_non_negative(plan.be_fte) * duration
-        usage[portfolio]["ai"] += _safe_non_negative(plan.ai_fte) * duration
-        usage[portfolio]["pm"] += _safe_non_negative(plan.pm_fte) * duration
-        usage[portfolio]["fs"] += _safe_non_negative(plan.fs_fte) * duration
+def _validated_roles(roles: RoleIndex) -> tuple[str, ...]:
+    # FS capacity is folded into FE/BE, so FS itself is never validated.
+    return ROLE_KEYS + roles.extra_keys
+
+
+def _role_columns(roles: RoleIndex) -> list[int]:
+    return [roles.keys.index(role) for role in _validated_roles(roles)]
+
+
+def _capacity_vector(
+    governance: GovernanceConfig,
+    portfolio: str,
+    roles: RoleVectors,
+    weekly: bool,
+) -> np.ndarray:
+    """Capacity of every validated role, built once per validation."""
+    limit = _capacity_limit_weekly if weekly else _capacity_limit_pw
+    legacy = [limit(governance, portfolio, role) for role in ROLE_KEYS]
+    # Extra roles have no per-role quota columns and use the legacy global quotas.
+    if portfolio == "client":
+        quota = float(governance.quota_client)
+    elif portfolio == "internal" or not weekly:
+        quota = float(governance.quota_internal)
+    else:
+        quota = 0.0
+    extra = roles.extra_team * roles.extra_efficiency * quota * (1.0 if weekly else 52.0)
+    return np.concatenate([legacy, np.maximum(0.0, extra)])
+
+
+def _extra_role_fte(role_fte: dict[str, float]) -> dict[str, float]:
+    return {role.strip().lower(): value for role, value in role_fte.items() if role.strip().lower() not in ROLE_KEYS}
+
+
+def _proposed_vector(proposed: dict[str, float], roles: RoleIndex) -> np.ndarray:
+    return np.array([_safe_non_negative(proposed.get(role, 0.0)) for role in _validated_roles(roles)])
+
+
+def _usage_pw_from_plans(plans: list[RoadmapPlanItem], fte: np.ndarray) -> np.ndarray:
+    """Person-weeks booked per portfolio (rows, ``PORTFOLIOS`` order) and role (``fte`` columns)."""
+    usage = np.zeros((len(PORTFOLIOS), fte.shape[1]))
+    if not plans:
+        return usage
+    portfolio = np.array([PORTFOLIOS.index(_norm_portfolio(plan.project_context)) for plan in plans])
+    duration = np.array([_usage_duration(plan.tentative_duration_weeks) for plan in plans], dtype=np.float64)
+    weighted = fte * duration[:, None]
+    for column in range(fte.shape[1]):
+        usage[:, column] = np.bincount(portfolio, weights=weighted[:, column], minlength=len(PORTFOLIOS))
     return usage
 
 
@@ -337,18 +399,37 @@ def _capacity_validate(
     duration_weeks: int,
     exclude_bucket_item_id: int | None = None,
     portfolio_quota_override: str | None = None,
+    roles: RoleIndex = DEFAULT_ROLES,
 ) -> tuple[str, list[str], dict[str, str], str]:
-    usage_pw = _current_usage_pw(db)
+    plans = db.query(RoadmapPlanItem).all()
+    vectors = load_role_vectors(db, governance, plans, roles)
+    usage_pw = _usage_pw_from_plans(plans, vectors.plan_fte)
     if exclude_bucket_item_id:
-        existing = db.query(RoadmapPlanItem).filter(RoadmapPlanItem.bucket_item_id == exclude_bucket_item_id).first()
-        if existing:
-            existing_portfolio = _norm_portfolio(existing.project_context)
-            existing_duration = _usage_duration(existing.tentative_duration_weeks)
-            usage_pw[existing_portfolio]["fe"] -= _safe_non_negative(existing.fe_fte) * existing_duration
-            usage_pw[existing_portfolio]["be"] -= _safe_non_negative(existing.be_fte) * existing_duration
-            usage_pw[existing_portfolio]["ai"] -= _safe_non_negative(existing.ai_fte) * existing_duration
-            usage_pw[existing_portfolio]["pm"] -= _safe_non_negative(existing.pm_fte) * existing_duration
+        for row, plan in enumerate(plans):
+            if plan.bucket_item_id == exclude_bucket_item_id:
+                _release_pw(usage_pw, plan, vectors.plan_fte[row], roles)
+                break
+    return _capacity_check_pw(governance, usage_pw, portfolio, proposed, duration_weeks, portfolio_quota_override, vectors)
+
+
+def _release_pw(usage_pw: np.ndarray, plan: RoadmapPlanItem, fte: np.ndarray, roles: RoleIndex) -> None:
+    """Take an existing plan's validated-role person-weeks back out of ``usage_pw``."""
+    columns = _role_columns(roles)
+    usage_pw[PORTFOLIOS.index(_norm_portfolio(plan.project_context)), columns] -= fte[columns] * _usage_duration(
+        plan.tentative_duration_weeks
+    )
 
+
+def _capacity_check_pw(
+    governance: GovernanceConfig,
+    usage_pw: np.ndarray,
+    portfolio: str,
+    proposed: dict[str, float],
+    duration_weeks: int,
+    portfolio_quota_override: str | None = None,
+    roles: RoleVectors | None = None,
+) -> tuple[str, list[str], dict[str, str], str]:
+    roles = roles or _default_role_vectors()
     breach_roles: list[str] = []
     no_capacity_roles: list[str] = []
     utilization: dict[str, str] = {}
@@ -356,18 +437,21 @@ def _capacity_validate(
     # Use override portfolio if specified
     effective_portfolio = portfolio_quota_override or portfolio
 
-    for role in ROLE_KEYS:
-        cap_pw = _capacity_limit_pw(governance, effective_portfolio, role)
-        next_pw = usage_pw[portfolio][role] + _safe_non_negative(proposed.get(role, 0.0)) * duration_weeks
+    validated = _validated_roles(roles.index)
+    capacity = _capacity_vector(governance, effective_portfolio, roles, weekly=False)
+    next_pw = usage_pw[PORTFOLIOS.index(portfolio), _role_columns(roles.index)] + _proposed_vector(
+        proposed, roles.index
+    ) * duration_weeks
+    for role, cap_pw, booked in zip(validated, capacity.tolist(), next_pw.tolist()):
         if cap_pw <= 0:
-            if next_pw <= 0:
+            if booked <= 0:
                 utilization[role.upper()] = "0.0%"
             else:
                 utilization[role.upper()] = "N/A"
                 breach_roles.append(role.upper())
                 no_capacity_roles.append(role.upper())
         else:
-            util_pct = (next_pw / cap_pw) * 100.0
+            util_pct = (booked / cap_pw) * 100.0
             utilization[role.upper()] = f"{util_pct}%"
             if util_pct > 100.0 + 1e-9:
                 breach_roles.append(role.upper())
@@ -394,6 +478,67 @@ def _capacity_validate(
     )
 
 
+def _lock_capacity(db: Session, buckets: list[tuple[str, str]]) -> None:
+    try:
+        lock_capacity_buckets(db, buckets)
+    except CapacityLockUnavailable as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+def _lock_timeline_capacity(
+    db: Session, portfolio: str, start_date: str, end_date: str, annual_pool: bool = False
+) -> None:
+    """Lock the weeks a plan will cover, plus the portfolio's annual pool when its duration changes.
+
+    A new duration changes the plan's annual person-weeks, which commits
+    validate under the annual pool lock; taking both in one call keeps the
+    lock order the same as every other writer.
+    """
+    buckets = _timeline_buckets(portfolio, start_date, end_date)
+    if annual_pool:
+        buckets.append((portfolio, ANNUAL_POOL_KEY))
+    _lock_capacity(db, buckets)
+
+
+def _timeline_buckets(portfolio: str, start_date: str, end_date: str) -> list[tuple[str, str]]:
+    parsed = _parse_plan_dates(start_date, end_date)
+    return [(portfolio, wk) for wk in _week_keys_between(*parsed)] if parsed else []
+
+
+def _recommit_buckets(bucket_items: list[RoadmapItem], plans: list[RoadmapPlanItem]) -> set[tuple[str, str]]:
+    """Capacity buckets a commit batch writes: each portfolio's annual pool, and the weeks of recommitted plans.
+
+    A recommit rewrites an existing plan's FTE and portfolio, so the weekly
+    demand of every week it already covers changes, in its old portfolio and
+    its new one.
+    """
+    bucket_of_id = {bucket.id: bucket for bucket in bucket_items if bucket.picked_up}
+    buckets = {(_norm_portfolio(bucket.project_context), ANNUAL_POOL_KEY) for bucket in bucket_of_id.values()}
+    for plan in plans:
+        bucket = bucket_of_id.get(plan.bucket_item_id)
+        if bucket is None:
+            continue
+        for portfolio in {_norm_portfolio(plan.project_context), _norm_portfolio(bucket.project_context)}:
+            buckets.update(_timeline_buckets(portfolio, plan.planned_start_date or "", plan.planned_end_date or ""))
+    return buckets
+
+
+def _lock_commit_capacity(db: Session, bucket_items: list[RoadmapItem]) -> None:
+    """Lock ``_recommit_buckets`` of a commit batch in one sorted call.
+
+    The plan dates are read before the locks are held, so they are read again
+    afterwards; if a concurrent edit moved a plan meanwhile, its new weeks
+    are locked as well.
+    """
+    bucket_ids = [bucket.id for bucket in bucket_items if bucket.picked_up]
+    query = db.query(RoadmapPlanItem).filter(RoadmapPlanItem.bucket_item_id.in_(bucket_ids))
+    locked = _recommit_buckets(bucket_items, query.all())
+    _lock_capacity(db, sorted(locked))
+    while missing := _recommit_buckets(bucket_items, query.populate_existing().all()) - locked:
+        _lock_capacity(db, sorted(missing))
+        locked |= missing
+
+
 def _capacity_validate_timeline(
     db: Session,
     governance: GovernanceConfig,
@@ -403,6 +548,7 @@ def _capacity_validate_timeline(
     planned_end_date: str,
     exclude_bucket_item_id: int | None = None,
     portfolio_quota_override: str | None = None,
+    roles: RoleIndex = DEFAULT_ROLES,
 ) -> tuple[str, list[str], dict[str, str], str]:
     parsed = _parse_plan_dates(planned_start_date, planned_end_date)
     if not parsed:
@@ -413,43 +559,49 @@ def _capacity_validate_timeline(
             "Invalid planned date range. Use YYYY-MM-DD and ensure end date is not before start date.",
         )
     start, end = parsed
-    week_keys = _week_keys_between(start, end)
-    usage_weekly = _current_usage_weekly(db, exclude_bucket_item_id=exclude_bucket_item_id)
+    first_week = week_number(start)
+    span = week_number(end) - first_week + 1
 
-    breach_roles: list[str] = []
-    no_capacity_roles: list[str] = []
-    breach_weeks: dict[str, str] = {}
-    peak_utilization: dict[str, float] = {"fe": 0.0, "be": 0.0, "ai": 0.0, "pm": 0.0, "fs": 0.0}
-    no_capacity_breach: dict[str, bool] = {"fe": False, "be": False, "ai": False, "pm": False, "fs": False}
-    for wk in week_keys:
-        existing = usage_weekly[portfolio].get(wk, {"fe": 0.0, "be": 0.0, "ai": 0.0, "pm": 0.0, "fs": 0.0})
-        for role in ROLE_KEYS:
-            cap_weekly = _capacity_limit_weekly(governance, portfolio, role)
-            next_fte = existing[role] + _safe_non_negative(proposed.get(role, 0.0))
-            if cap_weekly <= 0:
-                if next_fte > 0:
-                    no_capacity_breach[role] = True
-                    if role.upper() not in breach_roles:
-                        breach_roles.append(role.upper())
-                        breach_weeks[role.upper()] = wk
-                    if role.upper() not in no_capacity_roles:
-                        no_capacity_roles.append(role.upper())
-            else:
-                util_pct = (next_fte / cap_weekly) * 100.0
-                peak_utilization[role] = max(peak_utilization[role], util_pct)
-                if util_pct > 100.0 + 1e-9 and role.upper() not in breach_roles:
-                    breach_roles.append(role.upper())
-                    breach_weeks[role.upper()] = wk
-
-    # Use override portfolio if specified
-    effective_portfolio = portfolio_quota_override or portfolio
+    plans = [
+        plan
+        for plan in db.query(RoadmapPlanItem).all()
+        if not (exclude_bucket_item_id and plan.bucket_item_id == exclude_bucket_item_id)
+    ]
+    vectors = load_role_vectors(db, governance, plans, roles)
+    usage = usage_from_schedule(schedule_plans(plans, vectors.plan_fte))
+    columns = _role_columns(roles)
+    existing = np.zeros((span, len(columns)))
+    lo = max(first_week, usage.first_week)
+    hi = min(first_week + span, usage.first_week + usage.week_count)
+    if lo < hi:
+        profile = usage.demand[PORTFOLIOS.index(portfolio)][:, columns]
+        existing[lo - first_week : hi - first_week] = profile[lo - usage.first_week : hi - usage.first_week]
+
+    # Every week x role cell at once; roles are then reported in the order a
+    # week-by-week scan would first hit their breach.
+    validated = _validated_roles(roles)
+    capacity = _capacity_vector(governance, portfolio, vectors, weekly=True)
+    next_fte = existing + _proposed_vector(proposed, roles)
+    no_capacity = capacity <= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        util = np.where(no_capacity, 0.0, (next_fte / capacity) * 100.0)
+    no_capacity_hit = no_capacity & (next_fte > 0)
+    breach = no_capacity_hit | (~no_capacity & (util > 100.0 + 1e-9))
+    peak_utilization = np.maximum(0.0, util.max(axis=0))
+    no_capacity_breach = no_capacity_hit.any(axis=0)
+
+    first_breach = {int(col): int(np.argmax(breach[:, col])) for col in np.flatnonzero(breach.any(axis=0))}
+    breach_order = sorted(first_breach, key=lambda col: (first_breach[col], col))
+    breach_roles = [validated[col].upper() for col in breach_order]
+    breach_weeks = {validated[col].upper(): _week_key(week_start(first_week + first_breach[col])) for col in breach_order}
+    no_capacity_roles = [validated[col].upper() for col in breach_order if no_capacity_breach[col]]
 
     utilization = {}
-    for role in ROLE_KEYS:
-        if no_capacity_breach[role]:
+    for col, role in enumerate(validated):
+        if no_capacity_breach[col]:
             utilization[role.upper()] = "N/A"
         else:
-            utilization[role.upper()] = f"{peak_utilization[role]}%"
+            utilization[role.upper()] = f"{float(peak_utilization[col])}%"
     if breach_roles:
         exceeded_roles = [role for role in breach_roles if role not in no_capacity_roles]
         breach_detail = ", ".join(f"{r} ({breach_weeks.get(r, '-')})" for r in exceeded_roles)
@@ -494,7 +646,8 @@ def _containment(a: set[str], b: set[str]) -> float:
     return max(inter / len(a), inter / len(b))
 
 
-def _similarity(a: RoadmapItem, b: RoadmapItem) -> float:
+def _similarity(a, b) -> float:
+    """Similarity of two roadmap items, or rows carrying their ``title``, ``scope`` and ``activities``."""
     a_title_tokens = _tokens(a.title)
     b_title_tokens = _tokens(b.title)
     title_a = " ".join(a_title_tokens)
@@ -585,21 +738,60 @@ def _month_marks(item: RoadmapPlanItem, year: int) -> list[str]:
 
 
 @router.get("/items", response_model=list[RoadmapItemOut])
-def list_roadmap_items(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return db.query(RoadmapItem).order_by(RoadmapItem.id.desc()).all()
+def list_roadmap_items(
+    response: Response,
+    ids: list[int] | None = Query(default=None),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+    _=Depends(get_current_user),
+):
+    criteria = [RoadmapItem.id.in_(ids)] if ids else []
+    etag = collection_etag(schema_salt(RoadmapItemOut), rows_token(db, RoadmapItem, *criteria))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=collection_cache_headers(etag))
+    if fast_responses_enabled():
+        statement = schema_select(RoadmapItem, RoadmapItemOut).where(*criteria).order_by(RoadmapItem.id.desc())
+        return rows_response(db, statement, collection_cache_headers(etag))
+    response.headers.update(collection_cache_headers(etag))
+    return db.query(RoadmapItem).filter(*criteria).order_by(RoadmapItem.id.desc()).all()
 
 
 @router.get("/items/redundancy", response_model=list[RoadmapRedundancyOut])
-def list_roadmap_redundancy(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    items = db.query(RoadmapItem).order_by(RoadmapItem.id.desc()).all()
-    decisions = db.query(RoadmapRedundancyDecision).all()
+def list_roadmap_redundancy(
+    response: Response,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+    _=Depends(get_current_user),
+):
+    # Scoring every pair is the expensive part; skip it when neither the
+    # items nor the decisions changed.
+    etag = collection_etag(
+        schema_salt(RoadmapRedundancyOut),
+        rows_token(db, RoadmapItem),
+        rows_token(db, RoadmapRedundancyDecision),
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=collection_cache_headers(etag))
+    response.headers.update(collection_cache_headers(etag))
+    # Scoring needs four columns; plain rows keep the O(n²) loop off ORM objects.
+    items = db.execute(
+        select(RoadmapItem.id, RoadmapItem.title, RoadmapItem.scope, RoadmapItem.activities).order_by(
+            RoadmapItem.id.desc()
+        )
+    ).all()
     decision_map = {
-        (d.left_item_id, d.right_item_id): d.decision
-        for d in decisions
+        (left_item_id, right_item_id): decision
+        for left_item_id, right_item_id, decision in db.execute(
+            select(
+                RoadmapRedundancyDecision.left_item_id,
+                RoadmapRedundancyDecision.right_item_id,
+                RoadmapRedundancyDecision.decision,
+            )
+        )
     }
-    output: list[RoadmapRedundancyOut] = []
+    output: list[dict] = []
     for item in items:
-        matches: list[RedundancyMatchOut] = []
+        matches: list[dict] = []
         resolved_by = ""
         for other in items:
             if other.id == item.id:
@@ -612,22 +804,22 @@ def list_roadmap_redundancy(db: Session = Depends(get_db), _=Depends(get_current
                     resolved_by = decision
                 continue
             if score >= SIMILARITY_MATCH_THRESHOLD:
-                matches.append(
-                    RedundancyMatchOut(item_id=other.id, title=other.title, score=score)
-                )
-        matches = sorted(matches, key=lambda x: x.score, reverse=True)[:3]
+                matches.append({"item_id": other.id, "title": other.title, "score": score})
+        matches = sorted(matches, key=lambda x: x["score"], reverse=True)[:3]
         best = matches[0] if matches else None
         output.append(
-            RoadmapRedundancyOut(
-                item_id=item.id,
-                is_redundant=bool(best and best.score >= SIMILARITY_FLAG_THRESHOLD),
-                best_score=best.score if best else 0.0,
-                best_match_id=best.item_id if best else None,
-                best_match_title=best.title if best else "",
-                resolved_by_decision=resolved_by,
-                matches=matches,
-            )
+            {
+                "item_id": item.id,
+                "is_redundant": bool(best and best["score"] >= SIMILARITY_FLAG_THRESHOLD),
+                "best_score": best["score"] if best else 0.0,
+                "best_match_id": best["item_id"] if best else None,
+                "best_match_title": best["title"] if best else "",
+                "resolved_by_decision": resolved_by,
+                "matches": matches,
+            }
         )
+    if fast_responses_enabled():
+        return json_response(output, collection_cache_headers(etag))
     return output
 
 
@@ -636,7 +828,7 @@ def apply_redundancy_decision(
     item_id: int,
     payload: RoadmapRedundancyDecisionIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP)),
 ):
     primary = db.get(RoadmapItem, item_id)
     if not primary:
@@ -718,6 +910,8 @@ def apply_redundancy_decision(
 
     other_plan = db.query(RoadmapPlanItem).filter(RoadmapPlanItem.bucket_item_id == other.id).first()
     primary_plan = db.query(RoadmapPlanItem).filter(RoadmapPlanItem.bucket_item_id == primary.id).first()
+    other_plan_before = plan_item_snapshot(other_plan) if other_plan else {}
+    merged_plan_ids = [other_plan.id] if other_plan else []
     if other_plan and not primary_plan:
         other_plan.bucket_item_id = primary.id
         other_plan.title = primary.title
@@ -734,7 +928,23 @@ def apply_redundancy_decision(
         other_plan.delivery_mode = primary.delivery_mode
         other_plan.accountable_person = primary.accountable_person
         db.add(other_plan)
+        log_plan_version(
+            db=db,
+            plan_item_id=other_plan.id,
+            action="merged_into_item",
+            changed_by=current_user.id,
+            before_data=other_plan_before,
+            after_data=plan_item_snapshot(other_plan),
+        )
     elif other_plan and primary_plan:
+        log_plan_version(
+            db=db,
+            plan_item_id=other_plan.id,
+            action="merged_duplicate",
+            changed_by=current_user.id,
+            before_data=other_plan_before,
+            after_data={},
+        )
         db.delete(other_plan)
 
     db.query(IntakeItem).filter(IntakeItem.roadmap_item_id == other.id).update(
@@ -760,11 +970,12 @@ def apply_redundancy_decision(
     log_roadmap_version(
         db=db,
         roadmap_item_id=primary.id,
-        action=f"merged_from_item_{other.id}",
+        action=f"{MERGE_TRACE_ACTION_PREFIX}{other.id}",
         changed_by=current_user.id,
         before_data=other_before,
         after_data={},
     )
+    refresh_capacity_rollups(db, merged_plan_ids)
 
     db.commit()
     return RoadmapRedundancyDecisionOut(
@@ -777,8 +988,38 @@ def apply_redundancy_decision(
 
 
 @router.get("/plan/items", response_model=list[RoadmapPlanOut])
-def list_roadmap_plan_items(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return db.query(RoadmapPlanItem).order_by(RoadmapPlanItem.id.desc()).all()
+def list_roadmap_plan_items(
+    response: Response,
+    ids: list[int] | None = Query(default=None),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+    _=Depends(get_current_user),
+):
+    criteria = [RoadmapPlanItem.id.in_(ids)] if ids else []
+    etag = collection_etag(schema_salt(RoadmapPlanOut), rows_token(db, RoadmapPlanItem, *criteria))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=collection_cache_headers(etag))
+    if fast_responses_enabled():
+        statement = schema_select(RoadmapPlanItem, RoadmapPlanOut).where(*criteria).order_by(RoadmapPlanItem.id.desc())
+        return rows_response(db, statement, collection_cache_headers(etag))
+    response.headers.update(collection_cache_headers(etag))
+    return db.query(RoadmapPlanItem).filter(*criteria).order_by(RoadmapPlanItem.id.desc()).all()
+
+
+@router.get("/as-of", response_model=RoadmapAsOfOut)
+def get_roadmap_as_of(
+    at: datetime = Query(...),
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+):
+    """Commitments and roadmap plan items as they stood at ``at``, rebuilt from their version history."""
+    state = roadmap_as_of(db, as_naive_utc(at))
+    return RoadmapAsOfOut(
+        as_of=state.as_of,
+        checkpoint_at=state.checkpoint_at,
+        roadmap_items=[RoadmapItemOut.model_validate(item) for item in reversed(state.roadmap_models())],
+        plan_items=[RoadmapPlanOut.model_validate(plan) for plan in reversed(state.plan_models())],
+    )
 
 
 @router.get("/governance-lock", response_model=RoadmapGovernanceLockOut)
@@ -799,7 +1040,7 @@ def get_roadmap_governance_lock(
 def update_roadmap_governance_lock(
     payload: RoadmapGovernanceLockIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO)),
 ):
     cfg = _get_or_create_governance(db)
     now_utc = datetime.utcnow()
@@ -826,19 +1067,32 @@ def update_roadmap_governance_lock(
 
 @router.get("/movement/requests", response_model=list[RoadmapMovementRequestOut])
 def list_roadmap_movement_requests(
+    response: Response,
     status: str = Query(default="all"),
     plan_item_id: int | None = Query(default=None, ge=1),
+    if_none_match: str | None = Header(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
 ):
-    query = db.query(RoadmapMovementRequest)
+    criteria = []
     if status.lower() != "all":
-        query = query.filter(RoadmapMovementRequest.status == status.strip().lower())
+        criteria.append(RoadmapMovementRequest.status == status.strip().lower())
     if plan_item_id is not None:
-        query = query.filter(RoadmapMovementRequest.plan_item_id == plan_item_id)
+        criteria.append(RoadmapMovementRequest.plan_item_id == plan_item_id)
     if current_user.role in {UserRole.VP, UserRole.PM, UserRole.PO}:
-        query = query.filter(RoadmapMovementRequest.requested_by == current_user.id)
-    return query.order_by(RoadmapMovementRequest.id.desc()).all()
+        criteria.append(RoadmapMovementRequest.requested_by == current_user.id)
+    etag = collection_etag(schema_salt(RoadmapMovementRequestOut), rows_token(db, RoadmapMovementRequest, *criteria))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=collection_cache_headers(etag))
+    if fast_responses_enabled():
+        statement = (
+            schema_select(RoadmapMovementRequest, RoadmapMovementRequestOut)
+            .where(*criteria)
+            .order_by(RoadmapMovementRequest.id.desc())
+        )
+        return rows_response(db, statement, collection_cache_headers(etag))
+    response.headers.update(collection_cache_headers(etag))
+    return db.query(RoadmapMovementRequest).filter(*criteria).order_by(RoadmapMovementRequest.id.desc()).all()
 
 
 @router.get("/plan/export")
@@ -848,10 +1102,14 @@ def export_roadmap_plan_excel(
     context: str = Query(default="all"),
     mode: str = Query(default="all"),
     period: str = Query(default="all"),
+    as_of: datetime | None = Query(default=None),
     db: Session = Depends(get_db),
     _=Depends(get_current_user),
 ):
-    items = db.query(RoadmapPlanItem).order_by(RoadmapPlanItem.title.asc()).all()
+    if as_of is not None:
+        items = sorted(roadmap_as_of(db, as_naive_utc(as_of)).plan_models(), key=lambda plan: plan.title)
+    else:
+        items = plan_export_rows(db)
 
     def _ok(item: RoadmapPlanItem) -> bool:
         p_ok = priority == "all" or (item.priority or "").lower() == priority.lower()
@@ -949,7 +1207,7 @@ def export_roadmap_plan_excel(
     stream = BytesIO()
     wb.save(stream)
     stream.seek(0)
-    filename = f"roadmap_gantt_{year}.xlsx"
+    filename = f"roadmap_gantt_{year}.xlsx" if as_of is None else f"roadmap_gantt_{year}_as_of_{as_of:%Y%m%d}.xlsx"
     return StreamingResponse(
         stream,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -962,12 +1220,14 @@ def update_roadmap_plan_item(
     item_id: int,
     payload: RoadmapPlanUpdateIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    roles: RoleIndex = Depends(get_role_index),
 ):
     item = db.get(RoadmapPlanItem, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Roadmap plan item not found")
     _assert_expected_version("Roadmap plan item", int(item.version_no or 1), int(payload.expected_version_no))
+    before_data = plan_item_snapshot(item)
 
     start_date, end_date, duration_weeks = _parse_or_raise_plan_dates(
         payload.planned_start_date,
@@ -991,7 +1251,15 @@ def update_roadmap_plan_item(
         "ai": _safe_non_negative(item.ai_fte),
         "pm": _safe_non_negative(item.pm_fte),
         "fs": _safe_non_negative(item.fs_fte),
+        **load_plan_extra_fte(db, roles, item.id),
     }
+    _lock_timeline_capacity(
+        db,
+        _norm_portfolio(item.project_context),
+        start_date,
+        end_date,
+        annual_pool=duration_weeks != item.tentative_duration_weeks,
+    )
     status, _, _, reason = _capacity_validate_timeline(
         db=db,
         governance=governance,
@@ -1001,6 +1269,7 @@ def update_roadmap_plan_item(
         planned_end_date=end_date,
         exclude_bucket_item_id=item.bucket_item_id,
         portfolio_quota_override=payload.portfolio_quota_override,
+        roles=roles,
     )
     if status != "APPROVED":
         raise HTTPException(status_code=409, detail=reason)
@@ -1018,6 +1287,15 @@ def update_roadmap_plan_item(
     item.version_no = int(item.version_no or 1) + 1
 
     db.add(item)
+    log_plan_version(
+        db=db,
+        plan_item_id=item.id,
+        action="plan_updated",
+        changed_by=current_user.id,
+        before_data=before_data,
+        after_data=plan_item_snapshot(item),
+    )
+    refresh_capacity_rollups(db, [item.id], roles)
     db.commit()
     db.refresh(item)
     return item
@@ -1028,7 +1306,7 @@ def create_roadmap_movement_request(
     item_id: int,
     payload: RoadmapMovementRequestIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.VP, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.VP, UserRole.PM)),
 ):
     item = db.get(RoadmapPlanItem, item_id)
     if not item:
@@ -1060,6 +1338,7 @@ def create_roadmap_movement_request(
         requested_at=datetime.utcnow(),
     )
     db.add(request)
+    record_movement_event(db, request, item.project_context)
     db.commit()
     db.refresh(request)
     return request
@@ -1070,7 +1349,8 @@ def decide_roadmap_movement_request(
     request_id: int,
     payload: RoadmapMovementDecisionIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO)),
+    roles: RoleIndex = Depends(get_role_index),
 ):
     request = db.get(RoadmapMovementRequest, request_id)
     if not request:
@@ -1097,6 +1377,13 @@ def decide_roadmap_movement_request(
             raise HTTPException(status_code=404, detail="Roadmap plan item no longer exists.")
 
         start_date, end_date, duration_weeks = _parse_or_raise_plan_dates(request.to_start_date, request.to_end_date)
+        _lock_timeline_capacity(
+            db,
+            _norm_portfolio(item.project_context),
+            start_date,
+            end_date,
+            annual_pool=duration_weeks != item.tentative_duration_weeks,
+        )
         status, _, _, reason = _capacity_validate_timeline(
             db=db,
             governance=governance,
@@ -1106,10 +1393,12 @@ def decide_roadmap_movement_request(
                 "be": _safe_non_negative(item.be_fte),
                 "ai": _safe_non_negative(item.ai_fte),
                 "pm": _safe_non_negative(item.pm_fte),
+                **load_plan_extra_fte(db, roles, item.id),
             },
             planned_start_date=start_date,
             planned_end_date=end_date,
             exclude_bucket_item_id=item.bucket_item_id,
+            roles=roles,
         )
         if status != "APPROVED":
             request.status = "rejected"
@@ -1118,10 +1407,12 @@ def decide_roadmap_movement_request(
                 f"Auto-rejected: {reason}"
             )
             db.add(request)
+            record_movement_event(db, request, item.project_context)
             db.commit()
             db.refresh(request)
             return request
 
+        before_data = plan_item_snapshot(item)
         _apply_plan_schedule(
             item=item,
             start_date=start_date,
@@ -1135,8 +1426,19 @@ def decide_roadmap_movement_request(
         item.version_no = int(item.version_no or 1) + 1
         request.executed_at = datetime.utcnow()
         db.add(item)
+        log_plan_version(
+            db=db,
+            plan_item_id=item.id,
+            action="movement_approved",
+            changed_by=current_user.id,
+            before_data=before_data,
+            after_data=plan_item_snapshot(item),
+        )
+        refresh_capacity_rollups(db, [item.id], roles)
 
     db.add(request)
+    plan = db.get(RoadmapPlanItem, request.plan_item_id)
+    record_movement_event(db, request, plan.project_context if plan else "")
     db.commit()
     db.refresh(request)
     return request
@@ -1147,7 +1449,8 @@ def ceo_move_roadmap_plan_item(
     item_id: int,
     payload: RoadmapMovementCEOIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO)),
+    roles: RoleIndex = Depends(get_role_index),
 ):
     item = db.get(RoadmapPlanItem, item_id)
     if not item:
@@ -1164,6 +1467,13 @@ def ceo_move_roadmap_plan_item(
     if start_date == (item.planned_start_date or "") and end_date == (item.planned_end_date or ""):
         raise HTTPException(status_code=400, detail="Proposed dates are same as current plan dates.")
 
+    _lock_timeline_capacity(
+        db,
+        _norm_portfolio(item.project_context),
+        start_date,
+        end_date,
+        annual_pool=duration_weeks != item.tentative_duration_weeks,
+    )
     status, _, _, capacity_reason = _capacity_validate_timeline(
         db=db,
         governance=governance,
@@ -1173,16 +1483,19 @@ def ceo_move_roadmap_plan_item(
             "be": _safe_non_negative(item.be_fte),
             "ai": _safe_non_negative(item.ai_fte),
             "pm": _safe_non_negative(item.pm_fte),
+            **load_plan_extra_fte(db, roles, item.id),
         },
         planned_start_date=start_date,
         planned_end_date=end_date,
         exclude_bucket_item_id=item.bucket_item_id,
+        roles=roles,
     )
     if status != "APPROVED":
         raise HTTPException(status_code=409, detail=capacity_reason)
 
     from_start = item.planned_start_date or ""
     from_end = item.planned_end_date or ""
+    before_data = plan_item_snapshot(item)
     _apply_plan_schedule(
         item=item,
         start_date=start_date,
@@ -1216,6 +1529,16 @@ def ceo_move_roadmap_plan_item(
     )
     db.add(item)
     db.add(movement)
+    record_movement_event(db, movement, item.project_context)
+    log_plan_version(
+        db=db,
+        plan_item_id=item.id,
+        action="ceo_moved",
+        changed_by=current_user.id,
+        before_data=before_data,
+        after_data=plan_item_snapshot(item),
+    )
+    refresh_capacity_rollups(db, [item.id], roles)
     db.commit()
     db.refresh(movement)
     return movement
@@ -1226,7 +1549,7 @@ def update_roadmap_item(
     item_id: int,
     payload: RoadmapItemUpdateIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
     item = db.get(RoadmapItem, item_id)
     if not item:
@@ -1283,7 +1606,7 @@ def update_roadmap_item(
 def move_commitment_to_rnd_lab(
     item_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP)),
 ):
     item = db.get(RoadmapItem, item_id)
     if not item:
@@ -1353,7 +1676,7 @@ def move_commitment_to_rnd_lab(
 def unlock_roadmap_item(
     item_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP)),
 ):
     governance = _get_or_create_governance(db)
     if _is_roadmap_locked(governance):
@@ -1371,6 +1694,14 @@ def unlock_roadmap_item(
         return RoadmapUnlockOut(unlocked=False)
 
     before_data = _snapshot(item)
+    log_plan_version(
+        db=db,
+        plan_item_id=locked_plan.id,
+        action="unlocked",
+        changed_by=current_user.id,
+        before_data=plan_item_snapshot(locked_plan),
+        after_data={},
+    )
     db.delete(locked_plan)
     item.picked_up = False
     item.version_no = int(item.version_no or 1) + 1
@@ -1385,6 +1716,7 @@ def unlock_roadmap_item(
         before_data=before_data,
         after_data=_snapshot(item),
     )
+    refresh_capacity_rollups(db, [locked_plan.id])
 
     db.commit()
     return RoadmapUnlockOut(unlocked=True)
@@ -1393,15 +1725,20 @@ def unlock_roadmap_item(
 @router.get("/items/{item_id}/history", response_model=list[VersionOut])
 def roadmap_history(
     item_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
     db: Session = Depends(get_db),
     _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
-    versions = (
-        db.query(RoadmapItemVersion)
-        .filter(RoadmapItemVersion.roadmap_item_id == item_id)
-        .order_by(RoadmapItemVersion.id.desc())
-        .all()
+    etag = collection_etag(
+        schema_salt(VersionOut),
+        rows_token(db, RoadmapItemVersion, RoadmapItemVersion.roadmap_item_id == item_id),
+        rows_token(db, User),
     )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=collection_cache_headers(etag))
+    response.headers.update(collection_cache_headers(etag))
+    history = load_item_history(db, RoadmapItemVersion, RoadmapItemVersion.roadmap_item_id, item_id)
     users = {u.id: u.email for u in db.query(User).all()}
 
     return [
@@ -1411,11 +1748,11 @@ def roadmap_history(
             changed_by=v.changed_by,
             changed_by_email=users.get(v.changed_by),
             changed_fields=v.changed_fields,
-            before_data=v.before_data,
-            after_data=v.after_data,
+            before_data=before,
+            after_data=after,
             created_at=v.created_at,
         )
-        for v in versions
+        for v, before, after in history
     ]
 
 
@@ -1423,7 +1760,7 @@ def roadmap_history(
 def bulk_delete_roadmap_items(
     payload: BulkIdsIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP)),
 ):
     ids = sorted(set(payload.ids))
     if not ids:
@@ -1455,6 +1792,8 @@ def bulk_delete_roadmap_items(
         {"roadmap_item_id": None, "status": "draft"},
         synchronize_session=False,
     )
+    delete_plan_history(db, ids)
+    plan_ids = plan_ids_of_items(db, ids)
     db.query(RoadmapPlanItem).filter(RoadmapPlanItem.bucket_item_id.in_(ids)).delete(
         synchronize_session=False
     )
@@ -1462,6 +1801,7 @@ def bulk_delete_roadmap_items(
         synchronize_session=False
     )
     deleted = db.query(RoadmapItem).filter(RoadmapItem.id.in_(ids)).delete(synchronize_session=False) or 0
+    refresh_capacity_rollups(db, plan_ids)
     db.commit()
     return BulkDeleteOut(deleted=deleted)
 
@@ -1471,6 +1811,7 @@ def validate_capacity(
     payload: CapacityValidateIn,
     db: Session = Depends(get_db),
     _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
+    roles: RoleIndex = Depends(get_role_index),
 ):
     governance = db.query(GovernanceConfig).order_by(GovernanceConfig.id.asc()).first()
     if not governance:
@@ -1489,7 +1830,7 @@ def validate_capacity(
         "ai": _safe_non_negative(payload.ai_fte),
         "pm": _safe_non_negative(payload.pm_fte),
         "fs": _safe_non_negative(payload.fs_fte),
-        "pm": _safe_non_negative(payload.pm_fte),
+        **_extra_role_fte(payload.role_fte),
     }
     if payload.planned_start_date.strip() and payload.planned_end_date.strip():
         status, breaches, utilization, reason = _capacity_validate_timeline(
@@ -1500,6 +1841,7 @@ def validate_capacity(
             planned_start_date=payload.planned_start_date.strip(),
             planned_end_date=payload.planned_end_date.strip(),
             exclude_bucket_item_id=payload.exclude_bucket_item_id,
+            roles=roles,
         )
     else:
         status, breaches, utilization, reason = _capacity_validate(
@@ -1509,6 +1851,7 @@ def validate_capacity(
             proposed=proposed,
             duration_weeks=duration,
             exclude_bucket_item_id=payload.exclude_bucket_item_id,
+            roles=roles,
         )
     return CapacityValidateOut(
         status=status,
@@ -1518,63 +1861,381 @@ def validate_capacity(
     )
 
 
-@router.post("/plan/move", response_model=RoadmapMoveOut)
-def move_bucket_items_to_roadmap(
-    payload: RoadmapMoveIn,
+def _slot_out(slot: FeasibleSlot, roles: RoleIndex) -> CapacitySlotOut:
+    start = week_start(slot.start_week)
+    end = week_start(slot.end_week) + timedelta(days=6)
+    return CapacitySlotOut(
+        planned_start_date=start.date().isoformat(),
+        planned_end_date=end.date().isoformat(),
+        start_week=_week_key(start),
+        end_week=_week_key(end),
+        utilization_percentage={
+            role.upper(): f"{pct}%" for role, pct in zip(_validated_roles(roles), slot.peak_utilization_pct)
+        },
+    )
+
+
+@router.post("/capacity/earliest-slot", response_model=CapacitySlotSearchOut)
+def find_earliest_capacity_slot(
+    payload: CapacitySlotSearchIn,
     db: Session = Depends(get_db),
-    _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM)),
+    _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
+    roles: RoleIndex = Depends(get_role_index),
 ):
-    ids = sorted(set(payload.ids))
-    if not ids:
-        return RoadmapMoveOut(moved=0)
-    if not payload.tentative_duration_weeks or payload.tentative_duration_weeks <= 0:
-        raise HTTPException(status_code=400, detail="Tentative duration (weeks) is required to commit resources.")
+    """
+    Find the earliest Monday-aligned window where a commitment fits weekly capacity.
 
+    Applies the same per-week rule as timeline validation, so any returned
+    window can be saved through the plan update endpoint as-is.
+    """
+    duration = payload.duration_weeks
+    if duration <= 0:
+        raise HTTPException(status_code=400, detail="Duration (weeks) must be at least 1.")
+    if not 0 <= payload.alternatives <= MAX_SLOT_ALTERNATIVES:
+        raise HTTPException(status_code=400, detail=f"Alternatives must be between 0 and {MAX_SLOT_ALTERNATIVES}.")
+    if not 1 <= payload.horizon_weeks <= MAX_SLOT_HORIZON_WEEKS:
+        raise HTTPException(status_code=400, detail=f"Search horizon must be between 1 and {MAX_SLOT_HORIZON_WEEKS} weeks.")
+    earliest_raw = payload.earliest_start_date.strip()
+    try:
+        earliest = datetime.fromisoformat(earliest_raw) if earliest_raw else datetime.utcnow()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid earliest start date format. Use YYYY-MM-DD.")
+
+    source = payload
+    extra_fte = _extra_role_fte(payload.role_fte)
+    exclude_bucket_item_id = None
+    if payload.bucket_item_id is not None:
+        bucket = db.get(RoadmapItem, payload.bucket_item_id)
+        if not bucket:
+            raise HTTPException(status_code=404, detail="Roadmap item not found")
+        source = bucket
+        extra_fte = load_bucket_extra_fte(db, roles, [bucket.id]).get(bucket.id, {})
+        exclude_bucket_item_id = bucket.id
+    portfolio = _norm_portfolio(source.project_context)
+    proposed = _proposed_vector(
+        {**{role: getattr(source, f"{role}_fte") for role in ROLE_KEYS}, **extra_fte},
+        roles,
+    )
+
+    governance = db.query(GovernanceConfig).order_by(GovernanceConfig.id.asc()).first()
+    if not governance:
+        return CapacitySlotSearchOut(
+            status="NOT_FOUND",
+            portfolio=portfolio,
+            duration_weeks=duration,
+            reason="Governance configuration missing. CEO/VP must configure capacity first.",
+        )
+
+    plans = [plan for plan in db.query(RoadmapPlanItem).all() if plan.bucket_item_id != exclude_bucket_item_id]
+    vectors = load_role_vectors(db, governance, plans, roles)
+    first_monday = earliest + timedelta(days=(7 - earliest.weekday()) % 7)
+    slots = find_feasible_slots(
+        usage=usage_from_schedule(schedule_plans(plans, vectors.plan_fte)),
+        portfolio_idx=PORTFOLIOS.index(portfolio),
+        role_idx=_role_columns(roles),
+        capacity=_capacity_vector(governance, portfolio, vectors, weekly=True),
+        proposed=proposed,
+        duration_weeks=duration,
+        earliest_week=week_number(first_monday),
+        horizon_weeks=payload.horizon_weeks,
+        limit=payload.alternatives + 1,
+    )
+    if not slots:
+        return CapacitySlotSearchOut(
+            status="NOT_FOUND",
+            portfolio=portfolio,
+            duration_weeks=duration,
+            reason=(
+                f"No {duration}-week window in the next {payload.horizon_weeks} weeks stays within "
+                f"weekly capacity in {portfolio} portfolio."
+            ),
+        )
+    windows = [_slot_out(slot, roles) for slot in slots]
+    return CapacitySlotSearchOut(
+        status="FOUND",
+        portfolio=portfolio,
+        duration_weeks=duration,
+        earliest=windows[0],
+        alternatives=windows[1:],
+        reason="Within configured weekly capacity limits for suggested timeline.",
+    )
+
+
+@router.post("/capacity/simulate", response_model=CapacitySimulationOut)
+def simulate_capacity(
+    payload: CapacitySimulationIn,
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
+    roles: RoleIndex = Depends(get_role_index),
+):
+    """
+    Compare what-if capacity scenarios against the current roadmap.
+
+    Each scenario can change headcount, portfolio quotas and plan dates; all
+    of them are evaluated in memory and nothing is written back.
+    """
+    if not payload.scenarios:
+        raise HTTPException(status_code=400, detail="At least one scenario is required.")
+    if len(payload.scenarios) > MAX_SIMULATION_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SIMULATION_SCENARIOS} scenarios per simulation.")
     governance = db.query(GovernanceConfig).order_by(GovernanceConfig.id.asc()).first()
     if not governance:
         raise HTTPException(status_code=409, detail="Governance configuration missing. CEO/VP must configure capacity first.")
-    if _is_roadmap_locked(governance):
-        raise HTTPException(status_code=423, detail="Roadmap governance lock is active. Unlock governance to commit new roadmap items.")
-    if governance.quota_client + governance.quota_internal <= 0:
-        raise HTTPException(status_code=409, detail="Portfolio quotas are zero. Update governance quotas before commit.")
 
-    bucket_items = db.query(RoadmapItem).filter(RoadmapItem.id.in_(ids)).all()
-    moved = 0
+    scenarios = [
+        CapacityScenario(
+            name=scenario.name.strip() or f"Scenario {idx}",
+            team_deltas={role.strip().lower(): delta for role, delta in scenario.team_deltas.items()},
+            quota_overrides={key.strip().lower(): quota for key, quota in scenario.quota_overrides.items()},
+            plan_shifts={
+                plan_id: shift.shift_weeks
+                for shift in scenario.plan_shifts
+                for plan_id in shift.plan_item_ids
+            },
+        )
+        for idx, scenario in enumerate(payload.scenarios, start=1)
+    ]
+    plans = db.query(RoadmapPlanItem).order_by(RoadmapPlanItem.id.asc()).all()
+    unknown_ids = sorted(set().union(*(scenario.plan_shifts for scenario in scenarios)) - {plan.id for plan in plans})
+    if unknown_ids:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Roadmap plan items not found: {', '.join(str(plan_id) for plan_id in unknown_ids)}.",
+        )
+    try:
+        baseline, alerts = simulate_capacity_scenarios(
+            governance, plans, scenarios, load_role_vectors(db, governance, plans, roles)
+        )
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    return CapacitySimulationOut(
+        baseline=baseline,
+        scenarios=[CapacityScenarioOut(name=s.name, alert=alert) for s, alert in zip(scenarios, alerts)],
+    )
+
+
+@router.get("/capacity/forecast", response_model=CapacityForecastOut)
+def forecast_capacity(
+    trials: int = DEFAULT_FORECAST_TRIALS,
+    seed: int | None = None,
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
+    roles: RoleIndex = Depends(get_role_index),
+):
+    """
+    Probability that each portfolio/role runs over capacity, week by week.
+
+    Plan slips are sampled from plan confidence and status and pushed through
+    dependencies. Pass ``seed`` for a reproducible run.
+    """
+    if trials < 1 or trials > MAX_FORECAST_TRIALS:
+        raise HTTPException(status_code=400, detail=f"trials must be between 1 and {MAX_FORECAST_TRIALS}.")
+    governance = db.query(GovernanceConfig).order_by(GovernanceConfig.id.asc()).first()
+    if not governance:
+        raise HTTPException(status_code=409, detail="Governance configuration missing. CEO/VP must configure capacity first.")
+    plans = db.query(RoadmapPlanItem).order_by(RoadmapPlanItem.id.asc()).all()
+    return build_capacity_forecast(
+        governance, plans, trials, seed=seed, roles=load_role_vectors(db, governance, plans, roles)
+    )
+
+
+@router.get("/capacity/heatmap", response_model=CapacityHeatmapOut)
+def capacity_heatmap(
+    year: int,
+    granularity: str = "week",
+    portfolio: str | None = None,
+    role: str | None = None,
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
+    roles: RoleIndex = Depends(get_role_index),
+):
+    """
+    Weekly, monthly or quarterly utilization per portfolio and role for one year.
+
+    Served from the weekly rollups that plan writes keep current, so the
+    grid is read rather than recomputed.
+    """
+    governance = db.query(GovernanceConfig).order_by(GovernanceConfig.id.asc()).first()
+    if not governance:
+        raise HTTPException(status_code=409, detail="Governance configuration missing. CEO/VP must configure capacity first.")
+    try:
+        return build_capacity_heatmap(
+            db,
+            governance,
+            roles,
+            year,
+            granularity=granularity.strip().lower(),
+            portfolio=portfolio.strip().lower() if portfolio else None,
+            role=role.strip().lower() if role else None,
+        )
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+
+@router.get("/capacity/alert", response_model=CapacityGovernanceAlertOut)
+def capacity_alert(
+    as_of: datetime | None = Query(default=None),
+    db: Session = Depends(get_db),
+    _=Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM, UserRole.BA)),
+    roles: RoleIndex = Depends(get_role_index),
+):
+    """
+    The dashboard's capacity governance alert, optionally for the plans as of a past time.
+
+    Historical plans are checked against today's governance configuration
+    and extra-role allocations, which are not versioned.
+    """
+    governance = db.query(GovernanceConfig).order_by(GovernanceConfig.id.asc()).first()
+    if as_of is not None:
+        plans = roadmap_as_of(db, as_naive_utc(as_of)).plan_models()
+    else:
+        plans = plan_capacity_rows(db)
+    return build_capacity_governance_alert(
+        governance,
+        plans,
+        load_role_vectors(db, governance, plans, roles) if governance else None,
+    )
+
+
+def _plan_commit_batch(
+    governance: GovernanceConfig,
+    bucket_items: list[RoadmapItem],
+    plans: list[RoadmapPlanItem],
+    roles: RoleVectors,
+    duration_weeks: int,
+    bucket_extra_fte: dict[int, dict[str, float]] | None = None,
+) -> tuple[list[RoadmapItem], list[tuple[int, RoadmapCommitFailureOut]]]:
+    """Check a whole commit batch against one in-memory usage snapshot.
+
+    Items are checked in order and each approved item's demand is added to
+    the person-week usage of ``plans`` before the next one is checked, so the
+    batch is validated cumulatively. Rejected items do not consume capacity
+    and every failure is reported, with the HTTP status it would have raised
+    on its own, instead of stopping at the first one.
+    """
+    usage_pw = _usage_pw_from_plans(plans, roles.plan_fte)
+    plan_row_of_bucket = {plan.bucket_item_id: row for row, plan in enumerate(plans)}
+    approved: list[RoadmapItem] = []
+    failures: list[tuple[int, RoadmapCommitFailureOut]] = []
     for bucket in bucket_items:
         if not bucket.picked_up:
             continue
+        extra_fte = (bucket_extra_fte or {}).get(bucket.id, {})
+        raw_fte = [bucket.fe_fte, bucket.be_fte, bucket.ai_fte, bucket.pm_fte, bucket.fs_fte, *extra_fte.values()]
         requested = {
             "fe": _safe_non_negative(bucket.fe_fte),
             "be": _safe_non_negative(bucket.be_fte),
             "ai": _safe_non_negative(bucket.ai_fte),
             "pm": _safe_non_negative(bucket.pm_fte),
             "fs": _safe_non_negative(bucket.fs_fte),
+            **{role: _safe_non_negative(value) for role, value in extra_fte.items()},
         }
-        if (bucket.fe_fte or 0) < 0 or (bucket.be_fte or 0) < 0 or (bucket.ai_fte or 0) < 0 or (bucket.pm_fte or 0) < 0 or (bucket.fs_fte or 0) < 0:
-            raise HTTPException(status_code=400, detail=f"Negative FTE is not allowed for commitment '{bucket.title}'.")
-        if requested["fe"] + requested["be"] + requested["ai"] + requested["pm"] + requested["fs"] <= 0:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Set FE/BE/AI/PM resource commitments for '{bucket.title}' before confirming roadmap commitment.",
+        if any((value or 0) < 0 for value in raw_fte):
+            failures.append(
+                (
+                    400,
+                    RoadmapCommitFailureOut(
+                        bucket_item_id=bucket.id,
+                        title=bucket.title,
+                        reason=f"Negative FTE is not allowed for commitment '{bucket.title}'.",
+                    ),
+                )
+            )
+            continue
+        if sum(requested.values()) <= 0:
+            failures.append(
+                (
+                    400,
+                    RoadmapCommitFailureOut(
+                        bucket_item_id=bucket.id,
+                        title=bucket.title,
+                        reason=f"Set FE/BE/AI/PM resource commitments for '{bucket.title}' before confirming roadmap commitment.",
+                    ),
+                )
             )
+            continue
 
         portfolio = _norm_portfolio(bucket.project_context)
-        existing = db.query(RoadmapPlanItem).filter(RoadmapPlanItem.bucket_item_id == bucket.id).first()
-        status, breaches, utilization, reason = _capacity_validate(
-            db=db,
-            governance=governance,
-            portfolio=portfolio,
-            proposed=requested,
-            duration_weeks=payload.tentative_duration_weeks,
-            exclude_bucket_item_id=bucket.id if existing else None,
+        candidate = usage_pw.copy()
+        existing_row = plan_row_of_bucket.get(bucket.id)
+        if existing_row is not None:
+            _release_pw(candidate, plans[existing_row], roles.plan_fte[existing_row], roles.index)
+        status, _, utilization, reason = _capacity_check_pw(
+            governance, candidate, portfolio, requested, duration_weeks, roles=roles
         )
         if status != "APPROVED":
-            raise HTTPException(
-                status_code=409,
-                detail=f"Commitment blocked for '{bucket.title}'. {reason} Utilization: {utilization}.",
+            failures.append(
+                (
+                    409,
+                    RoadmapCommitFailureOut(
+                        bucket_item_id=bucket.id,
+                        title=bucket.title,
+                        reason=f"Commitment blocked for '{bucket.title}'. {reason} Utilization: {utilization}.",
+                    ),
+                )
             )
+            continue
+
+        for role, fte in requested.items():
+            if role in roles.index.keys:
+                candidate[PORTFOLIOS.index(portfolio), roles.index.keys.index(role)] += fte * duration_weeks
+        usage_pw = candidate
+        approved.append(bucket)
+    return approved, failures
 
+
+@router.post("/plan/move", response_model=RoadmapMoveOut)
+def move_bucket_items_to_roadmap(
+    payload: RoadmapMoveIn,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.PM)),
+    roles: RoleIndex = Depends(get_role_index),
+):
+    ids = sorted(set(payload.ids))
+    if not ids:
+        return RoadmapMoveOut(moved=0)
+    if not payload.tentative_duration_weeks or payload.tentative_duration_weeks <= 0:
+        raise HTTPException(status_code=400, detail="Tentative duration (weeks) is required to commit resources.")
+
+    governance = db.query(GovernanceConfig).order_by(GovernanceConfig.id.asc()).first()
+    if not governance:
+        raise HTTPException(status_code=409, detail="Governance configuration missing. CEO/VP must configure capacity first.")
+    if _is_roadmap_locked(governance):
+        raise HTTPException(status_code=423, detail="Roadmap governance lock is active. Unlock governance to commit new roadmap items.")
+    if governance.quota_client + governance.quota_internal <= 0:
+        raise HTTPException(status_code=409, detail="Portfolio quotas are zero. Update governance quotas before commit.")
+
+    bucket_items = db.query(RoadmapItem).filter(RoadmapItem.id.in_(ids)).order_by(RoadmapItem.id.asc()).all()
+    if not payload.dry_run:
+        _lock_commit_capacity(db, bucket_items)
+    plans = db.query(RoadmapPlanItem).all()
+    plans_by_bucket = {plan.bucket_item_id: plan for plan in plans}
+    bucket_extra_fte = load_bucket_extra_fte(db, roles, [bucket.id for bucket in bucket_items])
+    approved, failures = _plan_commit_batch(
+        governance=governance,
+        bucket_items=bucket_items,
+        plans=plans,
+        roles=load_role_vectors(db, governance, plans, roles),
+        duration_weeks=payload.tentative_duration_weeks,
+        bucket_extra_fte=bucket_extra_fte,
+    )
+    if payload.dry_run:
+        return RoadmapMoveOut(
+            moved=0 if failures else len(approved),
+            failures=[failure for _, failure in failures],
+        )
+    if failures:
+        raise HTTPException(
+            status_code=min(code for code, _ in failures),
+            detail=" ".join(failure.reason for _, failure in failures),
+        )
+
+    moved = 0
+    moved_plan_ids: list[int] = []
+    for bucket in approved:
+        existing = plans_by_bucket.get(bucket.id)
         if existing:
+            existing_before = plan_item_snapshot(existing)
             existing.title = bucket.title
             existing.scope = bucket.scope
             existing.activities = bucket.activities
@@ -1600,6 +2261,16 @@ def move_bucket_items_to_roadmap(
             existing.completion_period = payload.completion_period.strip()
             existing.version_no = int(existing.version_no or 1) + 1
             db.add(existing)
+            store_plan_extra_fte(db, roles, existing.id, bucket_extra_fte.get(bucket.id, {}))
+            log_plan_version(
+                db=db,
+                plan_item_id=existing.id,
+                action="recommitted",
+                changed_by=current_user.id,
+                before_data=existing_before,
+                after_data=plan_item_snapshot(existing),
+            )
+            moved_plan_ids.append(existing.id)
             moved += 1
             continue
 
@@ -1630,8 +2301,21 @@ def move_bucket_items_to_roadmap(
             completion_period=payload.completion_period.strip(),
         )
         db.add(plan)
+        db.flush()
+        if bucket.id in bucket_extra_fte:
+            store_plan_extra_fte(db, roles, plan.id, bucket_extra_fte[bucket.id])
+        log_plan_version(
+            db=db,
+            plan_item_id=plan.id,
+            action="committed",
+            changed_by=current_user.id,
+            before_data={},
+            after_data=plan_item_snapshot(plan),
+        )
+        moved_plan_ids.append(plan.id)
         moved += 1
 
+    refresh_capacity_rollups(db, moved_plan_ids, roles)
     db.commit()
     return RoadmapMoveOut(moved=moved)
 
@@ -1640,7 +2324,7 @@ def move_bucket_items_to_roadmap(
 def validate_resource_allocation(
     payload: ResourceValidationRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Validate resource allocation for a roadmap commitment.
@@ -11,7 +11,6 @@ from app.db.session import get_db
 from app.models.enums import UserRole
 from app.models.governance_config import GovernanceConfig
 from app.models.llm_config import LLMConfig
-from app.models.user import User
 from app.schemas.settings import (
     GovernanceOut,
     GovernanceQuotaIn,
@@ -22,6 +21,7 @@ from app.schemas.settings import (
 )
 from app.services.fte_role_service import migrate_existing_fte_data, seed_default_fte_roles
 from app.services.llm_client import test_llm_connection
+from app.services.principal_cache import Principal
 from app.services.project_document_builder import (
     generate_enterprise_project_document,
     generate_master_governance_doctrine,
@@ -59,7 +59,7 @@ def _is_locked(locked_until: datetime | None) -> bool:
 @router.get("/llm", response_model=list[LLMConfigOut])
 def list_llm_configs(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
     ensure_custom_role_permission(current_user, "can_manage_settings", "manage AI provider settings")
     return db.query(LLMConfig).order_by(LLMConfig.id.desc()).all()
@@ -69,7 +69,7 @@ def list_llm_configs(
 def set_active_llm(
     payload: LLMConfigIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
     ensure_custom_role_permission(current_user, "can_manage_settings", "manage AI provider settings")
     db.query(LLMConfig).update({"is_active": False})
@@ -90,7 +90,7 @@ def set_active_llm(
 @router.post("/llm/test", response_model=LLMTestOut)
 def test_llm(
     payload: LLMConfigIn,
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP, UserRole.BA, UserRole.PM)),
 ):
     ensure_custom_role_permission(current_user, "can_manage_settings", "manage AI provider settings")
     ok, message = test_llm_connection(
@@ -119,7 +119,7 @@ def get_governance_config(
 def update_governance_team_config(
     payload: GovernanceTeamIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO)),
 ):
     ensure_custom_role_permission(current_user, "can_configure_team_capacity", "update team capacity")
     cfg = _get_or_create_governance(db)
@@ -167,7 +167,7 @@ def update_governance_team_config(
 def update_governance_quotas(
     payload: GovernanceQuotaIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP)),
 ):
     ensure_custom_role_permission(current_user, "can_allocate_portfolio_quotas", "update portfolio quotas")
     cfg = _get_or_create_governance(db)
@@ -223,7 +223,7 @@ def update_governance_quotas(
 @router.post("/governance/efficiency-confirmation", response_model=GovernanceOut)
 def confirm_governance_efficiency(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.CEO, UserRole.VP)),
+    current_user: Principal = Depends(require_roles(UserRole.CEO, UserRole.VP)),
 ):
     ensure_custom_role_permission(current_user, "can_manage_settings", "confirm monthly efficiency baseline")
     cfg = _get_or_create_governance(db)
@@ -248,7 +248,7 @@ def download_project_document(
     version: str = Query(default="1.0", max_length=40),
     level: Literal["l1", "l2"] = Query(default="l1"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
 ):
     cfg = _get_or_create_governance(db)
     prepared = (prepared_by or "").strip() or (current_user.full_name or current_user.email)
@@ -290,7 +290,7 @@ def download_project_document(
 
 @router.post("/fte_roles/seed", response_model=dict[str, str])
 def seed_fte_roles_endpoint(
-    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CEO])),
+    current_user: Principal = Depends(require_roles([UserRole.ADMIN, UserRole.CEO])),
     db: Session = Depends(get_db),
 ) -> dict[str, str]:
     """Seed default FTE roles (Admin/CEO only)."""
@@ -303,7 +303,7 @@ def seed_fte_roles_endpoint(
 
 @router.post("/fte_roles/migrate", response_model=dict[str, int | str])
 def migrate_fte_data_endpoint(
-    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CEO])),
+    current_user: Principal = Depends(require_roles([UserRole.ADMIN, UserRole.CEO])),
     db: Session = Depends(get_db),
 ) -> dict[str, int | str]:
     """Migrate existing FTE data to dynamic system (Admin/CEO only)."""
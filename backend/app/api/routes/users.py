@@ -17,6 +17,7 @@ from app.schemas.user import (
     UserOut,
     UserUpdateIn,
 )
+from app.services.principal_cache import Principal, principal_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 SYSTEM_ROLE_NAMES = {str(UserRole.ADMIN), str(UserRole.CEO), str(UserRole.VP), str(UserRole.BA), str(UserRole.PM), str(UserRole.PO)}
@@ -129,7 +130,7 @@ def _system_role_policies() -> list[RolePolicyOut]:
 @router.get("", response_model=list[UserOut])
 def list_users(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
 ):
     ensure_custom_role_permission(current_user, "can_create_users", "manage users")
     return db.query(User).order_by(User.id.asc()).all()
@@ -139,7 +140,7 @@ def list_users(
 def create_user(
     payload: UserCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
 ):
     ensure_custom_role_permission(current_user, "can_create_users", "manage users")
     existing = db.query(User).filter(User.email == payload.email.lower()).first()
@@ -176,7 +177,7 @@ def update_user(
     user_id: int,
     payload: UserUpdateIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
 ):
     ensure_custom_role_permission(current_user, "can_create_users", "manage users")
     user = db.get(User, user_id)
@@ -230,6 +231,7 @@ def update_user(
 
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
     return user
 
@@ -246,7 +248,7 @@ def list_custom_roles(
 def create_custom_role(
     payload: CustomRoleCreateIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
 ):
     ensure_custom_role_permission(current_user, "can_create_users", "manage users")
     if payload.name.strip().upper() in SYSTEM_ROLE_NAMES:
@@ -280,7 +282,7 @@ def update_custom_role(
     custom_role_id: int,
     payload: CustomRoleUpdateIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
 ):
     ensure_custom_role_permission(current_user, "can_create_users", "manage users")
     role = db.get(CustomRole, custom_role_id)
@@ -326,6 +328,7 @@ def update_custom_role(
     role.updated_by = current_user.id
     db.add(role)
     db.commit()
+    principal_cache.invalidate_custom_role(role.id)
     db.refresh(role)
     return role
 
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
@@ -7,13 +9,26 @@ from app.core.config import settings
 from app.core.security import get_password_hash
 from app.db.base import Base
 from app.db.session import engine
+from app.models.audit_event import AuditEvent  # noqa: F401
+from app.models.capacity_rollup import CapacityPlanFootprint, CapacityWeekRollup  # noqa: F401
+from app.models.capacity_week_lock import CapacityWeekLock  # noqa: F401
+from app.models.change_event import ChangeEvent  # noqa: F401
 from app.models.custom_role import CustomRole  # noqa: F401
+from app.models.document_fingerprint import DocumentFingerprint  # noqa: F401
+from app.models.document_preview import DocumentPreview  # noqa: F401
+from app.models.document_unit import DocumentUnit  # noqa: F401
 from app.models.enums import UserRole
 from app.models.fte_role import FteRole  # noqa: F401
+from app.models.maintenance_job import MaintenanceJob  # noqa: F401
 from app.models.governance_config_fte import GovernanceConfigFte  # noqa: F401
+from app.models.roadmap_checkpoint import RoadmapCheckpoint  # noqa: F401
 from app.models.roadmap_item_fte import RoadmapItemFte, RoadmapPlanItemFte  # noqa: F401
 from app.models.roadmap_movement_request import RoadmapMovementRequest  # noqa: F401
+from app.models.roadmap_plan_item_version import RoadmapPlanItemVersion  # noqa: F401
 from app.models.user import User
+from app.services.agents.graph_registry import warm_up_graphs
+from app.services.audit_events import ensure_audit_partitions
+from app.services.storage_maintenance import start_storage_maintenance
 from sqlalchemy.orm import Session
 
 Base.metadata.create_all(bind=engine)
@@ -83,6 +98,63 @@ def _ensure_compat_columns() -> None:
         "ALTER TABLE roadmap_plan_items ADD COLUMN IF NOT EXISTS portfolio_quota_override VARCHAR(20)",
         "ALTER TABLE documents ADD COLUMN IF NOT EXISTS file_hash VARCHAR(64) NOT NULL DEFAULT ''",
         "CREATE INDEX IF NOT EXISTS ix_documents_file_hash ON documents (file_hash)",
+        "CREATE INDEX IF NOT EXISTS ix_documents_file_path ON documents (file_path)",
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS integrity_status VARCHAR(20) NOT NULL DEFAULT ''",
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS integrity_checked_at TIMESTAMP",
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS units_parser_version INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE intake_item_versions ADD COLUMN IF NOT EXISTS keyframe BOOLEAN NOT NULL DEFAULT TRUE",
+        "ALTER TABLE roadmap_item_versions ADD COLUMN IF NOT EXISTS keyframe BOOLEAN NOT NULL DEFAULT TRUE",
+        "CREATE INDEX IF NOT EXISTS ix_roadmap_item_versions_item_created ON roadmap_item_versions (roadmap_item_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_roadmap_item_versions_created_at_id ON roadmap_item_versions (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_roadmap_item_versions_changed_by ON roadmap_item_versions (changed_by)",
+        "CREATE INDEX IF NOT EXISTS ix_intake_item_versions_created_at_id ON intake_item_versions (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_intake_item_versions_changed_by ON intake_item_versions (changed_by)",
+        "CREATE INDEX IF NOT EXISTS ix_documents_created_at_id ON documents (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_documents_uploaded_by ON documents (uploaded_by)",
+        "CREATE INDEX IF NOT EXISTS ix_roadmap_movement_requests_requested_at_id ON roadmap_movement_requests (requested_at, id)",
+        """
+        CREATE TABLE IF NOT EXISTS document_units (
+            id SERIAL PRIMARY KEY,
+            document_id INTEGER NOT NULL REFERENCES documents(id),
+            position INTEGER NOT NULL,
+            ref VARCHAR(120) NOT NULL DEFAULT '',
+            text TEXT NOT NULL,
+            search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', text)) STORED NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_document_units_document_id ON document_units (document_id)",
+        "CREATE INDEX IF NOT EXISTS ix_document_units_search_vector ON document_units USING gin (search_vector)",
+        """
+        CREATE TABLE IF NOT EXISTS document_fingerprints (
+            document_id INTEGER PRIMARY KEY REFERENCES documents(id),
+            simhash BIGINT NOT NULL,
+            bands INTEGER[] NOT NULL,
+            unit_count INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_document_fingerprints_bands ON document_fingerprints USING gin (bands)",
+        """
+        CREATE TABLE IF NOT EXISTS maintenance_jobs (
+            name VARCHAR(50) PRIMARY KEY,
+            cursor INTEGER,
+            processed INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            remaining INTEGER NOT NULL DEFAULT 0,
+            started_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            completed_at TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS document_previews (
+            file_hash VARCHAR(64) NOT NULL,
+            file_type VARCHAR(20) NOT NULL,
+            parser_version INTEGER NOT NULL,
+            payload JSON NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (file_hash, file_type, parser_version)
+        )
+        """,
         """
         CREATE TABLE IF NOT EXISTS roadmap_redundancy_decisions (
             id SERIAL PRIMARY KEY,
@@ -154,6 +226,37 @@ def _ensure_compat_columns() -> None:
         "CREATE INDEX IF NOT EXISTS ix_roadmap_move_requests_status ON roadmap_movement_requests (status)",
         "CREATE INDEX IF NOT EXISTS ix_roadmap_move_requests_requested_by ON roadmap_movement_requests (requested_by)",
         """
+        CREATE TABLE IF NOT EXISTS capacity_week_locks (
+            id SERIAL PRIMARY KEY,
+            portfolio VARCHAR(30) NOT NULL,
+            week_key VARCHAR(16) NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            CONSTRAINT uq_capacity_week_lock UNIQUE (portfolio, week_key)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS capacity_week_rollups (
+            id SERIAL PRIMARY KEY,
+            portfolio VARCHAR(30) NOT NULL,
+            week INTEGER NOT NULL,
+            role VARCHAR(20) NOT NULL,
+            demand_fte DOUBLE PRECISION NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            CONSTRAINT uq_capacity_week_rollup UNIQUE (portfolio, week, role)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_capacity_week_rollups_week ON capacity_week_rollups (week)",
+        """
+        CREATE TABLE IF NOT EXISTS capacity_plan_footprints (
+            plan_item_id INTEGER PRIMARY KEY,
+            portfolio VARCHAR(30) NOT NULL,
+            first_week INTEGER NOT NULL,
+            span INTEGER NOT NULL,
+            fte JSON NOT NULL
+        )
+        """,
+        """
         CREATE TABLE IF NOT EXISTS custom_roles (
             id SERIAL PRIMARY KEY,
             name VARCHAR(80) NOT NULL UNIQUE,
@@ -264,6 +367,87 @@ def _ensure_compat_columns() -> None:
         """,
         "CREATE INDEX IF NOT EXISTS ix_governance_config_fte_governance_config_id ON governance_config_fte (governance_config_id)",
         "CREATE INDEX IF NOT EXISTS ix_governance_config_fte_fte_role_id ON governance_config_fte (fte_role_id)",
+        """
+        CREATE OR REPLACE FUNCTION audit_events_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'audit_events is append-only';
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = 'audit_events_append_only' AND tgrelid = 'audit_events'::regclass
+            ) THEN
+                CREATE TRIGGER audit_events_append_only BEFORE UPDATE OR DELETE ON audit_events
+                FOR EACH ROW EXECUTE FUNCTION audit_events_append_only();
+            END IF;
+        END
+        $$
+        """,
+        """
+        CREATE OR REPLACE FUNCTION change_events_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('change_feed', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION change_events_record_delete() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO change_events (entity_type, entity_id, version_no, action, created_at)
+            VALUES (TG_ARGV[0], OLD.id, OLD.version_no, 'deleted', NOW() AT TIME ZONE 'utc');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'change_events_notify') THEN
+                CREATE TRIGGER change_events_notify AFTER INSERT ON change_events
+                FOR EACH STATEMENT EXECUTE FUNCTION change_events_notify();
+            END IF;
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'intake_items_change_feed') THEN
+                CREATE TRIGGER intake_items_change_feed AFTER DELETE ON intake_items
+                FOR EACH ROW EXECUTE FUNCTION change_events_record_delete('intake_item');
+            END IF;
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'roadmap_items_change_feed') THEN
+                CREATE TRIGGER roadmap_items_change_feed AFTER DELETE ON roadmap_items
+                FOR EACH ROW EXECUTE FUNCTION change_events_record_delete('roadmap_item');
+            END IF;
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'roadmap_plan_items_change_feed') THEN
+                CREATE TRIGGER roadmap_plan_items_change_feed AFTER DELETE ON roadmap_plan_items
+                FOR EACH ROW EXECUTE FUNCTION change_events_record_delete('plan_item');
+            END IF;
+        END
+        $$
+        """,
+        """
+        CREATE OR REPLACE FUNCTION principal_cache_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('principal_cache', TG_ARGV[0] || ':' || OLD.id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'users_principal_cache') THEN
+                CREATE TRIGGER users_principal_cache AFTER UPDATE OR DELETE ON users
+                FOR EACH ROW EXECUTE FUNCTION principal_cache_notify('user');
+            END IF;
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'custom_roles_principal_cache') THEN
+                CREATE TRIGGER custom_roles_principal_cache AFTER UPDATE OR DELETE ON custom_roles
+                FOR EACH ROW EXECUTE FUNCTION principal_cache_notify('custom_role');
+            END IF;
+        END
+        $$
+        """,
     ]
     with engine.begin() as conn:
         for stmt in statements:
@@ -273,6 +457,14 @@ def _ensure_compat_columns() -> None:
 _ensure_compat_columns()
 
 
+def _ensure_audit_partitions() -> None:
+    with Session(engine) as db:
+        ensure_audit_partitions(db, datetime.utcnow(), settings.AUDIT_PARTITION_MONTHS_AHEAD)
+
+
+_ensure_audit_partitions()
+
+
 def _ensure_admin_user() -> None:
     email = (settings.ADMIN_BOOTSTRAP_EMAIL or "").strip().lower()
     password = settings.ADMIN_BOOTSTRAP_PASSWORD or ""
@@ -333,6 +525,17 @@ app.add_middleware(
 app.include_router(api_router)
 
 
+@app.on_event("startup")
+def _start_background_maintenance() -> None:
+    start_storage_maintenance()
+
+
+@app.on_event("startup")
+def _warm_up_agent_graphs() -> None:
+    # Routers are imported above, so every agent graph is registered by now.
+    warm_up_graphs()
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "env": settings.APP_ENV}
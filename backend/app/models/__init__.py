@@ -1,4 +1,11 @@
+from app.models.audit_event import AuditEvent
+from app.models.capacity_rollup import CapacityPlanFootprint, CapacityWeekRollup
+from app.models.capacity_week_lock import CapacityWeekLock
 from app.models.document import Document
+from app.models.document_fingerprint import DocumentFingerprint
+from app.models.document_preview import DocumentPreview
+from app.models.document_unit import DocumentUnit
+from app.models.change_event import ChangeEvent
 from app.models.custom_role import CustomRole
 from app.models.feature import Feature
 from app.models.fte_role import FteRole
@@ -7,10 +14,13 @@ from app.models.intake_analysis import IntakeAnalysis
 from app.models.intake_item import IntakeItem
 from app.models.intake_item_version import IntakeItemVersion
 from app.models.llm_config import LLMConfig
+from app.models.maintenance_job import MaintenanceJob
 from app.models.project import Project
 from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_checkpoint import RoadmapCheckpoint
 from app.models.roadmap_movement_request import RoadmapMovementRequest
 from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.models.roadmap_plan_item_version import RoadmapPlanItemVersion
 from app.models.roadmap_redundancy_decision import RoadmapRedundancyDecision
 from app.models.roadmap_item_version import RoadmapItemVersion
 from app.models.user import User
@@ -20,6 +30,14 @@ __all__ = [
     "Project",
     "Feature",
     "Document",
+    "AuditEvent",
+    "DocumentFingerprint",
+    "DocumentPreview",
+    "DocumentUnit",
+    "CapacityPlanFootprint",
+    "CapacityWeekLock",
+    "CapacityWeekRollup",
+    "ChangeEvent",
     "CustomRole",
     "FteRole",
     "GovernanceConfig",
@@ -28,8 +46,11 @@ __all__ = [
     "IntakeItemVersion",
     "RoadmapItem",
     "RoadmapPlanItem",
+    "RoadmapPlanItemVersion",
+    "RoadmapCheckpoint",
     "RoadmapMovementRequest",
     "RoadmapRedundancyDecision",
     "RoadmapItemVersion",
     "LLMConfig",
+    "MaintenanceJob",
 ]
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, JSON, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class AuditEvent(Base):
+    """One audited change, from any source, in an append-only table partitioned by month.
+
+    The table is range-partitioned on ``occurred_at`` into ``audit_events_YYYYMM``
+    partitions, so time-window reads only scan the months they cover and old
+    months can be detached for archiving without touching current writes.
+    Partitions are created ahead of time by ``ensure_audit_partitions``; the
+    primary key includes ``occurred_at`` as partitioned tables require. A
+    trigger rejects updates and deletes.
+
+    ``source_id`` is the row the event was written with: the version row for
+    item changes, the request for movement events. Item ids carry no foreign
+    keys, as the audit trail outlives the items.
+    """
+
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        Index("ix_audit_events_occurred_at_id", "occurred_at", "id"),
+        Index("ix_audit_events_actor_occurred_at", "actor_id", "occurred_at"),
+        Index("ix_audit_events_entity", "entity_type", "entity_id"),
+        Index("ix_audit_events_source", "entity_type", "source_id"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow)
+    entity_type: Mapped[str] = mapped_column(String(24), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    action: Mapped[str] = mapped_column(String(64), nullable=False)
+    actor_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    project_context: Mapped[str] = mapped_column(String(30), default="", nullable=False)
+    changed_fields: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
+    source_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Float, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CapacityWeekRollup(Base):
+    """Booked FTE of one role in one portfolio week, maintained from plan writes.
+
+    ``week`` is the week number used by the capacity engine (weeks since
+    0001-01-01, Monday aligned). Cells with no demand have no row.
+    """
+
+    __tablename__ = "capacity_week_rollups"
+    __table_args__ = (UniqueConstraint("portfolio", "week", "role", name="uq_capacity_week_rollup"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    portfolio: Mapped[str] = mapped_column(String(30), nullable=False)
+    week: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    role: Mapped[str] = mapped_column(String(20), nullable=False)
+    demand_fte: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class CapacityPlanFootprint(Base):
+    """What a plan item contributed to the rollups when they were last refreshed.
+
+    Comparing it with the live plan tells a refresh which weeks to recompute.
+    """
+
+    __tablename__ = "capacity_plan_footprints"
+
+    # No foreign key: the footprint of a deleted plan must outlive it until a
+    # refresh clears its weeks.
+    plan_item_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    portfolio: Mapped[str] = mapped_column(String(30), nullable=False)
+    first_week: Mapped[int] = mapped_column(Integer, nullable=False)
+    span: Mapped[int] = mapped_column(Integer, nullable=False)
+    fte: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
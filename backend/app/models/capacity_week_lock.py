@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CapacityWeekLock(Base):
+    """One row per portfolio capacity bucket that commits lock before validating.
+
+    ``week_key`` is an ISO week ("2025-W07") for timeline commits, or
+    ``"annual"`` for the person-week pool used by roadmap commitment.
+    """
+
+    __tablename__ = "capacity_week_locks"
+    __table_args__ = (UniqueConstraint("portfolio", "week_key", name="uq_capacity_week_lock"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    portfolio: Mapped[str] = mapped_column(String(30), nullable=False)
+    week_key: Mapped[str] = mapped_column(String(16), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
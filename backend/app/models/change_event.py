@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ChangeEvent(Base):
+    """One change to an intake, roadmap or plan item, for clients following the change feed.
+
+    Written in the transaction that makes the change: by the version loggers
+    for creates and edits, and by triggers for deletes. ``txid`` is the
+    writing transaction's id; the feed is read in ``(txid, id)`` order and
+    only below the oldest transaction still running, so an event that
+    commits late can never land behind a reader's cursor. Inserts notify the
+    ``change_feed`` channel. Pruned after ``CHANGE_FEED_RETENTION_HOURS``.
+    """
+
+    __tablename__ = "change_events"
+    __table_args__ = (Index("ix_change_events_txid_id", "txid", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    txid: Mapped[int] = mapped_column(
+        BigInteger, server_default=text("(pg_current_xact_id()::text)::bigint"), nullable=False
+    )
+    entity_type: Mapped[str] = mapped_column(String(24), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    version_no: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    action: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
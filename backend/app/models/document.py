@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -8,15 +8,20 @@ from app.db.base import Base
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (Index("ix_documents_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     project_id: Mapped[int | None] = mapped_column(ForeignKey("projects.id"), nullable=True, index=True)
-    uploaded_by: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    uploaded_by: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     file_name: Mapped[str] = mapped_column(String(255), nullable=False)
     file_type: Mapped[str] = mapped_column(String(30), nullable=False)
-    file_path: Mapped[str] = mapped_column(String(1000), nullable=False)
+    file_path: Mapped[str] = mapped_column(String(1000), nullable=False, index=True)
     file_hash: Mapped[str] = mapped_column(String(64), default="", nullable=False, index=True)
     notes: Mapped[str] = mapped_column(String(2000), default="", nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    integrity_status: Mapped[str] = mapped_column(String(20), default="", nullable=False)
+    integrity_checked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Parser version the search units were extracted with; 0 until indexed.
+    units_parser_version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
     project = relationship("Project", back_populates="documents")
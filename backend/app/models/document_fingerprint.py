@@ -0,0 +1,23 @@
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DocumentFingerprint(Base):
+    """64-bit SimHash of a document's normalized units, for spotting revised versions.
+
+    ``bands`` holds the eight bytes of the hash tagged with their position
+    (``band << 8 | byte``). Two hashes within 7 bits of each other share at
+    least one band, so the GIN index on it narrows a lookup to a handful of
+    candidates before the exact Hamming distance is checked.
+    """
+
+    __tablename__ = "document_fingerprints"
+    __table_args__ = (Index("ix_document_fingerprints_bands", "bands", postgresql_using="gin"),)
+
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id"), primary_key=True)
+    simhash: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    bands: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    unit_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DocumentPreview(Base):
+    """Extracted preview of a stored file, shared by every document with that content.
+
+    Keyed by content hash and parser version, so a row never goes stale: a
+    parser change simply looks up under the new version.
+    """
+
+    __tablename__ = "document_previews"
+
+    file_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    parser_version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
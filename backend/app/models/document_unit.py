@@ -0,0 +1,27 @@
+from sqlalchemy import Computed, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+SEARCH_CONFIG = "english"
+
+
+class DocumentUnit(Base):
+    """One parsed unit of a document (page line, paragraph, slide, table row) for full-text search.
+
+    ``ref`` is the parser's locator (``page:3:line:12``, ``table:2:row:5``);
+    ``search_vector`` is computed by Postgres from ``text``.
+    """
+
+    __tablename__ = "document_units"
+    __table_args__ = (Index("ix_document_units_search_vector", "search_vector", postgresql_using="gin"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id"), nullable=False, index=True)
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    ref: Mapped[str] = mapped_column(String(120), default="", nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    search_vector = mapped_column(
+        TSVECTOR, Computed(f"to_tsvector('{SEARCH_CONFIG}', text)", persisted=True), nullable=False
+    )
@@ -1,19 +1,27 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, JSON, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, JSON, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
 
 
 class IntakeItemVersion(Base):
+    """One change to an item. Keyframes hold the full before/after snapshots;
+    other rows hold patches, ``before_data`` against the previous version's
+    after state and ``after_data`` against this row's before state. Read
+    through ``app.services.versioning.version_states``.
+    """
+
     __tablename__ = "intake_item_versions"
+    __table_args__ = (Index("ix_intake_item_versions_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     intake_item_id: Mapped[int] = mapped_column(ForeignKey("intake_items.id"), nullable=False, index=True)
     action: Mapped[str] = mapped_column(String(40), nullable=False)
-    changed_by: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    changed_by: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
     changed_fields: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
     before_data: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
     after_data: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    keyframe: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
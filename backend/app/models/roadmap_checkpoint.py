@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RoadmapCheckpoint(Base):
+    """Reconstructed roadmap and plan item states at ``taken_at``, keyed by item id.
+
+    A cache for point-in-time reads: a lookup starts from the latest
+    checkpoint at or before its timestamp and only replays the versions
+    logged after it.
+    """
+
+    __tablename__ = "roadmap_checkpoints"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    taken_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, unique=True, index=True)
+    roadmap_items: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    plan_items: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
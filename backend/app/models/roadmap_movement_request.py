@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -8,6 +8,7 @@ from app.db.base import Base
 
 class RoadmapMovementRequest(Base):
     __tablename__ = "roadmap_movement_requests"
+    __table_args__ = (Index("ix_roadmap_movement_requests_requested_at_id", "requested_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     plan_item_id: Mapped[int] = mapped_column(ForeignKey("roadmap_plan_items.id"), nullable=False, index=True)
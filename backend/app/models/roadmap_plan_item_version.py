@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, JSON, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RoadmapPlanItemVersion(Base):
+    """One change to a roadmap plan item, encoded like ``RoadmapItemVersion``.
+
+    ``plan_item_id`` has no foreign key: plan items are deleted when a
+    commitment is unlocked, and their history has to outlive them for
+    point-in-time reads. Removal is logged with an empty after state.
+    """
+
+    __tablename__ = "roadmap_plan_item_versions"
+    __table_args__ = (Index("ix_roadmap_plan_item_versions_item_created", "plan_item_id", "created_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    plan_item_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    action: Mapped[str] = mapped_column(String(40), nullable=False)
+    changed_by: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    changed_fields: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
+    before_data: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    after_data: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    keyframe: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
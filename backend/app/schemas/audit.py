@@ -82,6 +82,19 @@ class AuditMovementRowOut(BaseModel):
     executed_at: datetime | None = None
 
 
+class AuditEventRowOut(BaseModel):
+    event_id: int
+    occurred_at: datetime
+    entity_type: str
+    entity_id: int
+    action: str
+    project_context: str
+    actor_id: int | None = None
+    actor_email: str | None = None
+    actor_role: str | None = None
+    changed_fields: list[str]
+
+
 class AuditCenterOut(BaseModel):
     generated_at: datetime
     summary: AuditSummaryOut
@@ -89,3 +102,28 @@ class AuditCenterOut(BaseModel):
     intake_changes: list[AuditIntakeChangeRowOut]
     roadmap_changes: list[AuditRoadmapChangeRowOut]
     movement_events: list[AuditMovementRowOut]
+
+
+class AuditDocumentPageOut(BaseModel):
+    items: list[AuditDocumentRowOut]
+    next_cursor: str | None = None
+
+
+class AuditIntakeChangePageOut(BaseModel):
+    items: list[AuditIntakeChangeRowOut]
+    next_cursor: str | None = None
+
+
+class AuditRoadmapChangePageOut(BaseModel):
+    items: list[AuditRoadmapChangeRowOut]
+    next_cursor: str | None = None
+
+
+class AuditMovementPageOut(BaseModel):
+    items: list[AuditMovementRowOut]
+    next_cursor: str | None = None
+
+
+class AuditEventPageOut(BaseModel):
+    items: list[AuditEventRowOut]
+    next_cursor: str | None = None
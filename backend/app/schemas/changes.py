@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ChangeEventOut(BaseModel):
+    cursor: str
+    entity_type: str
+    entity_id: int
+    version_no: int | None = None
+    action: str
+    created_at: datetime
+
+
+class ChangeFeedOut(BaseModel):
+    events: list[ChangeEventOut]
+    cursor: str
+    reset: bool = False
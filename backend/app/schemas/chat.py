@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -19,3 +21,12 @@ class ChatOut(BaseModel):
     support_state: str = "general"
     intent_clear: bool | None = None
     next_action: str = "none"
+
+
+class AgentGraphOut(BaseModel):
+    name: str
+    compile_seconds: float | None = None
+    compiled_at: datetime | None = None
+    invocations: int = 0
+
+    model_config = {"from_attributes": True}
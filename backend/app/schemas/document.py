@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -11,3 +13,43 @@ class DocumentOut(BaseModel):
     notes: str
 
     model_config = {"from_attributes": True}
+
+
+class SimilarDocumentOut(BaseModel):
+    document_id: int
+    file_name: str
+    distance: int
+    overlap_percent: float
+
+
+class DocumentUploadOut(DocumentOut):
+    similar_documents: list[SimilarDocumentOut] = []
+
+
+class DocumentSearchHitOut(BaseModel):
+    document_id: int
+    file_name: str
+    file_type: str
+    ref: str
+    text: str
+    rank: float
+
+
+class DocumentSearchOut(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    hits: list[DocumentSearchHitOut]
+
+
+class MaintenanceJobOut(BaseModel):
+    name: str
+    processed: int
+    failed: int
+    remaining: int
+    started_at: datetime
+    updated_at: datetime
+    completed_at: datetime | None = None
+
+    model_config = {"from_attributes": True}
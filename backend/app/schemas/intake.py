@@ -89,6 +89,8 @@ class IntakeAnalyzeIn(BaseModel):
     rnd_decision_date: str = ""
     rnd_next_gate: str = ""
     rnd_risk_level: str = ""
+    # Earlier version to analyse against; by default the closest analysed SimHash match.
+    baseline_document_id: int | None = None
 
 
 class IntakeManualIn(BaseModel):
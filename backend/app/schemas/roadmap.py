@@ -2,6 +2,8 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
+from app.schemas.dashboard import CapacityGovernanceAlertOut
+
 
 class RoadmapItemOut(BaseModel):
     id: int
@@ -63,10 +65,18 @@ class RoadmapMoveIn(BaseModel):
     tentative_duration_weeks: int | None = None
     pickup_period: str = ""
     completion_period: str = ""
+    dry_run: bool = False
+
+
+class RoadmapCommitFailureOut(BaseModel):
+    bucket_item_id: int
+    title: str
+    reason: str
 
 
 class RoadmapMoveOut(BaseModel):
     moved: int
+    failures: list[RoadmapCommitFailureOut] = []
 
 
 class RoadmapUnlockOut(BaseModel):
@@ -137,6 +147,8 @@ class CapacityValidateIn(BaseModel):
     ai_fte: float = 0.0
     pm_fte: float = 0.0
     fs_fte: float = 0.0
+    # FTE for additional roles from the FTE role catalogue, keyed by abbreviation.
+    role_fte: dict[str, float] = {}
     exclude_bucket_item_id: int | None = None
 
 
@@ -147,6 +159,110 @@ class CapacityValidateOut(BaseModel):
     reason: str
 
 
+class CapacitySlotSearchIn(BaseModel):
+    bucket_item_id: int | None = None
+    project_context: str = "internal"
+    duration_weeks: int = 1
+    earliest_start_date: str = ""
+    alternatives: int = 3
+    horizon_weeks: int = 104
+    fe_fte: float = 0.0
+    be_fte: float = 0.0
+    ai_fte: float = 0.0
+    pm_fte: float = 0.0
+    fs_fte: float = 0.0
+    role_fte: dict[str, float] = {}
+
+
+class CapacitySlotOut(BaseModel):
+    planned_start_date: str
+    planned_end_date: str
+    start_week: str
+    end_week: str
+    utilization_percentage: dict[str, str]
+
+
+class CapacitySlotSearchOut(BaseModel):
+    status: str
+    portfolio: str
+    duration_weeks: int
+    earliest: CapacitySlotOut | None = None
+    alternatives: list[CapacitySlotOut] = []
+    reason: str
+
+
+class CapacityPlanShiftIn(BaseModel):
+    plan_item_ids: list[int]
+    shift_weeks: int
+
+
+class CapacityScenarioIn(BaseModel):
+    name: str
+    team_deltas: dict[str, int] = {}
+    quota_overrides: dict[str, float] = {}
+    plan_shifts: list[CapacityPlanShiftIn] = []
+
+
+class CapacitySimulationIn(BaseModel):
+    scenarios: list[CapacityScenarioIn]
+
+
+class CapacityScenarioOut(BaseModel):
+    name: str
+    alert: CapacityGovernanceAlertOut
+
+
+class CapacitySimulationOut(BaseModel):
+    baseline: CapacityGovernanceAlertOut
+    scenarios: list[CapacityScenarioOut]
+
+
+class CapacityRiskHotspotOut(BaseModel):
+    portfolio: str
+    role: str
+    week: str
+    probability: float
+
+
+class CapacityPlanForecastOut(BaseModel):
+    plan_item_id: int
+    title: str
+    on_time_probability: float
+    p50_end_week: str
+    p90_end_week: str
+
+
+class CapacityForecastOut(BaseModel):
+    trials: int
+    weeks: list[str]
+    exceed_probability: dict[str, dict[str, list[float]]]
+    hotspots: list[CapacityRiskHotspotOut]
+    plans: list[CapacityPlanForecastOut]
+
+
+class CapacityHeatmapRowOut(BaseModel):
+    portfolio: str
+    role: str
+    capacity_fte: float
+    demand_fte: list[float]
+    peak_demand_fte: list[float]
+    utilization_pct: list[float | None]
+
+
+class CapacityHeatmapOut(BaseModel):
+    year: int
+    granularity: str
+    periods: list[str]
+    rows: list[CapacityHeatmapRowOut]
+
+
+class RoadmapAsOfOut(BaseModel):
+    as_of: datetime
+    checkpoint_at: datetime | None = None
+    roadmap_items: list[RoadmapItemOut]
+    plan_items: list[RoadmapPlanOut]
+
+
 class RoadmapGovernanceLockIn(BaseModel):
     roadmap_locked: bool
     note: str = ""
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from langgraph.graph import StateGraph
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GraphStats:
+    name: str
+    compile_seconds: float | None = None
+    compiled_at: datetime | None = None
+    invocations: int = 0
+
+
+_BUILDERS: dict[str, Callable[[], StateGraph]] = {}
+_COMPILED: dict[str, object] = {}
+_STATS: dict[str, GraphStats] = {}
+_LOCK = threading.Lock()
+
+
+def register_graph(name: str, builder: Callable[[], StateGraph]) -> None:
+    """Register the builder of an agent graph; it is compiled once, on first use or warm-up.
+
+    Compiled graphs are shared across requests and threads, so nodes must
+    not close over request objects. Per-request dependencies such as the DB
+    session go in ``config["configurable"]`` when invoking.
+    """
+    with _LOCK:
+        _BUILDERS[name] = builder
+        _COMPILED.pop(name, None)
+        _STATS[name] = GraphStats(name=name)
+
+
+def _compiled(name: str):
+    compiled = _COMPILED.get(name)
+    if compiled is not None:
+        return compiled
+    with _LOCK:
+        compiled = _COMPILED.get(name)
+        if compiled is None:
+            builder = _BUILDERS.get(name)
+            if builder is None:
+                raise KeyError(f"No agent graph registered as '{name}'")
+            started = time.perf_counter()
+            compiled = builder().compile()
+            stats = _STATS[name]
+            stats.compile_seconds = time.perf_counter() - started
+            stats.compiled_at = datetime.utcnow()
+            _COMPILED[name] = compiled
+    return compiled
+
+
+def get_graph(name: str):
+    """The compiled graph registered as ``name``; call once per run, it counts invocations."""
+    compiled = _compiled(name)
+    with _LOCK:
+        _STATS[name].invocations += 1
+    return compiled
+
+
+def warm_up_graphs() -> dict[str, float]:
+    """Compile every registered graph now, so no request pays for it. Returns seconds per graph."""
+    timings = {}
+    for name in sorted(_BUILDERS):
+        try:
+            _compiled(name)
+        except Exception:
+            logger.exception("Agent graph '%s' failed to compile", name)
+            continue
+        timings[name] = _STATS[name].compile_seconds or 0.0
+    return timings
+
+
+def graph_stats() -> list[GraphStats]:
+    return [_STATS[name] for name in sorted(_STATS)]
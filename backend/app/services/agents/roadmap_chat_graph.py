@@ -2,6 +2,7 @@ from datetime import datetime
 import json
 from typing import TypedDict
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -11,7 +12,9 @@ from app.models.llm_config import LLMConfig
 from app.models.roadmap_movement_request import RoadmapMovementRequest
 from app.models.roadmap_item import RoadmapItem
 from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.services.agents.graph_registry import get_graph, register_graph
 from app.services.llm_client import LLMClientError, call_llm_json
+from app.services.read_models import recent_commitments, recent_movements, recent_open_intake, recent_plans
 
 
 class ChatState(TypedDict):
@@ -49,9 +52,8 @@ def _build_context(db: Session) -> tuple[dict, list[str]]:
         for (x,) in db.query(RoadmapPlanItem.bucket_item_id).all()
         if x is not None
     }
-    commitment_candidates_q = db.query(RoadmapItem)
-    if committed_bucket_ids:
-        commitment_candidates_q = commitment_candidates_q.filter(~RoadmapItem.id.in_(committed_bucket_ids))
+    candidate_criteria = [~RoadmapItem.id.in_(committed_bucket_ids)] if committed_bucket_ids else []
+    commitment_candidates_q = db.query(RoadmapItem).filter(*candidate_criteria)
     commitments_candidates_total = commitment_candidates_q.count()
     commitments_ready_total = commitment_candidates_q.filter(RoadmapItem.picked_up.is_(True)).count()
 
@@ -71,21 +73,10 @@ def _build_context(db: Session) -> tuple[dict, list[str]]:
     roadmap_movement_total = db.query(func.count(RoadmapMovementRequest.id)).scalar() or 0
 
     # Sample rows for conversational detail (bounded).
-    intake_items = (
-        db.query(IntakeItem)
-        .filter(IntakeItem.status != "approved")
-        .order_by(IntakeItem.updated_at.desc())
-        .limit(120)
-        .all()
-    )
-    commitments = commitment_candidates_q.order_by(RoadmapItem.created_at.desc()).limit(120).all()
-    roadmap_items = db.query(RoadmapPlanItem).order_by(RoadmapPlanItem.created_at.desc()).limit(120).all()
-    roadmap_movements = (
-        db.query(RoadmapMovementRequest)
-        .order_by(RoadmapMovementRequest.id.desc())
-        .limit(120)
-        .all()
-    )
+    intake_items = recent_open_intake(db, limit=120)
+    commitments = recent_commitments(db, *candidate_criteria, limit=120)
+    roadmap_items = recent_plans(db, limit=120)
+    roadmap_movements = recent_movements(db, limit=120)
 
     context = {
         "snapshot_at": datetime.utcnow().isoformat(),
@@ -268,32 +259,34 @@ def _fallback_answer(question: str, context: dict) -> tuple[str, list[str]]:
     )
 
 
-def _resolve_with_llm_factory(db: Session):
+def _call_llm(llm_config: LLMConfig | None, prompt: str) -> dict:
+    if not llm_config:
+        raise LLMClientError("No active provider configuration")
+    return call_llm_json(
+        provider=llm_config.provider,
+        model=llm_config.model,
+        api_key=llm_config.api_key,
+        base_url=llm_config.base_url,
+        prompt=prompt,
+    )
+
+
+def _resolve_with_llm(state: ChatState, config: RunnableConfig) -> ChatState:
+    # The graph is compiled once and shared; the request's session comes in with the run config.
+    db: Session = config["configurable"]["db"]
     context, evidence_catalog = _build_context(db)
     context_json = json.dumps(context, ensure_ascii=True, default=str)
 
     active_llm = db.query(LLMConfig).filter(LLMConfig.is_active.is_(True)).first()
 
-    def _run_with(config: LLMConfig | None, prompt: str) -> dict:
-        if not config:
-            raise LLMClientError("No active provider configuration")
-        return call_llm_json(
-            provider=config.provider,
-            model=config.model,
-            api_key=config.api_key,
-            base_url=config.base_url,
-            prompt=prompt,
-        )
-
-    def _resolve_with_llm(state: ChatState) -> ChatState:
-        deterministic = _deterministic_count_answer(state["question"], context)
-        if deterministic:
-            state["answer"], state["evidence"] = deterministic
-            state["context_json"] = context_json
-            state["evidence_catalog"] = evidence_catalog
-            return state
+    deterministic = _deterministic_count_answer(state["question"], context)
+    if deterministic:
+        state["answer"], state["evidence"] = deterministic
+        state["context_json"] = context_json
+        state["evidence_catalog"] = evidence_catalog
+        return state
 
-        prompt = f"""
+    prompt = f"""
 You are an enterprise roadmap assistant.
 Answer ONLY from the provided system context. Do not hallucinate.
 
@@ -315,49 +308,53 @@ Return STRICT JSON with keys:
 Evidence catalog:
 {json.dumps(evidence_catalog)}
 """.strip()
-        data = None
-        try:
-            data = _run_with(active_llm, prompt)
-        except Exception:
-            # Provider fallback to latest saved vertex config when active is not vertex.
-            if active_llm and active_llm.provider != "vertex_gemini":
-                fallback = (
-                    db.query(LLMConfig)
-                    .filter(LLMConfig.provider == "vertex_gemini", LLMConfig.id != active_llm.id)
-                    .order_by(LLMConfig.id.desc())
-                    .first()
-                )
-                if fallback:
-                    try:
-                        data = _run_with(fallback, prompt)
-                    except Exception:
-                        data = None
-
-        if isinstance(data, dict) and str(data.get("answer", "")).strip():
-            state["answer"] = str(data.get("answer")).strip()
-            state["evidence"] = _sanitize_evidence(data.get("evidence"), evidence_catalog)
-            state["context_json"] = context_json
-            state["evidence_catalog"] = evidence_catalog
-            return state
-
-        answer, evidence = _fallback_answer(state["question"], context)
-        state["answer"] = answer
-        state["evidence"] = evidence
+    data = None
+    try:
+        data = _call_llm(active_llm, prompt)
+    except Exception:
+        # Provider fallback to latest saved vertex config when active is not vertex.
+        if active_llm and active_llm.provider != "vertex_gemini":
+            fallback = (
+                db.query(LLMConfig)
+                .filter(LLMConfig.provider == "vertex_gemini", LLMConfig.id != active_llm.id)
+                .order_by(LLMConfig.id.desc())
+                .first()
+            )
+            if fallback:
+                try:
+                    data = _call_llm(fallback, prompt)
+                except Exception:
+                    data = None
+
+    if isinstance(data, dict) and str(data.get("answer", "")).strip():
+        state["answer"] = str(data.get("answer")).strip()
+        state["evidence"] = _sanitize_evidence(data.get("evidence"), evidence_catalog)
         state["context_json"] = context_json
         state["evidence_catalog"] = evidence_catalog
         return state
 
-    return _resolve_with_llm
+    answer, evidence = _fallback_answer(state["question"], context)
+    state["answer"] = answer
+    state["evidence"] = evidence
+    state["context_json"] = context_json
+    state["evidence_catalog"] = evidence_catalog
+    return state
 
-def run_chat_graph(question: str, db: Session, role: str = "") -> tuple[str, list[str]]:
-    graph = StateGraph(ChatState)
-    graph.add_node("resolve_with_llm", _resolve_with_llm_factory(db))
 
+def _build_chat_graph() -> StateGraph:
+    graph = StateGraph(ChatState)
+    graph.add_node("resolve_with_llm", _resolve_with_llm)
     graph.set_entry_point("resolve_with_llm")
     graph.add_edge("resolve_with_llm", END)
+    return graph
 
-    app = graph.compile()
-    output = app.invoke(
-        {"question": question, "role": role, "answer": "", "evidence": [], "context_json": "", "evidence_catalog": []}
+
+register_graph("chat", _build_chat_graph)
+
+
+def run_chat_graph(question: str, db: Session, role: str = "") -> tuple[str, list[str]]:
+    output = get_graph("chat").invoke(
+        {"question": question, "role": role, "answer": "", "evidence": [], "context_json": "", "evidence_catalog": []},
+        config={"configurable": {"db": db}},
     )
     return output["answer"], output["evidence"]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+from app.services.document_similarity import normalize_unit_text
+
+# Below this share of unchanged units a revision is analysed from scratch;
+# the previous result would steer the model more than it helps.
+INCREMENTAL_MIN_UNCHANGED_RATIO = 0.5
+# Earlier versions found by SimHash are only used as a baseline above this unit overlap.
+INCREMENTAL_MIN_OVERLAP_PERCENT = 60.0
+
+
+@dataclass
+class AnalysisBaseline:
+    """An earlier analysed version of a document: its indexed units and stored analysis output."""
+
+    document_id: int
+    units: list[dict]
+    output: dict
+
+
+@dataclass
+class UnitAlignment:
+    """How the units of a revised document line up with the previous version's.
+
+    ``ref_map`` takes each unchanged previous ref to its ref in the new
+    document; ``changed_units`` are the new units with no unchanged
+    counterpart and ``removed_units`` the previous units that went away.
+    """
+
+    ref_map: dict[str, str] = field(default_factory=dict)
+    changed_units: list[dict] = field(default_factory=list)
+    removed_units: list[dict] = field(default_factory=list)
+    unchanged_count: int = 0
+    total_count: int = 0
+
+    @property
+    def unchanged_ratio(self) -> float:
+        return self.unchanged_count / self.total_count if self.total_count else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "unchanged_units": self.unchanged_count,
+            "changed_units": len(self.changed_units),
+            "removed_units": len(self.removed_units),
+            "unchanged_ratio": round(self.unchanged_ratio, 3),
+        }
+
+
+def align_units(previous: list[dict], current: list[dict]) -> UnitAlignment:
+    """Match units by normalized text, in order first, then sections that moved."""
+    previous_keys = [normalize_unit_text(u.get("text", "")) for u in previous]
+    current_keys = [normalize_unit_text(u.get("text", "")) for u in current]
+    matched_previous: set[int] = set()
+    matched_current: dict[int, int] = {}
+
+    matcher = SequenceMatcher(None, previous_keys, current_keys, autojunk=False)
+    for tag, p_start, p_end, c_start, _ in matcher.get_opcodes():
+        if tag != "equal":
+            continue
+        for offset in range(p_end - p_start):
+            matched_previous.add(p_start + offset)
+            matched_current[c_start + offset] = p_start + offset
+
+    # A section moved elsewhere in the document is still unchanged text.
+    leftover: dict[str, list[int]] = {}
+    for idx, key in enumerate(previous_keys):
+        if idx not in matched_previous and key:
+            leftover.setdefault(key, []).append(idx)
+    for idx, key in enumerate(current_keys):
+        if idx in matched_current or not leftover.get(key):
+            continue
+        p_idx = leftover[key].pop(0)
+        matched_previous.add(p_idx)
+        matched_current[idx] = p_idx
+
+    alignment = UnitAlignment(total_count=sum(1 for key in current_keys if key))
+    for idx, unit in enumerate(current):
+        if not current_keys[idx]:
+            continue
+        if idx in matched_current:
+            alignment.unchanged_count += 1
+            old_ref = str(previous[matched_current[idx]].get("ref") or "")
+            new_ref = str(unit.get("ref") or "")
+            if old_ref and new_ref:
+                alignment.ref_map.setdefault(old_ref, new_ref)
+        else:
+            alignment.changed_units.append(unit)
+    alignment.removed_units = [
+        unit for idx, unit in enumerate(previous) if idx not in matched_previous and previous_keys[idx]
+    ]
+    return alignment
+
+
+def baseline_alignment(baseline: AnalysisBaseline | None, units: list[dict]) -> UnitAlignment | None:
+    """Alignment against ``baseline`` when the revision is close enough to analyse incrementally."""
+    if baseline is None or not baseline.units or not units:
+        return None
+    alignment = align_units(baseline.units, units)
+    if alignment.unchanged_ratio < INCREMENTAL_MIN_UNCHANGED_RATIO:
+        return None
+    return alignment
+
+
+def carry_forward_refs(refs: list[str], alignment: UnitAlignment) -> list[str]:
+    """Previous evidence refs that still point at unchanged text, rewritten to the new refs."""
+    out: list[str] = []
+    for ref in refs:
+        new_ref = alignment.ref_map.get(str(ref).strip())
+        if new_ref and new_ref not in out:
+            out.append(new_ref)
+    return out
+
+
+def changed_context_units(units: list[dict], alignment: UnitAlignment, context: int = 1) -> list[dict]:
+    """Changed units plus ``context`` neighbours each side, in document order, for the prompt."""
+    changed = {id(unit) for unit in alignment.changed_units}
+    keep: set[int] = set()
+    for idx, unit in enumerate(units):
+        if id(unit) in changed:
+            keep.update(range(max(0, idx - context), min(len(units), idx + context + 1)))
+    return [units[idx] for idx in sorted(keep)]
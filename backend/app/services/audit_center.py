@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import Select, func, or_, select, tuple_
+from sqlalchemy.orm import Session, aliased
+
+from app.db.session import SessionLocal
+from app.models.audit_event import AuditEvent
+from app.models.document import Document
+from app.models.intake_item import IntakeItem
+from app.models.intake_item_version import IntakeItemVersion
+from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_item_version import RoadmapItemVersion
+from app.models.roadmap_movement_request import RoadmapMovementRequest
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.models.user import User
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 500
+
+
+@dataclass
+class AuditFilters:
+    actor_id: int | None = None
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+    action: str | None = None
+    context: str | None = None
+
+
+@dataclass
+class AuditSection:
+    """One audit list as a Core select, newest first by ``(time, id)``.
+
+    ``actor_columns`` are the user ids the actor filter matches, ``action``
+    and ``context`` the expressions the action and context filters compare
+    against (``None`` where a filter does not apply). ``finish`` fills the
+    fallbacks of a fetched row.
+    """
+
+    name: str
+    statement: Select
+    time_column: object
+    id_column: object
+    time_key: str
+    id_key: str
+    actor_columns: tuple
+    action: object | None
+    context: object
+    finish: Callable[[dict], dict]
+
+
+def _first_non_blank(*columns):
+    return func.coalesce(*(func.nullif(column, "") for column in columns), "")
+
+
+def _role_name(role) -> str | None:
+    return str(role) if role is not None else None
+
+
+def _documents_section() -> AuditSection:
+    context = _first_non_blank(
+        RoadmapPlanItem.project_context, RoadmapItem.project_context, IntakeItem.project_context
+    )
+    statement = (
+        select(
+            Document.id.label("document_id"),
+            Document.file_name,
+            Document.file_type,
+            Document.file_hash,
+            Document.notes,
+            Document.uploaded_by,
+            User.email.label("uploaded_by_email"),
+            User.role.label("uploaded_by_role"),
+            Document.created_at,
+            IntakeItem.id.label("intake_item_id"),
+            IntakeItem.status.label("intake_status"),
+            RoadmapItem.id.label("roadmap_item_id"),
+            RoadmapPlanItem.id.label("roadmap_plan_item_id"),
+            RoadmapPlanItem.planning_status.label("roadmap_planning_status"),
+            context.label("project_context"),
+        )
+        .select_from(Document)
+        .outerjoin(User, User.id == Document.uploaded_by)
+        .outerjoin(IntakeItem, IntakeItem.document_id == Document.id)
+        .outerjoin(RoadmapItem, RoadmapItem.id == IntakeItem.roadmap_item_id)
+        .outerjoin(RoadmapPlanItem, RoadmapPlanItem.bucket_item_id == RoadmapItem.id)
+    )
+
+    def finish(row: dict) -> dict:
+        row["uploaded_by_role"] = _role_name(row["uploaded_by_role"])
+        for key in ("file_name", "file_type", "file_hash", "notes", "intake_status", "roadmap_planning_status"):
+            row[key] = row[key] or ""
+        return row
+
+    return AuditSection(
+        name="documents",
+        statement=statement,
+        time_column=Document.created_at,
+        id_column=Document.id,
+        time_key="created_at",
+        id_key="document_id",
+        actor_columns=(Document.uploaded_by,),
+        action=None,
+        context=context,
+        finish=finish,
+    )
+
+
+def _intake_changes_section() -> AuditSection:
+    context = func.coalesce(IntakeItem.project_context, "")
+    statement = (
+        select(
+            IntakeItemVersion.id.label("event_id"),
+            IntakeItemVersion.intake_item_id,
+            IntakeItem.document_id,
+            IntakeItem.id.label("intake_id"),
+            IntakeItem.title,
+            IntakeItemVersion.action,
+            IntakeItem.status,
+            context.label("project_context"),
+            IntakeItemVersion.changed_by,
+            User.email.label("changed_by_email"),
+            User.role.label("changed_by_role"),
+            IntakeItemVersion.changed_fields,
+            IntakeItemVersion.created_at,
+        )
+        .select_from(IntakeItemVersion)
+        .outerjoin(IntakeItem, IntakeItem.id == IntakeItemVersion.intake_item_id)
+        .outerjoin(User, User.id == IntakeItemVersion.changed_by)
+    )
+
+    def finish(row: dict) -> dict:
+        if row.pop("intake_id") is None:
+            row["title"] = f"Intake #{row['intake_item_id']}"
+        row["title"] = row["title"] or ""
+        row["action"] = row["action"] or ""
+        row["status"] = row["status"] or ""
+        row["changed_by_role"] = _role_name(row["changed_by_role"])
+        row["changed_fields"] = row["changed_fields"] or []
+        return row
+
+    return AuditSection(
+        name="intake_changes",
+        statement=statement,
+        time_column=IntakeItemVersion.created_at,
+        id_column=IntakeItemVersion.id,
+        time_key="created_at",
+        id_key="event_id",
+        actor_columns=(IntakeItemVersion.changed_by,),
+        action=IntakeItemVersion.action,
+        context=context,
+        finish=finish,
+    )
+
+
+def _roadmap_changes_section() -> AuditSection:
+    context = func.coalesce(RoadmapItem.project_context, "")
+    statement = (
+        select(
+            RoadmapItemVersion.id.label("event_id"),
+            RoadmapItemVersion.roadmap_item_id,
+            RoadmapItem.id.label("roadmap_id"),
+            RoadmapItem.title,
+            RoadmapItemVersion.action,
+            context.label("project_context"),
+            RoadmapItemVersion.changed_by,
+            User.email.label("changed_by_email"),
+            User.role.label("changed_by_role"),
+            RoadmapItemVersion.changed_fields,
+            RoadmapItemVersion.created_at,
+        )
+        .select_from(RoadmapItemVersion)
+        .outerjoin(RoadmapItem, RoadmapItem.id == RoadmapItemVersion.roadmap_item_id)
+        .outerjoin(User, User.id == RoadmapItemVersion.changed_by)
+    )
+
+    def finish(row: dict) -> dict:
+        if row.pop("roadmap_id") is None:
+            row["title"] = f"Roadmap #{row['roadmap_item_id']}"
+        row["title"] = row["title"] or ""
+        row["action"] = row["action"] or ""
+        row["changed_by_role"] = _role_name(row["changed_by_role"])
+        row["changed_fields"] = row["changed_fields"] or []
+        return row
+
+    return AuditSection(
+        name="roadmap_changes",
+        statement=statement,
+        time_column=RoadmapItemVersion.created_at,
+        id_column=RoadmapItemVersion.id,
+        time_key="created_at",
+        id_key="event_id",
+        actor_columns=(RoadmapItemVersion.changed_by,),
+        action=RoadmapItemVersion.action,
+        context=context,
+        finish=finish,
+    )
+
+
+def _movement_events_section() -> AuditSection:
+    requester = aliased(User)
+    decider = aliased(User)
+    context = _first_non_blank(RoadmapPlanItem.project_context, RoadmapItem.project_context)
+    statement = (
+        select(
+            RoadmapMovementRequest.id.label("request_id"),
+            RoadmapMovementRequest.plan_item_id,
+            RoadmapMovementRequest.bucket_item_id,
+            RoadmapPlanItem.title.label("plan_title"),
+            RoadmapItem.title.label("roadmap_title"),
+            RoadmapMovementRequest.status,
+            RoadmapMovementRequest.request_type,
+            context.label("project_context"),
+            RoadmapMovementRequest.from_start_date,
+            RoadmapMovementRequest.from_end_date,
+            RoadmapMovementRequest.to_start_date,
+            RoadmapMovementRequest.to_end_date,
+            RoadmapMovementRequest.reason,
+            RoadmapMovementRequest.blocker,
+            RoadmapMovementRequest.decision_reason,
+            RoadmapMovementRequest.requested_by,
+            requester.email.label("requested_by_email"),
+            requester.role.label("requested_by_role"),
+            RoadmapMovementRequest.decided_by,
+            decider.email.label("decided_by_email"),
+            decider.role.label("decided_by_role"),
+            RoadmapMovementRequest.requested_at,
+            RoadmapMovementRequest.decided_at,
+            RoadmapMovementRequest.executed_at,
+        )
+        .select_from(RoadmapMovementRequest)
+        .outerjoin(RoadmapPlanItem, RoadmapPlanItem.id == RoadmapMovementRequest.plan_item_id)
+        .outerjoin(RoadmapItem, RoadmapItem.id == RoadmapMovementRequest.bucket_item_id)
+        .outerjoin(requester, requester.id == RoadmapMovementRequest.requested_by)
+        .outerjoin(decider, decider.id == RoadmapMovementRequest.decided_by)
+    )
+
+    def finish(row: dict) -> dict:
+        plan_title, roadmap_title = row.pop("plan_title"), row.pop("roadmap_title")
+        row["title"] = plan_title or roadmap_title or f"Roadmap #{row['bucket_item_id']}"
+        for key in (
+            "status",
+            "request_type",
+            "from_start_date",
+            "from_end_date",
+            "to_start_date",
+            "to_end_date",
+            "reason",
+            "blocker",
+            "decision_reason",
+        ):
+            row[key] = row[key] or ""
+        row["requested_by_role"] = _role_name(row["requested_by_role"])
+        row["decided_by_role"] = _role_name(row["decided_by_role"])
+        return row
+
+    # Movement requests have no action of their own; the action filter
+    # matches their status (pending, approved, rejected).
+    return AuditSection(
+        name="movement_events",
+        statement=statement,
+        time_column=RoadmapMovementRequest.requested_at,
+        id_column=RoadmapMovementRequest.id,
+        time_key="requested_at",
+        id_key="request_id",
+        actor_columns=(RoadmapMovementRequest.requested_by, RoadmapMovementRequest.decided_by),
+        action=RoadmapMovementRequest.status,
+        context=context,
+        finish=finish,
+    )
+
+
+def _events_section() -> AuditSection:
+    statement = (
+        select(
+            AuditEvent.id.label("event_id"),
+            AuditEvent.occurred_at,
+            AuditEvent.entity_type,
+            AuditEvent.entity_id,
+            AuditEvent.action,
+            AuditEvent.project_context,
+            AuditEvent.actor_id,
+            User.email.label("actor_email"),
+            User.role.label("actor_role"),
+            AuditEvent.changed_fields,
+        )
+        .select_from(AuditEvent)
+        .outerjoin(User, User.id == AuditEvent.actor_id)
+    )
+
+    def finish(row: dict) -> dict:
+        row["actor_role"] = _role_name(row["actor_role"])
+        row["changed_fields"] = row["changed_fields"] or []
+        return row
+
+    return AuditSection(
+        name="events",
+        statement=statement,
+        time_column=AuditEvent.occurred_at,
+        id_column=AuditEvent.id,
+        time_key="occurred_at",
+        id_key="event_id",
+        actor_columns=(AuditEvent.actor_id,),
+        action=AuditEvent.action,
+        context=AuditEvent.project_context,
+        finish=finish,
+    )
+
+
+AUDIT_SECTIONS: dict[str, Callable[[], AuditSection]] = {
+    "documents": _documents_section,
+    "intake_changes": _intake_changes_section,
+    "roadmap_changes": _roadmap_changes_section,
+    "movement_events": _movement_events_section,
+    "events": _events_section,
+}
+
+
+def encode_cursor(time_value: datetime, row_id: int) -> str:
+    raw = f"{time_value.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        time_part, id_part = raw.rsplit("|", 1)
+        return datetime.fromisoformat(time_part), int(id_part)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid audit cursor") from None
+
+
+def _filtered(section: AuditSection, filters: AuditFilters) -> Select:
+    statement = section.statement
+    if filters.actor_id is not None:
+        statement = statement.where(or_(*(column == filters.actor_id for column in section.actor_columns)))
+    if filters.date_from is not None:
+        statement = statement.where(section.time_column >= filters.date_from)
+    if filters.date_to is not None:
+        statement = statement.where(section.time_column <= filters.date_to)
+    if filters.action:
+        if section.action is None:
+            raise ValueError(f"The action filter does not apply to {section.name.replace('_', ' ')}")
+        statement = statement.where(section.action == filters.action.strip())
+    if filters.context:
+        statement = statement.where(section.context == filters.context.strip().lower())
+    return statement
+
+
+def validate_audit_filters(section_name: str, filters: AuditFilters) -> None:
+    """Raises ``ValueError`` for filters the section does not support, before any row is streamed."""
+    _filtered(AUDIT_SECTIONS[section_name](), filters)
+
+
+def fetch_audit_page(
+    db: Session,
+    section_name: str,
+    filters: AuditFilters,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> tuple[list[dict], str | None]:
+    """One page of an audit section, newest first, and the cursor of the next page (``None`` at the end).
+
+    Keyset pagination on ``(time, id)``: each page is an index range scan
+    that starts where the previous one stopped, however deep the reader is.
+    """
+    section = AUDIT_SECTIONS[section_name]()
+    statement = _filtered(section, filters)
+    if cursor:
+        after_time, after_id = decode_cursor(cursor)
+        # The plain bound lets the planner skip audit event partitions past the cursor.
+        statement = statement.where(
+            section.time_column <= after_time,
+            tuple_(section.time_column, section.id_column) < tuple_(after_time, after_id),
+        )
+    statement = statement.order_by(section.time_column.desc(), section.id_column.desc()).limit(limit + 1)
+    rows = [dict(row) for row in db.execute(statement).mappings()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][section.time_key], rows[-1][section.id_key])
+    return [section.finish(row) for row in rows], next_cursor
+
+
+def audit_section_rows(db: Session, section_name: str) -> list[dict]:
+    """Every row of an audit section, newest id first, as plain dicts shaped like its row schema."""
+    section = AUDIT_SECTIONS[section_name]()
+    statement = section.statement.order_by(section.id_column.desc())
+    return [section.finish(dict(row)) for row in db.execute(statement).mappings()]
+
+
+def count_audit_rows(db: Session, section_name: str, filters: AuditFilters) -> int:
+    statement = _filtered(AUDIT_SECTIONS[section_name](), filters)
+    return db.execute(select(func.count()).select_from(statement.subquery())).scalar_one()
+
+
+def iter_audit_rows(
+    section_name: str,
+    filters: AuditFilters,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[dict]:
+    """Every row of an audit section, newest first, fetched one keyset page at a time.
+
+    Runs on its own session, since a streamed response outlives the request
+    session, and ends the transaction between pages, so an export of any
+    size holds one page in memory and no snapshot open while the client reads.
+    """
+    db = SessionLocal()
+    try:
+        cursor = None
+        while True:
+            rows, cursor = fetch_audit_page(db, section_name, filters, cursor, batch_size)
+            db.rollback()
+            yield from rows
+            if cursor is None:
+                break
+    finally:
+        db.close()
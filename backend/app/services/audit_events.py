@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, datetime
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.audit_event import AuditEvent
+from app.models.intake_item import IntakeItem
+from app.models.intake_item_version import IntakeItemVersion
+from app.models.maintenance_job import MaintenanceJob
+from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_item_version import RoadmapItemVersion
+from app.models.roadmap_movement_request import RoadmapMovementRequest
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.models.roadmap_plan_item_version import RoadmapPlanItemVersion
+
+logger = logging.getLogger(__name__)
+
+ENTITY_INTAKE_ITEM = "intake_item"
+ENTITY_ROADMAP_ITEM = "roadmap_item"
+ENTITY_PLAN_ITEM = "plan_item"
+ENTITY_MOVEMENT_REQUEST = "movement_request"
+
+DEFAULT_PARTITION = "audit_events_default"
+_PARTITION_NAME = re.compile(r"^audit_events_(\d{4})(\d{2})$")
+# Serialises partition DDL across worker processes starting at once.
+_PARTITION_ADVISORY_LOCK = 7_300_336
+# Detaching waits for an exclusive lock on the parent table; give up and
+# retry on the next pass rather than queue writers behind it.
+_DETACH_LOCK_TIMEOUT = "2s"
+
+
+def record_audit_event(
+    db: Session,
+    entity_type: str,
+    entity_id: int,
+    action: str,
+    actor_id: int | None,
+    occurred_at: datetime | None = None,
+    project_context: str = "",
+    changed_fields: list[str] | None = None,
+    source_id: int | None = None,
+) -> None:
+    """Add an audit event to the session, so it commits or rolls back with the change it records."""
+    db.add(
+        AuditEvent(
+            occurred_at=occurred_at or datetime.utcnow(),
+            entity_type=entity_type,
+            entity_id=entity_id,
+            action=action,
+            actor_id=actor_id,
+            project_context=project_context or "",
+            changed_fields=list(changed_fields or []),
+            source_id=source_id,
+        )
+    )
+
+
+def movement_event_actions(movement: RoadmapMovementRequest) -> list[tuple[str, int | None, datetime]]:
+    """``(action, actor, time)`` of the events a movement request has produced so far."""
+    if movement.request_type == "ceo_direct":
+        return [("movement_ceo_direct", movement.requested_by, movement.requested_at)]
+    events = [("movement_requested", movement.requested_by, movement.requested_at)]
+    if movement.decided_at is not None and movement.status != "pending":
+        events.append((f"movement_{movement.status}", movement.decided_by, movement.decided_at))
+    return events
+
+
+def record_movement_event(db: Session, movement: RoadmapMovementRequest, project_context: str = "") -> None:
+    """Record the latest event of ``movement``; flushes to assign the request id."""
+    if movement.id is None:
+        db.flush()
+    action, actor_id, occurred_at = movement_event_actions(movement)[-1]
+    record_audit_event(
+        db,
+        ENTITY_MOVEMENT_REQUEST,
+        movement.id,
+        action,
+        actor_id,
+        occurred_at=occurred_at,
+        project_context=project_context,
+        source_id=movement.id,
+    )
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"audit_events_{month.year:04d}{month.month:02d}"
+
+
+def _attached_partitions(db: Session) -> list[str]:
+    rows = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'audit_events'::regclass"
+        )
+    )
+    return [name for (name,) in rows]
+
+
+def _create_month_partitions(db: Session, months: set[date]) -> list[str]:
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_ADVISORY_LOCK})
+    existing = set(_attached_partitions(db))
+    created = []
+    if DEFAULT_PARTITION not in existing:
+        db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF audit_events DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    for month in sorted(months):
+        name = partition_name(month)
+        if name in existing:
+            continue
+        upper = _add_months(month, 1)
+        try:
+            with db.begin_nested():
+                db.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_events "
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+                    )
+                )
+        except IntegrityError:
+            logger.warning("Audit events for %s are in the default partition; leaving them there", name)
+            continue
+        created.append(name)
+    return created
+
+
+def ensure_audit_partitions(db: Session, now: datetime, months_ahead: int) -> list[str]:
+    """Create the monthly partitions from this month to ``months_ahead`` months on, and the default partition.
+
+    The default partition only catches events outside the prepared months,
+    e.g. when maintenance has not run for a while. A month whose rows have
+    already landed there cannot get its own partition and is left in it.
+    Commits; returns the partitions created.
+    """
+    first = _month_start(now.date())
+    created = _create_month_partitions(db, {_add_months(first, offset) for offset in range(months_ahead + 1)})
+    db.commit()
+    return created
+
+
+def detach_audit_partitions(db: Session, now: datetime, retention_months: int) -> list[str]:
+    """Detach the monthly partitions entirely older than ``retention_months`` months.
+
+    A detached partition is an ordinary table with the same name, left in
+    place to be dumped and dropped by whoever archives it; the live table
+    and its indexes never see the months again. Detaching only changes
+    catalog entries, and gives up quickly if writers hold the table.
+    Commits; returns the partitions detached.
+    """
+    cutoff = _add_months(_month_start(now.date()), -retention_months)
+    detached = []
+    for name in sorted(_attached_partitions(db)):
+        match = _PARTITION_NAME.match(name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if _add_months(month, 1) > cutoff:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(text(f"SET LOCAL lock_timeout = '{_DETACH_LOCK_TIMEOUT}'"))
+                db.execute(text(f"ALTER TABLE audit_events DETACH PARTITION {name}"))
+        except OperationalError:
+            logger.warning("Could not detach audit partition %s; will retry", name)
+            continue
+        detached.append(name)
+    db.commit()
+    return detached
+
+
+VERSION_BACKFILL_JOBS = {
+    "audit_backfill_intake_versions": (
+        ENTITY_INTAKE_ITEM,
+        IntakeItemVersion,
+        IntakeItemVersion.intake_item_id,
+        IntakeItem,
+    ),
+    "audit_backfill_roadmap_versions": (
+        ENTITY_ROADMAP_ITEM,
+        RoadmapItemVersion,
+        RoadmapItemVersion.roadmap_item_id,
+        RoadmapItem,
+    ),
+    "audit_backfill_plan_versions": (
+        ENTITY_PLAN_ITEM,
+        RoadmapPlanItemVersion,
+        RoadmapPlanItemVersion.plan_item_id,
+        RoadmapPlanItem,
+    ),
+}
+MOVEMENT_BACKFILL_JOB = "audit_backfill_movements"
+
+
+def _recorded_sources(db: Session, entity_type: str, source_ids: list[int]) -> set[tuple[int, str]]:
+    if not source_ids:
+        return set()
+    rows = db.execute(
+        select(AuditEvent.source_id, AuditEvent.action).where(
+            AuditEvent.entity_type == entity_type,
+            AuditEvent.source_id.between(min(source_ids), max(source_ids)),
+        )
+    )
+    return {(source_id, action) for source_id, action in rows}
+
+
+def _version_backfill_batch(
+    db: Session, entity_type: str, model, item_column, item_model, cursor: int | None, limit: int
+) -> tuple[list[int], list[dict]]:
+    query = (
+        select(
+            model.id,
+            item_column,
+            model.action,
+            model.changed_by,
+            model.changed_fields,
+            model.created_at,
+            item_model.project_context,
+        )
+        .outerjoin(item_model, item_model.id == item_column)
+        .order_by(model.id.asc())
+        .limit(limit)
+    )
+    if cursor is not None:
+        query = query.where(model.id > cursor)
+    rows = db.execute(query).all()
+    recorded = _recorded_sources(db, entity_type, [row[0] for row in rows])
+    events = [
+        {
+            "occurred_at": created_at,
+            "entity_type": entity_type,
+            "entity_id": item_id,
+            "action": action,
+            "actor_id": changed_by,
+            "project_context": project_context or "",
+            "changed_fields": changed_fields or [],
+            "source_id": version_id,
+        }
+        for version_id, item_id, action, changed_by, changed_fields, created_at, project_context in rows
+        if (version_id, action) not in recorded
+    ]
+    return [row[0] for row in rows], events
+
+
+def _movement_backfill_batch(db: Session, cursor: int | None, limit: int) -> tuple[list[int], list[dict]]:
+    query = (
+        select(RoadmapMovementRequest, RoadmapPlanItem.project_context)
+        .outerjoin(RoadmapPlanItem, RoadmapPlanItem.id == RoadmapMovementRequest.plan_item_id)
+        .order_by(RoadmapMovementRequest.id.asc())
+        .limit(limit)
+    )
+    if cursor is not None:
+        query = query.where(RoadmapMovementRequest.id > cursor)
+    rows = db.execute(query).all()
+    recorded = _recorded_sources(db, ENTITY_MOVEMENT_REQUEST, [movement.id for movement, _ in rows])
+    events = [
+        {
+            "occurred_at": occurred_at,
+            "entity_type": ENTITY_MOVEMENT_REQUEST,
+            "entity_id": movement.id,
+            "action": action,
+            "actor_id": actor_id,
+            "project_context": project_context or "",
+            "changed_fields": [],
+            "source_id": movement.id,
+        }
+        for movement, project_context in rows
+        for action, actor_id, occurred_at in movement_event_actions(movement)
+        if (movement.id, action) not in recorded
+    ]
+    return [movement.id for movement, _ in rows], events
+
+
+def backfill_audit_events(db: Session, limit: int) -> int:
+    """One-off copy of the history logged before ``audit_events`` existed into it.
+
+    Works through up to ``limit`` source rows per source and call from the
+    cursor in ``maintenance_jobs``, skipping rows that already have their
+    event; new changes write their events as they happen, so each sweep
+    runs once. Returns the number of events inserted.
+    """
+    inserted = 0
+    for job_name in [*VERSION_BACKFILL_JOBS, MOVEMENT_BACKFILL_JOB]:
+        job = db.get(MaintenanceJob, job_name)
+        if job is None:
+            job = MaintenanceJob(name=job_name, processed=0, failed=0, remaining=0)
+            db.add(job)
+        elif job.completed_at is not None:
+            continue
+        if job_name == MOVEMENT_BACKFILL_JOB:
+            source_ids, events = _movement_backfill_batch(db, job.cursor, limit)
+        else:
+            source_ids, events = _version_backfill_batch(db, *VERSION_BACKFILL_JOBS[job_name], job.cursor, limit)
+        if events:
+            # History predates the prepared months; give it partitions of its own.
+            _create_month_partitions(db, {_month_start(event["occurred_at"].date()) for event in events})
+            db.execute(insert(AuditEvent), events)
+        inserted += len(events)
+        job.processed += len(events)
+        if source_ids:
+            job.cursor = source_ids[-1]
+        if len(source_ids) < limit:
+            job.completed_at = datetime.utcnow()
+        db.commit()
+    return inserted
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+from collections import deque
+
+import numpy as np
+
+from app.models.governance_config import GovernanceConfig
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.services.capacity_governance import (
+    EPSILON,
+    PORTFOLIOS,
+    ROLE_KEYS,
+    PlanSchedule,
+    RoleVectors,
+    _capacity_matrix,
+    _week_key,
+    schedule_plans,
+    week_start,
+)
+
+# Mean slip as a fraction of the planned span, by plan confidence.
+SLIP_FRACTION_BY_CONFIDENCE = {"high": 0.1, "medium": 0.25, "low": 0.5}
+DEFAULT_SLIP_FRACTION = SLIP_FRACTION_BY_CONFIDENCE["medium"]
+AT_RISK_SLIP_MULTIPLIER = 1.5
+MAX_SLIP_WEEKS = 52
+STARTED_STATUSES = ("in_progress", "at_risk")
+# Trials are booked onto the week grid in chunks to bound memory.
+TRIAL_CHUNK = 500
+
+
+def _norm(value: str | None) -> str:
+    return (value or "").strip().lower()
+
+
+def _slip_fractions(plans: list[RoadmapPlanItem]) -> np.ndarray:
+    fractions = []
+    for plan in plans:
+        status = _norm(plan.planning_status)
+        fraction = SLIP_FRACTION_BY_CONFIDENCE.get(_norm(plan.confidence), DEFAULT_SLIP_FRACTION)
+        if status == "at_risk":
+            fraction *= AT_RISK_SLIP_MULTIPLIER
+        elif status == "done":
+            fraction = 0.0
+        fractions.append(fraction)
+    return np.asarray(fractions, dtype=float)
+
+
+def _dependency_order(plans: list[RoadmapPlanItem]) -> list[tuple[int, list[int]]]:
+    """Rows with scheduled dependencies, each listed after all of its dependencies.
+
+    ``plans`` are the scheduled plans in schedule row order. Dependencies on
+    unscheduled plans are ignored. Rows are released Kahn-style as their
+    dependencies are placed; when only cycles are left, the lowest remaining
+    row is placed next and its edges to unplaced rows are dropped.
+    """
+    row_of_plan = {plan.id: row for row, plan in enumerate(plans)}
+    deps_of: list[list[int]] = []
+    dependents: list[list[int]] = [[] for _ in plans]
+    for row, plan in enumerate(plans):
+        deps = list(dict.fromkeys(row_of_plan.get(dep_id) for dep_id in plan.dependency_ids or []))
+        deps = [dep_row for dep_row in deps if dep_row is not None and dep_row != row]
+        for dep_row in deps:
+            dependents[dep_row].append(row)
+        deps_of.append(deps)
+
+    waiting = [len(deps) for deps in deps_of]
+    ready = deque(row for row, count in enumerate(waiting) if count == 0)
+    placed = [False] * len(plans)
+    order: list[tuple[int, list[int]]] = []
+    next_unplaced = 0
+    for _ in range(len(plans)):
+        while ready and placed[ready[0]]:
+            ready.popleft()
+        if ready:
+            row = ready.popleft()
+        else:
+            while placed[next_unplaced]:
+                next_unplaced += 1
+            row = next_unplaced
+        placed[row] = True
+        deps = [dep_row for dep_row in deps_of[row] if placed[dep_row]]
+        if deps:
+            order.append((row, deps))
+        for dependent in dependents[row]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0 and not placed[dependent]:
+                ready.append(dependent)
+    return order
+
+
+def _sample_delays(
+    plans: list[RoadmapPlanItem],
+    schedule: PlanSchedule,
+    trials: int,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Start shift and end delay in whole weeks, each ``trials x plans``.
+
+    Each plan slips by an exponentially distributed number of weeks whose mean
+    is its span times its confidence fraction. Plans that have not started
+    move as a whole and are pushed by late dependencies, less the slack they
+    already had; plans in progress keep their start and run longer.
+    """
+    status = [_norm(plan.planning_status) for plan in plans]
+    started = np.isin(status, STARTED_STATUSES)
+    pinned = started | np.equal(status, "done")
+    mean_slip = _slip_fractions(plans) * schedule.span
+    slip = np.minimum(np.floor(rng.exponential(1.0, size=(trials, len(plans))) * mean_slip), MAX_SLIP_WEEKS)
+
+    shift = np.where(started, 0.0, slip)
+    end_delay = slip.copy()
+    last_week = schedule.first_week + schedule.span - 1
+    for row, deps in _dependency_order(plans):
+        if pinned[row]:
+            continue
+        slack = np.maximum(0, schedule.first_week[row] - last_week[deps] - 1)
+        push = np.maximum(0.0, end_delay[:, deps] - slack).max(axis=1)
+        shift[:, row] = np.maximum(shift[:, row], push)
+        end_delay[:, row] = shift[:, row]
+    return shift.astype(np.int64), end_delay.astype(np.int64)
+
+
+def _exceedance_counts(
+    schedule: PlanSchedule,
+    shift: np.ndarray,
+    end_delay: np.ndarray,
+    capacity: np.ndarray,
+    origin: int,
+    week_count: int,
+) -> np.ndarray:
+    """Per portfolio, week and role, the number of trials that breach capacity.
+
+    Every trial is booked with a +fte at each plan's first week and a -fte
+    after its last, then a cumsum over weeks turns those steps into demand, so
+    the cost is two scatters per plan and trial whatever the plan length.
+    """
+    role_count = capacity.shape[1]
+    grid = week_count + 1
+    cells_per_trial = len(PORTFOLIOS) * grid
+    no_capacity = capacity <= EPSILON
+    counts = np.zeros((len(PORTFOLIOS), week_count, role_count), dtype=np.int64)
+    for lo in range(0, shift.shape[0], TRIAL_CHUNK):
+        chunk_shift, chunk_delay = shift[lo : lo + TRIAL_CHUNK], end_delay[lo : lo + TRIAL_CHUNK]
+        chunk = chunk_shift.shape[0]
+        base = np.arange(chunk)[:, None] * cells_per_trial + schedule.portfolio * grid - origin
+        opens = base + schedule.first_week + chunk_shift
+        closes = base + schedule.first_week + schedule.span + chunk_delay
+        cells = np.concatenate([opens.ravel(), closes.ravel()])
+        steps = np.empty((chunk * cells_per_trial, role_count))
+        for r in range(role_count):
+            weights = np.broadcast_to(schedule.fte[:, r], opens.shape).ravel()
+            steps[:, r] = np.bincount(
+                cells,
+                weights=np.concatenate([weights, -weights]),
+                minlength=chunk * cells_per_trial,
+            )
+        demand = np.cumsum(steps.reshape(chunk, len(PORTFOLIOS), grid, role_count), axis=2)[:, :, :week_count]
+        over = np.where(no_capacity[:, None, :], demand > EPSILON, demand - capacity[:, None, :] > EPSILON)
+        counts += over.sum(axis=0)
+    return counts
+
+
+def build_capacity_forecast(
+    cfg: GovernanceConfig,
+    plans: list[RoadmapPlanItem],
+    trials: int,
+    seed: int | None = None,
+    roles: RoleVectors | None = None,
+) -> dict:
+    """Monte Carlo delivery risk: how likely each week/role is to run over capacity.
+
+    Plan slips are sampled from their confidence and planning status and
+    pushed through ``dependency_ids``; every trial is then booked and compared
+    against the same weekly capacity and breach rule the governance alert uses.
+    """
+    schedule = schedule_plans(plans, roles.plan_fte if roles else None)
+    role_keys = roles.index.keys if roles else ROLE_KEYS
+    empty = {
+        "trials": trials,
+        "weeks": [],
+        "exceed_probability": {portfolio: {role: [] for role in role_keys} for portfolio in PORTFOLIOS},
+        "hotspots": [],
+        "plans": [],
+    }
+    if not schedule.span.size or trials <= 0:
+        return empty
+
+    scheduled = [plans[int(idx)] for idx in schedule.plan_index]
+    rng = np.random.default_rng(seed)
+    shift, end_delay = _sample_delays(scheduled, schedule, trials, rng)
+    origin = int(schedule.first_week.min())
+    last_weeks = schedule.first_week + schedule.span - 1
+    week_count = int((last_weeks + end_delay.max(axis=0)).max()) + 1 - origin
+    counts = _exceedance_counts(schedule, shift, end_delay, _capacity_matrix(cfg, roles), origin, week_count)
+    probability = counts / trials
+
+    week_keys = [_week_key(week_start(origin + offset)) for offset in range(week_count)]
+    hotspots = []
+    for p, portfolio in enumerate(PORTFOLIOS):
+        for r, role in enumerate(role_keys):
+            if counts[p, :, r].any():
+                peak = int(np.argmax(counts[p, :, r]))
+                hotspots.append(
+                    {
+                        "portfolio": portfolio,
+                        "role": role,
+                        "week": week_keys[peak],
+                        "probability": round(float(probability[p, peak, r]), 4),
+                    }
+                )
+    hotspots.sort(key=lambda spot: spot["probability"], reverse=True)
+
+    end_weeks = last_weeks + end_delay
+    p50 = np.percentile(end_weeks, 50, axis=0, method="higher")
+    p90 = np.percentile(end_weeks, 90, axis=0, method="higher")
+    on_time = (end_delay == 0).mean(axis=0)
+    plan_rows = [
+        {
+            "plan_item_id": plan.id,
+            "title": plan.title,
+            "on_time_probability": round(float(on_time[row]), 4),
+            "p50_end_week": _week_key(week_start(int(p50[row]))),
+            "p90_end_week": _week_key(week_start(int(p90[row]))),
+        }
+        for row, plan in enumerate(scheduled)
+    ]
+    return {
+        "trials": trials,
+        "weeks": week_keys,
+        "exceed_probability": {
+            portfolio: {role: [round(float(v), 4) for v in probability[p, :, r]] for r, role in enumerate(role_keys)}
+            for p, portfolio in enumerate(PORTFOLIOS)
+        },
+        "hotspots": hotspots,
+        "plans": plan_rows,
+    }
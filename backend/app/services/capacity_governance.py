@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import attrgetter
+from types import SimpleNamespace
+
+import numpy as np
 
 from app.models.governance_config import GovernanceConfig
 from app.models.roadmap_plan_item import RoadmapPlanItem
@@ -98,35 +104,285 @@ def _weekly_capacity(cfg: GovernanceConfig) -> dict[str, dict[str, float]]:
     return out
 
 
-def _weekly_usage(plans: list[RoadmapPlanItem]) -> tuple[dict[str, dict[str, dict[str, float]]], int]:
-    usage: dict[str, dict[str, dict[str, float]]] = {"client": {}, "internal": {}, "rnd": {}}
-    unscheduled_demand_items = 0
-    for plan in plans:
-        role_values = {
-            "fe": _safe_non_negative(plan.fe_fte),
-            "be": _safe_non_negative(plan.be_fte),
-            "ai": _safe_non_negative(plan.ai_fte),
-            "pm": _safe_non_negative(plan.pm_fte),
-            "fs": _safe_non_negative(plan.fs_fte),
-        }
-        has_demand = any(v > EPSILON for v in role_values.values())
-        parsed = _parse_plan_dates(plan.planned_start_date, plan.planned_end_date)
-        if not parsed:
-            if has_demand:
-                unscheduled_demand_items += 1
+@dataclass(frozen=True)
+class RoleIndex:
+    """Capacity roles in vector order.
+
+    The five built-in roles always come first, in ``ROLE_KEYS`` order, and
+    keep reading their dedicated columns. Any other active FTE role follows;
+    ``extra_role_ids`` holds their ``fte_roles`` ids in the same order.
+    """
+
+    keys: tuple[str, ...] = ROLE_KEYS
+    extra_role_ids: tuple[int, ...] = ()
+
+    @property
+    def extra_keys(self) -> tuple[str, ...]:
+        return self.keys[len(ROLE_KEYS) :]
+
+
+DEFAULT_ROLES = RoleIndex()
+
+
+@dataclass
+class RoleVectors:
+    """Role-indexed inputs for one set of plans.
+
+    ``plan_fte`` has one row per plan and one column per ``index`` role;
+    ``extra_team`` and ``extra_efficiency`` are the governance headcount and
+    efficiency of the extra roles.
+    """
+
+    index: RoleIndex
+    plan_fte: np.ndarray
+    extra_team: np.ndarray
+    extra_efficiency: np.ndarray
+
+
+@dataclass
+class WeeklyUsage:
+    """Scheduled demand as one ``weeks x roles`` matrix per portfolio.
+
+    ``demand[p, w, r]`` is the FTE booked for ``PORTFOLIOS[p]`` and role
+    ``r`` (``ROLE_KEYS`` order unless built from a ``RoleIndex``) in the ISO
+    week that starts ``w`` weeks after ``first_week`` (a week number counted
+    from ``date.min``).
+    """
+
+    first_week: int
+    demand: np.ndarray
+    unscheduled_demand_items: int
+
+    @property
+    def week_count(self) -> int:
+        return int(self.demand.shape[1])
+
+    def week_key(self, index: int) -> str:
+        return _week_key(week_start(self.first_week + index))
+
+
+def week_number(dt: datetime) -> int:
+    # date.min is a Monday, so every ISO week maps to one integer.
+    return (dt.toordinal() - 1) // 7
+
+
+def week_start(number: int) -> datetime:
+    return datetime.fromordinal(number * 7 + 1)
+
+
+def _plan_week_span(start: datetime, end: datetime) -> tuple[int, int]:
+    """First week number and number of weeks ``_week_keys_between`` would emit."""
+    cursor = start - timedelta(days=start.weekday())
+    last = end - timedelta(days=end.weekday())
+    return week_number(cursor), max(0, (last - cursor) // timedelta(days=7) + 1)
+
+
+@lru_cache(maxsize=4096)
+def _plan_week_bounds(start_date: str, end_date: str) -> tuple[int, int] | None:
+    """Week span of a plan's date strings, or None when they do not parse.
+
+    Plans share a small set of date pairs (quarter starts, sprint ends), so
+    the parse is memoized on the raw strings.
+    """
+    parsed = _parse_plan_dates(start_date, end_date)
+    if not parsed:
+        return None
+    start, end = parsed
+    if len(start_date) == 10 and len(end_date) == 10:
+        # Plain YYYY-MM-DD dates: whole weeks between the two Mondays.
+        first_week = week_number(start)
+        return first_week, week_number(end) - first_week + 1
+    return _plan_week_span(start, end)
+
+
+_plan_dates = attrgetter("planned_start_date", "planned_end_date", "project_context")
+_plan_ftes = attrgetter(*(f"{role}_fte" for role in ROLE_KEYS))
+
+
+def plan_fte_matrix(plans: list[RoadmapPlanItem]) -> np.ndarray:
+    """Built-in role FTE of every plan as a ``plans x ROLE_KEYS`` array.
+
+    None, NaN and negative values all collapse to 0.0, as in _safe_non_negative.
+    """
+    fte = np.array([_plan_ftes(plan) for plan in plans], dtype=np.float64).reshape(-1, len(ROLE_KEYS))
+    return np.fmax(fte, 0.0)
+
+
+@dataclass
+class PlanSchedule:
+    """Portfolio, week span and FTE vector of every plan with a usable date range.
+
+    Rows follow the order of the plan list; ``plan_index`` maps each row back
+    to its position in that list.
+    """
+
+    plan_index: np.ndarray
+    portfolio: np.ndarray
+    first_week: np.ndarray
+    span: np.ndarray
+    fte: np.ndarray
+    unscheduled_demand_items: int
+
+    @property
+    def last_week(self) -> int | None:
+        return int((self.first_week + self.span).max()) - 1 if self.span.size else None
+
+
+def schedule_plans(plans: list[RoadmapPlanItem], fte: np.ndarray | None = None) -> PlanSchedule:
+    """Parse every plan's week span once; ``fte`` overrides the built-in role columns."""
+    portfolio_index: dict[str, int] = {}
+    scheduled: list[int] = []
+    portfolios: list[int] = []
+    first_weeks: list[int] = []
+    spans: list[int] = []
+    unparsed: list[int] = []
+    for idx, (start_raw, end_raw, context) in enumerate(map(_plan_dates, plans)):
+        bounds = _plan_week_bounds(start_raw, end_raw)
+        if bounds is None:
+            unparsed.append(idx)
+            continue
+        first_week, span = bounds
+        if span <= 0:
             continue
-        start, end = parsed
-        portfolio = _norm_portfolio(plan.project_context)
-        for wk in _week_keys_between(start, end):
-            slot = usage[portfolio].setdefault(wk, {"fe": 0.0, "be": 0.0, "ai": 0.0, "pm": 0.0, "fs": 0.0})
-            for role in ROLE_KEYS:
-                slot[role] += role_values[role]
-    return usage, unscheduled_demand_items
+        if context not in portfolio_index:
+            portfolio_index[context] = PORTFOLIOS.index(_norm_portfolio(context))
+        scheduled.append(idx)
+        portfolios.append(portfolio_index[context])
+        first_weeks.append(first_week)
+        spans.append(span)
+
+    if fte is None:
+        fte = plan_fte_matrix(plans)
+    plan_index = np.asarray(scheduled, dtype=np.int64)
+    return PlanSchedule(
+        plan_index=plan_index,
+        portfolio=np.asarray(portfolios, dtype=np.int64),
+        first_week=np.asarray(first_weeks, dtype=np.int64),
+        span=np.asarray(spans, dtype=np.int64),
+        fte=fte[plan_index],
+        unscheduled_demand_items=int((fte[unparsed] > EPSILON).any(axis=1).sum()),
+    )
+
+
+def _booked_demand(
+    portfolio: np.ndarray,
+    first_week: np.ndarray,
+    span: np.ndarray,
+    fte: np.ndarray,
+    origin: int,
+    week_count: int,
+) -> np.ndarray:
+    """Demand of the given plans as a flat ``(portfolios * weeks) x roles`` array."""
+    cell_count = len(PORTFOLIOS) * week_count
+    demand = np.zeros((cell_count, fte.shape[1]))
+    if not span.size:
+        return demand
+
+    # Expand every plan into one cell index per covered week. Offsets within a
+    # plan come from a cumsum over the span lengths, so no Python loop is needed.
+    plan_of_cell = np.repeat(np.arange(span.size), span)
+    offsets = np.arange(int(span.sum())) - np.repeat(np.cumsum(span) - span, span)
+    cells = portfolio[plan_of_cell] * week_count + (first_week - origin)[plan_of_cell] + offsets
+
+    # bincount accumulates in input order (plan by plan), which keeps the sums
+    # bit-identical to adding each plan into its weekly slots one at a time.
+    weights = fte[plan_of_cell]
+    for r in range(fte.shape[1]):
+        demand[:, r] = np.bincount(cells, weights=weights[:, r], minlength=cell_count)
+    return demand
+
+
+def usage_from_schedule(
+    schedule: PlanSchedule,
+    origin: int | None = None,
+    week_count: int | None = None,
+) -> WeeklyUsage:
+    """Book a schedule onto a week grid; by default the grid just covers its plans."""
+    if origin is None:
+        origin = int(schedule.first_week.min()) if schedule.span.size else 0
+    if week_count is None:
+        week_count = schedule.last_week + 1 - origin if schedule.span.size else 0
+    demand = _booked_demand(schedule.portfolio, schedule.first_week, schedule.span, schedule.fte, origin, week_count)
+    return WeeklyUsage(
+        first_week=origin,
+        demand=demand.reshape(len(PORTFOLIOS), week_count, schedule.fte.shape[1]),
+        unscheduled_demand_items=schedule.unscheduled_demand_items,
+    )
+
+
+def build_weekly_usage(plans: list[RoadmapPlanItem]) -> WeeklyUsage:
+    return usage_from_schedule(schedule_plans(plans))
+
+
+def _capacity_matrix(cfg: GovernanceConfig, roles: RoleVectors | None = None) -> np.ndarray:
+    capacity = _weekly_capacity(cfg)
+    matrix = np.array([[capacity[portfolio][role] for role in ROLE_KEYS] for portfolio in PORTFOLIOS])
+    if roles is None or not roles.index.extra_keys:
+        return matrix
+    # Extra roles have no per-role quota columns and use the legacy global quotas.
+    quotas = np.array([float(cfg.quota_client), float(cfg.quota_internal), 0.0])
+    extra = np.maximum(0.0, np.outer(quotas, roles.extra_team * roles.extra_efficiency))
+    return np.hstack([matrix, extra])
+
+
+def _peak_index(values: np.ndarray) -> int:
+    """Position a sequential ``if v > best + EPSILON: best = v`` scan settles on.
+
+    Only strict running maxima can ever replace the best value, so the scan
+    is replayed over those few candidates instead of every cell. Returns -1
+    when nothing rises above zero.
+    """
+    if values.size == 0:
+        return -1
+    prior_max = np.maximum.accumulate(np.concatenate(([0.0], values)))[:-1]
+    best, best_idx = 0.0, -1
+    for idx in np.flatnonzero(values > prior_max):
+        if values[idx] > best + EPSILON:
+            best, best_idx = float(values[idx]), int(idx)
+    return best_idx
+
+
+def _role_peaks(usage: WeeklyUsage, capacity: np.ndarray, role_idx: int) -> tuple[dict | None, dict | None]:
+    """Worst shortage and highest utilization for one role across portfolios and weeks."""
+    week_count = usage.week_count
+    demand = usage.demand[:, :, role_idx].ravel()
+    cap = np.repeat(capacity[:, role_idx], week_count)
+    no_cap = cap <= EPSILON
+    has_demand = demand > EPSILON
+    with np.errstate(divide="ignore", invalid="ignore"):
+        util = np.where(no_cap, 0.0, (demand / cap) * 100.0)
+    required = np.where(no_cap, np.where(has_demand, demand, 0.0), np.maximum(0.0, demand - cap))
+    util_unbounded = no_cap & has_demand
+
+    def _cell(idx: int) -> dict:
+        portfolio_idx, week_idx = divmod(idx, week_count)
+        return {
+            "portfolio": PORTFOLIOS[portfolio_idx],
+            "peak_week": usage.week_key(week_idx),
+            "peak_demand_fte": float(demand[idx]),
+            "capacity_fte": float(cap[idx]),
+        }
+
+    shortage = None
+    shortage_idx = _peak_index(required)
+    if shortage_idx >= 0:
+        shortage = {
+            "required_extra_fte": float(required[shortage_idx]),
+            **_cell(shortage_idx),
+            "peak_utilization_pct": 0.0 if util_unbounded[shortage_idx] else float(util[shortage_idx]),
+        }
+
+    warning = None
+    warning_idx = _peak_index(np.where(util_unbounded, 0.0, util))
+    if warning_idx >= 0:
+        warning = {**_cell(warning_idx), "peak_utilization_pct": float(util[warning_idx])}
+    return shortage, warning
 
 
 def build_capacity_governance_alert(
     cfg: GovernanceConfig | None,
     plans: list[RoadmapPlanItem],
+    roles: RoleVectors | None = None,
 ) -> dict:
     if not cfg:
         return {
@@ -138,65 +394,29 @@ def build_capacity_governance_alert(
             "role_alerts": [],
         }
 
-    usage, unscheduled_demand_items = _weekly_usage(plans)
-    capacity = _weekly_capacity(cfg)
-    all_weeks = sorted({wk for p in PORTFOLIOS for wk in usage[p].keys()})
+    schedule = schedule_plans(plans, roles.plan_fte if roles else None)
+    role_keys = roles.index.keys if roles else ROLE_KEYS
+    return _alert_from_usage(usage_from_schedule(schedule), _capacity_matrix(cfg, roles), schedule.last_week, role_keys)
+
+
+def _alert_from_usage(
+    usage: WeeklyUsage,
+    capacity: np.ndarray,
+    last_week: int | None,
+    role_keys: tuple[str, ...] = ROLE_KEYS,
+) -> dict:
+    unscheduled_demand_items = usage.unscheduled_demand_items
+    last_week_key = _week_key(week_start(last_week)) if last_week is not None else ""
 
     role_alerts: list[dict] = []
     shortage_roles: list[str] = []
     warning_roles: list[str] = []
 
-    for role in ROLE_KEYS:
+    for role_idx, role in enumerate(role_keys):
         role_upper = role.upper()
-        best_shortage = {
-            "required_extra_fte": 0.0,
-            "portfolio": "internal",
-            "peak_week": "",
-            "peak_demand_fte": 0.0,
-            "capacity_fte": 0.0,
-            "peak_utilization_pct": 0.0,
-        }
-        best_warning = {
-            "portfolio": "internal",
-            "peak_week": "",
-            "peak_demand_fte": 0.0,
-            "capacity_fte": 0.0,
-            "peak_utilization_pct": 0.0,
-        }
+        best_shortage, best_warning = _role_peaks(usage, capacity, role_idx)
 
-        for portfolio in PORTFOLIOS:
-            cap = capacity[portfolio][role]
-            weeks = sorted(usage[portfolio].keys())
-            for wk in weeks:
-                demand = usage[portfolio][wk][role]
-                util_pct: float | None
-                if cap <= EPSILON:
-                    util_pct = None if demand > EPSILON else 0.0
-                    required = demand if demand > EPSILON else 0.0
-                else:
-                    util_pct = (demand / cap) * 100.0
-                    required = max(0.0, demand - cap)
-
-                if required > best_shortage["required_extra_fte"] + EPSILON:
-                    best_shortage = {
-                        "required_extra_fte": required,
-                        "portfolio": portfolio,
-                        "peak_week": wk,
-                        "peak_demand_fte": demand,
-                        "capacity_fte": cap,
-                        "peak_utilization_pct": util_pct or 0.0,
-                    }
-
-                if util_pct is not None and util_pct > best_warning["peak_utilization_pct"] + EPSILON:
-                    best_warning = {
-                        "portfolio": portfolio,
-                        "peak_week": wk,
-                        "peak_demand_fte": demand,
-                        "capacity_fte": cap,
-                        "peak_utilization_pct": util_pct,
-                    }
-
-        if best_shortage["required_extra_fte"] > EPSILON:
+        if best_shortage:
             shortage_roles.append(role_upper)
             role_alerts.append(
                 {
@@ -212,7 +432,7 @@ def build_capacity_governance_alert(
                     else None,
                 }
             )
-        elif best_warning["peak_utilization_pct"] >= WARNING_UTILIZATION_THRESHOLD - EPSILON:
+        elif best_warning and best_warning["peak_utilization_pct"] >= WARNING_UTILIZATION_THRESHOLD - EPSILON:
             warning_roles.append(role_upper)
             role_alerts.append(
                 {
@@ -232,7 +452,7 @@ def build_capacity_governance_alert(
                     "role": role_upper,
                     "status": "OK",
                     "portfolio": "",
-                    "peak_week": all_weeks[-1] if all_weeks else "",
+                    "peak_week": last_week_key,
                     "peak_demand_fte": 0.0,
                     "capacity_fte": 0.0,
                     "required_extra_fte": 0.0,
@@ -271,3 +491,123 @@ def build_capacity_governance_alert(
         "unscheduled_demand_items": unscheduled_demand_items,
         "role_alerts": role_alerts,
     }
+
+
+@dataclass
+class CapacityScenario:
+    """What-if deltas applied on top of the current plans and governance config.
+
+    ``team_deltas`` adds (or removes) headcount per role, ``quota_overrides``
+    sets portfolio quotas either for every role (``"client"``) or for one role
+    (``"be_client"``), and ``plan_shifts`` moves plan items by a number of
+    weeks, keyed by plan item id.
+    """
+
+    name: str
+    team_deltas: dict[str, int] = field(default_factory=dict)
+    quota_overrides: dict[str, float] = field(default_factory=dict)
+    plan_shifts: dict[int, int] = field(default_factory=dict)
+
+
+_CAPACITY_FIELDS = (
+    *(f"{prefix}_{role}" for prefix in ("team", "efficiency") for role in ROLE_KEYS),
+    *(f"quota_{role}_{portfolio}" for role in ROLE_KEYS for portfolio in PORTFOLIOS),
+    "quota_client",
+    "quota_internal",
+)
+
+
+def _scenario_config(
+    cfg: GovernanceConfig,
+    scenario: CapacityScenario,
+    roles: RoleVectors | None = None,
+) -> tuple[SimpleNamespace, RoleVectors | None]:
+    values = {key: getattr(cfg, key) for key in _CAPACITY_FIELDS if hasattr(cfg, key)}
+    extra_keys = roles.index.extra_keys if roles else ()
+    extra_team = roles.extra_team.copy() if roles else None
+    for role, delta in scenario.team_deltas.items():
+        if role in extra_keys:
+            position = extra_keys.index(role)
+            extra_team[position] = max(0, int(extra_team[position]) + int(delta))
+            continue
+        if role not in ROLE_KEYS:
+            raise ValueError(f"Unknown role '{role}' in scenario '{scenario.name}'.")
+        values[f"team_{role}"] = max(0, int(values.get(f"team_{role}") or 0) + int(delta))
+    for key, quota in scenario.quota_overrides.items():
+        if key in PORTFOLIOS:
+            targets = [f"quota_{role}_{key}" for role in ROLE_KEYS]
+            if key != "rnd":
+                targets.append(f"quota_{key}")
+        elif key.partition("_")[0] in ROLE_KEYS and key.partition("_")[2] in PORTFOLIOS:
+            targets = [f"quota_{key}"]
+        else:
+            raise ValueError(f"Unknown quota '{key}' in scenario '{scenario.name}'.")
+        for target in targets:
+            values[target] = max(0.0, float(quota))
+    if roles is not None:
+        roles = RoleVectors(roles.index, roles.plan_fte, extra_team, roles.extra_efficiency)
+    return SimpleNamespace(**values), roles
+
+
+def simulate_capacity_scenarios(
+    cfg: GovernanceConfig,
+    plans: list[RoadmapPlanItem],
+    scenarios: list[CapacityScenario],
+    roles: RoleVectors | None = None,
+) -> tuple[dict, list[dict]]:
+    """Baseline alert plus one alert per scenario, without touching the database.
+
+    The plans are parsed and booked once onto a week grid wide enough for
+    every shifted plan. Each scenario then only re-books the plans it moves
+    and rebuilds the capacity matrix from its config overrides.
+    """
+    schedule = schedule_plans(plans, roles.plan_fte if roles else None)
+    role_keys = roles.index.keys if roles else ROLE_KEYS
+    row_of_plan = {plans[int(idx)].id: row for row, idx in enumerate(schedule.plan_index)}
+    scenario_moves: list[tuple[np.ndarray, np.ndarray]] = []
+    for scenario in scenarios:
+        rows: list[int] = []
+        weeks: list[int] = []
+        for plan_id, shift in scenario.plan_shifts.items():
+            # Unscheduled plans have no weeks to move and are left as they are.
+            if shift and plan_id in row_of_plan:
+                rows.append(row_of_plan[plan_id])
+                weeks.append(int(shift))
+        scenario_moves.append((np.asarray(rows, dtype=np.int64), np.asarray(weeks, dtype=np.int64)))
+
+    origin = int(schedule.first_week.min()) if schedule.span.size else 0
+    end = schedule.last_week + 1 if schedule.span.size else 0
+    for rows, weeks in scenario_moves:
+        if rows.size:
+            shifted = schedule.first_week[rows] + weeks
+            origin = min(origin, int(shifted.min()))
+            end = max(end, int((shifted + schedule.span[rows]).max()))
+    base = usage_from_schedule(schedule, origin=origin, week_count=end - origin)
+    baseline = _alert_from_usage(base, _capacity_matrix(cfg, roles), schedule.last_week, role_keys)
+
+    results: list[dict] = []
+    for scenario, (rows, weeks) in zip(scenarios, scenario_moves):
+        usage, last_week = base, schedule.last_week
+        if rows.size:
+            portfolio, first, span, fte = (
+                schedule.portfolio[rows],
+                schedule.first_week[rows],
+                schedule.span[rows],
+                schedule.fte[rows],
+            )
+            demand = base.demand.reshape(-1, len(role_keys)).copy()
+            demand -= _booked_demand(portfolio, first, span, fte, base.first_week, base.week_count)
+            demand += _booked_demand(portfolio, first + weeks, span, fte, base.first_week, base.week_count)
+            usage = WeeklyUsage(
+                first_week=base.first_week,
+                # Clear the rounding residue left in weeks a moved plan vacated.
+                demand=np.where(np.abs(demand) <= EPSILON, 0.0, demand).reshape(base.demand.shape),
+                unscheduled_demand_items=base.unscheduled_demand_items,
+            )
+            last_weeks = schedule.first_week + schedule.span - 1
+            last_weeks[rows] += weeks
+            last_week = int(last_weeks.max())
+        scenario_cfg, scenario_roles = _scenario_config(cfg, scenario, roles)
+        capacity = _capacity_matrix(scenario_cfg, scenario_roles)
+        results.append(_alert_from_usage(usage, capacity, last_week, role_keys))
+    return baseline, results
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.capacity_week_lock import CapacityWeekLock
+
+ANNUAL_POOL_KEY = "annual"
+LOCK_RETRY_ATTEMPTS = 5
+LOCK_RETRY_BACKOFF_SECONDS = 0.05
+
+# deadlock_detected, serialization_failure, lock_not_available
+_RETRYABLE_PGCODES = {"40P01", "40001", "55P03"}
+
+
+class CapacityLockUnavailable(Exception):
+    pass
+
+
+def lock_capacity_buckets(db: Session, buckets: Iterable[tuple[str, str]]) -> dict[tuple[str, str], int]:
+    """Row-lock the (portfolio, week_key) buckets a commit is about to book.
+
+    Call this before reading usage for validation. The rows stay locked until
+    the caller's transaction ends, so two commits that share a week serialize
+    while commits to disjoint weeks never wait on each other. Rows are created
+    on first use and always locked in sorted order; deadlocks and lock
+    timeouts roll back to a savepoint and retry with backoff.
+
+    Returns the bumped version of every locked bucket.
+    """
+    keys = sorted(set(buckets))
+    if not keys:
+        return {}
+
+    for attempt in range(LOCK_RETRY_ATTEMPTS):
+        savepoint = db.begin_nested()
+        try:
+            db.execute(
+                insert(CapacityWeekLock)
+                .values([{"portfolio": portfolio, "week_key": week_key, "version": 0} for portfolio, week_key in keys])
+                .on_conflict_do_nothing(index_elements=["portfolio", "week_key"])
+            )
+            rows = db.execute(
+                select(CapacityWeekLock)
+                .where(tuple_(CapacityWeekLock.portfolio, CapacityWeekLock.week_key).in_(keys))
+                .order_by(CapacityWeekLock.portfolio, CapacityWeekLock.week_key)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            ).scalars().all()
+            versions: dict[tuple[str, str], int] = {}
+            for row in rows:
+                row.version = int(row.version or 0) + 1
+                versions[(row.portfolio, row.week_key)] = row.version
+            db.flush()
+            savepoint.commit()
+            return versions
+        except OperationalError as exc:
+            savepoint.rollback()
+            if getattr(exc.orig, "pgcode", None) not in _RETRYABLE_PGCODES:
+                raise
+            time.sleep(LOCK_RETRY_BACKOFF_SECONDS * (2**attempt))
+
+    raise CapacityLockUnavailable(
+        "Capacity for the selected weeks is being committed by another request. Please retry."
+    )
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.fte_role import FteRole
+from app.models.governance_config import GovernanceConfig
+from app.models.governance_config_fte import GovernanceConfigFte
+from app.models.roadmap_item_fte import RoadmapItemFte, RoadmapPlanItemFte
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.services.capacity_governance import ROLE_KEYS, RoleIndex, RoleVectors, plan_fte_matrix
+
+
+def load_role_index(db: Session) -> RoleIndex:
+    """Built-in roles plus every other active FTE role, by display order."""
+    rows = db.execute(
+        select(FteRole.id, FteRole.abbreviation)
+        .where(FteRole.is_active.is_(True))
+        .order_by(FteRole.display_order, FteRole.name)
+    ).all()
+    extra = [(role_id, abbreviation.strip().lower()) for role_id, abbreviation in rows]
+    extra = [(role_id, key) for role_id, key in extra if key and key not in ROLE_KEYS]
+    return RoleIndex(
+        keys=ROLE_KEYS + tuple(key for _, key in extra),
+        extra_role_ids=tuple(role_id for role_id, _ in extra),
+    )
+
+
+def load_role_vectors(
+    db: Session,
+    cfg: GovernanceConfig | None,
+    plans: list[RoadmapPlanItem],
+    index: RoleIndex,
+) -> RoleVectors:
+    """Plan FTE and extra-role capacity for ``index``, one query per table.
+
+    Built-in roles still come from the plan and governance columns; only the
+    extra roles are read from ``roadmap_plan_item_fte`` and
+    ``governance_config_fte``.
+    """
+    fte = plan_fte_matrix(plans)
+    extra_count = len(index.extra_role_ids)
+    extra_team = np.zeros(extra_count)
+    extra_efficiency = np.zeros(extra_count)
+    if not extra_count:
+        return RoleVectors(index, fte, extra_team, extra_efficiency)
+
+    column_of_role = {role_id: len(ROLE_KEYS) + pos for pos, role_id in enumerate(index.extra_role_ids)}
+    fte = np.hstack([fte, np.zeros((len(plans), extra_count))])
+    if plans:
+        row_of_plan = {plan.id: row for row, plan in enumerate(plans)}
+        allocations = db.execute(
+            select(RoadmapPlanItemFte.roadmap_plan_item_id, RoadmapPlanItemFte.fte_role_id, RoadmapPlanItemFte.fte_value)
+            .where(RoadmapPlanItemFte.fte_role_id.in_(index.extra_role_ids))
+        ).all()
+        for plan_id, role_id, value in allocations:
+            row = row_of_plan.get(plan_id)
+            if row is not None:
+                fte[row, column_of_role[role_id]] = max(0.0, float(value or 0.0))
+
+    if cfg is not None:
+        team_rows = db.execute(
+            select(GovernanceConfigFte.fte_role_id, GovernanceConfigFte.team_size, GovernanceConfigFte.efficiency_factor)
+            .where(
+                GovernanceConfigFte.governance_config_id == cfg.id,
+                GovernanceConfigFte.fte_role_id.in_(index.extra_role_ids),
+            )
+        ).all()
+        for role_id, team_size, efficiency in team_rows:
+            pos = column_of_role[role_id] - len(ROLE_KEYS)
+            extra_team[pos] = max(0, int(team_size or 0))
+            extra_efficiency[pos] = float(efficiency or 0.0)
+    return RoleVectors(index, fte, extra_team, extra_efficiency)
+
+
+def load_plan_extra_fte(db: Session, index: RoleIndex, plan_item_id: int) -> dict[str, float]:
+    """Extra-role FTE of one plan item, keyed by role key."""
+    if not index.extra_role_ids:
+        return {}
+    key_of_role = dict(zip(index.extra_role_ids, index.extra_keys))
+    rows = db.execute(
+        select(RoadmapPlanItemFte.fte_role_id, RoadmapPlanItemFte.fte_value).where(
+            RoadmapPlanItemFte.roadmap_plan_item_id == plan_item_id,
+            RoadmapPlanItemFte.fte_role_id.in_(index.extra_role_ids),
+        )
+    ).all()
+    return {key_of_role[role_id]: float(value or 0.0) for role_id, value in rows}
+
+
+def load_bucket_extra_fte(db: Session, index: RoleIndex, roadmap_item_ids: list[int]) -> dict[int, dict[str, float]]:
+    """Extra-role FTE of several bucket items in one query, keyed by item id then role key."""
+    if not index.extra_role_ids or not roadmap_item_ids:
+        return {}
+    key_of_role = dict(zip(index.extra_role_ids, index.extra_keys))
+    rows = db.execute(
+        select(RoadmapItemFte.roadmap_item_id, RoadmapItemFte.fte_role_id, RoadmapItemFte.fte_value).where(
+            RoadmapItemFte.roadmap_item_id.in_(roadmap_item_ids),
+            RoadmapItemFte.fte_role_id.in_(index.extra_role_ids),
+        )
+    ).all()
+    out: dict[int, dict[str, float]] = {}
+    for item_id, role_id, value in rows:
+        out.setdefault(item_id, {})[key_of_role[role_id]] = float(value or 0.0)
+    return out
+
+
+def store_plan_extra_fte(db: Session, index: RoleIndex, plan_item_id: int, values: dict[str, float]) -> None:
+    """Replace a plan item's extra-role FTE rows with ``values`` (keyed by role key)."""
+    if not index.extra_role_ids:
+        return
+    db.execute(
+        delete(RoadmapPlanItemFte).where(
+            RoadmapPlanItemFte.roadmap_plan_item_id == plan_item_id,
+            RoadmapPlanItemFte.fte_role_id.in_(index.extra_role_ids),
+        )
+    )
+    role_of_key = dict(zip(index.extra_keys, index.extra_role_ids))
+    for key, value in values.items():
+        if key in role_of_key:
+            db.add(RoadmapPlanItemFte(roadmap_plan_item_id=plan_item_id, fte_role_id=role_of_key[key], fte_value=value))
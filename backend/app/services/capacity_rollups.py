@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import delete, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.capacity_rollup import CapacityPlanFootprint, CapacityWeekRollup
+from app.models.governance_config import GovernanceConfig
+from app.models.maintenance_job import MaintenanceJob
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.services.capacity_governance import (
+    EPSILON,
+    PORTFOLIOS,
+    RoleIndex,
+    _capacity_matrix,
+    _week_key,
+    schedule_plans,
+    week_number,
+    week_start,
+)
+from app.services.capacity_roles import load_role_index, load_role_vectors
+
+HEATMAP_GRANULARITIES = ("week", "month", "quarter")
+# maintenance_jobs row marking the rollups as built for the current role set.
+ROLLUP_BUILD_JOB = "capacity_rollup_build"
+# Serializes full builds and invalidations; any constant unique to this table set works.
+_ROLLUP_ADVISORY_LOCK = 7_300_331
+
+
+def _footprint(portfolio: str, first_week: int, span: int, fte: dict[str, float]) -> tuple:
+    return portfolio, first_week, span, tuple(sorted(fte.items()))
+
+
+def _add_footprint(delta: dict[tuple[str, int, str], float], footprint: tuple, sign: float) -> None:
+    portfolio, first_week, span, fte = footprint
+    for week in range(first_week, first_week + span):
+        for role, value in fte:
+            delta[portfolio, week, role] += sign * value
+
+
+def refresh_capacity_rollups(db: Session, plan_ids: Iterable[int], index: RoleIndex | None = None) -> int:
+    """Apply the rollup change of the plan items ``plan_ids`` after they were created, edited or deleted.
+
+    Each plan's portfolio, weeks and FTE are compared with the footprint
+    stored at its last refresh; where they differ, the old footprint is
+    subtracted from the weekly cells it covered and the new one added. Only
+    those cells are upserted, so a write costs its own weeks however many
+    plans exist. Concurrent writers add their deltas to shared cells in turn
+    under the row locks, and the capacity week locks already order writers
+    to the same weeks, so no global lock is taken. Call it in the same
+    transaction as the plan write, after the change, with every plan id it
+    touched; it flushes the session first.
+
+    Returns the number of (portfolio, week) cells changed.
+    """
+    db.flush()
+    plan_ids = sorted(set(plan_ids))
+    if not plan_ids:
+        return 0
+    if index is None:
+        index = load_role_index(db)
+    plans = db.query(RoadmapPlanItem).filter(RoadmapPlanItem.id.in_(plan_ids)).order_by(RoadmapPlanItem.id.asc()).all()
+    schedule = schedule_plans(plans, load_role_vectors(db, None, plans, index).plan_fte)
+
+    current: dict[int, tuple] = {}
+    for row, idx in enumerate(schedule.plan_index):
+        fte = {key: float(value) for key, value in zip(index.keys, schedule.fte[row]) if value > EPSILON}
+        if fte:
+            portfolio = PORTFOLIOS[int(schedule.portfolio[row])]
+            current[plans[int(idx)].id] = _footprint(
+                portfolio, int(schedule.first_week[row]), int(schedule.span[row]), fte
+            )
+    # Locked so two writers of one plan cannot both subtract the same old footprint.
+    stored = {
+        footprint.plan_item_id: footprint
+        for footprint in db.query(CapacityPlanFootprint)
+        .filter(CapacityPlanFootprint.plan_item_id.in_(plan_ids))
+        .order_by(CapacityPlanFootprint.plan_item_id.asc())
+        .with_for_update()
+    }
+
+    delta: dict[tuple[str, int, str], float] = defaultdict(float)
+    for plan_id in plan_ids:
+        new = current.get(plan_id)
+        old_row = stored.get(plan_id)
+        old = (
+            _footprint(old_row.portfolio, old_row.first_week, old_row.span, old_row.fte or {})
+            if old_row is not None
+            else None
+        )
+        if new == old:
+            continue
+        if old is not None:
+            _add_footprint(delta, old, -1.0)
+        if new is None:
+            db.delete(old_row)
+            continue
+        _add_footprint(delta, new, 1.0)
+        if old_row is None:
+            old_row = CapacityPlanFootprint(plan_item_id=plan_id)
+            db.add(old_row)
+        old_row.portfolio, old_row.first_week, old_row.span = new[:3]
+        old_row.fte = dict(new[3])
+    if not delta:
+        return 0
+
+    # Sorted, so concurrent writers lock shared cells in the same order.
+    cells = sorted(delta)
+    now = datetime.utcnow()
+    insert = pg_insert(CapacityWeekRollup.__table__)
+    db.execute(
+        insert.on_conflict_do_update(
+            constraint="uq_capacity_week_rollup",
+            set_={
+                "demand_fte": CapacityWeekRollup.__table__.c.demand_fte + insert.excluded.demand_fte,
+                "updated_at": insert.excluded.updated_at,
+            },
+        ),
+        [
+            {"portfolio": cell[0], "week": cell[1], "role": cell[2], "demand_fte": delta[cell], "updated_at": now}
+            for cell in cells
+        ],
+    )
+    # Cells with no demand have no row; only cells that lost demand can have drained.
+    drained = [cell for cell in cells if delta[cell] < 0]
+    if drained:
+        db.execute(
+            delete(CapacityWeekRollup).where(
+                tuple_(CapacityWeekRollup.portfolio, CapacityWeekRollup.week, CapacityWeekRollup.role).in_(drained),
+                CapacityWeekRollup.demand_fte <= EPSILON,
+            )
+        )
+    return len({(portfolio, week) for portfolio, week, _ in cells})
+
+
+def plan_ids_of_items(db: Session, roadmap_item_ids: Iterable[int]) -> list[int]:
+    """Ids of the plans committed from ``roadmap_item_ids``; read them before deleting the plans, to refresh."""
+    return list(
+        db.execute(
+            select(RoadmapPlanItem.id).where(RoadmapPlanItem.bucket_item_id.in_(list(roadmap_item_ids)))
+        ).scalars()
+    )
+
+
+def invalidate_capacity_rollups(db: Session) -> None:
+    """Have the next heatmap read rebuild every plan's rollups.
+
+    Call it in the transaction of any write that changes plan demand outside
+    ``refresh_capacity_rollups``: activating, deactivating or renaming an FTE
+    role, or bulk-writing extra-role plan FTE. Takes the build lock, so a
+    build running concurrently cannot mark the old role set as current.
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ROLLUP_ADVISORY_LOCK})
+    db.query(MaintenanceJob).filter(MaintenanceJob.name == ROLLUP_BUILD_JOB).update(
+        {"completed_at": None}, synchronize_session=False
+    )
+
+
+def _ensure_rollups(db: Session) -> None:
+    """Roll up every plan unless ``ROLLUP_BUILD_JOB`` records a completed build.
+
+    Plan writes refresh their own footprints from deploy on, so the presence
+    of footprints says nothing about the plans that existed before; only the
+    job row does. Every plan and every stored footprint is refreshed, which
+    adds plans never rolled up, re-applies plans whose roles changed and
+    clears footprints of plans deleted since. Commits.
+    """
+    job = db.get(MaintenanceJob, ROLLUP_BUILD_JOB)
+    if job is not None and job.completed_at is not None:
+        return
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ROLLUP_ADVISORY_LOCK})
+    # Another request may have built them while this one waited for the lock.
+    job = db.get(MaintenanceJob, ROLLUP_BUILD_JOB, populate_existing=True)
+    if job is not None and job.completed_at is not None:
+        db.commit()
+        return
+    plan_ids = {plan_id for (plan_id,) in db.query(RoadmapPlanItem.id)}
+    plan_ids.update(plan_id for (plan_id,) in db.query(CapacityPlanFootprint.plan_item_id))
+    # The role set is read under the lock, after any invalidation that held it.
+    refresh_capacity_rollups(db, plan_ids)
+    now = datetime.utcnow()
+    if job is None:
+        job = MaintenanceJob(name=ROLLUP_BUILD_JOB, started_at=now)
+        db.add(job)
+    job.processed, job.failed, job.remaining, job.completed_at = len(plan_ids), 0, 0, now
+    db.commit()
+
+
+def _iso_year_weeks(year: int) -> tuple[int, int]:
+    """First and last week number of an ISO year (the weeks holding Jan 4 and Dec 28)."""
+    return week_number(date(year, 1, 4)), week_number(date(year, 12, 28))
+
+
+def _period_labels(first: int, last: int, granularity: str) -> tuple[list[str], np.ndarray]:
+    """Label of every period and the period position of each week in ``first..last``.
+
+    A week belongs to the month of its Thursday, as ISO weeks belong to years.
+    """
+    labels: list[str] = []
+    period_of_week = []
+    for week in range(first, last + 1):
+        monday = week_start(week)
+        thursday = monday + timedelta(days=3)
+        if granularity == "week":
+            label = _week_key(monday)
+        elif granularity == "month":
+            label = f"{thursday.year}-{thursday.month:02d}"
+        else:
+            label = f"{thursday.year}-Q{(thursday.month - 1) // 3 + 1}"
+        if not labels or labels[-1] != label:
+            labels.append(label)
+        period_of_week.append(len(labels) - 1)
+    return labels, np.asarray(period_of_week, dtype=np.int64)
+
+
+def build_capacity_heatmap(
+    db: Session,
+    cfg: GovernanceConfig,
+    index: RoleIndex,
+    year: int,
+    granularity: str = "week",
+    portfolio: str | None = None,
+    role: str | None = None,
+) -> dict:
+    """Demand and utilization per portfolio/role for one ISO year, read from the rollups.
+
+    Month and quarter cells are derived from the weekly rows: ``demand_fte``
+    is the average weekly demand over the period and ``peak_demand_fte`` /
+    ``utilization_pct`` its busiest week, so a short overload is not averaged
+    away. Utilization is ``None`` where a role has no capacity.
+    """
+    if granularity not in HEATMAP_GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(HEATMAP_GRANULARITIES)}.")
+    portfolios = [portfolio] if portfolio else list(PORTFOLIOS)
+    roles = [role] if role else list(index.keys)
+    if any(value not in PORTFOLIOS for value in portfolios):
+        raise ValueError(f"portfolio must be one of: {', '.join(PORTFOLIOS)}.")
+    if any(value not in index.keys for value in roles):
+        raise ValueError(f"role must be one of: {', '.join(index.keys)}.")
+
+    _ensure_rollups(db)
+    first, last = _iso_year_weeks(year)
+    labels, period_of_week = _period_labels(first, last, granularity)
+    demand = np.zeros((len(portfolios), last - first + 1, len(roles)))
+    rows = db.execute(
+        select(CapacityWeekRollup.portfolio, CapacityWeekRollup.week, CapacityWeekRollup.role, CapacityWeekRollup.demand_fte)
+        .where(
+            CapacityWeekRollup.week.between(first, last),
+            CapacityWeekRollup.portfolio.in_(portfolios),
+            CapacityWeekRollup.role.in_(roles),
+        )
+    ).all()
+    for row_portfolio, week, row_role, value in rows:
+        demand[portfolios.index(row_portfolio), week - first, roles.index(row_role)] = value
+
+    capacity_matrix = _capacity_matrix(cfg, load_role_vectors(db, cfg, [], index))
+    weeks_per_period = np.bincount(period_of_week, minlength=len(labels))
+    starts = np.flatnonzero(np.diff(period_of_week, prepend=-1))
+    out_rows = []
+    for p, portfolio_key in enumerate(portfolios):
+        for r, role_key in enumerate(roles):
+            capacity = float(capacity_matrix[PORTFOLIOS.index(portfolio_key), index.keys.index(role_key)])
+            weekly = demand[p, :, r]
+            average = np.bincount(period_of_week, weights=weekly, minlength=len(labels)) / weeks_per_period
+            peak = np.maximum.reduceat(weekly, starts)
+            out_rows.append(
+                {
+                    "portfolio": portfolio_key,
+                    "role": role_key,
+                    "capacity_fte": round(capacity, 4),
+                    "demand_fte": [round(float(v), 4) for v in average],
+                    "peak_demand_fte": [round(float(v), 4) for v in peak],
+                    "utilization_pct": [
+                        round(float(v) / capacity * 100.0, 2) if capacity > EPSILON else None for v in peak
+                    ],
+                }
+            )
+    return {"year": year, "granularity": granularity, "periods": labels, "rows": out_rows}
+
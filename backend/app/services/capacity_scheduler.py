@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.services.capacity_governance import WeeklyUsage
+
+# Same tolerance _capacity_validate_timeline applies to "> 100%".
+UTILIZATION_TOLERANCE_PCT = 1e-9
+
+
+@dataclass
+class FeasibleSlot:
+    start_week: int
+    end_week: int
+    peak_utilization_pct: list[float]
+
+
+def find_feasible_slots(
+    usage: WeeklyUsage,
+    portfolio_idx: int,
+    role_idx: list[int],
+    capacity: np.ndarray,
+    proposed: np.ndarray,
+    duration_weeks: int,
+    earliest_week: int,
+    horizon_weeks: int,
+    limit: int,
+) -> list[FeasibleSlot]:
+    """Earliest ``limit`` start weeks where the proposed FTE fits for every role.
+
+    ``capacity`` and ``proposed`` are weekly FTE per role in ``role_idx``
+    order; weeks are week numbers as used by ``WeeklyUsage``.
+
+    A week is blocked when any role would breach its weekly limit, using the
+    same rule as the timeline validator: over 100% utilization, or any demand
+    against a role with no capacity. A start week is feasible when none of the
+    ``duration_weeks`` it covers are blocked, which a prefix sum over blocked
+    weeks answers for every candidate start at once.
+    """
+    if duration_weeks <= 0 or horizon_weeks <= 0 or limit <= 0:
+        return []
+
+    span = horizon_weeks + duration_weeks - 1
+    existing = np.zeros((span, len(role_idx)))
+    lo = max(earliest_week, usage.first_week)
+    hi = min(earliest_week + span, usage.first_week + usage.week_count)
+    if lo < hi:
+        profile = usage.demand[portfolio_idx][:, role_idx]
+        existing[lo - earliest_week : hi - earliest_week] = profile[lo - usage.first_week : hi - usage.first_week]
+
+    booked = existing + proposed
+    no_capacity = capacity <= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        util = np.where(no_capacity, 0.0, (booked / capacity) * 100.0)
+    breach = np.where(no_capacity, booked > 0, util > 100.0 + UTILIZATION_TOLERANCE_PCT)
+
+    blocked = np.concatenate(([0], np.cumsum(breach.any(axis=1))))
+    starts = np.arange(horizon_weeks)
+    feasible = np.flatnonzero(blocked[starts + duration_weeks] - blocked[starts] == 0)[:limit]
+    if feasible.size == 0:
+        return []
+
+    window_peak = sliding_window_view(util, duration_weeks, axis=0).max(axis=-1)[feasible]
+    return [
+        FeasibleSlot(
+            start_week=earliest_week + int(start),
+            end_week=earliest_week + int(start) + duration_weeks - 1,
+            peak_utilization_pct=[float(v) for v in peaks],
+        )
+        for start, peaks in zip(feasible, window_peak)
+    ]
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import select as select_module
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import literal_column, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.db.session import engine
+from app.models.change_event import ChangeEvent
+from app.models.maintenance_job import MaintenanceJob
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_CHANNEL = "change_feed"
+DEFAULT_FEED_LIMIT = 200
+MAX_FEED_LIMIT = 1000
+PRUNE_JOB = "change_feed_prune"
+# Transactions below this id have all finished, so every event they wrote is visible.
+_HORIZON = literal_column("(pg_snapshot_xmin(pg_current_snapshot())::text)::bigint")
+
+
+@dataclass
+class FeedPage:
+    events: list[ChangeEvent]
+    cursor: str
+    reset: bool = False
+
+
+def record_change(db: Session, entity_type: str, entity_id: int, version_no: int | None, action: str) -> None:
+    """Add a change event to the session, so it commits or rolls back with the change."""
+    db.add(ChangeEvent(entity_type=entity_type, entity_id=entity_id, version_no=version_no, action=action))
+
+
+def encode_feed_cursor(txid: int, event_id: int) -> str:
+    return f"{txid}-{event_id}"
+
+
+def decode_feed_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        txid, event_id = (int(part) for part in cursor.split("-"))
+    except ValueError:
+        raise ValueError("Invalid change feed cursor") from None
+    return txid, event_id
+
+
+def event_cursor(event: ChangeEvent) -> str:
+    """The cursor to resume from right after ``event``."""
+    return encode_feed_cursor(event.txid, event.id)
+
+
+def head_cursor(db: Session) -> str:
+    """A cursor for "from now on": skips every event already settled, delivers everything after."""
+    return encode_feed_cursor(db.execute(select(_HORIZON)).scalar_one(), 0)
+
+
+def _oldest_key(db: Session) -> tuple[int, int] | None:
+    row = db.execute(
+        select(ChangeEvent.txid, ChangeEvent.id).order_by(ChangeEvent.txid.asc(), ChangeEvent.id.asc()).limit(1)
+    ).first()
+    return tuple(row) if row else None
+
+
+def _pruned_past(db: Session, key: tuple[int, int]) -> bool:
+    """Whether events after ``key`` may have been pruned before the reader saw them."""
+    job = db.get(MaintenanceJob, PRUNE_JOB)
+    if job is None or not job.processed:
+        return False
+    oldest = _oldest_key(db)
+    return oldest is not None and key < oldest
+
+
+def read_changes(db: Session, cursor: str, limit: int = DEFAULT_FEED_LIMIT) -> FeedPage:
+    """Settled events after ``cursor``, oldest first, and the cursor to continue from.
+
+    ``reset`` means the cursor is older than the retained feed; the client
+    should reload its lists in full and continue from the returned cursor.
+    Raises ``ValueError`` for a malformed cursor.
+    """
+    key = decode_feed_cursor(cursor)
+    if _pruned_past(db, key):
+        return FeedPage(events=[], cursor=head_cursor(db), reset=True)
+    horizon = db.execute(select(_HORIZON)).scalar_one()
+    events = list(
+        db.execute(
+            select(ChangeEvent)
+            .where(
+                tuple_(ChangeEvent.txid, ChangeEvent.id) > tuple_(*key),
+                ChangeEvent.txid < horizon,
+            )
+            .order_by(ChangeEvent.txid.asc(), ChangeEvent.id.asc())
+            .limit(limit)
+        ).scalars()
+    )
+    if len(events) == limit:
+        return FeedPage(events=events, cursor=event_cursor(events[-1]))
+    # Everything settled past the cursor has been read, so the cursor can
+    # move up to the horizon and skip the range on the next read.
+    last = (events[-1].txid, events[-1].id) if events else key
+    return FeedPage(events=events, cursor=encode_feed_cursor(*max(last, (horizon, 0))))
+
+
+def prune_change_feed(db: Session, retention: timedelta) -> int:
+    """Delete events older than ``retention``. Commits; returns the number deleted.
+
+    The newest event is always kept, so a reader can tell a cursor that
+    predates the retained feed from one that is merely idle.
+    """
+    newest = db.execute(
+        select(ChangeEvent.txid, ChangeEvent.id).order_by(ChangeEvent.txid.desc(), ChangeEvent.id.desc()).limit(1)
+    ).first()
+    if newest is None:
+        return 0
+    deleted = (
+        db.query(ChangeEvent)
+        .filter(
+            ChangeEvent.created_at < datetime.utcnow() - retention,
+            tuple_(ChangeEvent.txid, ChangeEvent.id) < tuple_(*newest),
+        )
+        .delete(synchronize_session=False)
+    )
+    if deleted:
+        job = db.get(MaintenanceJob, PRUNE_JOB)
+        if job is None:
+            job = MaintenanceJob(name=PRUNE_JOB, processed=0, failed=0, remaining=0)
+            db.add(job)
+        job.processed += deleted
+    db.commit()
+    return deleted
+
+
+class ChangeFeedListener:
+    """One ``LISTEN change_feed`` connection per process, shared by every waiting feed reader.
+
+    Readers note ``generation()``, read the feed, and if it had nothing new
+    await ``wait()``, which returns as soon as any worker commits a change.
+    Waiting happens on the readers' event loop, so an idle feed holds no
+    worker thread. The connection is opened on first use and reopened if it
+    drops.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._thread: threading.Thread | None = None
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="change-feed-listener", daemon=True)
+                self._thread.start()
+
+    def _signal(self) -> None:
+        with self._lock:
+            self._generation += 1
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The waiter's loop has closed; it is not waiting any more.
+                pass
+
+    def _listen(self) -> None:
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        connection = engine.dialect.dbapi.connect(*cargs, **cparams)
+        try:
+            connection.autocommit = True
+            connection.cursor().execute(f"LISTEN {CHANGE_FEED_CHANNEL}")
+            # Changes made while the connection was down were not notified.
+            self._signal()
+            while True:
+                if select_module.select([connection], [], [], 60) == ([], [], []):
+                    continue
+                connection.poll()
+                if connection.notifies:
+                    connection.notifies.clear()
+                    self._signal()
+        finally:
+            connection.close()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Change feed listener failed; reconnecting")
+                time.sleep(5)
+
+    def generation(self) -> int:
+        self._ensure_started()
+        return self._generation
+
+    async def wait(self, generation: int, timeout: float) -> bool:
+        """Wait until a change is notified after ``generation``, or ``timeout`` seconds; True if notified."""
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            if self._generation != generation:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+change_feed_listener = ChangeFeedListener()
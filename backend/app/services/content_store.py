@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import exists, text
+from sqlalchemy.orm import Session
+
+from app.models.document import Document
+from app.models.document_preview import DocumentPreview
+from app.models.maintenance_job import MaintenanceJob
+from app.services.file_storage import adopt_file, hash_file, is_blob_path
+
+INTEGRITY_OK = "ok"
+INTEGRITY_MISSING = "missing"
+INTEGRITY_MISMATCH = "mismatch"
+HASH_BACKFILL_JOB = "document_hash_backfill"
+# First key of the per-blob advisory locks; the second is the hashtext of the hash.
+_BLOB_ADVISORY_LOCK = 7_300_337
+
+
+@dataclass
+class ScrubResult:
+    checked: int = 0
+    ok: int = 0
+    missing: int = 0
+    mismatched: int = 0
+
+
+def lock_blob(db: Session, file_hash: str) -> None:
+    """Hold the blob ``file_hash`` until the transaction ends.
+
+    Take it before storing or reusing a blob and keep it until the row that
+    points at the blob commits; ``release_files`` takes it before checking
+    references, so it can never delete a blob a new row is about to share.
+    """
+    db.execute(
+        text("SELECT pg_advisory_xact_lock(:key, hashtext(:file_hash))"),
+        {"key": _BLOB_ADVISORY_LOCK, "file_hash": file_hash},
+    )
+
+
+def release_files(db: Session, paths: Iterable[str]) -> int:
+    """Remove stored files that no document points at any more.
+
+    Call after the transaction that deleted the documents has committed, so
+    a rollback never leaves a row without its file. Each blob is checked and
+    removed under its ``lock_blob``, one transaction per file. Cached
+    previews of a removed blob go with it. Returns the number of files removed.
+    """
+    removed = 0
+    for path in sorted(set(paths)):
+        if not path:
+            continue
+        shared = is_blob_path(path)
+        if shared:
+            lock_blob(db, Path(path).name)
+        if db.query(exists().where(Document.file_path == path)).scalar():
+            db.commit()
+            continue
+        try:
+            Path(path).unlink(missing_ok=True)
+        except OSError:
+            db.commit()
+            continue
+        removed += 1
+        if shared:
+            db.query(DocumentPreview).filter(DocumentPreview.file_hash == Path(path).name).delete(
+                synchronize_session=False
+            )
+        db.commit()
+    return removed
+
+
+def _missing_hash_query(db: Session):
+    return db.query(Document).filter(
+        (Document.file_hash == "") | (Document.file_hash.is_(None)),
+        Document.integrity_status != INTEGRITY_MISSING,
+    )
+
+
+def backfill_missing_hashes(db: Session, limit: int, pause_seconds: float = 0.0) -> MaintenanceJob:
+    """Hash up to ``limit`` legacy documents stored without a ``file_hash``.
+
+    Works newest first from the cursor in ``maintenance_jobs``, so a restart
+    resumes where the last batch committed. Sleeps ``pause_seconds`` between
+    files to keep disk reads from competing with uploads. Files that cannot
+    be read are marked missing and skipped from then on. When a sweep finds
+    nothing left it records completion and starts over from the top next time.
+    """
+    job = db.get(MaintenanceJob, HASH_BACKFILL_JOB)
+    if job is None:
+        job = MaintenanceJob(name=HASH_BACKFILL_JOB, processed=0, failed=0, remaining=0)
+        db.add(job)
+
+    query = _missing_hash_query(db)
+    if job.cursor is not None:
+        query = query.filter(Document.id < job.cursor)
+    batch = query.order_by(Document.id.desc()).limit(limit).all()
+    if batch and job.completed_at is not None:
+        job.started_at, job.completed_at, job.processed, job.failed = datetime.utcnow(), None, 0, 0
+
+    for index, doc in enumerate(batch):
+        if index and pause_seconds:
+            time.sleep(pause_seconds)
+        try:
+            doc.file_hash = hash_file(doc.file_path)
+            job.processed += 1
+        except OSError:
+            doc.integrity_status = INTEGRITY_MISSING
+            job.failed += 1
+        job.cursor = doc.id
+
+    if len(batch) < limit:
+        job.cursor = None
+        if job.completed_at is None:
+            job.completed_at = datetime.utcnow()
+    db.flush()
+    job.remaining = _missing_hash_query(db).count()
+    db.commit()
+    return job
+
+
+def adopt_legacy_documents(db: Session, limit: int) -> int:
+    """Move up to ``limit`` hashed files from the flat upload layout into the blob store.
+
+    Every document sharing the old path is repointed, so identical legacy
+    uploads collapse onto one blob. The blob is linked in before the rows are
+    repointed and the legacy file removed only after they commit, so readers
+    always find a file and an interrupted pass simply finds the blob already
+    in place next time. Returns the number of files moved.
+    """
+    candidates = (
+        db.query(Document.file_path, Document.file_hash)
+        .filter(Document.file_hash != "")
+        .filter(~Document.file_path.like("%/objects/%"))
+        .filter(Document.integrity_status.notin_([INTEGRITY_MISSING, INTEGRITY_MISMATCH]))
+        .group_by(Document.file_path, Document.file_hash)
+        .limit(limit)
+        .all()
+    )
+    moved = 0
+    for path, file_hash in candidates:
+        if is_blob_path(path):
+            continue
+        try:
+            status = INTEGRITY_OK if hash_file(path) == file_hash else INTEGRITY_MISMATCH
+        except OSError:
+            status = INTEGRITY_MISSING
+        if status != INTEGRITY_OK:
+            # Filing it under the wrong hash would be worse than leaving it; the
+            # status also keeps it out of the next batch.
+            db.query(Document).filter(Document.file_path == path).update(
+                {"integrity_status": status}, synchronize_session=False
+            )
+            db.commit()
+            continue
+        lock_blob(db, file_hash)
+        target = adopt_file(path, file_hash)
+        db.query(Document).filter(Document.file_path == path).update(
+            {"file_path": target}, synchronize_session=False
+        )
+        db.commit()
+        # Only now that no row points at it; if this fails the legacy copy is just left over.
+        try:
+            Path(path).unlink(missing_ok=True)
+        except OSError:
+            pass
+        moved += 1
+    return moved
+
+
+def scrub_documents(db: Session, limit: int) -> ScrubResult:
+    """Re-hash the stored files of the ``limit`` least recently checked documents.
+
+    Each document gets ``integrity_status`` (ok / missing / mismatch) and
+    ``integrity_checked_at``; ordering by the latter makes repeated runs walk
+    the whole table and resume where the last one stopped. Shared blobs are
+    hashed once per run.
+    """
+    documents = (
+        db.query(Document)
+        .filter(Document.file_hash != "")
+        .order_by(Document.integrity_checked_at.asc().nulls_first(), Document.id.asc())
+        .limit(limit)
+        .all()
+    )
+    result = ScrubResult()
+    hashes: dict[str, str | None] = {}
+    now = datetime.utcnow()
+    for doc in documents:
+        if doc.file_path not in hashes:
+            try:
+                hashes[doc.file_path] = hash_file(doc.file_path)
+            except OSError:
+                hashes[doc.file_path] = None
+        actual = hashes[doc.file_path]
+        if actual is None:
+            doc.integrity_status = INTEGRITY_MISSING
+            result.missing += 1
+        elif actual != doc.file_hash:
+            doc.integrity_status = INTEGRITY_MISMATCH
+            result.mismatched += 1
+        else:
+            doc.integrity_status = INTEGRITY_OK
+            result.ok += 1
+        doc.integrity_checked_at = now
+        result.checked += 1
+    db.commit()
+    return result
@@ -6,6 +6,9 @@ from openpyxl import load_workbook
 from pypdf import PdfReader
 from pptx import Presentation
 
+# Bump whenever extraction output changes; cached previews keyed on it go stale.
+PARSER_VERSION = 1
+
 
 def _safe_read_text(path: Path) -> str:
     try:
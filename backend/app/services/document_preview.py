@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.document import Document
+from app.models.document_preview import DocumentPreview
+from app.services.document_parser import PARSER_VERSION, extract_document_units
+
+INLINE_FILE_TYPES = {"pdf", "png", "jpg", "jpeg", "gif", "webp", "txt", "md", "csv", "json", "xml", "html"}
+EXTRACTED_FILE_TYPES = {"doc", "docx", "ppt", "pptx", "xls", "xlsx"}
+
+# Stored files never change under a given hash, but the routes sit behind
+# auth, so only the browser may keep a copy.
+DOCUMENT_CACHE_CONTROL = "private, max-age=86400"
+
+
+def file_etag(file_hash: str) -> str | None:
+    """Strong validator for the stored bytes; ``None`` until the hash is known."""
+    return f'"{file_hash}"' if file_hash else None
+
+
+def preview_etag(file_hash: str, file_type: str) -> str | None:
+    """Strong validator for a preview payload: same bytes, type and parser give the same JSON."""
+    if not file_hash:
+        return None
+    return f'"{file_hash}-{file_type}-p{PARSER_VERSION}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    """Whether an ``If-None-Match`` header lets the client keep its copy (RFC 9110 weak comparison)."""
+    if not if_none_match or not etag:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+def cache_headers(etag: str | None) -> dict[str, str]:
+    if not etag:
+        return {}
+    return {"ETag": etag, "Cache-Control": DOCUMENT_CACHE_CONTROL}
+
+
+def preview_is_cacheable(payload: dict, file_type: str) -> bool:
+    """Whether ``payload`` is what this parser will always build for these bytes.
+
+    A parse failure falls back to ``download_only`` and may be transient (a
+    file still being written, memory pressure), so it is never cached.
+    """
+    return not (file_type.lower().strip(".") in EXTRACTED_FILE_TYPES and payload.get("mode") == "download_only")
+
+
+def build_preview_payload(file_path: str, file_type: str) -> dict:
+    ext = file_type.lower().strip(".")
+    if ext in INLINE_FILE_TYPES:
+        return {"mode": "inline_file", "file_type": ext}
+
+    if ext in EXTRACTED_FILE_TYPES:
+        try:
+            units = extract_document_units(file_path=file_path, file_type=ext)
+        except Exception:
+            return {"mode": "download_only", "file_type": ext}
+        lines = [u.get("text", "").strip() for u in units if u.get("text")]
+        preview_lines = [line for line in lines if line][:200]
+        preview_units = []
+        for u in units[:280]:
+            ref = str(u.get("ref", "")).strip()
+            text = str(u.get("text", "")).strip()
+            if not text:
+                continue
+            preview_units.append({"ref": ref, "text": text})
+        return {
+            "mode": "extracted_text",
+            "file_type": ext,
+            "preview_text": "\n".join(preview_lines),
+            "line_count": len(preview_lines),
+            "preview_units": preview_units,
+        }
+
+    return {"mode": "download_only", "file_type": ext}
+
+
+def get_document_preview_payload(db: Session, doc: Document, file_type: str) -> dict:
+    """Preview payload for ``doc``, parsed at most once per content hash and parser version.
+
+    Only extracted previews are stored; the other modes cost nothing to
+    rebuild, and failed parses are retried on the next request. Documents
+    still waiting for the hash backfill are parsed every time, as before.
+    """
+    ext = file_type.lower().strip(".")
+    if ext not in EXTRACTED_FILE_TYPES or not doc.file_hash:
+        return build_preview_payload(doc.file_path, ext)
+
+    cached = db.get(DocumentPreview, (doc.file_hash, ext, PARSER_VERSION))
+    # Failures cached before they stopped being stored are parsed again and replaced.
+    if cached is not None and preview_is_cacheable(cached.payload, ext):
+        return cached.payload
+
+    payload = build_preview_payload(doc.file_path, ext)
+    if not preview_is_cacheable(payload, ext):
+        return payload
+    # Two viewers opening the same file race here; both payloads are
+    # identical, so whichever write lands last changes nothing.
+    statement = insert(DocumentPreview).values(
+        file_hash=doc.file_hash, file_type=ext, parser_version=PARSER_VERSION, payload=payload
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["file_hash", "file_type", "parser_version"],
+            set_={"payload": statement.excluded.payload, "created_at": statement.excluded.created_at},
+        )
+    )
+    db.commit()
+    return payload
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.document import Document
+from app.models.document_unit import SEARCH_CONFIG, DocumentUnit
+from app.services.content_store import INTEGRITY_MISSING
+from app.services.document_parser import PARSER_VERSION, extract_document_units
+from app.services.document_similarity import fingerprint_document
+
+SNIPPET_MAX_CHARS = 500
+
+
+def _unit_rows(document_id: int, units: list[dict]) -> list[dict]:
+    rows = []
+    for position, unit in enumerate(units):
+        # Postgres text cannot hold NUL, which some PDF extractors emit.
+        text = str(unit.get("text") or "").replace("\x00", "").strip()
+        if not text:
+            continue
+        ref = str(unit.get("ref") or "").strip()[:120]
+        rows.append({"document_id": document_id, "position": position, "ref": ref, "text": text})
+    return rows
+
+
+def index_document_units(db: Session, doc: Document, units: list[dict]) -> int:
+    """Replace the searchable units and SimHash of ``doc``; the caller commits. Returns the units stored."""
+    db.query(DocumentUnit).filter(DocumentUnit.document_id == doc.id).delete(synchronize_session=False)
+    rows = _unit_rows(doc.id, units)
+    if rows:
+        db.execute(insert(DocumentUnit), rows)
+    fingerprint_document(db, doc, units)
+    doc.units_parser_version = PARSER_VERSION
+    return len(rows)
+
+
+def index_document(db: Session, doc: Document) -> int:
+    """Parse ``doc`` and index its units. A file that cannot be parsed is indexed as empty,
+    so it is not retried until the parser version changes."""
+    try:
+        units = extract_document_units(file_path=doc.file_path, file_type=doc.file_type)
+    except Exception:
+        units = []
+    return index_document_units(db, doc, units)
+
+
+def index_pending_documents(db: Session, limit: int) -> int:
+    """Index up to ``limit`` documents not yet indexed with the current parser, newest first."""
+    documents = (
+        db.query(Document)
+        .filter(Document.units_parser_version < PARSER_VERSION)
+        .filter(Document.integrity_status != INTEGRITY_MISSING)
+        .order_by(Document.id.desc())
+        .limit(limit)
+        .all()
+    )
+    for doc in documents:
+        index_document(db, doc)
+        db.commit()
+    return len(documents)
+
+
+def search_document_units(db: Session, query: str, limit: int, offset: int) -> dict:
+    """Rank document units against ``query`` (web-search syntax: quotes, OR, -term).
+
+    Ranking and counting run on the GIN index; only the requested page is
+    joined back to its documents.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    rank = func.ts_rank_cd(DocumentUnit.search_vector, tsquery).label("rank")
+    matches = DocumentUnit.search_vector.op("@@")(tsquery)
+
+    total = db.execute(select(func.count()).select_from(DocumentUnit).where(matches)).scalar_one()
+    page = (
+        select(DocumentUnit.id, rank)
+        .where(matches)
+        .order_by(rank.desc(), DocumentUnit.id.asc())
+        .limit(limit)
+        .offset(offset)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            DocumentUnit.document_id,
+            Document.file_name,
+            Document.file_type,
+            DocumentUnit.ref,
+            DocumentUnit.text,
+            page.c.rank,
+        )
+        .join(page, page.c.id == DocumentUnit.id)
+        .join(Document, Document.id == DocumentUnit.document_id)
+        .order_by(page.c.rank.desc(), DocumentUnit.id.asc())
+    ).all()
+    hits = [
+        {
+            "document_id": row.document_id,
+            "file_name": row.file_name,
+            "file_type": row.file_type,
+            "ref": row.ref,
+            "text": row.text[:SNIPPET_MAX_CHARS],
+            "rank": round(float(row.rank), 6),
+        }
+        for row in rows
+    ]
+    return {"query": query, "total": total, "limit": limit, "offset": offset, "hits": hits}
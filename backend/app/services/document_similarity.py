@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.document import Document
+from app.models.document_fingerprint import DocumentFingerprint
+from app.models.document_unit import DocumentUnit
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 8
+# Eight 8-bit bands: by pigeonhole, any hash within 7 bits shares a band.
+SIMHASH_MAX_DISTANCE = SIMHASH_BANDS - 1
+SHINGLE_WORDS = 3
+MAX_SIMILAR_DOCUMENTS = 5
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_unit_text(text: str) -> str:
+    """Lowercased words only, so reflowed lines and punctuation edits compare equal."""
+    return " ".join(_NON_WORD.sub(" ", str(text or "").lower()).split())
+
+
+def normalized_units(units: list[dict]) -> list[str]:
+    """Normalized unit texts, without blanks and bare numbers (page numbers, row counters)."""
+    lines = []
+    for unit in units:
+        line = normalize_unit_text(unit.get("text", ""))
+        if line and not line.replace(" ", "").isdigit():
+            lines.append(line)
+    return lines
+
+
+def _features(lines: list[str]) -> Counter:
+    features: Counter = Counter()
+    for line in lines:
+        words = line.split()
+        if len(words) <= SHINGLE_WORDS:
+            features[line] += 1
+            continue
+        for start in range(len(words) - SHINGLE_WORDS + 1):
+            features[" ".join(words[start : start + SHINGLE_WORDS])] += 1
+    return features
+
+
+def simhash(lines: list[str]) -> int:
+    """64-bit SimHash over word 3-shingles of ``lines``, weighted by frequency; 0 for no text."""
+    features = _features(lines)
+    if not features:
+        return 0
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "big") for f in features],
+        dtype=np.uint64,
+    )
+    weights = np.array(list(features.values()), dtype=np.int64)
+    bits = (hashes[:, None] >> np.arange(SIMHASH_BITS, dtype=np.uint64)) & np.uint64(1)
+    totals = (np.where(bits == 1, 1, -1) * weights[:, None]).sum(axis=0)
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if totals[bit] > 0)
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return ((left ^ right) & ((1 << SIMHASH_BITS) - 1)).bit_count()
+
+
+def simhash_bands(value: int) -> list[int]:
+    return [(band << 8) | ((value >> (band * 8)) & 0xFF) for band in range(SIMHASH_BANDS)]
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value & ((1 << SIMHASH_BITS) - 1)
+
+
+def unit_overlap_percent(left: list[str], right: list[str]) -> float:
+    """Share of distinct normalized units the two documents have in common (Jaccard), in percent."""
+    left_set, right_set = set(left), set(right)
+    union = left_set | right_set
+    if not union:
+        return 0.0
+    return round(100.0 * len(left_set & right_set) / len(union), 1)
+
+
+def fingerprint_document(db: Session, doc: Document, units: list[dict]) -> DocumentFingerprint | None:
+    """Store the SimHash of ``doc``'s units; the caller commits. Documents without text get none."""
+    lines = normalized_units(units)
+    existing = db.get(DocumentFingerprint, doc.id)
+    if not lines:
+        if existing is not None:
+            db.delete(existing)
+        return None
+    value = simhash(lines)
+    fingerprint = existing or DocumentFingerprint(document_id=doc.id)
+    fingerprint.simhash = _to_signed(value)
+    fingerprint.bands = simhash_bands(value)
+    fingerprint.unit_count = len(lines)
+    db.add(fingerprint)
+    return fingerprint
+
+
+def find_similar_documents(db: Session, doc: Document, units: list[dict] | None = None) -> list[dict]:
+    """Earlier documents whose SimHash is within ``SIMHASH_MAX_DISTANCE`` bits of ``doc``'s.
+
+    Candidates come from the band index; each is scored by the overlap of
+    its indexed units with ``units`` (or ``doc``'s own indexed units), most
+    similar first.
+    """
+    fingerprint = db.get(DocumentFingerprint, doc.id)
+    if fingerprint is None:
+        return []
+    value = _to_unsigned(fingerprint.simhash)
+    candidates = (
+        db.query(DocumentFingerprint.document_id, DocumentFingerprint.simhash)
+        .filter(DocumentFingerprint.bands.overlap(simhash_bands(value)))
+        .filter(DocumentFingerprint.document_id < doc.id)
+        .all()
+    )
+    nearest = sorted(
+        (distance, document_id)
+        for document_id, other in candidates
+        if (distance := hamming_distance(value, _to_unsigned(other))) <= SIMHASH_MAX_DISTANCE
+    )[:MAX_SIMILAR_DOCUMENTS]
+    if not nearest:
+        return []
+
+    if units is None:
+        units = [{"text": text} for (text,) in db.query(DocumentUnit.text).filter(DocumentUnit.document_id == doc.id)]
+    lines = normalized_units(units)
+    ids = [document_id for _, document_id in nearest]
+    other_units: dict[int, list[dict]] = {document_id: [] for document_id in ids}
+    for document_id, text in db.query(DocumentUnit.document_id, DocumentUnit.text).filter(
+        DocumentUnit.document_id.in_(ids)
+    ):
+        other_units[document_id].append({"text": text})
+    names = dict(db.query(Document.id, Document.file_name).filter(Document.id.in_(ids)).all())
+
+    similar = [
+        {
+            "document_id": document_id,
+            "file_name": names.get(document_id, ""),
+            "distance": distance,
+            "overlap_percent": unit_overlap_percent(lines, normalized_units(other_units[document_id])),
+        }
+        for distance, document_id in nearest
+    ]
+    similar.sort(key=lambda item: (-item["overlap_percent"], item["distance"], -item["document_id"]))
+    return similar
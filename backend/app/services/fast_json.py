@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from functools import cache
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+def fast_responses_enabled() -> bool:
+    """Whether large read-only listings skip the ORM and response-model validation (``FAST_JSON_RESPONSES``)."""
+    return settings.FAST_JSON_RESPONSES
+
+
+@cache
+def schema_columns(model, schema: type[BaseModel]) -> tuple:
+    """The ``model`` table columns named by the fields of ``schema``, in field order.
+
+    Raises ``ValueError`` when a field has no column of that name: such a
+    schema cannot be served from bare rows.
+    """
+    table_columns = model.__table__.columns
+    missing = [name for name in schema.model_fields if name not in table_columns]
+    if missing:
+        raise ValueError(f"{schema.__name__} fields without a {model.__tablename__} column: {', '.join(missing)}")
+    return tuple(table_columns[name] for name in schema.model_fields)
+
+
+def schema_select(model, schema: type[BaseModel]) -> Select:
+    """A Core select of exactly the columns ``schema`` renders, labeled with its field names."""
+    return select(*schema_columns(model, schema))
+
+
+def json_response(content, headers: dict[str, str] | None = None) -> ORJSONResponse:
+    """Render plain dicts and lists with orjson, bypassing the route's ``response_model``.
+
+    The content must already be shaped like the response schema; the
+    contract tests check that the columns and fallbacks behind each fast
+    listing produce the same JSON as validating through the schema.
+    """
+    return ORJSONResponse(content, headers=headers)
+
+
+def rows_response(db: Session, statement: Select, headers: dict[str, str] | None = None) -> ORJSONResponse:
+    """Run ``statement`` and render each result tuple as an object keyed by its column labels."""
+    result = db.execute(statement)
+    keys = list(result.keys())
+    return json_response([dict(zip(keys, row)) for row in result], headers)
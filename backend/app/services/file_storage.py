@@ -1,24 +1,146 @@
+from dataclasses import dataclass
 from pathlib import Path
 import hashlib
-from uuid import uuid4
+import os
+import shutil
+import tempfile
 
 from fastapi import UploadFile
 
 from app.core.config import settings
 
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Staged uploads live next to final storage so promotion is a rename.
+INCOMING_DIR_NAME = ".incoming"
+# Content-addressed blobs: objects/<hash[:2]>/<hash[2:4]>/<hash>.
+OBJECTS_DIR_NAME = "objects"
 
-def save_upload(file: UploadFile) -> tuple[str, str, str]:
-    extension = Path(file.filename).suffix.lower()
-    safe_name = f"{uuid4().hex}{extension}"
 
+class UploadTooLarge(Exception):
+    pass
+
+
+@dataclass
+class StagedUpload:
+    temp_path: Path
+    file_type: str
+    file_hash: str
+    size: int
+
+
+def _storage_dir() -> Path:
     storage_dir = Path(settings.FILE_STORAGE_PATH)
     storage_dir.mkdir(parents=True, exist_ok=True)
+    return storage_dir
+
+
+def stage_upload(file: UploadFile, max_bytes: int | None = None) -> StagedUpload:
+    """Stream an upload to a temporary file, hashing it chunk by chunk.
+
+    Memory use is one chunk regardless of the upload size. Raises
+    ``UploadTooLarge`` (and removes the partial file) as soon as more than
+    ``max_bytes`` (default ``settings.MAX_UPLOAD_BYTES``) have arrived.
+    """
+    limit = settings.MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    extension = Path(file.filename or "").suffix.lower()
+    incoming_dir = _storage_dir() / INCOMING_DIR_NAME
+    incoming_dir.mkdir(parents=True, exist_ok=True)
 
     hasher = hashlib.sha256()
-    target_path = storage_dir / safe_name
-    with target_path.open("wb") as out:
-        data = file.file.read()
+    size = 0
+    fd, temp_name = tempfile.mkstemp(suffix=extension, dir=incoming_dir)
+    temp_path = Path(temp_name)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := file.file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > limit:
+                    raise UploadTooLarge(f"Upload exceeds the maximum size of {limit / (1024 * 1024):g} MB.")
+                hasher.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    return StagedUpload(
+        temp_path=temp_path,
+        file_type=extension.replace(".", ""),
+        file_hash=hasher.hexdigest(),
+        size=size,
+    )
+
+
+def blob_path(file_hash: str) -> Path:
+    """Where the content with SHA-256 ``file_hash`` is stored."""
+    return _storage_dir() / OBJECTS_DIR_NAME / file_hash[:2] / file_hash[2:4] / file_hash
+
+
+def is_blob_path(path: str | Path) -> bool:
+    candidate = Path(path)
+    return len(candidate.name) == 64 and candidate == blob_path(candidate.name)
+
+
+def _store_file(source: Path, file_hash: str) -> str:
+    """Move ``source`` into the blob store; only for files no row points at yet."""
+    target_path = blob_path(file_hash)
+    if target_path.exists():
+        # Same content is already stored; share it instead of writing a copy.
+        source.unlink(missing_ok=True)
+    else:
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target_path)
+    return str(target_path)
+
+
+def promote_upload(staged: StagedUpload) -> str:
+    """Move a staged upload into the blob store and return its path."""
+    return _store_file(staged.temp_path, staged.file_hash)
+
+
+def discard_upload(staged: StagedUpload) -> None:
+    staged.temp_path.unlink(missing_ok=True)
+
+
+def store_bytes(data: bytes) -> tuple[str, str]:
+    """Store ``data`` as a blob; returns its path and SHA-256."""
+    file_hash = hashlib.sha256(data).hexdigest()
+    incoming_dir = _storage_dir() / INCOMING_DIR_NAME
+    incoming_dir.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=incoming_dir)
+    with os.fdopen(fd, "wb") as out:
         out.write(data)
-        hasher.update(data)
+    return _store_file(Path(temp_name), file_hash), file_hash
+
+
+def adopt_file(path: str | Path, file_hash: str) -> str:
+    """Hard-link (or copy) a file stored under a legacy flat name into the blob store.
 
-    return str(target_path), extension.replace(".", ""), hasher.hexdigest()
+    The legacy file stays where it is, so documents still pointing at it keep
+    working; remove it once the new path is committed. A blob already present
+    under ``file_hash`` is taken as the adopted copy.
+    """
+    target_path = blob_path(file_hash)
+    if target_path.exists():
+        return str(target_path)
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    # Built under a temporary name, so the blob path never holds a partial copy.
+    temp_path = target_path.with_name(f".{file_hash}.{os.getpid()}.adopt")
+    temp_path.unlink(missing_ok=True)
+    try:
+        try:
+            os.link(path, temp_path)
+        except OSError:
+            shutil.copy2(path, temp_path)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return str(target_path)
+
+
+def hash_file(path: str | Path) -> str:
+    hasher = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_BYTES):
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -6,6 +6,7 @@ from app.models.governance_config_fte import GovernanceConfigFte
 from app.models.roadmap_item import RoadmapItem
 from app.models.roadmap_item_fte import RoadmapItemFte, RoadmapPlanItemFte
 from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.services.capacity_rollups import invalidate_capacity_rollups
 
 
 def seed_default_fte_roles(db: Session) -> None:
@@ -181,6 +182,8 @@ def migrate_existing_fte_data(db: Session) -> dict[str, int]:
                 db.add(config_fte)
                 summary["governance_configs_migrated"] += 1
 
+    if summary["roadmap_plan_items_migrated"]:
+        invalidate_capacity_rollups(db)
     db.commit()
     return summary
 
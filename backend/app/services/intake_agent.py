@@ -3,6 +3,14 @@ import re
 from typing import Any, TypedDict
 
 from langgraph.graph import END, StateGraph
+from app.services.agents.graph_registry import get_graph, register_graph
+from app.services.analysis_diff import (
+    AnalysisBaseline,
+    UnitAlignment,
+    baseline_alignment,
+    carry_forward_refs,
+    changed_context_units,
+)
 from app.services.document_parser import extract_document_units
 from app.services.llm_client import LLMClientError, call_llm_json
 
@@ -1604,6 +1612,9 @@ def _normalize_candidate(
             raw_tags = item.get("tags") or item.get("tag") or []
         else:
             raw_text = str(item)
+            # Activities carried from an earlier analysis arrive as "[FE/BE] ..." strings.
+            if ACTIVITY_TAG_RE.match(raw_text):
+                raw_tags = _activity_tags(raw_text)
 
         act = _sanitize_activity(raw_text)
         if not act or _is_forbidden_text(act):
@@ -1682,6 +1693,18 @@ class CandidateGraphState(TypedDict, total=False):
     commitment_quality: dict[str, Any]
     implementation_quality: dict[str, Any]
     rewrite_summary: dict[str, Any]
+    alignment: UnitAlignment
+    baseline_candidate: dict
+    baseline_understanding: dict
+    carried_evidence: list[str]
+    reused_candidate: bool
+    previous_activity_reviews: dict[str, str]
+    activity_reviews: dict[str, str]
+
+
+def _same_understanding(left: dict, right: dict) -> bool:
+    keys = ("Primary intent (1 sentence)", "Explicit outcomes (bullet list)", "Dominant capability/theme (1 phrase)")
+    return all(left.get(key) == right.get(key) for key in keys)
 
 
 def _candidate_graph_prepare_node(state: CandidateGraphState) -> CandidateGraphState:
@@ -1695,15 +1718,31 @@ def _candidate_graph_prepare_node(state: CandidateGraphState) -> CandidateGraphS
         max_units=int(profile.get("prompt_units_candidate", 320)),
     )
     fallback_candidate = _fallback_candidate(units=units, file_name=file_name, file_type=file_type)
+    llm_attempted = bool(state.get("provider") and state.get("model"))
+    alignment = state.get("alignment")
+    if alignment is not None:
+        sampled_units = _select_units_for_prompt(
+            units=changed_context_units(units, alignment),
+            mode="candidate",
+            max_units=int(profile.get("prompt_units_candidate", 320)),
+        )
+    # Same text and same approved understanding as the baseline: its candidate stands.
+    reused = (
+        alignment is not None
+        and not alignment.changed_units
+        and not alignment.removed_units
+        and _same_understanding(state.get("understanding_check") or {}, state.get("baseline_understanding") or {})
+    )
     return {
         "profile": profile,
         "sampled_units": sampled_units,
         "fallback_candidate": fallback_candidate,
-        "llm_attempted": bool(state.get("provider") and state.get("model")),
+        "llm_attempted": llm_attempted and not reused,
         "llm_success": False,
         "llm_error": "",
         "llm_raw_candidate": {},
         "candidate": fallback_candidate,
+        "reused_candidate": reused,
     }
 
 
@@ -1711,7 +1750,18 @@ def _candidate_graph_llm_node(state: CandidateGraphState) -> CandidateGraphState
     if not state.get("llm_attempted"):
         return {}
     sampled_units = state.get("sampled_units") or []
-    units_for_prompt = "\n".join([f"[{u['ref']}] {u['text']}" for u in sampled_units])
+    alignment = state.get("alignment")
+    if alignment is not None:
+        previous = state.get("baseline_candidate") or {}
+        units_block = _incremental_units_block(
+            previous={key: previous.get(key) for key in ("Title", "Intent", "Scope", "Activities", "Confidence")},
+            previous_label="roadmap candidate",
+            alignment=alignment,
+            sampled_units=sampled_units,
+        )
+    else:
+        units_for_prompt = "\n".join([f"[{u['ref']}] {u['text']}" for u in sampled_units])
+        units_block = f"Document units with references:\n{units_for_prompt}"
     guidance = (state.get("guidance") or "").strip()
     guidance_block = (
         f"\nOperator guidance:\n{guidance}\nUse this to prioritize relevant document sections.\n"
@@ -1777,8 +1827,7 @@ Approved understanding context:
 {state.get("understanding_check") or {}}
 
 Document name: {state.get("file_name") or "document"}
-Document units with references:
-{units_for_prompt}
+{units_block}
 """.strip()
     try:
         raw = call_llm_json(
@@ -1801,9 +1850,18 @@ def _candidate_graph_refine_node(state: CandidateGraphState) -> CandidateGraphSt
     fallback_candidate = state.get("fallback_candidate") or _fallback_candidate(units, file_name, state.get("file_type") or "")
     profile = state.get("profile") or {}
 
-    if state.get("llm_success") and state.get("llm_raw_candidate"):
+    raw_candidate = state.get("llm_raw_candidate") or {}
+    if state.get("reused_candidate"):
+        raw_candidate = state.get("baseline_candidate") or {}
+    elif not state.get("llm_success"):
+        raw_candidate = {}
+    carried_evidence = state.get("carried_evidence") or []
+    if carried_evidence and raw_candidate:
+        raw_candidate = {**raw_candidate, "Evidence": carried_evidence + _as_ref_list(raw_candidate.get("Evidence"))}
+
+    if raw_candidate:
         candidate = _normalize_candidate(
-            data=state.get("llm_raw_candidate") or {},
+            data=raw_candidate,
             fallback=fallback_candidate,
             units=units,
             file_name=file_name,
@@ -1824,7 +1882,7 @@ def _candidate_graph_refine_node(state: CandidateGraphState) -> CandidateGraphSt
     )
     merged_deterministic = structured_activities + [a for a in deterministic_activities if a not in structured_activities]
     seed_activities = candidate.get("activities") or []
-    if not state.get("llm_success"):
+    if not state.get("llm_success") and not state.get("reused_candidate"):
         # For non-LLM path, prioritize structured table activities first.
         seed_activities = structured_activities
     commitment_activities, implementation_activities = _merge_activity_sets(
@@ -1932,9 +1990,19 @@ def _candidate_graph_critic_rewrite_node(state: CandidateGraphState) -> Candidat
     if not commitment and not implementation:
         return {}
 
+    # Weak activity -> its critiqued form. Carried over from the baseline, so
+    # activities on unchanged sections are not sent for rewriting again.
+    previous_reviews = state.get("previous_activity_reviews") or {}
+    reviews: dict[str, str] = {}
+
     def _rewrite_list(name: str, items: list[str]) -> tuple[list[str], int]:
         weak_rows: list[dict[str, Any]] = []
+        carried = list(items)
         for idx, item in enumerate(items):
+            if item in previous_reviews:
+                carried[idx] = previous_reviews[item]
+                reviews[item] = previous_reviews[item]
+                continue
             score = _activity_quality_score(item)
             if score >= ACTIVITY_REWRITE_THRESHOLD and not _contains_activity_noise(item):
                 continue
@@ -1947,6 +2015,7 @@ def _candidate_graph_critic_rewrite_node(state: CandidateGraphState) -> Candidat
                     "score": score,
                 }
             )
+        items = carried
         if not weak_rows:
             return items, 0
 
@@ -1966,11 +2035,13 @@ def _candidate_graph_critic_rewrite_node(state: CandidateGraphState) -> Candidat
             old_score = int(row["score"])
             candidate_text = llm_rewrites.get(str(row["id"])) or _deterministic_rewrite_activity(old_item)
             candidate_text = _sanitize_activity(candidate_text)
+            reviews[old_item] = old_item
             if not candidate_text:
                 continue
             new_item = _format_activity_with_tags(candidate_text, row.get("tags") or [])
             if _activity_quality_score(new_item) >= old_score and new_item != old_item:
                 out[idx] = new_item
+                reviews[old_item] = new_item
                 rewritten += 1
         return out, rewritten
 
@@ -1997,16 +2068,11 @@ def _candidate_graph_critic_rewrite_node(state: CandidateGraphState) -> Candidat
             "implementation_rewritten": implementation_changed,
             "total_rewritten": commitment_changed + implementation_changed,
         },
+        "activity_reviews": reviews,
     }
 
 
-_CANDIDATE_GRAPH = None
-
-
-def _candidate_graph():
-    global _CANDIDATE_GRAPH
-    if _CANDIDATE_GRAPH is not None:
-        return _CANDIDATE_GRAPH
+def _build_candidate_graph() -> StateGraph:
     graph = StateGraph(CandidateGraphState)
     graph.add_node("prepare", _candidate_graph_prepare_node)
     graph.add_node("llm_candidate", _candidate_graph_llm_node)
@@ -2017,8 +2083,10 @@ def _candidate_graph():
     graph.add_edge("llm_candidate", "deterministic_refine")
     graph.add_edge("deterministic_refine", "critic_rewrite")
     graph.add_edge("critic_rewrite", END)
-    _CANDIDATE_GRAPH = graph.compile()
-    return _CANDIDATE_GRAPH
+    return graph
+
+
+register_graph("candidate", _build_candidate_graph)
 
 
 def _map_to_phase(activity: str) -> str:
@@ -2224,6 +2292,37 @@ def _normalize_v2(data: dict, fallback: dict) -> dict:
     return norm
 
 
+def _as_ref_list(raw: object) -> list[str]:
+    if isinstance(raw, list):
+        return [str(x).strip() for x in raw if str(x).strip()]
+    return [x.strip() for x in re.split(r"[\n,;]", str(raw or "")) if x.strip()]
+
+
+def _incremental_units_block(
+    previous: dict,
+    previous_label: str,
+    alignment: UnitAlignment,
+    sampled_units: list[dict],
+    max_removed: int = 60,
+) -> str:
+    changed = "\n".join([f"[{u['ref']}] {u['text']}" for u in sampled_units]) or "(none)"
+    removed = "\n".join([f"- {u.get('text', '')}" for u in alignment.removed_units[:max_removed]]) or "(none)"
+    return f"""
+This document is a revision of one analysed before. {alignment.unchanged_count} of {alignment.total_count} units are unchanged.
+Previous {previous_label} (from the earlier version):
+{previous}
+
+Keep everything in the previous {previous_label} that the unchanged sections still support, word for word.
+Revise, add or drop only what the changed and removed sections below require.
+
+Removed sections (no longer in the document):
+{removed}
+
+Changed or new sections with references:
+{changed}
+""".strip()
+
+
 def generate_intake_analysis_v2(
     file_path: str,
     file_type: str,
@@ -2233,7 +2332,15 @@ def generate_intake_analysis_v2(
     api_key: str = "",
     base_url: str = "",
     guidance: str = "",
+    baseline: AnalysisBaseline | None = None,
 ) -> tuple[dict, dict]:
+    """Document understanding check.
+
+    With a ``baseline`` (an analysed earlier version) close enough to align,
+    only the changed and removed sections go to the model together with the
+    previous understanding, and evidence on unchanged text is carried over.
+    An unchanged document reuses the previous understanding without a call.
+    """
     units = extract_document_units(file_path=file_path, file_type=file_type)
     profile = _doc_complexity_profile(units=units, file_name=file_name, file_type=file_type)
     fallback = _fallback_understanding(units=units, file_name=file_name, file_type=file_type)
@@ -2242,15 +2349,51 @@ def generate_intake_analysis_v2(
     llm_error = ""
     outcomes_max = int(profile.get("understanding_outcomes_max", 8))
 
-    if not llm_attempted:
+    alignment = baseline_alignment(baseline, units)
+    previous_understanding = (baseline.output.get("document_understanding_check") or {}) if alignment else {}
+    if not previous_understanding:
+        alignment = None
+    carried_evidence = carry_forward_refs(previous_understanding.get("Evidence") or [], alignment) if alignment else []
+    prompt_units = 0
+
+    if alignment and not alignment.changed_units and not alignment.removed_units:
+        llm_attempted = False
+        understanding = _normalize_understanding(
+            {**previous_understanding, "Evidence": carried_evidence}, fallback, units, max_outcomes=outcomes_max
+        )
+    elif not llm_attempted:
         understanding = fallback
+        carried_evidence = []
     else:
-        sampled_units = _select_units_for_prompt(
-            units=units,
-            mode="understanding",
-            max_units=int(profile.get("prompt_units_understanding", 260)),
-        )
-        units_for_prompt = "\n".join([f"[{u['ref']}] {u['text']}" for u in sampled_units])
+        if alignment:
+            sampled_units = _select_units_for_prompt(
+                units=changed_context_units(units, alignment),
+                mode="understanding",
+                max_units=int(profile.get("prompt_units_understanding", 260)),
+            )
+            units_block = _incremental_units_block(
+                previous={
+                    key: previous_understanding.get(key)
+                    for key in (
+                        "Primary intent (1 sentence)",
+                        "Explicit outcomes (bullet list)",
+                        "Dominant capability/theme (1 phrase)",
+                        "Confidence",
+                    )
+                },
+                previous_label="understanding",
+                alignment=alignment,
+                sampled_units=sampled_units,
+            )
+        else:
+            sampled_units = _select_units_for_prompt(
+                units=units,
+                mode="understanding",
+                max_units=int(profile.get("prompt_units_understanding", 260)),
+            )
+            units_for_prompt = "\n".join([f"[{u['ref']}] {u['text']}" for u in sampled_units])
+            units_block = f"Document units with references:\n{units_for_prompt}"
+        prompt_units = len(sampled_units)
         guidance_block = f"\nOperator guidance:\n{guidance}\nUse this to focus extraction while staying evidence-grounded.\n" if guidance else ""
         prompt = f"""
 You are a Roadmap Intake Agent.
@@ -2284,8 +2427,7 @@ Rules:
 {guidance_block}
 
 Document name: {file_name}
-Document units with references:
-{units_for_prompt}
+{units_block}
 """.strip()
         try:
             raw = call_llm_json(
@@ -2295,6 +2437,8 @@ Document units with references:
                 base_url=base_url,
                 prompt=prompt,
             )
+            if carried_evidence and isinstance(raw, dict):
+                raw = {**raw, "Evidence": carried_evidence + _as_ref_list(raw.get("Evidence") or raw.get("evidence"))}
             understanding = _normalize_understanding(raw, fallback, units, max_outcomes=outcomes_max)
             llm_success = True
         except LLMClientError as exc:
@@ -2350,6 +2494,14 @@ Document units with references:
             "understanding_outcomes_max": outcomes_max,
         },
     }
+    if alignment:
+        analysis_output["incremental"] = {
+            "baseline_document_id": baseline.document_id,
+            **alignment.summary(),
+            "carried_evidence": len(carried_evidence),
+            "prompt_units": prompt_units,
+            "reused_understanding": not alignment.changed_units and not alignment.removed_units,
+        }
 
     return analysis_output, flat
 
@@ -2364,7 +2516,15 @@ def generate_roadmap_candidate_from_document(
     api_key: str = "",
     base_url: str = "",
     guidance: str = "",
+    baseline: AnalysisBaseline | None = None,
 ) -> tuple[dict, dict]:
+    """Roadmap candidate for an approved understanding.
+
+    With a ``baseline`` whose analysis has a roadmap candidate, the model
+    sees only the changed and removed sections next to that candidate,
+    evidence on unchanged text is carried over, and carried activities skip
+    the critic rewrite.
+    """
     units = extract_document_units(file_path=file_path, file_type=file_type)
 
     primary_intent = str(understanding_check.get("Primary intent (1 sentence)") or "").strip()
@@ -2382,7 +2542,19 @@ def generate_roadmap_candidate_from_document(
         "base_url": base_url,
         "guidance": guidance,
     }
-    state = _candidate_graph().invoke(initial_state)
+    alignment = baseline_alignment(baseline, units)
+    baseline_candidate = (baseline.output.get("roadmap_candidate") or {}) if alignment else {}
+    if baseline_candidate:
+        initial_state.update(
+            {
+                "alignment": alignment,
+                "baseline_candidate": baseline_candidate,
+                "baseline_understanding": baseline.output.get("document_understanding_check") or {},
+                "carried_evidence": carry_forward_refs(baseline_candidate.get("Evidence") or [], alignment),
+                "previous_activity_reviews": baseline.output.get("activity_reviews") or {},
+            }
+        )
+    state = get_graph("candidate").invoke(initial_state)
     fallback = state.get("fallback_candidate") or _fallback_candidate(units=units, file_name=file_name, file_type=file_type)
     candidate = state.get("candidate") or fallback
     commitment_activities = state.get("commitment_activities") or candidate.get("activities") or []
@@ -2438,7 +2610,16 @@ def generate_roadmap_candidate_from_document(
             "implementation_count_actual": len(implementation_activities),
         },
         "rewrite_summary": rewrite_summary,
+        "activity_reviews": state.get("activity_reviews") or {},
     }
+    if baseline_candidate:
+        analysis_output["incremental"] = {
+            "baseline_document_id": baseline.document_id,
+            **alignment.summary(),
+            "carried_evidence": len(state.get("carried_evidence") or []),
+            "prompt_units": len(state.get("sampled_units") or []) if llm_attempted else 0,
+            "reused_candidate": bool(state.get("reused_candidate")),
+        }
     flat = {
         "document_class": {
             "BRD": "brd",
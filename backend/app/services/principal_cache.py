@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import logging
+import select as select_module
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.custom_role import CustomRole
+from app.models.enums import UserRole
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_CHANNEL = "principal_cache"
+CUSTOM_ROLE_PERMISSIONS = (
+    "can_create_users",
+    "can_configure_team_capacity",
+    "can_allocate_portfolio_quotas",
+    "can_submit_commitment",
+    "can_edit_roadmap",
+    "can_manage_settings",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated user as the role and permission checks read it, detached from any session."""
+
+    id: int
+    email: str
+    full_name: str
+    role: UserRole
+    is_active: bool
+    custom_role_id: int | None = None
+    custom_role_name: str | None = None
+    custom_role_permissions: frozenset[str] = frozenset()
+
+
+def load_principal(db: Session, user_id: int) -> Principal | None:
+    """The principal of ``user_id`` with its custom role, in one query; ``None`` for an unknown user."""
+    row = db.execute(
+        select(
+            User.id,
+            User.email,
+            User.full_name,
+            User.role,
+            User.is_active,
+            CustomRole.id,
+            CustomRole.name,
+            *(getattr(CustomRole, permission) for permission in CUSTOM_ROLE_PERMISSIONS),
+        )
+        .outerjoin(CustomRole, CustomRole.id == User.custom_role_id)
+        .where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+    user_id, email, full_name, role, is_active, custom_role_id, custom_role_name, *allowed = row
+    return Principal(
+        id=user_id,
+        email=email,
+        full_name=full_name,
+        role=role,
+        is_active=is_active,
+        custom_role_id=custom_role_id,
+        custom_role_name=custom_role_name,
+        custom_role_permissions=frozenset(
+            permission for permission, granted in zip(CUSTOM_ROLE_PERMISSIONS, allowed) if granted
+        ),
+    )
+
+
+class PrincipalCache:
+    """Principals by user id for ``PRINCIPAL_CACHE_TTL_SECONDS``, shared by the requests of one process.
+
+    Triggers on ``users`` and ``custom_roles`` notify ``principal_cache`` when
+    a change commits, and a listener thread drops the affected entries in
+    every process; the process that made the change also drops them as soon
+    as it commits. Entries are only served while the listener is connected:
+    when it drops, the cache is emptied and bypassed until it is back, so a
+    missed notification cannot keep a deactivated user signed in.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[int, tuple[float, Principal]] = {}
+        self._generation = 0
+        self._listening = False
+        self._thread: threading.Thread | None = None
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="principal-cache-listener", daemon=True)
+                self._thread.start()
+
+    def get(self, user_id: int) -> Principal | None:
+        if settings.PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+            return None
+        self._ensure_started()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or not self._listening:
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            return principal
+
+    def generation(self) -> int:
+        """Note this before loading a principal, and pass it to ``put``."""
+        return self._generation
+
+    def put(self, principal: Principal, generation: int) -> None:
+        """Cache ``principal`` unless an invalidation arrived since ``generation``, as it may predate it."""
+        with self._lock:
+            if self._listening and generation == self._generation:
+                self._entries[principal.id] = (time.monotonic() + settings.PRINCIPAL_CACHE_TTL_SECONDS, principal)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def invalidate_custom_role(self, custom_role_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            for user_id, (_, principal) in list(self._entries.items()):
+                if principal.custom_role_id == custom_role_id:
+                    del self._entries[user_id]
+
+    def _set_listening(self, listening: bool) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._listening = listening
+
+    def _apply(self, payload: str) -> None:
+        kind, _, raw_id = payload.partition(":")
+        try:
+            entity_id = int(raw_id)
+        except ValueError:
+            logger.warning("Ignoring principal cache notification %r", payload)
+            return
+        if kind == "custom_role":
+            self.invalidate_custom_role(entity_id)
+        else:
+            self.invalidate_user(entity_id)
+
+    def _listen(self) -> None:
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        connection = engine.dialect.dbapi.connect(*cargs, **cparams)
+        try:
+            connection.autocommit = True
+            connection.cursor().execute(f"LISTEN {PRINCIPAL_CACHE_CHANNEL}")
+            # Principals cached before the LISTEN may have missed a change.
+            self._set_listening(True)
+            while True:
+                if select_module.select([connection], [], [], 60) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self._apply(connection.notifies.pop(0).payload)
+        finally:
+            self._set_listening(False)
+            connection.close()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Principal cache listener failed; reconnecting")
+                time.sleep(5)
+
+
+principal_cache = PrincipalCache()
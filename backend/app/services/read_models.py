@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.intake_item import IntakeItem
+from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_movement_request import RoadmapMovementRequest
+from app.models.roadmap_plan_item import RoadmapPlanItem
+
+
+class IntakeFlagsRow(NamedTuple):
+    delivery_mode: str
+    activities: list[str]
+
+
+class CommitmentFlagsRow(NamedTuple):
+    picked_up: bool
+    delivery_mode: str
+    ai_fte: float | None
+    activities: list[str]
+
+
+class PlanCapacityRow(NamedTuple):
+    """What the capacity scheduler and the dashboard flags read from a plan item."""
+
+    id: int
+    project_context: str
+    delivery_mode: str
+    planned_start_date: str
+    planned_end_date: str
+    fe_fte: float | None
+    be_fte: float | None
+    ai_fte: float | None
+    pm_fte: float | None
+    fs_fte: float | None
+    activities: list[str]
+
+
+class PlanExportRow(NamedTuple):
+    id: int
+    title: str
+    priority: str
+    project_context: str
+    delivery_mode: str
+    accountable_person: str
+    planning_status: str
+    confidence: str
+    planned_start_date: str
+    planned_end_date: str
+    pickup_period: str
+    completion_period: str
+    resource_count: int | None
+    effort_person_weeks: int | None
+    dependency_ids: list[int]
+    entered_roadmap_at: datetime
+
+
+class IntakeBriefRow(NamedTuple):
+    id: int
+    title: str
+    status: str
+    priority: str
+    project_context: str
+    delivery_mode: str
+    updated_at: datetime
+
+
+class CommitmentBriefRow(NamedTuple):
+    id: int
+    title: str
+    picked_up: bool
+    priority: str
+    project_context: str
+    delivery_mode: str
+    accountable_person: str
+    created_at: datetime
+
+
+class PlanBriefRow(NamedTuple):
+    id: int
+    bucket_item_id: int
+    title: str
+    planning_status: str
+    confidence: str
+    planned_start_date: str
+    planned_end_date: str
+    pickup_period: str
+    completion_period: str
+    resource_count: int | None
+    effort_person_weeks: int | None
+    entered_roadmap_at: datetime
+
+
+class MovementBriefRow(NamedTuple):
+    id: int
+    plan_item_id: int
+    bucket_item_id: int
+    request_type: str
+    status: str
+    from_start_date: str
+    from_end_date: str
+    to_start_date: str
+    to_end_date: str
+    reason: str
+    blocker: str
+    decision_reason: str
+    requested_by: int | None
+    decided_by: int | None
+    requested_at: datetime
+    decided_at: datetime | None
+    executed_at: datetime | None
+
+
+def row_select(model, row_type: type[tuple]):
+    """A Core select of the ``model`` columns named by the fields of ``row_type``, in field order."""
+    return select(*(model.__table__.columns[name] for name in row_type._fields))
+
+
+def read_rows(db: Session, row_type: type[tuple], model, *criteria, order_by=(), limit: int | None = None) -> list:
+    """``model`` rows matching ``criteria`` as ``row_type`` tuples, for handlers that never write them.
+
+    Only the row type's columns are selected and nothing enters the session's
+    identity map. The tuples have the models' attribute names, so code that
+    reads the models (the capacity scheduler, the export formatters) takes
+    them unchanged.
+    """
+    statement = row_select(model, row_type).where(*criteria).order_by(*order_by).limit(limit)
+    return [row_type._make(row) for row in db.execute(statement)]
+
+
+def open_intake_flags(db: Session) -> list[IntakeFlagsRow]:
+    return read_rows(db, IntakeFlagsRow, IntakeItem, IntakeItem.status != "approved")
+
+
+def commitment_flags(db: Session) -> list[CommitmentFlagsRow]:
+    return read_rows(db, CommitmentFlagsRow, RoadmapItem)
+
+
+def plan_capacity_rows(db: Session) -> list[PlanCapacityRow]:
+    """Every plan item, in id order, as the capacity scheduler reads it."""
+    return read_rows(db, PlanCapacityRow, RoadmapPlanItem, order_by=[RoadmapPlanItem.id.asc()])
+
+
+def plan_export_rows(db: Session) -> list[PlanExportRow]:
+    return read_rows(db, PlanExportRow, RoadmapPlanItem, order_by=[RoadmapPlanItem.title.asc()])
+
+
+def recent_open_intake(db: Session, limit: int) -> list[IntakeBriefRow]:
+    return read_rows(
+        db,
+        IntakeBriefRow,
+        IntakeItem,
+        IntakeItem.status != "approved",
+        order_by=[IntakeItem.updated_at.desc()],
+        limit=limit,
+    )
+
+
+def recent_commitments(db: Session, *criteria, limit: int) -> list[CommitmentBriefRow]:
+    return read_rows(
+        db, CommitmentBriefRow, RoadmapItem, *criteria, order_by=[RoadmapItem.created_at.desc()], limit=limit
+    )
+
+
+def recent_plans(db: Session, limit: int) -> list[PlanBriefRow]:
+    return read_rows(db, PlanBriefRow, RoadmapPlanItem, order_by=[RoadmapPlanItem.created_at.desc()], limit=limit)
+
+
+def recent_movements(db: Session, limit: int) -> list[MovementBriefRow]:
+    return read_rows(
+        db, MovementBriefRow, RoadmapMovementRequest, order_by=[RoadmapMovementRequest.id.desc()], limit=limit
+    )
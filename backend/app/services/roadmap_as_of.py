@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import DateTime, and_, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.roadmap_checkpoint import RoadmapCheckpoint
+from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_item_version import RoadmapItemVersion
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.models.roadmap_plan_item_version import RoadmapPlanItemVersion
+from app.services.versioning import MERGE_TRACE_ACTION_PREFIX, ROADMAP_KEYS, version_states
+
+ROADMAP_SNAPSHOT_KEYS = [*ROADMAP_KEYS, "version_no"]
+# Checkpoints are taken this far in the past, so transactions still in
+# flight when one is taken have committed the versions it covers.
+CHECKPOINT_SETTLE = timedelta(minutes=5)
+_PLAN_DATETIME_COLUMNS = {
+    column.key for column in RoadmapPlanItem.__table__.columns if isinstance(column.type, DateTime)
+}
+
+
+def roadmap_item_snapshot(item: RoadmapItem) -> dict:
+    """The same fields the roadmap routes log in ``RoadmapItemVersion`` snapshots."""
+    return {key: getattr(item, key) for key in ROADMAP_SNAPSHOT_KEYS}
+
+
+def plan_item_snapshot(plan: RoadmapPlanItem) -> dict:
+    """Every plan column but the id, JSON-ready, as logged in ``RoadmapPlanItemVersion``."""
+    snapshot = {}
+    for column in RoadmapPlanItem.__table__.columns:
+        if column.key == "id":
+            continue
+        value = getattr(plan, column.key)
+        snapshot[column.key] = value.isoformat() if isinstance(value, datetime) else value
+    return snapshot
+
+
+def _model_values(model, snapshot: dict) -> dict:
+    """Snapshot values for ``model``'s columns; columns added after it was logged take their defaults."""
+    values = {}
+    for column in model.__table__.columns:
+        if column.key in snapshot:
+            values[column.key] = snapshot[column.key]
+        elif column.default is not None and column.default.is_scalar:
+            values[column.key] = column.default.arg
+    return values
+
+
+def roadmap_item_from_snapshot(item_id: int, snapshot: dict) -> RoadmapItem:
+    return RoadmapItem(**{**_model_values(RoadmapItem, snapshot), "id": item_id})
+
+
+def plan_item_from_snapshot(plan_id: int, snapshot: dict) -> RoadmapPlanItem:
+    """A detached ``RoadmapPlanItem`` carrying a historical state, for the planning code that takes plans."""
+    values = _model_values(RoadmapPlanItem, snapshot)
+    for key in _PLAN_DATETIME_COLUMNS:
+        if isinstance(values.get(key), str):
+            values[key] = datetime.fromisoformat(values[key])
+    return RoadmapPlanItem(**{**values, "id": plan_id})
+
+
+def as_naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; aware query values are converted to match."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class RoadmapAsOf:
+    as_of: datetime
+    checkpoint_at: datetime | None = None
+    roadmap_items: dict[int, dict] = field(default_factory=dict)
+    plan_items: dict[int, dict] = field(default_factory=dict)
+
+    def roadmap_models(self) -> list[RoadmapItem]:
+        return [roadmap_item_from_snapshot(item_id, state) for item_id, state in sorted(self.roadmap_items.items())]
+
+    def plan_models(self) -> list[RoadmapPlanItem]:
+        return [plan_item_from_snapshot(plan_id, state) for plan_id, state in sorted(self.plan_items.items())]
+
+
+def _version_states_by_id(db: Session, model, item_column, version_ids: list[int]) -> dict[int, tuple[dict, dict]]:
+    """Full (before, after) states of the given versions, replaying each from its keyframe in one query."""
+    if not version_ids:
+        return {}
+    target = aliased(model)
+    target_item = getattr(target, item_column.key)
+    bounds = (
+        select(
+            target_item.label("item_id"),
+            target.id.label("upper"),
+            func.max(model.id).label("lower"),
+        )
+        .join(model, and_(item_column == target_item, model.keyframe.is_(True), model.id <= target.id))
+        .where(target.id.in_(version_ids))
+        .group_by(target_item, target.id)
+        .subquery()
+    )
+    rows = (
+        db.query(model, bounds.c.upper)
+        .join(bounds, and_(item_column == bounds.c.item_id, model.id >= bounds.c.lower, model.id <= bounds.c.upper))
+        .order_by(bounds.c.upper, model.id)
+        .all()
+    )
+    chains: dict[int, list] = {}
+    for version, upper in rows:
+        chains.setdefault(upper, []).append(version)
+    return {upper: version_states(chain)[-1] for upper, chain in chains.items()}
+
+
+def _relevant(model):
+    return ~model.action.startswith(MERGE_TRACE_ACTION_PREFIX, autoescape=True)
+
+
+def _states_as_of(
+    db: Session,
+    model,
+    item_column,
+    live: dict[int, tuple[datetime, dict]],
+    as_of: datetime,
+    base: dict[int, dict],
+    base_at: datetime | None,
+) -> dict[int, dict]:
+    """Item states at ``as_of``, starting from the checkpoint ``base`` taken at ``base_at``.
+
+    In order of precedence, an item's state is the after state of its last
+    version since the checkpoint, its checkpoint state, the before state of
+    its first version after ``as_of``, or, for an item created by then and
+    not changed since, its live state. An empty state means the item did
+    not exist.
+    """
+    last_query = (
+        select(item_column, model.id)
+        .where(_relevant(model), model.created_at <= as_of)
+        .distinct(item_column)
+        .order_by(item_column, model.created_at.desc(), model.id.desc())
+    )
+    if base_at is not None:
+        last_query = last_query.where(model.created_at > base_at)
+    last = dict(db.execute(last_query).all())
+
+    first_query = (
+        select(item_column, model.id)
+        .where(_relevant(model), model.created_at > as_of)
+        .distinct(item_column)
+        .order_by(item_column, model.created_at.asc(), model.id.asc())
+    )
+    if base_at is not None:
+        # Anything that existed at the checkpoint is in it, so only items
+        # created between the checkpoint and ``as_of`` are left to look up.
+        pending = [
+            item_id
+            for item_id, (created_at, _) in live.items()
+            if item_id not in last and base_at < created_at <= as_of
+        ]
+        first_query = first_query.where(item_column.in_(pending))
+    first = dict(db.execute(first_query).all()) if base_at is None or pending else {}
+    states_by_version = _version_states_by_id(db, model, item_column, [*last.values(), *first.values()])
+
+    gone: set[int] = set()
+    if base:
+        # Items bulk-deleted since the checkpoint leave neither a row nor a
+        # version behind, and are erased from past states as well.
+        gone = set(base) - set(live) - set(last)
+        if gone:
+            gone -= {item_id for (item_id,) in db.query(item_column).filter(item_column.in_(gone)).distinct()}
+
+    states: dict[int, dict] = {}
+    for item_id in set(base) | set(live) | set(last) | set(first):
+        created_at = live[item_id][0] if item_id in live else None
+        if item_id in last:
+            state = states_by_version[last[item_id]][1]
+        elif item_id in base:
+            state = {} if item_id in gone else base[item_id]
+        elif created_at is not None and (created_at > as_of or (base_at is not None and created_at <= base_at)):
+            state = {}
+        elif item_id in first:
+            state = states_by_version[first[item_id]][0]
+        else:
+            state = live[item_id][1] if item_id in live else {}
+        if state:
+            states[item_id] = state
+    return states
+
+
+def _latest_checkpoint(db: Session, as_of: datetime | None = None) -> RoadmapCheckpoint | None:
+    query = db.query(RoadmapCheckpoint)
+    if as_of is not None:
+        query = query.filter(RoadmapCheckpoint.taken_at <= as_of)
+    return query.order_by(RoadmapCheckpoint.taken_at.desc()).first()
+
+
+def roadmap_as_of(db: Session, as_of: datetime) -> RoadmapAsOf:
+    """Roadmap and plan item states at ``as_of`` (naive UTC).
+
+    Starts from the latest checkpoint at or before ``as_of`` and looks up,
+    per item, only the versions around ``as_of`` on the ``(item, created_at)``
+    indexes, so the cost does not grow with the length of the history.
+    """
+    checkpoint = _latest_checkpoint(db, as_of)
+    base_at = checkpoint.taken_at if checkpoint else None
+    live_items = {item.id: (item.created_at, roadmap_item_snapshot(item)) for item in db.query(RoadmapItem).all()}
+    live_plans = {plan.id: (plan.created_at, plan_item_snapshot(plan)) for plan in db.query(RoadmapPlanItem).all()}
+    return RoadmapAsOf(
+        as_of=as_of,
+        checkpoint_at=base_at,
+        roadmap_items=_states_as_of(
+            db,
+            RoadmapItemVersion,
+            RoadmapItemVersion.roadmap_item_id,
+            live_items,
+            as_of,
+            {int(k): v for k, v in (checkpoint.roadmap_items if checkpoint else {}).items()},
+            base_at,
+        ),
+        plan_items=_states_as_of(
+            db,
+            RoadmapPlanItemVersion,
+            RoadmapPlanItemVersion.plan_item_id,
+            live_plans,
+            as_of,
+            {int(k): v for k, v in (checkpoint.plan_items if checkpoint else {}).items()},
+            base_at,
+        ),
+    )
+
+
+def take_roadmap_checkpoint(db: Session, interval: timedelta) -> RoadmapCheckpoint | None:
+    """Cache the reconstructed state ``CHECKPOINT_SETTLE`` ago if the last checkpoint is ``interval`` older.
+
+    Built from the previous checkpoint like any other lookup, so it always
+    agrees with the versions. Commits; returns the new checkpoint, if any.
+    """
+    taken_at = datetime.utcnow() - CHECKPOINT_SETTLE
+    latest = _latest_checkpoint(db)
+    if latest is not None and latest.taken_at > taken_at - interval:
+        return None
+    state = roadmap_as_of(db, taken_at)
+    checkpoint = RoadmapCheckpoint(
+        taken_at=taken_at,
+        roadmap_items={str(k): v for k, v in state.roadmap_items.items()},
+        plan_items={str(k): v for k, v in state.plan_items.items()},
+    )
+    db.add(checkpoint)
+    db.commit()
+    return checkpoint
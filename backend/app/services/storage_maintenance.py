@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.audit_events import backfill_audit_events, detach_audit_partitions, ensure_audit_partitions
+from app.services.change_feed import prune_change_feed
+from app.services.content_store import ScrubResult, adopt_legacy_documents, backfill_missing_hashes, scrub_documents
+from app.services.document_search import index_pending_documents
+from app.services.roadmap_as_of import take_roadmap_checkpoint
+from app.services.versioning import compact_version_history
+
+logger = logging.getLogger(__name__)
+
+# Only one worker process runs maintenance at a time.
+_MAINTENANCE_ADVISORY_LOCK = 7_300_335
+
+
+def run_storage_maintenance(db: Session, batch_size: int) -> dict | None:
+    """One bounded maintenance pass; ``None`` if another process holds the lock.
+
+    The steps commit as they go, so the lock is held on a connection of its
+    own rather than on the session's, which changes between transactions.
+    """
+    with db.get_bind().connect() as lock_conn:
+        acquired = lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": _MAINTENANCE_ADVISORY_LOCK}
+        ).scalar()
+        if not acquired:
+            return None
+        try:
+            backfill = backfill_missing_hashes(db, batch_size, settings.STORAGE_BACKFILL_PAUSE_SECONDS)
+            adopted = adopt_legacy_documents(db, batch_size)
+            scrub: ScrubResult = scrub_documents(db, batch_size)
+            indexed = index_pending_documents(db, batch_size)
+            compacted = compact_version_history(db, batch_size)
+            checkpoint = None
+            if settings.ROADMAP_CHECKPOINT_INTERVAL_HOURS > 0:
+                checkpoint = take_roadmap_checkpoint(db, timedelta(hours=settings.ROADMAP_CHECKPOINT_INTERVAL_HOURS))
+            now = datetime.utcnow()
+            ensure_audit_partitions(db, now, settings.AUDIT_PARTITION_MONTHS_AHEAD)
+            audit_backfilled = backfill_audit_events(db, batch_size)
+            detached = []
+            if settings.AUDIT_EVENT_RETENTION_MONTHS > 0:
+                detached = detach_audit_partitions(db, now, settings.AUDIT_EVENT_RETENTION_MONTHS)
+            pruned = prune_change_feed(db, timedelta(hours=settings.CHANGE_FEED_RETENTION_HOURS))
+            return {
+                "hashes_remaining": backfill.remaining,
+                "adopted": adopted,
+                "scrub": scrub,
+                "indexed": indexed,
+                "versions_compacted": compacted,
+                "roadmap_checkpoint": checkpoint.taken_at if checkpoint else None,
+                "audit_events_backfilled": audit_backfilled,
+                "audit_partitions_detached": detached,
+                "change_events_pruned": pruned,
+            }
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _MAINTENANCE_ADVISORY_LOCK})
+            lock_conn.commit()
+
+
+def _maintenance_loop(interval_seconds: int, batch_size: int) -> None:
+    while True:
+        time.sleep(interval_seconds)
+        try:
+            with SessionLocal() as db:
+                result = run_storage_maintenance(db, batch_size)
+            if result and (result["scrub"].missing or result["scrub"].mismatched):
+                logger.warning("Storage maintenance: %s", result)
+        except Exception:
+            logger.exception("Storage maintenance pass failed")
+
+
+def start_storage_maintenance() -> threading.Thread | None:
+    """Run maintenance passes on a daemon thread every ``STORAGE_MAINTENANCE_INTERVAL_SECONDS``.
+
+    Each pass handles at most ``STORAGE_MAINTENANCE_BATCH_SIZE`` files per
+    step, so the disk and database load stays flat however large the store.
+    An interval of 0 disables the thread.
+    """
+    interval = settings.STORAGE_MAINTENANCE_INTERVAL_SECONDS
+    if interval <= 0:
+        return None
+    thread = threading.Thread(
+        target=_maintenance_loop,
+        args=(interval, settings.STORAGE_MAINTENANCE_BATCH_SIZE),
+        name="storage-maintenance",
+        daemon=True,
+    )
+    thread.start()
+    return thread
@@ -1,9 +1,24 @@
 from collections.abc import Iterable
+from datetime import datetime
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.models.intake_item import IntakeItem
 from app.models.intake_item_version import IntakeItemVersion
+from app.models.maintenance_job import MaintenanceJob
+from app.models.roadmap_item import RoadmapItem
 from app.models.roadmap_item_version import RoadmapItemVersion
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.models.roadmap_plan_item_version import RoadmapPlanItemVersion
+from app.services.audit_events import (
+    ENTITY_INTAKE_ITEM,
+    ENTITY_PLAN_ITEM,
+    ENTITY_ROADMAP_ITEM,
+    record_audit_event,
+)
+from app.services.change_feed import record_change
 
 
 TRACKED_KEYS = [
@@ -48,6 +63,38 @@ ROADMAP_KEYS = [
     "accountable_person",
     "picked_up",
 ]
+PLAN_KEYS = [
+    "bucket_item_id",
+    "title",
+    "priority",
+    "project_context",
+    "delivery_mode",
+    "fe_fte",
+    "be_fte",
+    "ai_fte",
+    "pm_fte",
+    "fs_fte",
+    "accountable_person",
+    "planned_start_date",
+    "planned_end_date",
+    "resource_count",
+    "effort_person_weeks",
+    "planning_status",
+    "confidence",
+    "dependency_ids",
+    "tentative_duration_weeks",
+    "pickup_period",
+    "completion_period",
+    "portfolio_quota_override",
+]
+# The merge trace logs the removed duplicate's snapshot under the surviving
+# item; it says nothing about the surviving item's own state.
+MERGE_TRACE_ACTION_PREFIX = "merged_from_item_"
+_ITEM_MODELS = {
+    ENTITY_INTAKE_ITEM: IntakeItem,
+    ENTITY_ROADMAP_ITEM: RoadmapItem,
+    ENTITY_PLAN_ITEM: RoadmapPlanItem,
+}
 
 
 def _diff_keys(before: dict, after: dict, keys: Iterable[str]) -> list[str]:
@@ -58,6 +105,90 @@ def _diff_keys(before: dict, after: dict, keys: Iterable[str]) -> list[str]:
     return changed
 
 
+def diff_patch(base: dict, target: dict) -> dict:
+    """Forward patch taking ``base`` to ``target``: changed or new keys under ``set``, dropped keys under ``unset``."""
+    patch: dict = {}
+    changed = {key: value for key, value in target.items() if key not in base or base[key] != value}
+    removed = [key for key in base if key not in target]
+    if changed:
+        patch["set"] = changed
+    if removed:
+        patch["unset"] = removed
+    return patch
+
+
+def apply_patch(base: dict, patch: dict) -> dict:
+    state = dict(base)
+    state.update(patch.get("set") or {})
+    for key in patch.get("unset") or []:
+        state.pop(key, None)
+    return state
+
+
+def version_states(versions: Iterable) -> list[tuple[dict, dict]]:
+    """Full (before, after) snapshots of ``versions``, which must be one item's rows in id order
+    starting at a keyframe (all of an item's rows always do)."""
+    states: list[tuple[dict, dict]] = []
+    after: dict = {}
+    for version in versions:
+        if version.keyframe:
+            before, after = version.before_data or {}, version.after_data or {}
+        else:
+            before = apply_patch(after, version.before_data or {})
+            after = apply_patch(before, version.after_data or {})
+        states.append((before, after))
+    return states
+
+
+def _since_keyframe(db: Session, model, item_column, item_id: int) -> list:
+    # One statement, so the chain is read from a single snapshot even while
+    # the compaction sweep rewrites the item's rows.
+    last_keyframe = (
+        select(func.max(model.id)).where(item_column == item_id, model.keyframe.is_(True)).scalar_subquery()
+    )
+    return db.query(model).filter(item_column == item_id, model.id >= last_keyframe).order_by(model.id.asc()).all()
+
+
+def _encode_version(version, chain_length: int, previous_after: dict, before_data: dict, after_data: dict) -> None:
+    """Store ``version`` as a keyframe when it starts a chain of ``VERSION_KEYFRAME_INTERVAL``, else as patches."""
+    if not chain_length or chain_length >= max(settings.VERSION_KEYFRAME_INTERVAL, 1):
+        version.keyframe = True
+        version.before_data = before_data
+        version.after_data = after_data
+        return
+    version.keyframe = False
+    version.before_data = diff_patch(previous_after, before_data)
+    version.after_data = diff_patch(before_data, after_data)
+
+
+def _log_version(db: Session, model, item_column, item_id: int, entity_type: str, **values) -> None:
+    """Add a version row for the item, and its audit and change feed events, in the same transaction."""
+    before_data, after_data = values.pop("before_data"), values.pop("after_data")
+    # Flushing first makes versions logged earlier in this transaction part
+    # of the chain, and takes the item's row lock before the chain is read.
+    db.flush()
+    chain = _since_keyframe(db, model, item_column, item_id)
+    previous_after = version_states(chain)[-1][1] if chain else {}
+    version = model(**values)
+    _encode_version(version, len(chain), previous_after, before_data, after_data)
+    db.add(version)
+    # Flushed again for the version id the audit event points back to.
+    db.flush()
+    record_audit_event(
+        db,
+        entity_type,
+        item_id,
+        version.action,
+        version.changed_by,
+        occurred_at=version.created_at,
+        project_context=(after_data or before_data).get("project_context") or "",
+        changed_fields=version.changed_fields,
+        source_id=version.id,
+    )
+    item = db.get(_ITEM_MODELS[entity_type], item_id)
+    record_change(db, entity_type, item_id, item.version_no if item else None, version.action)
+
+
 def log_intake_version(
     db: Session,
     intake_item_id: int,
@@ -66,16 +197,19 @@ def log_intake_version(
     before_data: dict,
     after_data: dict,
 ) -> None:
-    changed_fields = _diff_keys(before_data, after_data, TRACKED_KEYS)
-    version = IntakeItemVersion(
+    _log_version(
+        db,
+        IntakeItemVersion,
+        IntakeItemVersion.intake_item_id,
+        intake_item_id,
+        ENTITY_INTAKE_ITEM,
         intake_item_id=intake_item_id,
         action=action,
         changed_by=changed_by,
-        changed_fields=changed_fields,
+        changed_fields=_diff_keys(before_data, after_data, TRACKED_KEYS),
         before_data=before_data,
         after_data=after_data,
     )
-    db.add(version)
 
 
 def log_roadmap_version(
@@ -86,13 +220,108 @@ def log_roadmap_version(
     before_data: dict,
     after_data: dict,
 ) -> None:
-    changed_fields = _diff_keys(before_data, after_data, ROADMAP_KEYS)
-    version = RoadmapItemVersion(
+    _log_version(
+        db,
+        RoadmapItemVersion,
+        RoadmapItemVersion.roadmap_item_id,
+        roadmap_item_id,
+        ENTITY_ROADMAP_ITEM,
         roadmap_item_id=roadmap_item_id,
         action=action,
         changed_by=changed_by,
-        changed_fields=changed_fields,
+        changed_fields=_diff_keys(before_data, after_data, ROADMAP_KEYS),
         before_data=before_data,
         after_data=after_data,
     )
-    db.add(version)
+
+
+def log_plan_version(
+    db: Session,
+    plan_item_id: int,
+    action: str,
+    changed_by: int | None,
+    before_data: dict,
+    after_data: dict,
+) -> None:
+    _log_version(
+        db,
+        RoadmapPlanItemVersion,
+        RoadmapPlanItemVersion.plan_item_id,
+        plan_item_id,
+        ENTITY_PLAN_ITEM,
+        plan_item_id=plan_item_id,
+        action=action,
+        changed_by=changed_by,
+        changed_fields=_diff_keys(before_data, after_data, PLAN_KEYS),
+        before_data=before_data,
+        after_data=after_data,
+    )
+
+
+def delete_plan_history(db: Session, roadmap_item_ids: Iterable[int]) -> None:
+    """Drop the version rows of the plans committed from ``roadmap_item_ids``; call before deleting the plans."""
+    plan_ids = select(RoadmapPlanItem.id).where(RoadmapPlanItem.bucket_item_id.in_(list(roadmap_item_ids)))
+    db.query(RoadmapPlanItemVersion).filter(RoadmapPlanItemVersion.plan_item_id.in_(plan_ids)).delete(
+        synchronize_session=False
+    )
+
+
+def load_item_history(db: Session, model, item_column, item_id: int) -> list[tuple[object, dict, dict]]:
+    """``(version, before, after)`` for every version of an item, newest first."""
+    versions = db.query(model).filter(item_column == item_id).order_by(model.id.asc()).all()
+    history = [(version, before, after) for version, (before, after) in zip(versions, version_states(versions))]
+    history.reverse()
+    return history
+
+
+VERSION_COMPACTION_JOBS = {
+    "intake_version_compaction": (IntakeItemVersion, IntakeItemVersion.intake_item_id),
+    "roadmap_version_compaction": (RoadmapItemVersion, RoadmapItemVersion.roadmap_item_id),
+}
+
+
+def _compact_item(db: Session, model, item_column, item_id: int) -> int:
+    versions = db.query(model).filter(item_column == item_id).order_by(model.id.asc()).all()
+    rewritten = 0
+    chain_length, previous_after = 0, {}
+    for version, (before, after) in zip(versions, version_states(versions)):
+        was = (version.keyframe, version.before_data, version.after_data)
+        _encode_version(version, chain_length, previous_after, before, after)
+        chain_length = 1 if version.keyframe else chain_length + 1
+        previous_after = after
+        if (version.keyframe, version.before_data, version.after_data) != was:
+            rewritten += 1
+    return rewritten
+
+
+def compact_version_history(db: Session, limit: int) -> int:
+    """One-off migration of version rows written as full snapshots into keyframes and patches.
+
+    Works through up to ``limit`` items per table and call, in id order from
+    the cursor in ``maintenance_jobs``; once a table's sweep completes it is
+    never run again, as new rows are written compactly. Reads handle both
+    encodings, so the history stays correct while the sweep is under way.
+    Returns the number of rows rewritten.
+    """
+    rewritten = 0
+    for job_name, (model, item_column) in VERSION_COMPACTION_JOBS.items():
+        job = db.get(MaintenanceJob, job_name)
+        if job is None:
+            job = MaintenanceJob(name=job_name, processed=0, failed=0, remaining=0)
+            db.add(job)
+        elif job.completed_at is not None:
+            continue
+
+        query = db.query(item_column).distinct()
+        if job.cursor is not None:
+            query = query.filter(item_column > job.cursor)
+        item_ids = [item_id for (item_id,) in query.order_by(item_column.asc()).limit(limit)]
+        for item_id in item_ids:
+            count = _compact_item(db, model, item_column, item_id)
+            rewritten += count
+            job.processed += count
+            job.cursor = item_id
+        if len(item_ids) < limit:
+            job.completed_at = datetime.utcnow()
+        db.commit()
+    return rewritten
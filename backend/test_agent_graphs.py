@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Tests for the registry of precompiled agent graphs."""
+
+import sys
+import threading
+from typing import TypedDict
+
+sys.path.insert(0, '.')
+
+from langgraph.graph import END, StateGraph
+
+from app.services.agents import graph_registry
+from app.services.agents.graph_registry import get_graph, graph_stats, register_graph, warm_up_graphs
+
+
+class _EchoState(TypedDict):
+    value: str
+
+
+def _echo_node(state: _EchoState, config) -> _EchoState:
+    return {"value": f"{state['value']}:{config['configurable']['db']}"}
+
+
+def _counting_builder(calls: list):
+    def build() -> StateGraph:
+        calls.append(1)
+        graph = StateGraph(_EchoState)
+        graph.add_node("echo", _echo_node)
+        graph.set_entry_point("echo")
+        graph.add_edge("echo", END)
+        return graph
+
+    return build
+
+
+def test_graph_compiles_once_and_takes_request_deps_from_config():
+    calls: list = []
+    register_graph("test_echo", _counting_builder(calls))
+    threads = [threading.Thread(target=get_graph, args=("test_echo",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    first = get_graph("test_echo").invoke({"value": "a"}, config={"configurable": {"db": "session-1"}})
+    second = get_graph("test_echo").invoke({"value": "b"}, config={"configurable": {"db": "session-2"}})
+    assert (first["value"], second["value"]) == ("a:session-1", "b:session-2")
+    assert len(calls) == 1
+    stats = next(s for s in graph_stats() if s.name == "test_echo")
+    assert stats.invocations == 10 and stats.compile_seconds is not None
+    print("✓ Graph compiles once and takes request deps from config")
+
+
+def test_warm_up_compiles_registered_app_graphs():
+    import app.services.agents.roadmap_chat_graph  # noqa: F401
+    import app.services.intake_agent  # noqa: F401
+
+    timings = warm_up_graphs()
+    assert {"chat", "candidate"} <= set(timings)
+    assert "chat" in graph_registry._COMPILED and "candidate" in graph_registry._COMPILED
+    print("✓ Warm-up compiles registered app graphs")
+
+
+if __name__ == "__main__":
+    test_graph_compiles_once_and_takes_request_deps_from_config()
+    test_warm_up_compiles_registered_app_graphs()
+    print("\n✅ All tests passed!")
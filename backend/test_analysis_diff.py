@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Tests for aligning a revised document's units with its previous version."""
+
+import sys
+
+sys.path.insert(0, '.')
+
+from app.services.analysis_diff import (
+    AnalysisBaseline,
+    align_units,
+    baseline_alignment,
+    carry_forward_refs,
+    changed_context_units,
+)
+
+
+def _units(texts: list[str], prefix: str = "paragraph") -> list[dict]:
+    return [{"ref": f"{prefix}:{idx}", "text": text} for idx, text in enumerate(texts, start=1)]
+
+
+PREVIOUS = _units(["Cover v1", "Scope: payments", "Build ledger sync", "Add refund flow", "Appendix A"])
+
+
+def test_align_maps_unchanged_refs_and_isolates_changes():
+    current = _units(["Cover v2", "Scope:  PAYMENTS", "Build ledger sync", "Add payout webhooks", "Add refund flow", "Appendix A"])
+    alignment = align_units(PREVIOUS, current)
+    assert alignment.ref_map == {
+        "paragraph:2": "paragraph:2",
+        "paragraph:3": "paragraph:3",
+        "paragraph:4": "paragraph:5",
+        "paragraph:5": "paragraph:6",
+    }
+    assert [u["text"] for u in alignment.changed_units] == ["Cover v2", "Add payout webhooks"]
+    assert [u["text"] for u in alignment.removed_units] == ["Cover v1"]
+    assert alignment.unchanged_count == 4 and alignment.total_count == 6
+    print("✓ Align maps unchanged refs and isolates changes")
+
+
+def test_moved_section_counts_as_unchanged():
+    current = _units(["Cover v1", "Scope: payments", "Appendix A", "Build ledger sync", "Add refund flow"], "page")
+    alignment = align_units(PREVIOUS, current)
+    assert alignment.changed_units == [] and alignment.removed_units == []
+    assert alignment.ref_map["paragraph:5"] == "page:3"
+    print("✓ Moved section counts as unchanged")
+
+
+def test_carry_forward_drops_refs_to_changed_text():
+    current = _units(["Cover v2", "Scope: payments", "Build ledger sync", "Add refund flow", "Appendix B"])
+    alignment = align_units(PREVIOUS, current)
+    assert carry_forward_refs(["paragraph:1", "paragraph:3", "paragraph:3", "paragraph:5", "bogus"], alignment) == [
+        "paragraph:3"
+    ]
+    print("✓ Carry forward drops refs to changed text")
+
+
+def test_prompt_context_and_rewrite_threshold():
+    current = _units(["Cover v1", "Scope: payments", "Build ledger sync", "Add payout webhooks", "Appendix A"])
+    alignment = align_units(PREVIOUS, current)
+    assert [u["ref"] for u in changed_context_units(current, alignment)] == ["paragraph:3", "paragraph:4", "paragraph:5"]
+
+    baseline = AnalysisBaseline(document_id=1, units=PREVIOUS, output={})
+    assert baseline_alignment(baseline, current) is not None
+    assert baseline_alignment(baseline, _units(["Entirely", "different", "document"])) is None
+    assert baseline_alignment(None, current) is None
+    print("✓ Prompt context and rewrite threshold")
+
+
+if __name__ == "__main__":
+    test_align_maps_unchanged_refs_and_isolates_changes()
+    test_moved_section_counts_as_unchanged()
+    test_carry_forward_drops_refs_to_changed_text()
+    test_prompt_context_and_rewrite_threshold()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tests for paginated audit center sections.
+
+The paging and export tests need a disposable PostgreSQL database; every
+table in it is dropped. Run with
+    AUDIT_CENTER_DATABASE_URL=postgresql+psycopg2://... python test_audit_center.py
+Without that variable they are skipped.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, '.')
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.services.audit_center as audit_center
+from app.api.deps import get_current_user, get_db
+from app.api.routes import audit
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.models.enums import UserRole
+from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_item_version import RoadmapItemVersion
+from app.models.user import User
+from app.services.audit_center import AuditFilters, decode_cursor, encode_cursor, validate_audit_filters
+from app.services.principal_cache import Principal
+
+DATABASE_URL = os.getenv("AUDIT_CENTER_DATABASE_URL", "")
+
+
+def test_cursor_round_trip():
+    """Cursors carry the (time, id) key of the last row of a page."""
+    stamp = datetime(2026, 3, 9, 14, 5, 30, 123456)
+    cursor = encode_cursor(stamp, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (stamp, 42)
+    print("✓ Cursor round trip")
+
+
+def test_invalid_cursor():
+    """Tampered cursors are rejected rather than silently restarting the list."""
+    for cursor in ["!!", "bm90LWEtY3Vyc29y", encode_cursor(datetime(2026, 1, 1), 1)[:-3]]:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            continue
+        raise AssertionError(f"cursor {cursor!r} should be rejected")
+    print("✓ Invalid cursors rejected")
+
+
+def test_action_filter_sections():
+    """Documents have no action; version and movement lists do."""
+    filters = AuditFilters(action="updated")
+    for section in ["intake_changes", "roadmap_changes", "movement_events"]:
+        validate_audit_filters(section, filters)
+    try:
+        validate_audit_filters("documents", filters)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("documents should not take an action filter")
+    validate_audit_filters("documents", AuditFilters(actor_id=1, context="client"))
+    print("✓ Action filter sections")
+
+
+def _setup(monkeypatch):
+    """A database with one roadmap item, seven versions (five sharing a timestamp) and an audit API."""
+    engine = create_engine(DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Exports stream on a session of their own.
+    monkeypatch.setattr(audit_center, "SessionLocal", Session)
+
+    base = datetime(2026, 3, 9, 12, 0, 0)
+    with Session() as db:
+        user = User(full_name="CEO", email="ceo@audit.test", password_hash=get_password_hash("x"), role=UserRole.CEO, is_active=True)
+        item = RoadmapItem(title="Checkout", project_context="client")
+        db.add_all([user, item])
+        db.flush()
+        offsets = [0, 1, 1, 1, 2, 1, 1]
+        for number, offset in enumerate(offsets):
+            db.add(
+                RoadmapItemVersion(
+                    roadmap_item_id=item.id,
+                    action=f"updated_{number}",
+                    changed_by=user.id,
+                    changed_fields=["title", "scope"] if number == 3 else ["scope"],
+                    created_at=base + timedelta(minutes=offset),
+                )
+            )
+        db.commit()
+        expected = [
+            version_id
+            for (version_id,) in db.query(RoadmapItemVersion.id).order_by(
+                RoadmapItemVersion.created_at.desc(), RoadmapItemVersion.id.desc()
+            )
+        ]
+        user_id = user.id
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    api = FastAPI()
+    api.include_router(audit.router)
+    api.dependency_overrides[get_db] = override_db
+    api.dependency_overrides[get_current_user] = lambda: Principal(
+        id=user_id, email="ceo@audit.test", full_name="CEO", role=UserRole.CEO, is_active=True
+    )
+    return engine, TestClient(api), expected
+
+
+def test_paging_across_equal_timestamps(monkeypatch):
+    """Walking a section one row at a time visits every row once, in (time, id) order."""
+    if not DATABASE_URL:
+        pytest.skip("AUDIT_CENTER_DATABASE_URL is not set")
+    engine, client, expected = _setup(monkeypatch)
+    try:
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/audit/roadmap-changes", params=params)
+            assert response.status_code == 200, response.text
+            page = response.json()
+            seen += [row["event_id"] for row in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+            assert len(seen) <= len(expected), "pagination does not terminate"
+        assert seen == expected
+    finally:
+        engine.dispose()
+    print("✓ Paging across equal timestamps")
+
+
+def test_export_formats(monkeypatch):
+    """Exports stream every row as NDJSON or CSV; list columns are joined with "; " in CSV."""
+    if not DATABASE_URL:
+        pytest.skip("AUDIT_CENTER_DATABASE_URL is not set")
+    engine, client, expected = _setup(monkeypatch)
+    try:
+        response = client.get("/audit/export/roadmap-changes", params={"format": "ndjson"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert ".ndjson" in response.headers["content-disposition"]
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["event_id"] for row in rows] == expected
+        assert {tuple(row["changed_fields"]) for row in rows} == {("scope",), ("title", "scope")}
+
+        response = client.get("/audit/export/roadmap-changes", params={"format": "csv"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        records = list(csv.DictReader(io.StringIO(response.text)))
+        assert [int(record["event_id"]) for record in records] == expected
+        assert list(records[0]) == list(audit.SECTION_ROW_SCHEMAS["roadmap_changes"].model_fields)
+        by_id = {json_row["event_id"]: json_row for json_row in rows}
+        for record in records:
+            assert record["changed_fields"] == "; ".join(by_id[int(record["event_id"])]["changed_fields"])
+        assert "title; scope" in {record["changed_fields"] for record in records}
+        assert records[0]["title"] == "Checkout"
+
+        assert client.get("/audit/export/roadmap-changes", params={"format": "xml"}).status_code == 400
+        assert client.get("/audit/export/nope").status_code == 404
+    finally:
+        engine.dispose()
+    print("✓ Export formats")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_invalid_cursor()
+    test_action_filter_sections()
+    if DATABASE_URL:
+        monkeypatch = pytest.MonkeyPatch()
+        try:
+            test_paging_across_equal_timestamps(monkeypatch)
+            monkeypatch.undo()
+            test_export_formats(monkeypatch)
+        finally:
+            monkeypatch.undo()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Tests for the partitioned audit event log."""
+
+import sys
+from datetime import date, datetime
+
+sys.path.insert(0, '.')
+
+from app.models.audit_event import AuditEvent
+from app.models.roadmap_movement_request import RoadmapMovementRequest
+from app.services.audit_events import _add_months, movement_event_actions, partition_name
+
+
+def test_monthly_partitions():
+    """Partitions are named by month and month arithmetic crosses year ends."""
+    assert partition_name(date(2026, 3, 1)) == "audit_events_202603"
+    assert _add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert _add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert _add_months(date(2026, 1, 1), -13) == date(2024, 12, 1)
+    print("✓ Monthly partitions")
+
+
+def test_table_is_partitioned_by_time():
+    """The primary key carries the partition key, as Postgres requires."""
+    table = AuditEvent.__table__
+    assert table.dialect_options["postgresql"]["partition_by"] == "RANGE (occurred_at)"
+    assert [column.name for column in table.primary_key.columns] == ["id", "occurred_at"]
+    print("✓ Table is partitioned by time")
+
+
+def test_movement_event_actions():
+    """Requests produce a request and a decision event; CEO moves a single one."""
+    requested, decided = datetime(2026, 5, 1, 9), datetime(2026, 5, 2, 10)
+    movement = RoadmapMovementRequest(
+        request_type="request", status="pending", requested_by=3, requested_at=requested
+    )
+    assert movement_event_actions(movement) == [("movement_requested", 3, requested)]
+
+    movement.status, movement.decided_by, movement.decided_at = "approved", 1, decided
+    assert movement_event_actions(movement)[-1] == ("movement_approved", 1, decided)
+
+    direct = RoadmapMovementRequest(
+        request_type="ceo_direct", status="approved", requested_by=1, requested_at=requested, decided_at=requested
+    )
+    assert movement_event_actions(direct) == [("movement_ceo_direct", 1, requested)]
+    print("✓ Movement event actions")
+
+
+if __name__ == "__main__":
+    test_monthly_partitions()
+    test_table_is_partitioned_by_time()
+    test_movement_event_actions()
+    print("\n✅ All tests passed!")
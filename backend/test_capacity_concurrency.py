@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Stress test: parallel roadmap planners must never overbook a week.
+
+Needs a disposable PostgreSQL database; every table in it is dropped. Run with
+    CAPACITY_STRESS_DATABASE_URL=postgresql+psycopg2://... python test_capacity_concurrency.py
+Without that variable the test is skipped.
+"""
+import os
+import sys
+import threading
+from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, '.')
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.api.deps import get_db
+from app.api.routes import roadmap
+from app.core.security import create_access_token, get_password_hash
+from app.db.base import Base
+from app.models.enums import UserRole
+from app.models.governance_config import GovernanceConfig
+from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.models.user import User
+from app.services.audit_events import ensure_audit_partitions
+from app.services.capacity_locks import ANNUAL_POOL_KEY, lock_capacity_buckets
+
+DATABASE_URL = os.getenv("CAPACITY_STRESS_DATABASE_URL", "")
+PARALLEL_CLIENTS = 8
+
+
+def _reset_schema(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+
+
+def _setup():
+    engine = create_engine(DATABASE_URL, pool_size=PARALLEL_CLIENTS + 2)
+    _reset_schema(engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        ensure_audit_partitions(db, datetime.utcnow(), 1)
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(roadmap.router)
+    app.dependency_overrides[get_db] = override_db
+
+    with Session() as db:
+        user = User(full_name="PM", email="pm@stress.test", password_hash=get_password_hash("x"), role=UserRole.PM, is_active=True)
+        db.add(user)
+        db.add(
+            GovernanceConfig(
+                team_fe=1, team_be=0, team_ai=0, team_pm=0, team_fs=0,
+                quota_client=1.0, quota_internal=0.0, quota_fe_client=1.0,
+            )
+        )
+        plan_ids = []
+        for index in range(PARALLEL_CLIENTS * 2):
+            bucket = RoadmapItem(title=f"Item {index}", project_context="client", fe_fte=0.5, picked_up=True)
+            db.add(bucket)
+            db.flush()
+            plan = RoadmapPlanItem(bucket_item_id=bucket.id, title=bucket.title, project_context="client", fe_fte=0.5)
+            db.add(plan)
+            db.flush()
+            plan_ids.append(plan.id)
+        db.commit()
+        token = create_access_token(str(user.id))
+    return engine, Session, app, token, plan_ids
+
+
+def _patch_all(app, token, plan_ids, windows):
+    barrier = threading.Barrier(len(plan_ids))
+
+    def patch(args):
+        plan_id, (start, end) = args
+        client = TestClient(app)
+        barrier.wait()
+        response = client.patch(
+            f"/roadmap/plan/items/{plan_id}",
+            json={"planned_start_date": start, "planned_end_date": end, "expected_version_no": 1},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        return response.status_code
+
+    with ThreadPoolExecutor(max_workers=len(plan_ids)) as pool:
+        return list(pool.map(patch, zip(plan_ids, windows)))
+
+
+def test_parallel_commits_never_overbook():
+    """Concurrent commits into the same weeks admit exactly what fits; disjoint weeks all succeed."""
+    if not DATABASE_URL:
+        pytest.skip("CAPACITY_STRESS_DATABASE_URL is not set")
+    engine, Session, app, token, plan_ids = _setup()
+    try:
+        contended, disjoint = plan_ids[:PARALLEL_CLIENTS], plan_ids[PARALLEL_CLIENTS:]
+
+        codes = _patch_all(app, token, contended, [("2030-03-04", "2030-03-17")] * len(contended))
+        assert sorted(codes) == [200, 200] + [409] * (len(contended) - 2), codes
+
+        windows = [(f"2031-{month:02d}-03", f"2031-{month:02d}-09") for month in range(1, len(disjoint) + 1)]
+        codes = _patch_all(app, token, disjoint, windows)
+        assert codes == [200] * len(disjoint), codes
+
+        with Session() as db:
+            booked = db.query(RoadmapPlanItem).filter(RoadmapPlanItem.planned_start_date == "2030-03-04").count()
+        assert booked == 2
+        print("✓ Parallel commits never overbook")
+    finally:
+        engine.dispose()
+        _reset_schema(engine)
+        engine.dispose()
+
+
+def test_duration_change_waits_for_annual_pool():
+    """A plan edit that changes the duration waits for the annual pool; one that keeps it does not."""
+    if not DATABASE_URL:
+        pytest.skip("CAPACITY_STRESS_DATABASE_URL is not set")
+    engine, Session, app, token, plan_ids = _setup()
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def patch(start, end, version):
+        return client.patch(
+            f"/roadmap/plan/items/{plan_ids[0]}",
+            json={"planned_start_date": start, "planned_end_date": end, "expected_version_no": version},
+            headers=headers,
+        ).status_code
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            holder = Session()
+            try:
+                lock_capacity_buckets(holder, [("client", ANNUAL_POOL_KEY)])
+                pending = pool.submit(patch, "2030-03-04", "2030-03-17", 1)
+                time.sleep(0.5)
+                waited = not pending.done()
+            finally:
+                holder.rollback()
+                holder.close()
+            assert pending.result(timeout=10) == 200
+            assert waited, "duration change did not wait for the annual pool"
+
+            holder = Session()
+            try:
+                lock_capacity_buckets(holder, [("client", ANNUAL_POOL_KEY)])
+                # Same two-week duration, different weeks.
+                assert pool.submit(patch, "2030-04-01", "2030-04-14", 2).result(timeout=5) == 200
+            finally:
+                holder.rollback()
+                holder.close()
+        print("✓ Duration changes wait for the annual pool")
+    finally:
+        engine.dispose()
+        _reset_schema(engine)
+        engine.dispose()
+
+
+def test_recommit_waits_for_plan_weeks():
+    """Recommitting a dated plan rewrites its weekly demand, so it waits for those weeks."""
+    if not DATABASE_URL:
+        pytest.skip("CAPACITY_STRESS_DATABASE_URL is not set")
+    engine, Session, app, token, plan_ids = _setup()
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        response = client.patch(
+            f"/roadmap/plan/items/{plan_ids[0]}",
+            json={"planned_start_date": "2030-03-04", "planned_end_date": "2030-03-17", "expected_version_no": 1},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+        with Session() as db:
+            bucket_id = db.get(RoadmapPlanItem, plan_ids[0]).bucket_item_id
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            holder = Session()
+            try:
+                lock_capacity_buckets(holder, [("client", "2030-W11")])
+                pending = pool.submit(
+                    lambda: client.post(
+                        "/roadmap/plan/move", json={"ids": [bucket_id], "tentative_duration_weeks": 2}, headers=headers
+                    ).status_code
+                )
+                time.sleep(0.5)
+                waited = not pending.done()
+            finally:
+                holder.rollback()
+                holder.close()
+            assert pending.result(timeout=10) == 200
+            assert waited, "recommit did not wait for the plan's weeks"
+        print("✓ Recommits wait for the plan's weeks")
+    finally:
+        engine.dispose()
+        _reset_schema(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_parallel_commits_never_overbook()
+    test_duration_change_waits_for_annual_pool()
+    test_recommit_waits_for_plan_weeks()
+    print("\n✅ All tests passed!")
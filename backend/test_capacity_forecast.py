@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Tests for the Monte Carlo capacity risk forecast."""
+
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, '.')
+
+from app.services.capacity_forecast import _dependency_order, build_capacity_forecast
+from app.services.capacity_governance import PORTFOLIOS, ROLE_KEYS, build_capacity_governance_alert
+
+
+def _config(team: int = 2, quota: float = 0.5) -> SimpleNamespace:
+    values = {"quota_client": quota, "quota_internal": quota}
+    for role in ROLE_KEYS:
+        values[f"team_{role}"] = team
+        values[f"efficiency_{role}"] = 1.0
+        for portfolio in PORTFOLIOS:
+            values[f"quota_{role}_{portfolio}"] = quota if portfolio != "rnd" else 0.0
+    return SimpleNamespace(**values)
+
+
+def _plan(plan_id, start, end, confidence="medium", status="not_started", deps=None, context="client", **fte):
+    values = {f"{role}_fte": fte.get(role) for role in ROLE_KEYS}
+    return SimpleNamespace(
+        id=plan_id,
+        title=f"Plan {plan_id}",
+        planned_start_date=start,
+        planned_end_date=end,
+        project_context=context,
+        confidence=confidence,
+        planning_status=status,
+        dependency_ids=deps or [],
+        **values,
+    )
+
+
+def test_done_plans_reproduce_the_alert():
+    """Without slip every trial is the plan itself, so breaches have probability 0 or 1."""
+    plans = [
+        _plan(1, "2026-01-05", "2026-01-25", status="done", fe=1.0),
+        _plan(2, "2026-01-19", "2026-02-08", status="done", fe=1.0),
+    ]
+    cfg = _config()
+    forecast = build_capacity_forecast(cfg, plans, trials=50, seed=1)
+    fe = forecast["exceed_probability"]["client"]["fe"]
+    assert set(fe) == {0.0, 1.0}
+    assert forecast["weeks"][fe.index(1.0)] == build_capacity_governance_alert(cfg, plans)["role_alerts"][0]["peak_week"]
+    assert all(plan["on_time_probability"] == 1.0 for plan in forecast["plans"])
+    print("✓ Done plans reproduce the alert")
+
+
+def test_low_confidence_slips_more():
+    """Lower confidence means fewer on-time trials and a later p90 end."""
+    plans = [
+        _plan(1, "2026-01-05", "2026-04-26", confidence="high", fe=0.1),
+        _plan(2, "2026-01-05", "2026-04-26", confidence="low", fe=0.1),
+    ]
+    forecast = build_capacity_forecast(_config(), plans, trials=2000, seed=3)
+    high, low = forecast["plans"]
+    assert high["on_time_probability"] > low["on_time_probability"]
+    assert high["p90_end_week"] < low["p90_end_week"]
+    print("✓ Low confidence slips more")
+
+
+def test_dependencies_push_late_successors():
+    """A successor with no slack of its own slips whenever its dependency does."""
+    plans = [
+        _plan(1, "2026-01-05", "2026-03-01", confidence="low", fe=0.1),
+        _plan(2, "2026-03-02", "2026-03-08", confidence="high", deps=[1], fe=0.1),
+        _plan(3, "2026-09-07", "2026-09-13", confidence="high", deps=[1], fe=0.1),
+    ]
+    forecast = build_capacity_forecast(_config(), plans, trials=2000, seed=5)
+    first, tight, slack = forecast["plans"]
+    # A one-week high-confidence plan never slips on its own.
+    assert tight["on_time_probability"] == first["on_time_probability"]
+    assert slack["on_time_probability"] > tight["on_time_probability"]
+    print("✓ Dependencies push late successors")
+
+
+def test_dependency_order_long_chain_and_cycles():
+    """Thousands of chained plans are ordered without recursion; a cycle loses one edge."""
+    chain = [_plan(plan_id, None, None, deps=[plan_id + 1] if plan_id < 5000 else []) for plan_id in range(1, 5001)]
+    order = _dependency_order(chain)
+    assert len(order) == 4999
+    position = {row: index for index, (row, _) in enumerate(order)}
+    assert all(position.get(dep, -1) < position[row] for row, deps in order for dep in deps)
+    assert order[0] == (4998, [4999]) and order[-1] == (0, [1])
+
+    cycle = [_plan(1, None, None, deps=[3]), _plan(2, None, None, deps=[1]), _plan(3, None, None, deps=[2, 3, 99])]
+    assert _dependency_order(cycle) == [(1, [0]), (2, [1])]
+    print("✓ Dependency order handles long chains and cycles")
+
+
+def test_seed_is_reproducible():
+    plans = [_plan(1, "2026-01-05", "2026-03-01", confidence="low", fe=1.0)]
+    first = build_capacity_forecast(_config(), plans, trials=200, seed=11)
+    second = build_capacity_forecast(_config(), plans, trials=200, seed=11)
+    assert first == second
+    print("✓ Seed is reproducible")
+
+
+def test_full_portfolio_is_fast():
+    """A few hundred plans over thousands of trials stays within dashboard latency."""
+    plans = []
+    origin = date(2026, 1, 5)
+    for plan_id in range(1, 401):
+        start = origin + timedelta(weeks=(plan_id * 7) % 80)
+        end = start + timedelta(weeks=4 + plan_id % 20)
+        plans.append(
+            _plan(
+                plan_id,
+                start.isoformat(),
+                end.isoformat(),
+                confidence=("high", "medium", "low")[plan_id % 3],
+                deps=[plan_id - 1] if plan_id % 4 == 0 else [],
+                context=PORTFOLIOS[plan_id % 3],
+                fe=0.3,
+                be=0.2,
+                ai=0.1,
+            )
+        )
+    started = time.perf_counter()
+    forecast = build_capacity_forecast(_config(team=10), plans, trials=2000, seed=0)
+    elapsed = time.perf_counter() - started
+    assert len(forecast["plans"]) == 400
+    assert elapsed < 5.0, elapsed
+    print(f"✓ 400 plans x 2000 trials in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_done_plans_reproduce_the_alert()
+    test_low_confidence_slips_more()
+    test_dependencies_push_late_successors()
+    test_dependency_order_long_chain_and_cycles()
+    test_seed_is_reproducible()
+    test_full_portfolio_is_fast()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Tests for the array-backed capacity governance engine."""
+
+import random
+import sys
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, '.')
+
+from app.services.capacity_governance import (
+    PORTFOLIOS,
+    ROLE_KEYS,
+    CapacityScenario,
+    RoleIndex,
+    RoleVectors,
+    _plan_week_bounds,
+    _week_keys_between,
+    build_capacity_governance_alert,
+    build_weekly_usage,
+    plan_fte_matrix,
+    simulate_capacity_scenarios,
+)
+
+
+def _config(team: int = 2, efficiency: float = 1.0, quota: float = 0.5) -> SimpleNamespace:
+    values = {"quota_client": quota, "quota_internal": quota}
+    for role in ROLE_KEYS:
+        values[f"team_{role}"] = team
+        values[f"efficiency_{role}"] = efficiency
+        for portfolio in PORTFOLIOS:
+            values[f"quota_{role}_{portfolio}"] = quota if portfolio != "rnd" else 0.0
+    return SimpleNamespace(**values)
+
+
+def _plan(start: str, end: str, context: str = "client", plan_id: int | None = None, **fte) -> SimpleNamespace:
+    values = {f"{role}_fte": fte.get(role) for role in ROLE_KEYS}
+    return SimpleNamespace(id=plan_id, planned_start_date=start, planned_end_date=end, project_context=context, **values)
+
+
+def test_week_bounds_match_week_keys():
+    """Week spans must agree with the week keys the dict engine iterated over."""
+    rng = random.Random(7)
+    for _ in range(500):
+        start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 800))
+        end = start + timedelta(days=rng.randint(0, 200))
+        start_raw, end_raw = start.isoformat(), end.isoformat()
+        if rng.random() < 0.3:
+            start_raw, end_raw = f"{start_raw}T{rng.randint(0, 23):02d}:00", f"{end_raw}T{rng.randint(0, 23):02d}:00"
+        start_dt, end_dt = datetime.fromisoformat(start_raw), datetime.fromisoformat(end_raw)
+        bounds = _plan_week_bounds(start_raw, end_raw)
+        if end_dt < start_dt:
+            assert bounds is None
+            continue
+        keys = _week_keys_between(start_dt, end_dt)
+        assert bounds[1] == len(keys), (start_raw, end_raw, bounds, keys)
+
+
+def test_usage_matrix_sums_overlapping_plans():
+    plans = [
+        _plan("2025-01-06", "2025-01-19", fe=1.0, be=0.5),
+        _plan("2025-01-13", "2025-01-26", fe=0.5),
+        _plan("2025-01-13", "2025-01-13", "rnd", ai=2.0),
+        _plan("", "", fe=1.0),
+    ]
+    usage = build_weekly_usage(plans)
+    client, rnd = PORTFOLIOS.index("client"), PORTFOLIOS.index("rnd")
+    fe, ai = ROLE_KEYS.index("fe"), ROLE_KEYS.index("ai")
+
+    assert usage.week_count == 3
+    assert [usage.week_key(i) for i in range(3)] == ["2025-W02", "2025-W03", "2025-W04"]
+    assert usage.demand[client, :, fe].tolist() == [1.0, 1.5, 0.5]
+    assert usage.demand[rnd, :, ai].tolist() == [0.0, 2.0, 0.0]
+    assert usage.unscheduled_demand_items == 1
+
+
+def test_alert_reports_first_peak_shortage():
+    cfg = _config(team=2, quota=0.5)
+    plans = [
+        _plan("2025-03-03", "2025-03-30", fe=1.5),
+        _plan("2025-03-17", "2025-04-13", fe=1.5),
+        _plan("2025-03-03", "2025-03-09", "internal", pm=0.9),
+    ]
+    alert = build_capacity_governance_alert(cfg, plans)
+    by_role = {a["role"]: a for a in alert["role_alerts"]}
+
+    # FE capacity is (2 FE + 2 FS x 50%) x 50% client quota = 1.5 FTE/week; overlap books 3.0.
+    assert alert["status"] == "CRITICAL"
+    assert alert["shortage_roles"] == ["FE"]
+    assert by_role["FE"]["peak_week"] == "2025-W12"
+    assert by_role["FE"]["required_extra_fte"] == 1.5
+    assert by_role["PM"]["status"] == "WARNING"
+    assert by_role["PM"]["peak_utilization_pct"] == 90.0
+    assert by_role["AI"] == {
+        "role": "AI",
+        "status": "OK",
+        "portfolio": "",
+        "peak_week": "2025-W15",
+        "peak_demand_fte": 0.0,
+        "capacity_fte": 0.0,
+        "required_extra_fte": 0.0,
+        "peak_utilization_pct": 0.0,
+    }
+
+
+def test_alert_handles_large_portfolios():
+    rng = random.Random(11)
+    plans = []
+    for _ in range(20000):
+        start = date(2025, 1, 1) + timedelta(days=rng.randint(0, 365))
+        end = start + timedelta(days=rng.randint(7, 90))
+        plans.append(_plan(start.isoformat(), end.isoformat(), rng.choice(PORTFOLIOS), fe=0.1, be=0.2))
+    alert = build_capacity_governance_alert(_config(team=10), plans)
+    assert alert["status"] == "CRITICAL"
+    assert alert["unscheduled_demand_items"] == 0
+
+
+def test_simulation_matches_recomputed_alerts():
+    cfg = _config(team=2, quota=0.5)
+    plans = [
+        _plan("2025-03-03", "2025-03-30", plan_id=1, fe=1.5),
+        _plan("2025-03-17", "2025-04-13", plan_id=2, fe=1.5),
+        _plan("2025-03-03", "2025-03-09", "internal", plan_id=3, pm=0.9),
+    ]
+    moved = [plans[0], _plan("2025-04-14", "2025-05-11", plan_id=2, fe=1.5), plans[2]]
+    baseline, (unchanged, shifted, hired) = simulate_capacity_scenarios(
+        cfg,
+        plans,
+        [
+            CapacityScenario(name="as-is"),
+            CapacityScenario(name="defer", plan_shifts={2: 4}),
+            CapacityScenario(name="hire", team_deltas={"fe": 3}, quota_overrides={"internal": 0.6}),
+        ],
+    )
+
+    assert baseline == unchanged == build_capacity_governance_alert(cfg, plans)
+    assert shifted == build_capacity_governance_alert(cfg, moved)
+    # Three more FE engineers cover the overlap; a 60% internal quota takes PM from 90% to 75%.
+    assert baseline["warning_roles"] == ["PM"]
+    assert hired["shortage_roles"] == []
+    assert hired["warning_roles"] == ["FE"]
+
+
+def test_extra_roles_extend_the_role_vector():
+    """Roles beyond the built-in five get their own column, capacity and alert."""
+    cfg = _config(team=2, quota=0.5)
+    plans = [
+        _plan("2025-03-03", "2025-03-16", fe=0.5),
+        _plan("2025-03-10", "2025-03-23", fe=0.5),
+    ]
+    roles = RoleVectors(
+        index=RoleIndex(keys=ROLE_KEYS + ("qa",), extra_role_ids=(42,)),
+        plan_fte=np.hstack([plan_fte_matrix(plans), [[0.6], [0.6]]]),
+        extra_team=np.array([2.0]),
+        extra_efficiency=np.array([1.0]),
+    )
+
+    alert = build_capacity_governance_alert(cfg, plans, roles)
+    qa = alert["role_alerts"][-1]
+    assert qa["role"] == "QA" and qa["status"] == "CRITICAL"
+    assert qa["peak_week"] == "2025-W11"
+    assert abs(qa["required_extra_fte"] - 0.2) < 1e-9
+    assert alert["shortage_roles"] == ["QA"]
+    assert alert["role_alerts"][:-1] == build_capacity_governance_alert(cfg, plans)["role_alerts"]
+
+    _, (hired,) = simulate_capacity_scenarios(cfg, plans, [CapacityScenario(name="qa", team_deltas={"qa": 1})], roles)
+    assert hired["shortage_roles"] == []
+
+
+if __name__ == "__main__":
+    test_week_bounds_match_week_keys()
+    test_usage_matrix_sums_overlapping_plans()
+    test_alert_reports_first_peak_shortage()
+    test_alert_handles_large_portfolios()
+    test_simulation_matches_recomputed_alerts()
+    test_extra_roles_extend_the_role_vector()
+    print("\n🎉 All tests passed!")
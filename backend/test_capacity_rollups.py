@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Tests for the capacity rollup deltas and heatmap period bucketing.
+
+The build tests need a disposable PostgreSQL database; every table in it is
+dropped. Run with
+    CAPACITY_ROLLUP_DATABASE_URL=postgresql+psycopg2://... python test_capacity_rollups.py
+Without that variable they are skipped.
+"""
+
+import os
+import sys
+from collections import defaultdict
+from datetime import date
+
+sys.path.insert(0, '.')
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.db.base import Base
+from app.models.capacity_rollup import CapacityWeekRollup
+from app.models.fte_role import FteRole
+from app.models.governance_config import GovernanceConfig
+from app.models.maintenance_job import MaintenanceJob
+from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_item_fte import RoadmapPlanItemFte
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.services.capacity_governance import week_number
+from app.services.capacity_roles import load_role_index
+from app.services.capacity_rollups import (
+    ROLLUP_BUILD_JOB,
+    _add_footprint,
+    _footprint,
+    _iso_year_weeks,
+    _period_labels,
+    build_capacity_heatmap,
+    invalidate_capacity_rollups,
+    refresh_capacity_rollups,
+)
+
+DATABASE_URL = os.getenv("CAPACITY_ROLLUP_DATABASE_URL", "")
+
+
+def test_iso_year_weeks():
+    """Years span ISO week 1 to 52 or 53."""
+    first, last = _iso_year_weeks(2026)
+    assert last - first + 1 == 53
+    assert first == week_number(date(2025, 12, 29))
+    first, last = _iso_year_weeks(2030)
+    assert last - first + 1 == 52
+    print("✓ ISO year weeks")
+
+
+def test_period_labels():
+    """Weeks land in the month and quarter of their Thursday."""
+    first, last = _iso_year_weeks(2026)
+    labels, period = _period_labels(first, last, "week")
+    assert labels[0] == "2026-W01" and labels[-1] == "2026-W53"
+    assert list(period) == list(range(53))
+
+    labels, period = _period_labels(first, last, "month")
+    assert labels == [f"2026-{month:02d}" for month in range(1, 13)]
+    # 2025-12-29 is a Monday whose Thursday is 2026-01-01.
+    assert period[0] == 0
+
+    labels, period = _period_labels(first, last, "quarter")
+    assert labels == ["2026-Q1", "2026-Q2", "2026-Q3", "2026-Q4"]
+    assert sum(period == 0) == 13
+    print("✓ Period labels")
+
+
+def test_footprint_delta():
+    """Moving a plan subtracts its old weeks and adds its new ones; shared weeks net out."""
+    delta = defaultdict(float)
+    _add_footprint(delta, _footprint("client", 100, 3, {"fe": 0.5, "be": 0.25}), -1.0)
+    _add_footprint(delta, _footprint("client", 101, 3, {"fe": 1.0}), 1.0)
+    assert delta == {
+        ("client", 100, "fe"): -0.5,
+        ("client", 100, "be"): -0.25,
+        ("client", 101, "fe"): 0.5,
+        ("client", 101, "be"): -0.25,
+        ("client", 102, "fe"): 0.5,
+        ("client", 102, "be"): -0.25,
+        ("client", 103, "fe"): 1.0,
+    }
+    print("✓ Footprint delta")
+
+
+def _setup():
+    engine = create_engine(DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.add(GovernanceConfig(team_fe=4, quota_client=1.0, quota_internal=0.0, quota_fe_client=1.0))
+        db.commit()
+    return engine, Session
+
+
+def _plan(db, title: str, fe_fte: float = 0.5) -> RoadmapPlanItem:
+    bucket = RoadmapItem(title=title, project_context="client", fe_fte=fe_fte, picked_up=True)
+    db.add(bucket)
+    db.flush()
+    plan = RoadmapPlanItem(
+        bucket_item_id=bucket.id,
+        title=title,
+        project_context="client",
+        fe_fte=fe_fte,
+        planned_start_date="2030-03-04",
+        planned_end_date="2030-03-17",
+    )
+    db.add(plan)
+    db.flush()
+    return plan
+
+
+def _weekly_demand(db, role: str = "fe") -> list[float]:
+    heatmap = build_capacity_heatmap(
+        db, db.query(GovernanceConfig).one(), load_role_index(db), 2030, portfolio="client", role=role
+    )
+    return [value for value in heatmap["rows"][0]["demand_fte"] if value]
+
+
+def test_build_counts_plans_from_before_deploy():
+    """A plan written before the first heatmap read does not hide the plans that predate the rollups."""
+    if not DATABASE_URL:
+        pytest.skip("CAPACITY_ROLLUP_DATABASE_URL is not set")
+    engine, Session = _setup()
+    try:
+        with Session() as db:
+            for index in range(3):
+                _plan(db, f"Existing {index}")
+            db.commit()
+            # The first write after deploy stores a footprint for its own plan only.
+            plan = _plan(db, "Edited after deploy")
+            refresh_capacity_rollups(db, [plan.id])
+            db.commit()
+
+            assert _weekly_demand(db) == [2.0, 2.0]
+            job = db.get(MaintenanceJob, ROLLUP_BUILD_JOB)
+            assert job is not None and job.completed_at is not None and job.processed == 4
+            # Later reads do not rebuild.
+            built_at = job.completed_at
+            assert _weekly_demand(db) == [2.0, 2.0]
+            db.refresh(job)
+            assert job.completed_at == built_at
+    finally:
+        engine.dispose()
+    print("✓ Build counts plans from before deploy")
+
+
+def test_build_is_recorded_without_demand():
+    """Plans with no demand store no footprints, but the build still completes once."""
+    if not DATABASE_URL:
+        pytest.skip("CAPACITY_ROLLUP_DATABASE_URL is not set")
+    engine, Session = _setup()
+    try:
+        with Session() as db:
+            _plan(db, "Unstaffed", fe_fte=0.0)
+            db.commit()
+            assert _weekly_demand(db) == []
+            assert db.get(MaintenanceJob, ROLLUP_BUILD_JOB).completed_at is not None
+            assert db.query(CapacityWeekRollup).count() == 0
+    finally:
+        engine.dispose()
+    print("✓ Build is recorded without demand")
+
+
+def test_role_change_rebuilds():
+    """Activating a role after the build invalidates it, so that role's plan FTE is rolled up."""
+    if not DATABASE_URL:
+        pytest.skip("CAPACITY_ROLLUP_DATABASE_URL is not set")
+    engine, Session = _setup()
+    try:
+        with Session() as db:
+            role = FteRole(name="Quality", abbreviation="QA", is_active=False)
+            db.add(role)
+            plan = _plan(db, "Tested")
+            db.add(RoadmapPlanItemFte(roadmap_plan_item_id=plan.id, fte_role_id=role.id, fte_value=1.0))
+            db.commit()
+            assert _weekly_demand(db) == [0.5, 0.5]
+            assert db.query(CapacityWeekRollup).filter(CapacityWeekRollup.role == "qa").count() == 0
+
+            role.is_active = True
+            invalidate_capacity_rollups(db)
+            db.commit()
+            assert _weekly_demand(db, "qa") == [1.0, 1.0]
+            assert _weekly_demand(db) == [0.5, 0.5]
+    finally:
+        engine.dispose()
+    print("✓ Role change rebuilds the rollups")
+
+
+if __name__ == "__main__":
+    test_iso_year_weeks()
+    test_period_labels()
+    test_footprint_delta()
+    test_build_counts_plans_from_before_deploy()
+    test_build_is_recorded_without_demand()
+    test_role_change_rebuilds()
+    print("\n✅ All tests passed!")
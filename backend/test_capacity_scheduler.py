@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Tests for the earliest-feasible-slot capacity search."""
+
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, '.')
+
+from app.services.capacity_governance import ROLE_KEYS, build_weekly_usage, week_number
+from app.services.capacity_scheduler import find_feasible_slots
+
+ROLES = ["fe", "be", "ai", "pm"]
+ROLE_IDX = [ROLE_KEYS.index(role) for role in ROLES]
+
+
+def _plan(start: str, end: str, **fte) -> SimpleNamespace:
+    values = {f"{role}_fte": fte.get(role) for role in ROLE_KEYS}
+    return SimpleNamespace(planned_start_date=start, planned_end_date=end, project_context="client", **values)
+
+
+def _search(plans, proposed, duration, limit=3, capacity=(2.0, 2.0, 1.0, 1.0)):
+    return find_feasible_slots(
+        usage=build_weekly_usage(plans),
+        portfolio_idx=0,
+        role_idx=ROLE_IDX,
+        capacity=np.array(capacity),
+        proposed=np.array(proposed),
+        duration_weeks=duration,
+        earliest_week=week_number(datetime(2025, 1, 6)),
+        horizon_weeks=52,
+        limit=limit,
+    )
+
+
+def test_skips_weeks_that_would_overbook():
+    # FE is fully booked for the first three weeks of January.
+    plans = [_plan("2025-01-06", "2025-01-26", fe=1.5)]
+    slots = _search(plans, proposed=[1.0, 0.0, 0.0, 0.0], duration=2)
+
+    first = week_number(datetime(2025, 1, 27))
+    assert [s.start_week for s in slots] == [first, first + 1, first + 2]
+    assert slots[0].end_week == first + 1
+    assert slots[0].peak_utilization_pct[0] == 50.0
+
+
+def test_window_must_clear_every_covered_week():
+    # A one-week gap between two bookings cannot hold a two-week commitment.
+    plans = [
+        _plan("2025-01-06", "2025-01-12", be=2.0),
+        _plan("2025-01-20", "2025-01-26", be=2.0),
+    ]
+    slots = _search(plans, proposed=[0.0, 0.5, 0.0, 0.0], duration=2, limit=1)
+    assert slots[0].start_week == week_number(datetime(2025, 1, 27))
+
+    single = _search(plans, proposed=[0.0, 0.5, 0.0, 0.0], duration=1, limit=1)
+    assert single[0].start_week == week_number(datetime(2025, 1, 13))
+
+
+def test_role_without_capacity_blocks_any_demand():
+    assert _search([], proposed=[0.0, 0.0, 0.5, 0.0], duration=1, capacity=(2.0, 2.0, 0.0, 1.0)) == []
+    assert len(_search([], proposed=[0.5, 0.0, 0.0, 0.0], duration=1, capacity=(2.0, 2.0, 0.0, 1.0))) == 3
+
+
+if __name__ == "__main__":
+    test_skips_weeks_that_would_overbook()
+    test_window_must_clear_every_covered_week()
+    test_role_without_capacity_blocks_any_demand()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Tests for the item change feed."""
+
+import asyncio
+import sys
+import threading
+
+sys.path.insert(0, '.')
+
+from app.api.routes.changes import _sse
+from app.services.change_feed import ChangeFeedListener, decode_feed_cursor, encode_feed_cursor
+
+
+def test_cursor_round_trip():
+    """Cursors order by transaction, then event id."""
+    cursor = encode_feed_cursor(1882, 4)
+    assert cursor == "1882-4"
+    assert decode_feed_cursor(cursor) == (1882, 4)
+    assert decode_feed_cursor(encode_feed_cursor(10, 0)) < decode_feed_cursor(encode_feed_cursor(10, 1))
+    print("✓ Cursor round trip")
+
+
+def test_invalid_cursor():
+    """Malformed cursors are rejected rather than replaying the feed from the start."""
+    for cursor in ["", "abc", "1-2-3", "12"]:
+        try:
+            decode_feed_cursor(cursor)
+        except ValueError:
+            continue
+        raise AssertionError(f"cursor {cursor!r} should be rejected")
+    print("✓ Invalid cursors rejected")
+
+
+def test_sse_framing():
+    """Server-sent events carry the cursor as their id, so reconnects resume after it."""
+    frame = _sse("change", {"entity_id": 3}, "7-2")
+    assert frame == 'id: 7-2\nevent: change\ndata: {"entity_id": 3}\n\n'
+    assert _sse("cursor", {}).startswith("event: cursor\n")
+    print("✓ SSE framing")
+
+
+def test_wait_is_woken_from_listener_thread():
+    """Readers await notifications on their event loop; the listener thread wakes them."""
+    listener = ChangeFeedListener()
+
+    async def scenario():
+        assert await listener.wait(0, 0.05) is False
+        threading.Timer(0.05, listener._signal).start()
+        assert await listener.wait(0, 5) is True
+        # A change notified between reading the feed and waiting is not lost.
+        assert await listener.wait(0, 5) is True
+        assert not listener._waiters
+
+    asyncio.run(scenario())
+    print("✓ Async wait woken by the listener thread")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_invalid_cursor()
+    test_sse_framing()
+    test_wait_is_woken_from_listener_thread()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Tests for listing validators."""
+
+import sys
+
+from pydantic import BaseModel
+
+sys.path.insert(0, '.')
+
+from app.services.collection_etags import collection_cache_headers, collection_etag, schema_salt
+from app.services.document_preview import etag_matches
+
+
+class _ItemV1(BaseModel):
+    id: int
+    title: str
+
+
+class _ItemV2(BaseModel):
+    id: int
+    title: str
+    owner: str
+
+
+def test_etag_tracks_rows_and_schema():
+    """Validators are weak and change with the row tokens or the response schema."""
+    etag = collection_etag(schema_salt(_ItemV1), "3.1042")
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == collection_etag(schema_salt(_ItemV1), "3.1042")
+    assert etag != collection_etag(schema_salt(_ItemV1), "3.1043")
+    assert etag != collection_etag(schema_salt(_ItemV2), "3.1042")
+    assert collection_etag("s", "1.2", "3.4") != collection_etag("s", "1.23", ".4")
+    print("✓ ETag tracks rows and schema")
+
+
+def test_weak_comparison():
+    """A weak validator matches with or without its W/ prefix, as If-None-Match requires."""
+    etag = collection_etag(schema_salt(_ItemV1), "3.1042")
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert not etag_matches(collection_etag(schema_salt(_ItemV1), "4.1042"), etag)
+    assert collection_cache_headers(etag) == {"ETag": etag, "Cache-Control": "private, no-cache"}
+    print("✓ Weak comparison")
+
+
+if __name__ == "__main__":
+    test_etag_tracks_rows_and_schema()
+    test_weak_comparison()
+    print("\n✅ All tests passed!")
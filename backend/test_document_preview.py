@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Tests for document preview payloads and their HTTP validators."""
+
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, '.')
+
+from docx import Document as DocxDocument
+
+from app.services.document_parser import PARSER_VERSION
+from app.services.document_preview import (
+    build_preview_payload,
+    cache_headers,
+    etag_matches,
+    file_etag,
+    get_document_preview_payload,
+    preview_etag,
+    preview_is_cacheable,
+)
+
+HASH = "ab" * 32
+
+
+def test_etags_are_strong_and_versioned():
+    assert file_etag(HASH) == f'"{HASH}"'
+    assert preview_etag(HASH, "docx") == f'"{HASH}-docx-p{PARSER_VERSION}"'
+    assert preview_etag(HASH, "docx") != preview_etag(HASH, "pptx")
+    assert file_etag("") is None and preview_etag("", "docx") is None
+    assert cache_headers(None) == {}
+    assert cache_headers(file_etag(HASH))["ETag"] == f'"{HASH}"'
+    print("✓ ETags are strong and versioned")
+
+
+def test_if_none_match_parsing():
+    etag = file_etag(HASH)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("*", None)
+    print("✓ If-None-Match parsing")
+
+
+def test_preview_payload_modes():
+    assert build_preview_payload("/nowhere.pdf", "PDF") == {"mode": "inline_file", "file_type": "pdf"}
+    assert build_preview_payload("/nowhere.zip", "zip") == {"mode": "download_only", "file_type": "zip"}
+    assert build_preview_payload("/nowhere.docx", "docx")["mode"] == "download_only"
+
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / "brief.docx"
+        doc = DocxDocument()
+        doc.add_paragraph("Scope: payments revamp")
+        doc.add_paragraph("")
+        doc.add_paragraph("Owner: platform team")
+        doc.save(str(path))
+        payload = build_preview_payload(str(path), "docx")
+    assert payload["mode"] == "extracted_text"
+    assert payload["line_count"] == 2
+    assert payload["preview_text"] == "Scope: payments revamp\nOwner: platform team"
+    assert [u["text"] for u in payload["preview_units"]] == ["Scope: payments revamp", "Owner: platform team"]
+    print("✓ Preview payload modes")
+
+
+class _RecordingSession:
+    def __init__(self, cached=None):
+        self.statements = []
+        self.cached = cached
+
+    def get(self, model, key):
+        return self.cached
+
+    def execute(self, statement):
+        self.statements.append(statement)
+
+    def commit(self):
+        pass
+
+
+def test_failed_parses_are_not_cached():
+    """A parse failure is rebuilt on every request; real payloads are stored once."""
+    assert not preview_is_cacheable({"mode": "download_only", "file_type": "docx"}, "DOCX")
+    assert preview_is_cacheable({"mode": "download_only", "file_type": "zip"}, "zip")
+    assert preview_is_cacheable({"mode": "extracted_text", "file_type": "docx"}, "docx")
+
+    db = _RecordingSession()
+    missing = SimpleNamespace(file_hash=HASH, file_path="/nowhere.docx")
+    assert get_document_preview_payload(db, missing, "docx")["mode"] == "download_only"
+    assert db.statements == []
+
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / "brief.docx"
+        doc = DocxDocument()
+        doc.add_paragraph("Scope: payments revamp")
+        doc.save(str(path))
+        stored = SimpleNamespace(file_hash=HASH, file_path=str(path))
+        assert get_document_preview_payload(db, stored, "docx")["mode"] == "extracted_text"
+        assert len(db.statements) == 1
+
+        # A failure cached by an older build is parsed again and overwritten.
+        db = _RecordingSession(SimpleNamespace(payload={"mode": "download_only", "file_type": "docx"}))
+        assert get_document_preview_payload(db, stored, "docx")["mode"] == "extracted_text"
+        assert len(db.statements) == 1
+        db = _RecordingSession(SimpleNamespace(payload={"mode": "extracted_text", "file_type": "docx"}))
+        assert get_document_preview_payload(db, stored, "docx") == db.cached.payload
+        assert db.statements == []
+    print("✓ Failed parses are not cached")
+
+
+if __name__ == "__main__":
+    test_etags_are_strong_and_versioned()
+    test_if_none_match_parsing()
+    test_preview_payload_modes()
+    test_failed_parses_are_not_cached()
+    print("\n✅ All tests passed!")
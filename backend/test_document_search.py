@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Tests for full-text search over parsed document units.
+
+The search tests need a disposable PostgreSQL database; every table in it is
+dropped. Run with
+    DOCUMENT_SEARCH_DATABASE_URL=postgresql+psycopg2://... python test_document_search.py
+Without that variable only the unit-row tests run.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, '.')
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.services.document_search as document_search
+from app.api.deps import get_current_user, get_db
+from app.api.routes import documents
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.models.document import Document
+from app.models.document_unit import DocumentUnit
+from app.models.enums import UserRole
+from app.models.user import User
+from app.services.document_parser import PARSER_VERSION
+from app.services.document_search import (
+    _unit_rows,
+    index_document,
+    index_document_units,
+    index_pending_documents,
+    search_document_units,
+)
+from app.services.principal_cache import Principal
+
+DATABASE_URL = os.getenv("DOCUMENT_SEARCH_DATABASE_URL", "")
+
+
+def test_unit_rows():
+    """Units keep their position and ref; empty units are dropped and NULs stripped."""
+    rows = _unit_rows(
+        7,
+        [
+            {"ref": "page:1:line:1", "text": "  Checkout redesign  "},
+            {"ref": "page:1:line:2", "text": "   "},
+            {"ref": "x" * 200, "text": "Payments\x00 API"},
+            {"text": "No ref"},
+        ],
+    )
+    assert rows == [
+        {"document_id": 7, "position": 0, "ref": "page:1:line:1", "text": "Checkout redesign"},
+        {"document_id": 7, "position": 2, "ref": "x" * 120, "text": "Payments API"},
+        {"document_id": 7, "position": 3, "ref": "", "text": "No ref"},
+    ]
+    print("✓ Unit rows")
+
+
+def _setup():
+    engine = create_engine(DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        user = User(full_name="CEO", email="ceo@search.test", password_hash=get_password_hash("x"), role=UserRole.CEO, is_active=True)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    return engine, Session, user_id
+
+
+def _document(db, user_id: int, name: str, lines: list[str], directory: str) -> Document:
+    path = Path(directory) / name
+    path.write_text("\n".join(lines), encoding="utf-8")
+    doc = Document(uploaded_by=user_id, file_name=name, file_type="txt", file_path=str(path), file_hash="")
+    db.add(doc)
+    db.flush()
+    index_document(db, doc)
+    db.commit()
+    return doc
+
+
+def _requires_database():
+    if not DATABASE_URL:
+        pytest.skip("DOCUMENT_SEARCH_DATABASE_URL is not set")
+
+
+def test_index_and_search_with_refs():
+    """Indexed units carry the parser ref back to each hit."""
+    _requires_database()
+    engine, Session, user_id = _setup()
+    try:
+        with tempfile.TemporaryDirectory() as directory, Session() as db:
+            doc = _document(db, user_id, "brd.txt", ["Overview", "Checkout must support saved cards"], directory)
+            assert doc.units_parser_version == PARSER_VERSION
+            assert [(unit.position, unit.ref) for unit in db.query(DocumentUnit).order_by(DocumentUnit.position)] == [
+                (0, "line:1"),
+                (1, "line:2"),
+            ]
+            result = search_document_units(db, "saved cards", limit=10, offset=0)
+            assert result["total"] == 1
+            (hit,) = result["hits"]
+            assert (hit["document_id"], hit["file_name"], hit["ref"]) == (doc.id, "brd.txt", "line:2")
+            assert hit["text"] == "Checkout must support saved cards"
+    finally:
+        engine.dispose()
+    print("✓ Index and search with refs")
+
+
+def test_web_search_syntax():
+    """Quoted phrases, OR and -term are parsed as in a web search box."""
+    _requires_database()
+    engine, Session, user_id = _setup()
+    try:
+        with tempfile.TemporaryDirectory() as directory, Session() as db:
+            _document(
+                db,
+                user_id,
+                "spec.txt",
+                [
+                    "payment gateway integration",
+                    "gateway for payment retries",
+                    "refund workflow",
+                    "payment gateway with legacy fallback",
+                ],
+                directory,
+            )
+
+            def texts(query):
+                return sorted(hit["text"] for hit in search_document_units(db, query, limit=10, offset=0)["hits"])
+
+            assert texts('"payment gateway"') == ["payment gateway integration", "payment gateway with legacy fallback"]
+            assert texts("refund OR retries") == ["gateway for payment retries", "refund workflow"]
+            assert texts("payment -legacy") == ["gateway for payment retries", "payment gateway integration"]
+            assert texts("invoices") == []
+    finally:
+        engine.dispose()
+    print("✓ Web-search syntax")
+
+
+def test_ranking_and_pagination():
+    """Denser matches rank first; pages are stable and ``total`` counts every match."""
+    _requires_database()
+    engine, Session, user_id = _setup()
+    try:
+        with tempfile.TemporaryDirectory() as directory, Session() as db:
+            _document(
+                db,
+                user_id,
+                "notes.txt",
+                [
+                    "onboarding",
+                    "onboarding onboarding checklist for onboarding",
+                    "unrelated line",
+                    "onboarding flow",
+                    "onboarding emails",
+                ],
+                directory,
+            )
+            first = search_document_units(db, "onboarding", limit=2, offset=0)
+            second = search_document_units(db, "onboarding", limit=2, offset=2)
+            third = search_document_units(db, "onboarding", limit=2, offset=4)
+            assert first["total"] == second["total"] == 4
+            assert first["hits"][0]["text"] == "onboarding onboarding checklist for onboarding"
+            pages = [hit["ref"] for page in (first, second) for hit in page["hits"]]
+            assert len(pages) == len(set(pages)) == 4
+            assert third["hits"] == []
+            ranks = [hit["rank"] for page in (first, second) for hit in page["hits"]]
+            assert ranks == sorted(ranks, reverse=True)
+    finally:
+        engine.dispose()
+    print("✓ Ranking and pagination")
+
+
+def test_reindex_on_parser_version(monkeypatch):
+    """Documents indexed by an older parser are re-indexed; current ones are left alone."""
+    _requires_database()
+    engine, Session, user_id = _setup()
+    try:
+        with tempfile.TemporaryDirectory() as directory, Session() as db:
+            doc = _document(db, user_id, "v1.txt", ["legacy wording"], directory)
+            Path(doc.file_path).write_text("revised wording", encoding="utf-8")
+            assert index_pending_documents(db, limit=10) == 0
+            assert search_document_units(db, "revised", limit=10, offset=0)["total"] == 0
+
+            monkeypatch.setattr(document_search, "PARSER_VERSION", PARSER_VERSION + 1)
+            assert index_pending_documents(db, limit=10) == 1
+            db.refresh(doc)
+            assert doc.units_parser_version == PARSER_VERSION + 1
+            assert search_document_units(db, "revised", limit=10, offset=0)["total"] == 1
+            assert search_document_units(db, "legacy", limit=10, offset=0)["total"] == 0
+            assert index_pending_documents(db, limit=10) == 0
+    finally:
+        engine.dispose()
+    print("✓ Re-index on parser version change")
+
+
+def test_units_removed_with_document():
+    """Deleting a document removes its units from search; the route reports the hits."""
+    _requires_database()
+    engine, Session, user_id = _setup()
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    api = FastAPI()
+    api.include_router(documents.router)
+    api.dependency_overrides[get_db] = override_db
+    api.dependency_overrides[get_current_user] = lambda: Principal(
+        id=user_id, email="ceo@search.test", full_name="CEO", role=UserRole.CEO, is_active=True
+    )
+    client = TestClient(api)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            with Session() as db:
+                kept = _document(db, user_id, "kept.txt", ["quarterly roadmap review"], directory)
+                removed = _document(db, user_id, "removed.txt", ["roadmap retirement plan"], directory)
+                kept_id, removed_id = kept.id, removed.id
+
+            response = client.get("/documents/search", params={"q": "  roadmap  ", "limit": 1})
+            assert response.status_code == 200
+            body = response.json()
+            assert (body["query"], body["total"], len(body["hits"])) == ("roadmap", 2, 1)
+
+            response = client.post("/documents/bulk-delete", json={"ids": [removed_id]})
+            assert response.status_code == 200, response.text
+            body = client.get("/documents/search", params={"q": "roadmap"}).json()
+            assert [hit["document_id"] for hit in body["hits"]] == [kept_id]
+            with Session() as db:
+                assert db.query(DocumentUnit).filter(DocumentUnit.document_id == removed_id).count() == 0
+    finally:
+        engine.dispose()
+    print("✓ Units removed with their document")
+
+
+def test_index_replaces_units():
+    """Re-indexing replaces a document's units rather than appending to them."""
+    _requires_database()
+    engine, Session, user_id = _setup()
+    try:
+        with tempfile.TemporaryDirectory() as directory, Session() as db:
+            doc = _document(db, user_id, "draft.txt", ["first draft", "second line"], directory)
+            assert index_document_units(db, doc, [{"ref": "line:1", "text": "final text"}]) == 1
+            db.commit()
+            assert [unit.text for unit in db.query(DocumentUnit).filter(DocumentUnit.document_id == doc.id)] == [
+                "final text"
+            ]
+    finally:
+        engine.dispose()
+    print("✓ Re-indexing replaces units")
+
+
+if __name__ == "__main__":
+    test_unit_rows()
+    if DATABASE_URL:
+        monkeypatch = pytest.MonkeyPatch()
+        try:
+            test_index_and_search_with_refs()
+            test_web_search_syntax()
+            test_ranking_and_pagination()
+            test_reindex_on_parser_version(monkeypatch)
+        finally:
+            monkeypatch.undo()
+        test_units_removed_with_document()
+        test_index_replaces_units()
+    print("\n✅ All tests passed!")
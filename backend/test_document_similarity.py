@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Tests for SimHash fingerprints used to spot revised document versions."""
+
+import random
+import sys
+
+sys.path.insert(0, '.')
+
+from app.services.document_similarity import (
+    SIMHASH_MAX_DISTANCE,
+    hamming_distance,
+    normalized_units,
+    simhash,
+    simhash_bands,
+    unit_overlap_percent,
+)
+
+WORDS = "scope payments ledger refund invoice customer portal approval audit export gateway sla".split()
+
+
+def _body(seed: int, count: int = 60) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(10)) for _ in range(count)]
+
+
+def test_normalization_ignores_layout_noise():
+    units = [{"text": "Scope:  Payments,\nRefunds!"}, {"text": "12"}, {"text": "  "}, {"text": "scope payments refunds"}]
+    assert normalized_units(units) == ["scope payments refunds", "scope payments refunds"]
+    print("✓ Normalization ignores layout noise")
+
+
+def test_revision_is_near_and_rewrite_is_far():
+    original = _body(1)
+    revised = ["cover page v2 march"] + original[1:-1] + ["new closing clause"]
+    unrelated = _body(2)
+    base = simhash(original)
+    assert hamming_distance(base, simhash(revised)) <= SIMHASH_MAX_DISTANCE
+    assert hamming_distance(base, simhash(unrelated)) > SIMHASH_MAX_DISTANCE
+    assert simhash([]) == 0
+    print("✓ Revision is near, rewrite is far")
+
+
+def test_bands_catch_every_hash_within_max_distance():
+    """Pigeonhole: flipping up to SIMHASH_MAX_DISTANCE bits always leaves one band intact."""
+    rng = random.Random(7)
+    for _ in range(200):
+        value = rng.getrandbits(64)
+        flipped = value
+        for bit in rng.sample(range(64), SIMHASH_MAX_DISTANCE):
+            flipped ^= 1 << bit
+        assert set(simhash_bands(value)) & set(simhash_bands(flipped))
+    print("✓ Bands catch every hash within max distance")
+
+
+def test_overlap_percent():
+    assert unit_overlap_percent(["a", "b", "c"], ["a", "b", "d"]) == 50.0
+    assert unit_overlap_percent(["a"], ["a", "a"]) == 100.0
+    assert unit_overlap_percent([], []) == 0.0
+    print("✓ Overlap percent")
+
+
+if __name__ == "__main__":
+    test_normalization_ignores_layout_noise()
+    test_revision_is_near_and_rewrite_is_far()
+    test_bands_catch_every_hash_within_max_distance()
+    test_overlap_percent()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Contract tests for the opt-in orjson listings: bare rows must render like the response schemas."""
+
+import json
+import sys
+import typing
+from datetime import datetime
+from enum import Enum
+
+sys.path.insert(0, '.')
+
+from pydantic import BaseModel
+
+from app.models.document import Document
+from app.models.intake_item import IntakeItem
+from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_movement_request import RoadmapMovementRequest
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.schemas.audit import (
+    AuditDocumentRowOut,
+    AuditIntakeChangeRowOut,
+    AuditMovementRowOut,
+    AuditRoadmapChangeRowOut,
+)
+from app.schemas.document import DocumentOut
+from app.schemas.intake import IntakeOut
+from app.schemas.roadmap import (
+    RoadmapItemOut,
+    RoadmapMovementRequestOut,
+    RoadmapPlanOut,
+    RoadmapRedundancyOut,
+)
+from app.services.audit_center import AUDIT_SECTIONS
+from app.services.fast_json import json_response, schema_columns
+
+FAST_LISTINGS = [
+    (RoadmapItem, RoadmapItemOut),
+    (RoadmapPlanItem, RoadmapPlanOut),
+    (RoadmapMovementRequest, RoadmapMovementRequestOut),
+    (IntakeItem, IntakeOut),
+    (Document, DocumentOut),
+]
+AUDIT_ROW_SCHEMAS = {
+    "documents": AuditDocumentRowOut,
+    "intake_changes": AuditIntakeChangeRowOut,
+    "roadmap_changes": AuditRoadmapChangeRowOut,
+    "movement_events": AuditMovementRowOut,
+}
+SAMPLE_TIME = datetime(2026, 3, 4, 5, 6, 7, 890123)
+
+
+def _sample(column, annotation):
+    """A representative non-null value for ``column``, as the driver would return it."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return "x"
+    if issubclass(python_type, Enum):
+        return next(iter(python_type))
+    if python_type is bool:
+        return True
+    if python_type is int:
+        return 3
+    if python_type is float:
+        return 1.5
+    if python_type is datetime:
+        return SAMPLE_TIME
+    if python_type in (dict, list):
+        return _json_sample(annotation)
+    return "x"
+
+
+def _json_sample(annotation):
+    """A JSON column value of the shape the schema field declares."""
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if typing.get_origin(annotation) in (typing.Union, type(int | None)):
+        return _json_sample(args[0])
+    if typing.get_origin(annotation) is list:
+        return [2, 5] if args and args[0] is int else ["a", "b"]
+    return {"k": 1}
+
+
+def _can_be_null(column, base_table) -> bool:
+    """Outer-joined and nullable columns can come back null; coalesced expressions cannot."""
+    element = getattr(column, "element", column)
+    table = getattr(element, "table", None)
+    if table is None:
+        return False
+    return table is not base_table or element.nullable
+
+
+def _fast_json(content):
+    return json.loads(json_response(content).body)
+
+
+def _schema_json(schema: type[BaseModel], row: dict):
+    return json.loads(schema.model_validate(row).model_dump_json())
+
+
+def test_listing_columns_cover_schemas():
+    """Every fast listing selects exactly the fields its schema renders, in order."""
+    for model, schema in FAST_LISTINGS:
+        columns = schema_columns(model, schema)
+        assert [column.name for column in columns] == list(schema.model_fields)
+
+    class Extra(BaseModel):
+        id: int
+        not_a_column: str
+
+    try:
+        schema_columns(RoadmapItem, Extra)
+    except ValueError as err:
+        assert "not_a_column" in str(err)
+    else:
+        raise AssertionError("schema with a computed field accepted")
+    print("✓ Fast listings select their schema columns")
+
+
+def test_listing_rows_render_like_schemas():
+    """A row of each listing's columns renders to the same JSON with orjson as through its schema."""
+    for model, schema in FAST_LISTINGS:
+        row = {
+            column.name: _sample(column, schema.model_fields[column.name].annotation)
+            for column in schema_columns(model, schema)
+        }
+        assert _fast_json([row]) == [_schema_json(schema, row)], schema.__name__
+        nullable = {column.name: None for column in schema_columns(model, schema) if column.nullable}
+        if nullable:
+            row.update(nullable)
+            assert _fast_json([row]) == [_schema_json(schema, row)], schema.__name__
+    print("✓ Fast listing rows render like their schemas")
+
+
+def test_audit_section_rows_render_like_schemas():
+    """Finished audit section rows have the row schema's fields and render the same JSON."""
+    for name, schema in AUDIT_ROW_SCHEMAS.items():
+        section = AUDIT_SECTIONS[name]()
+        annotations = {key: field.annotation for key, field in schema.model_fields.items()}
+        for blank in (False, True):
+            raw = {
+                column.name: None
+                if blank and _can_be_null(column, section.id_column.table)
+                else _sample(column, annotations.get(column.name))
+                for column in section.statement.selected_columns
+            }
+            row = section.finish(raw)
+            assert set(row) == set(schema.model_fields), name
+            assert _fast_json(row) == _schema_json(schema, row), name
+    print("✓ Audit section rows render like their schemas")
+
+
+def test_redundancy_rows_render_like_schema():
+    """The plain redundancy entries match RoadmapRedundancyOut."""
+    entry = {
+        "item_id": 4,
+        "is_redundant": True,
+        "best_score": 0.91,
+        "best_match_id": 2,
+        "best_match_title": "Checkout",
+        "resolved_by_decision": "",
+        "matches": [{"item_id": 2, "title": "Checkout", "score": 0.91}],
+    }
+    assert set(entry) == set(RoadmapRedundancyOut.model_fields)
+    assert _fast_json([entry]) == [_schema_json(RoadmapRedundancyOut, entry)]
+    print("✓ Redundancy entries render like their schema")
+
+
+if __name__ == "__main__":
+    test_listing_columns_cover_schemas()
+    test_listing_rows_render_like_schemas()
+    test_audit_section_rows_render_like_schemas()
+    test_redundancy_rows_render_like_schema()
+    print("\n✅ All tests passed!")
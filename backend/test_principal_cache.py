@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the principal cache used by authentication and role checks.
+"""
+import sys
+import threading
+
+sys.path.insert(0, '.')
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.deps import ensure_custom_role_permission
+from app.core.config import settings
+from app.models.enums import UserRole
+from app.services.principal_cache import Principal, PrincipalCache
+
+
+def _listening_cache() -> PrincipalCache:
+    """A cache that behaves as if its listener were connected, without starting one."""
+    cache = PrincipalCache()
+    cache._thread = threading.current_thread()
+    cache._set_listening(True)
+    return cache
+
+
+def _principal(user_id: int = 1, **values) -> Principal:
+    return Principal(
+        id=user_id,
+        email=f"user{user_id}@example.com",
+        full_name=f"User {user_id}",
+        role=values.pop("role", UserRole.PM),
+        is_active=values.pop("is_active", True),
+        **values,
+    )
+
+
+def test_put_and_get():
+    cache = _listening_cache()
+    principal = _principal()
+    cache.put(principal, cache.generation())
+    assert cache.get(1) is principal
+    assert cache.get(2) is None
+    print("✓ Cached principals are served by user id")
+
+
+def test_entries_expire(monkeypatch):
+    cache = _listening_cache()
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_TTL_SECONDS", 0)
+    cache.put(_principal(), cache.generation())
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_TTL_SECONDS", 30)
+    assert cache.get(1) is None
+    assert 1 not in cache._entries
+    print("✓ Entries expire after the TTL")
+
+
+def test_disabled_by_zero_ttl(monkeypatch):
+    cache = _listening_cache()
+    cache.put(_principal(), cache.generation())
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_TTL_SECONDS", 0)
+    assert cache.get(1) is None
+    print("✓ A TTL of zero disables the cache")
+
+
+def test_stale_put_is_dropped():
+    """A principal loaded before an invalidation must not be cached after it."""
+    cache = _listening_cache()
+    generation = cache.generation()
+    cache.invalidate_user(1)
+    cache.put(_principal(), generation)
+    assert cache.get(1) is None
+    print("✓ Principals loaded before an invalidation are not cached")
+
+
+def test_invalidate_user():
+    cache = _listening_cache()
+    cache.put(_principal(1), cache.generation())
+    cache.put(_principal(2), cache.generation())
+    cache.invalidate_user(1)
+    assert cache.get(1) is None
+    assert cache.get(2) is not None
+    print("✓ Invalidating a user drops only that user")
+
+
+def test_invalidate_custom_role():
+    cache = _listening_cache()
+    cache.put(_principal(1, custom_role_id=7, custom_role_name="Planner"), cache.generation())
+    cache.put(_principal(2, custom_role_id=8, custom_role_name="Reviewer"), cache.generation())
+    cache.put(_principal(3), cache.generation())
+    cache.invalidate_custom_role(7)
+    assert cache.get(1) is None
+    assert cache.get(2) is not None
+    assert cache.get(3) is not None
+    print("✓ Invalidating a custom role drops the users holding it")
+
+
+def test_bypassed_without_listener():
+    """Nothing is cached or served while notifications could be missed."""
+    cache = _listening_cache()
+    cache.put(_principal(), cache.generation())
+    cache._set_listening(False)
+    assert cache.get(1) is None
+    cache.put(_principal(), cache.generation())
+    assert cache._entries == {}
+    print("✓ The cache is bypassed while the listener is down")
+
+
+def test_notifications():
+    cache = _listening_cache()
+    cache.put(_principal(1, custom_role_id=7, custom_role_name="Planner"), cache.generation())
+    cache.put(_principal(2), cache.generation())
+    cache._apply("custom_role:7")
+    assert cache.get(1) is None
+    cache._apply("user:2")
+    assert cache.get(2) is None
+    cache.put(_principal(3), cache.generation())
+    cache._apply("user:")
+    assert cache.get(3) is not None
+    print("✓ Notifications invalidate users and custom roles")
+
+
+def test_custom_role_permission():
+    ensure_custom_role_permission(_principal(), "can_edit_roadmap", "edit roadmap")
+    planner = _principal(
+        custom_role_id=7,
+        custom_role_name="Planner",
+        custom_role_permissions=frozenset({"can_edit_roadmap"}),
+    )
+    ensure_custom_role_permission(planner, "can_edit_roadmap", "edit roadmap")
+    with pytest.raises(HTTPException) as denied:
+        ensure_custom_role_permission(planner, "can_manage_settings", "manage settings")
+    assert denied.value.status_code == 403
+    assert denied.value.detail == "Custom role 'Planner' does not allow: manage settings"
+    print("✓ Custom role permissions are checked against the principal")
+
+
+if __name__ == "__main__":
+    monkeypatch = pytest.MonkeyPatch()
+    try:
+        test_put_and_get()
+        test_entries_expire(monkeypatch)
+        monkeypatch.undo()
+        test_disabled_by_zero_ttl(monkeypatch)
+        monkeypatch.undo()
+        test_stale_put_is_dropped()
+        test_invalidate_user()
+        test_invalidate_custom_role()
+        test_bypassed_without_listener()
+        test_notifications()
+        test_custom_role_permission()
+    finally:
+        monkeypatch.undo()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for the read-only row layer, and a benchmark against loading ORM entities.
+
+The benchmark needs a disposable PostgreSQL database; every table in it is
+dropped. Run with
+    READ_MODEL_BENCH_DATABASE_URL=postgresql+psycopg2://... python test_read_models.py
+Without that variable the benchmark is skipped.
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, '.')
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.api.routes.dashboard import _is_ai_plan_item
+from app.api.routes.roadmap import _month_marks, _quarter_from_plan_item
+from app.db.base import Base
+from app.models.intake_item import IntakeItem
+from app.models.roadmap_item import RoadmapItem
+from app.models.roadmap_movement_request import RoadmapMovementRequest
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.services.capacity_governance import schedule_plans
+from app.services.read_models import (
+    CommitmentBriefRow,
+    CommitmentFlagsRow,
+    IntakeBriefRow,
+    IntakeFlagsRow,
+    MovementBriefRow,
+    PlanBriefRow,
+    PlanCapacityRow,
+    PlanExportRow,
+    plan_export_rows,
+    row_select,
+)
+
+DATABASE_URL = os.getenv("READ_MODEL_BENCH_DATABASE_URL", "")
+BENCH_PLANS = 20000
+
+ROW_MODELS = [
+    (IntakeFlagsRow, IntakeItem),
+    (IntakeBriefRow, IntakeItem),
+    (CommitmentFlagsRow, RoadmapItem),
+    (CommitmentBriefRow, RoadmapItem),
+    (PlanCapacityRow, RoadmapPlanItem),
+    (PlanExportRow, RoadmapPlanItem),
+    (PlanBriefRow, RoadmapPlanItem),
+    (MovementBriefRow, RoadmapMovementRequest),
+]
+
+
+def _plan(**values) -> RoadmapPlanItem:
+    defaults = dict(
+        id=1,
+        bucket_item_id=1,
+        title="Checkout",
+        priority="high",
+        project_context="client",
+        delivery_mode="standard",
+        accountable_person="",
+        planning_status="not_started",
+        confidence="medium",
+        planned_start_date="2026-02-02",
+        planned_end_date="2026-04-26",
+        pickup_period="",
+        completion_period="",
+        resource_count=None,
+        effort_person_weeks=None,
+        dependency_ids=[],
+        entered_roadmap_at=datetime(2026, 1, 5),
+        fe_fte=1.0,
+        be_fte=None,
+        ai_fte=0.5,
+        pm_fte=None,
+        fs_fte=0.25,
+        activities=[],
+    )
+    return RoadmapPlanItem(**{**defaults, **values})
+
+
+def _as_row(row_type, model):
+    return row_type._make(getattr(model, name) for name in row_type._fields)
+
+
+def test_rows_select_only_their_columns():
+    """Each row type maps onto columns of its model and selects nothing else."""
+    for row_type, model in ROW_MODELS:
+        statement = row_select(model, row_type)
+        assert [column.name for column in statement.selected_columns] == list(row_type._fields), row_type
+        assert {table.name for table in statement.get_final_froms()} == {model.__tablename__}
+    print("✓ Row types select only their columns")
+
+
+def test_rows_stand_in_for_models():
+    """Scheduler, dashboard flags and export formatting read rows as they read plan items."""
+    plans = [
+        _plan(id=1),
+        _plan(id=2, planned_start_date="", planned_end_date="", pickup_period="Q3", ai_fte=None, activities=["[AI] eval"]),
+        _plan(id=3, project_context="internal", fe_fte=float("nan")),
+    ]
+    capacity_rows = [_as_row(PlanCapacityRow, plan) for plan in plans]
+    from_models, from_rows = schedule_plans(plans), schedule_plans(capacity_rows)
+    assert (from_models.fte == from_rows.fte).all()
+    assert (from_models.first_week == from_rows.first_week).all()
+    assert from_models.unscheduled_demand_items == from_rows.unscheduled_demand_items
+    assert [_is_ai_plan_item(plan) for plan in plans] == [_is_ai_plan_item(row) for row in capacity_rows]
+
+    for plan in plans:
+        row = _as_row(PlanExportRow, plan)
+        assert _month_marks(row, 2026) == _month_marks(plan, 2026)
+        assert _quarter_from_plan_item(row) == _quarter_from_plan_item(plan)
+    print("✓ Rows stand in for plan items")
+
+
+def _measure(load):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def test_rows_are_lighter_than_entities():
+    """Benchmark: loading every plan for the export as rows vs as ORM entities."""
+    if not DATABASE_URL:
+        pytest.skip("READ_MODEL_BENCH_DATABASE_URL is not set")
+    engine = create_engine(DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    try:
+        with Session() as db:
+            buckets = [RoadmapItem(title=f"Item {index}", scope="scope " * 60) for index in range(BENCH_PLANS)]
+            db.add_all(buckets)
+            db.flush()
+            db.add_all(
+                _plan(id=None, bucket_item_id=bucket.id, title=bucket.title, scope=bucket.scope) for bucket in buckets
+            )
+            db.commit()
+
+        with Session() as db:
+            entities, entity_seconds, entity_peak = _measure(
+                lambda: db.query(RoadmapPlanItem).order_by(RoadmapPlanItem.title.asc()).all()
+            )
+            assert len(entities) == BENCH_PLANS
+        with Session() as db:
+            rows, row_seconds, row_peak = _measure(lambda: plan_export_rows(db))
+            assert len(rows) == BENCH_PLANS
+    finally:
+        engine.dispose()
+
+    print(
+        f"✓ {BENCH_PLANS} plans: entities {entity_seconds * 1000:.0f} ms / {entity_peak / 2**20:.1f} MiB, "
+        f"rows {row_seconds * 1000:.0f} ms / {row_peak / 2**20:.1f} MiB"
+    )
+    assert row_peak < entity_peak / 2, (row_peak, entity_peak)
+
+
+if __name__ == "__main__":
+    test_rows_select_only_their_columns()
+    test_rows_stand_in_for_models()
+    if DATABASE_URL:
+        test_rows_are_lighter_than_entities()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Tests for point-in-time roadmap snapshots."""
+
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, '.')
+
+from app.models.roadmap_plan_item import RoadmapPlanItem
+from app.services.roadmap_as_of import (
+    as_naive_utc,
+    plan_item_from_snapshot,
+    plan_item_snapshot,
+    roadmap_item_from_snapshot,
+)
+
+
+def test_plan_snapshot_round_trip():
+    """A logged plan snapshot rebuilds the plan the planning code takes, datetimes included."""
+    entered = datetime(2026, 1, 5, 9, 30)
+    plan = RoadmapPlanItem(
+        id=7,
+        bucket_item_id=3,
+        title="Checkout",
+        fe_fte=0.5,
+        planned_start_date="2026-02-02",
+        planned_end_date="2026-03-01",
+        dependency_ids=[2],
+        entered_roadmap_at=entered,
+        created_at=entered,
+        version_no=4,
+    )
+    snapshot = plan_item_snapshot(plan)
+    assert "id" not in snapshot
+    assert snapshot["entered_roadmap_at"] == "2026-01-05T09:30:00"
+
+    rebuilt = plan_item_from_snapshot(7, snapshot)
+    assert rebuilt.id == 7 and rebuilt.bucket_item_id == 3
+    assert rebuilt.entered_roadmap_at == entered
+    assert (rebuilt.planned_start_date, rebuilt.planned_end_date) == ("2026-02-02", "2026-03-01")
+    assert rebuilt.dependency_ids == [2] and rebuilt.version_no == 4
+    print("✓ Plan snapshot round trip")
+
+
+def test_old_snapshots_take_column_defaults():
+    """Fields added after a version was logged read as their column defaults."""
+    item = roadmap_item_from_snapshot(5, {"title": "Legacy", "scope": "s", "activities": []})
+    assert item.id == 5 and item.title == "Legacy"
+    assert item.priority == "medium" and item.delivery_mode == "standard"
+    assert item.rnd_hypothesis == ""
+    print("✓ Old snapshots take column defaults")
+
+
+def test_as_naive_utc():
+    """Aware timestamps compare against the naive UTC columns."""
+    aware = datetime(2026, 4, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+    assert as_naive_utc(aware) == datetime(2026, 4, 1, 10, 0)
+    naive = datetime(2026, 4, 1, 12, 0)
+    assert as_naive_utc(naive) is naive
+    print("✓ Naive UTC timestamps")
+
+
+if __name__ == "__main__":
+    test_plan_snapshot_round_trip()
+    test_old_snapshots_take_column_defaults()
+    test_as_naive_utc()
+    print("\n✅ All tests passed!")
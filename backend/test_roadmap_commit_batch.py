@@ -0,0 +1,64 @@
+"""
+Tests for cumulative validation of multi-item roadmap commitments.
+"""
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, '.')
+
+from app.api.routes.roadmap import _default_role_vectors, _plan_commit_batch
+from app.models.governance_config import GovernanceConfig
+
+
+def _governance():
+    return GovernanceConfig(
+        team_fe=1, team_be=1, team_ai=1, team_pm=1, team_fs=0,
+        efficiency_fe=1.0, efficiency_be=1.0, efficiency_ai=1.0, efficiency_pm=1.0, efficiency_fs=1.0,
+        quota_client=1.0, quota_internal=0.0,
+    )
+
+
+def _bucket(item_id, title, fe_fte):
+    return SimpleNamespace(
+        id=item_id, title=title, picked_up=True, project_context="client",
+        fe_fte=fe_fte, be_fte=0.0, ai_fte=0.0, pm_fte=0.0, fs_fte=0.0,
+    )
+
+
+def test_batch_counts_earlier_items():
+    """Two items that each fit alone must not both be approved together."""
+    buckets = [_bucket(1, "A", 0.6), _bucket(2, "B", 0.6), _bucket(3, "C", 0.3)]
+    approved, failures = _plan_commit_batch(
+        governance=_governance(),
+        bucket_items=buckets,
+        plans=[],
+        roles=_default_role_vectors(),
+        duration_weeks=52,
+    )
+
+    assert [bucket.id for bucket in approved] == [1, 3]
+    assert [(code, failure.bucket_item_id) for code, failure in failures] == [(409, 2)]
+    assert "FE" in failures[0][1].reason
+    print("✓ Batch commit counts earlier items")
+
+
+def test_batch_reports_every_failure():
+    """Invalid FTE and capacity failures are all reported."""
+    buckets = [_bucket(1, "A", 1.2), _bucket(2, "B", 0.0), _bucket(3, "C", -1.0)]
+    approved, failures = _plan_commit_batch(
+        governance=_governance(),
+        bucket_items=buckets,
+        plans=[],
+        roles=_default_role_vectors(),
+        duration_weeks=52,
+    )
+
+    assert approved == []
+    assert [(code, failure.bucket_item_id) for code, failure in failures] == [(409, 1), (400, 2), (400, 3)]
+    print("✓ Batch commit reports every failure")
+
+
+if __name__ == "__main__":
+    test_batch_counts_earlier_items()
+    test_batch_reports_every_failure()
+    print("\n✅ All tests passed!")